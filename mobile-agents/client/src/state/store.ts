@@ -208,6 +208,17 @@ export const useStore = create<AppState>((set, get) => ({
       case 'edge_status':
         state.updateEdgeStatus(event.edgeId, event.status);
         break;
+      case 'graph_patch':
+        set((s) => ({
+          graphState: s.graphState
+            ? {
+                ...s.graphState,
+                nodes: [...s.graphState.nodes, ...event.nodes],
+                edges: [...s.graphState.edges, ...event.edges],
+              }
+            : null,
+        }));
+        break;
       case 'execution_complete':
         set((s) => ({
           isExecuting: false,
@@ -448,6 +459,9 @@ export const useStore = create<AppState>((set, get) => ({
             status: 'pending',
             requiresApproval: s.requires_approval ?? false,
             dependsOn: s.depends_on || [],
+            type: s.type || 'tool',
+            mapOver: s.map_over ?? undefined,
+            reducer: s.reducer || 'concat',
           })),
           status: 'proposed',
           createdAt: new Date().toISOString(),
@@ -540,6 +554,9 @@ export const useStore = create<AppState>((set, get) => ({
           params: s.params,
           requires_approval: s.requiresApproval,
           depends_on: s.dependsOn || [],
+          type: s.type || 'tool',
+          map_over: s.mapOver ?? null,
+          reducer: s.reducer || 'concat',
         })),
       };
 
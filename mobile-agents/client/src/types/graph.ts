@@ -17,6 +17,8 @@ export interface GraphNodeData extends Record<string, unknown> {
   duration?: number;
   inputModality?: 'text' | 'voice' | 'image';
   timestamp?: string;
+  stepType?: 'tool' | 'map';
+  parentId?: string;
 }
 
 export interface GraphEdgeData extends Record<string, unknown> {
@@ -33,12 +35,51 @@ export interface ExecutionGraphState {
   edges: FlowEdge[];
   currentNodeId?: string;
   status: 'planning' | 'awaiting_approval' | 'executing' | 'completed' | 'failed';
+  estimate?: PlanEstimate;
+}
+
+export interface PlanEstimate {
+  stepMs: Record<string, number>;
+  criticalPath: string[];
+  criticalPathMs: number;
+  totalMs: number;
+  synthesisMs: number;
+  priority: Record<string, number>;
+}
+
+export interface UsageRecord {
+  role: string;
+  model: string;
+  ok: boolean;
+  latencyMs: number;
+  promptTokens: number;
+  completionTokens: number;
+  cachedTokens: number;
+  audioSeconds: number;
+  costUsd: number;
+  conversationId: string | null;
+  executionId: string | null;
+  stepId: string | null;
+  agentId: string | null;
+  userId: string | null;
+  source: string | null;
 }
 
 export type ExecutionSSEEvent =
   | { type: 'graph_init'; graph: ExecutionGraphState }
   | { type: 'node_status'; nodeId: string; status: NodeStatus; result?: string; duration?: number }
   | { type: 'edge_status'; edgeId: string; status: EdgeStatus; dataPreview?: string }
+  | { type: 'graph_patch'; nodes: FlowNode[]; edges: FlowEdge[] }
   | { type: 'checkpoint_reached'; nodeId: string; stepId: string }
+  | { type: 'usage'; records: UsageRecord[]; total: Record<string, number> }
+  | {
+      type: 'eta';
+      remainingMs: number;
+      criticalPath: string[];
+      criticalPathMs: number;
+      completedSteps: number;
+      totalSteps: number;
+      elapsedMs: number;
+    }
   | { type: 'execution_complete'; graph: ExecutionGraphState; summary?: string }
   | { type: 'execution_failed'; nodeId: string; error: string };
@@ -8,6 +8,9 @@ export interface TaskStep {
   result?: string;
   requiresApproval: boolean;
   dependsOn?: string[];
+  type?: 'tool' | 'map';
+  mapOver?: string;
+  reducer?: 'concat' | 'unique';
 }
 
 export interface TaskPlan {
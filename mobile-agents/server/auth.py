@@ -2,6 +2,8 @@
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from config import settings
+from services import tracing
 from services.supabase_client import get_supabase
 
 _bearer = HTTPBearer()
@@ -13,11 +15,22 @@ async def get_current_user(
     """Validate token via Supabase auth.get_user(). Works with both HS256 and ES256 keys."""
     token = credentials.credentials
     try:
-        sb = get_supabase()
-        res = sb.auth.get_user(token)
+        with tracing.span("auth"):
+            sb = get_supabase()
+            res = sb.auth.get_user(token)
         return {"sub": res.user.id, "email": res.user.email}
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
         )
+
+
+async def get_admin_user(user: dict = Depends(get_current_user)) -> dict:
+    """get_current_user, restricted to settings.admin_user_ids."""
+    if user["sub"] not in settings.admin_user_ids:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+    return user
@@ -0,0 +1,333 @@
+"""
+Micro-benchmarks for the planning and execution hot paths, stored per commit.
+
+Cases: build_graph on 1 to 1,000 step plans, the execute_plan_stream loop
+with stubbed tools and synthesis, SSE event encoding, _call_tool parameter
+binding and action fallback, tool response parsing over the payloads in
+benchmarks/payloads/, and agent_store load/save. Each case is timed with
+timeit (auto-ranged, best-of and median over --repeat rounds) and results
+are written to benchmarks/results/<commit>.json. Usage:
+
+    python benchmarks/bench_hot_paths.py                       # run and store
+    python benchmarks/bench_hot_paths.py --compare main        # also diff against main's results
+    python benchmarks/bench_hot_paths.py -k build_graph --no-save
+
+With --compare, cases whose best time is more than --threshold slower than
+the baseline's (the minimum is far less noisy than the median on a busy
+machine) are listed and the exit status is 1, so a pre-deploy check can run
+it against the last deployed commit's results.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config import settings
+from crew import tools
+from crew.orchestrator import build_graph
+from models.results import Paper, ToolResult
+from services import agent_store, execution_tracker
+from services.execution_tracker import _call_tool, execute_plan_stream
+
+BENCH_DIR = Path(__file__).parent
+PAYLOADS = BENCH_DIR / "payloads"
+RESULTS_DIR = BENCH_DIR / "results"
+
+_AGENT_ACTIONS = [
+    ("arxiv", "arxiv_search"),
+    ("semantic_scholar", "semantic_scholar_search"),
+    ("wikipedia", "wiki_search"),
+    ("arxiv", "arxiv_summarize"),
+    ("wikipedia", "wiki_summarize"),
+]
+
+
+def _plan(n: int, seed: int = 0) -> dict:
+    """n steps; after the first few, each depends on up to two earlier steps."""
+    rng = random.Random(seed)
+    steps = []
+    for i in range(n):
+        agent, action = _AGENT_ACTIONS[i % len(_AGENT_ACTIONS)]
+        deps = sorted({f"step_{rng.randrange(i)}" for _ in range(2)}) if i >= 3 else []
+        steps.append({
+            "id": f"step_{i}",
+            "agent_id": agent,
+            "action": action,
+            "description": f"Step {i}: {action.replace('_', ' ')} for graph neural networks",
+            "params": {"query": f"graph neural networks {i}"},
+            "requires_approval": False,
+            "depends_on": deps,
+            "type": "tool",
+            "map_over": None,
+            "reducer": "concat",
+        })
+    return {"summary": f"Research plan with {n} steps", "steps": steps, "user_message": "graph neural networks"}
+
+
+def _papers(n: int) -> ToolResult:
+    return ToolResult(
+        action="arxiv_search",
+        kind="papers",
+        query="graph neural networks",
+        papers=[
+            Paper(
+                title=f"Graph Neural Networks: Study {i}",
+                authors=["A. Author", "B. Author"],
+                abstract="graph neural networks " * 60,
+                url=f"http://arxiv.org/abs/2601.{i:05d}v1",
+                arxiv_id=f"2601.{i:05d}v1",
+            )
+            for i in range(n)
+        ],
+    )
+
+
+class _StubCache:
+    """Stands in for the tool cache so no tool does I/O."""
+
+    def __init__(self):
+        self.result = _papers(5)
+
+    def call(self, action, func, kwargs, source="execution"):
+        return self.result
+
+
+class _NoSynthesisCache:
+    def get(self, *args):
+        return None
+
+    def put(self, *args):
+        pass
+
+
+async def _no_sleep(delay, result=None):
+    return result
+
+
+# -- cases -----------------------------------------------------------------
+# Each case returns a zero-argument callable to time; setup happens outside
+# it, and patches, loops and temp dirs it opens go on the stack to be undone.
+
+
+def case_build_graph(n: int, stack: list):
+    plan = _plan(n)
+    return lambda: build_graph(plan, plan["user_message"])
+
+
+def case_execute_plan_stream(n: int, stack: list):
+    """The scheduling loop: tools, synthesis and the inter-step pause stubbed out."""
+    for patch in (
+        mock.patch.object(execution_tracker, "tool_cache", _StubCache()),
+        mock.patch.object(execution_tracker, "synthesis_cache", _NoSynthesisCache()),
+        mock.patch.object(execution_tracker, "_synthesize", lambda *a: ("Summary.", "stub")),
+        mock.patch.object(execution_tracker.asyncio, "sleep", _no_sleep),
+        mock.patch.multiple(
+            settings, research_index_enabled=False, vector_store_enabled=False, incremental_synthesis=False
+        ),
+    ):
+        patch.start()
+        stack.append(patch)
+    plan = _plan(n)
+    graph = build_graph(plan, plan["user_message"])
+    loop = asyncio.new_event_loop()
+    stack.append(loop)
+
+    async def consume():
+        async for _ in execute_plan_stream(plan, graph, api_key="sk-bench"):
+            pass
+
+    return lambda: loop.run_until_complete(consume())
+
+
+def case_sse_encode(kind: str, stack: list):
+    plan = _plan(50)
+    graph = build_graph(plan, plan["user_message"])
+    result_text = tools.render_result(_papers(10))
+    if kind == "node_status":
+        return lambda: f"data: {json.dumps({'type': 'node_status', 'nodeId': 'step_1', 'status': 'completed', 'result': result_text, 'duration': 412, 'speculated': False})}\n\n"
+    if kind == "edge_status":
+        return lambda: f"data: {json.dumps({'type': 'edge_status', 'edgeId': 'e-step_1-output', 'status': 'completed'})}\n\n"
+    return lambda: f"data: {json.dumps({'type': 'graph_init', 'graph': graph})}\n\n"
+
+
+def case_call_tool(kind: str, stack: list):
+    patch = mock.patch.object(execution_tracker, "tool_cache", _StubCache())
+    patch.start()
+    stack.append(patch)
+    prev = {"step_1": _papers(5)}
+    calls = {
+        # Exact action, params bound through aliases
+        "exact": ("slack_send_message", {"recipient": "#lab", "message": "digest"}, {}, ""),
+        # Fuzzy action name resolved by scanning TOOL_FUNCTIONS
+        "fuzzy": ("arxiv search", {"query": "graph"}, {}, "arxiv"),
+        # Unknown action resolved from the agent id
+        "agent_fallback": ("find_papers", {"query": "graph"}, {}, "semantic_scholar"),
+        # No params: filled from the description and previous results
+        "from_previous": ("generate_proposal", {}, prev, "proposal"),
+    }
+    action, params, prev_results, agent_id = calls[kind]
+    return lambda: _call_tool(action, params, prev_results, "Research graph neural networks", agent_id)
+
+
+def case_parse(kind: str, stack: list):
+    payloads = {
+        "arxiv_atom": ("arxiv_search.xml", lambda: tools._arxiv_search_result("graph neural networks", 25)),
+        "s2_json": ("s2_search.json", lambda: tools._semantic_scholar_search_result("graph neural networks", 20)),
+        "wiki_json": ("wiki_search.json", lambda: tools._wiki_search_result("graph neural networks")),
+    }
+    name, call = payloads[kind]
+    body = (PAYLOADS / name).read_bytes()
+    patch = mock.patch.object(tools.urllib.request, "urlopen", lambda *a, **k: io.BytesIO(body))
+    patch.start()
+    stack.append(patch)
+    return call
+
+
+def case_agent_store(op: str, stack: list):
+    tmp = tempfile.TemporaryDirectory()
+    stack.append(tmp)
+    path = Path(tmp.name) / "agents_config.json"
+    patches = [
+        mock.patch.object(agent_store, "AGENTS_FILE", path),
+        mock.patch.object(agent_store, "_agents_registry", {}),
+    ]
+    for p in patches:
+        p.start()
+        stack.append(p)
+    agent_store.load_agents()  # writes the defaults
+    return agent_store.load_agents if op == "load" else agent_store._save
+
+
+CASES = {
+    **{f"build_graph[{n}]": (case_build_graph, (n,)) for n in (1, 10, 100, 1000)},
+    **{f"execute_plan_stream[{n}]": (case_execute_plan_stream, (n,)) for n in (3, 20)},
+    **{f"sse_encode[{k}]": (case_sse_encode, (k,)) for k in ("edge_status", "node_status", "graph_init")},
+    **{f"call_tool[{k}]": (case_call_tool, (k,)) for k in ("exact", "fuzzy", "agent_fallback", "from_previous")},
+    **{f"parse[{k}]": (case_parse, (k,)) for k in ("arxiv_atom", "s2_json", "wiki_json")},
+    **{f"agent_store[{op}]": (case_agent_store, (op,)) for op in ("load", "save")},
+}
+
+
+def _close(stack: list) -> None:
+    for item in reversed(stack):
+        if isinstance(item, asyncio.AbstractEventLoop):
+            item.close()
+        elif isinstance(item, tempfile.TemporaryDirectory):
+            item.cleanup()
+        else:
+            item.stop()
+    stack.clear()
+
+
+def time_case(name: str, repeat: int) -> dict:
+    factory, args = CASES[name]
+    stack: list = []
+    try:
+        timer = timeit.Timer(factory(*args, stack))
+        number, _ = timer.autorange()
+        per_op = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    finally:
+        _close(stack)
+    return {"median": statistics.median(per_op), "min": min(per_op), "number": number, "repeat": repeat}
+
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True, cwd=BENCH_DIR
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _format(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def load_results(ref: str) -> dict:
+    """Results for a file path, or for a commit-ish whose results were stored."""
+    path = Path(ref)
+    if not path.is_file():
+        commit = _git("rev-parse", "--short", ref) or ref
+        path = RESULTS_DIR / f"{commit}.json"
+    if not path.is_file():
+        raise SystemExit(f"No stored results for {ref!r} ({path})")
+    return json.loads(path.read_text())
+
+
+def compare(base: dict, head: dict, threshold: float) -> list[str]:
+    """Print best-time ratios; return the cases slower than base by more than threshold."""
+    regressions = []
+    print(f"\ncompared with {base.get('commit') or '?'}:")
+    for name, result in head["results"].items():
+        old = base["results"].get(name)
+        if not old:
+            print(f"  {name:<32} (new)")
+            continue
+        ratio = result["min"] / old["min"]
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"  {name:<32} {_format(old['min']):>10} -> {_format(result['min']):>10}  {ratio:5.2f}x{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-k", dest="filter", default="", help="only cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--compare", metavar="COMMIT_OR_FILE", help="baseline results to diff against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before flagging (0.2 = 20%%)")
+    parser.add_argument("--no-save", action="store_true", help="do not write results/<commit>.json")
+    args = parser.parse_args()
+
+    names = [n for n in CASES if args.filter in n]
+    results = {}
+    print(f"{'case':<32} {'median':>10} {'min':>10} {'loops':>8}")
+    for name in names:
+        results[name] = time_case(name, args.repeat)
+        r = results[name]
+        print(f"{name:<32} {_format(r['median']):>10} {_format(r['min']):>10} {r['number']:>8}")
+
+    commit = _git("rev-parse", "--short", "HEAD")
+    report = {
+        "commit": commit,
+        # Uncommitted changes make the numbers not reproducible from the commit alone
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "results": results,
+    }
+    if not args.no_save and commit:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / f"{commit}.json"
+        path.write_text(json.dumps(report, indent=2))
+        print(f"\nsaved {path}")
+
+    if args.compare:
+        regressions = compare(load_results(args.compare), report, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
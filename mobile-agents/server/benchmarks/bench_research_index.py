@@ -0,0 +1,94 @@
+"""
+Benchmark local_search query latency against research index size.
+
+Builds synthetic corpora of increasing size in a temporary directory,
+ingesting them in search-result-sized batches, then times queries of
+one to three terms. Usage:
+
+    python benchmarks/bench_research_index.py --sizes 1000 10000 50000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models.results import Paper, ToolResult
+from services.research_index import ResearchIndex
+
+VOCAB = [
+    "attention", "transformer", "diffusion", "graph", "neural", "network", "retrieval",
+    "reinforcement", "learning", "language", "model", "vision", "protein", "folding",
+    "quantum", "optimization", "bayesian", "causal", "inference", "robotics", "policy",
+    "contrastive", "representation", "sparse", "mixture", "experts", "scaling", "laws",
+    "alignment", "benchmark", "federated", "privacy", "compression", "distillation",
+]
+# Abstract vocabulary drawn with Zipf-like weights; topic words sit at
+# mid-frequency ranks rather than among the most common terms
+_FILLER = [f"term{i}" for i in range(5000)]
+TAIL = _FILLER[:200] + VOCAB + _FILLER[200:]
+TAIL_WEIGHTS = [1 / (rank + 1) for rank in range(len(TAIL))]
+
+
+def _paper(i: int, rng: random.Random) -> Paper:
+    words = rng.sample(VOCAB, 6)
+    return Paper(
+        title=" ".join(words[:4]).title() + f" {i}",
+        authors=[f"Author {rng.randint(1, 5000)}" for _ in range(3)],
+        abstract=" ".join(rng.choices(TAIL, TAIL_WEIGHTS, k=120)),
+        arxiv_id=f"{2000 + i // 100000}.{i % 100000:05d}",
+        url=f"http://arxiv.org/abs/{2000 + i // 100000}.{i % 100000:05d}",
+    )
+
+
+def _percentile(samples: list[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def run(sizes: list[int], queries: int, seed: int) -> None:
+    rng = random.Random(seed)
+    print(f"{'docs':>8} {'ingest/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'db MB':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        index = ResearchIndex(path, max_docs=max(sizes))
+        ingested = 0
+        for size in sorted(sizes):
+            added = size - ingested
+            start = time.perf_counter()
+            while ingested < size:
+                batch = [_paper(ingested + j, rng) for j in range(min(5, size - ingested))]
+                index.ingest(ToolResult(action="arxiv_search", kind="papers", papers=batch))
+                ingested += len(batch)
+            rate = added / max(time.perf_counter() - start, 1e-9)
+            index.compact()
+
+            latencies = []
+            for _ in range(queries):
+                q = " ".join(rng.sample(VOCAB, rng.randint(1, 3)))
+                t = time.perf_counter()
+                index.search(q, 5)
+                latencies.append((time.perf_counter() - t) * 1000)
+            size_mb = sum(
+                os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp)
+            ) / 1e6
+            print(
+                f"{size:>8} {rate:>10.0f} {statistics.median(latencies):>8.2f} "
+                f"{_percentile(latencies, 0.95):>8.2f} {_percentile(latencies, 0.99):>8.2f} "
+                f"{size_mb:>7.1f}"
+            )
+        index.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.sizes, args.queries, args.seed)
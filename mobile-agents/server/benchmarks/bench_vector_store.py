@@ -0,0 +1,106 @@
+"""
+Benchmark the vector store: build time, memory per vector and query latency
+for brute-force and IVF search at increasing corpus sizes.
+
+Vectors are written directly (random unit vectors, clustered so IVF has
+structure to exploit) to isolate index cost from embedding cost; embedding
+throughput of the configured embedder is reported separately. Usage:
+
+    python benchmarks/bench_vector_store.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config import settings
+from services.vector_store import HashingEmbedder, VectorStore
+
+
+def _percentile(samples: list[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def _fill(store: VectorStore, n: int, dims: int, rng: np.random.Generator) -> None:
+    """Write n clustered unit vectors straight into the memmap."""
+    store._load()
+    store._ensure_capacity(n)
+    centers = rng.standard_normal((max(1, n // 500), dims)).astype(np.float32)
+    for start in range(0, n, 65536):
+        m = min(65536, n - start)
+        block = centers[rng.integers(0, len(centers), m)] + 0.5 * rng.standard_normal((m, dims)).astype(np.float32)
+        block /= np.linalg.norm(block, axis=1, keepdims=True)
+        store._vectors[start:start + m] = block
+    store._records = [{"row": i, "keys": [], "kind": "paper", "data": {}} for i in range(n)]
+    store.count = n
+    store._vectors.flush()
+
+
+def _latencies(store: VectorStore, queries: np.ndarray, k: int, ivf: bool) -> list[float]:
+    out = []
+    for q in queries:
+        t = time.perf_counter()
+        if ivf:
+            store._search_ivf(q, k)
+        else:
+            store._search_brute(q[None, :], k)
+        out.append((time.perf_counter() - t) * 1000)
+    return out
+
+
+def run(sizes: list[int], dims: int, queries: int, k: int, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    embedder = HashingEmbedder(dims)
+    texts = [f"paper {i} on diffusion models and graph neural networks " * 8 for i in range(2000)]
+    t = time.perf_counter()
+    embedder.embed(texts)
+    print(f"embedder {embedder.name}: {len(texts) / (time.perf_counter() - t):.0f} texts/s\n")
+
+    print(f"{'vectors':>9} {'build s':>8} {'B/vector':>9} {'brute p50':>10} {'brute p95':>10} "
+          f"{'ivf build s':>11} {'ivf p50':>8} {'ivf p95':>8} {'recall@k':>9}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = VectorStore(tmp, embedder=embedder, ivf_min_vectors=10**12)
+            t = time.perf_counter()
+            _fill(store, n, dims, rng)
+            build = time.perf_counter() - t
+            q = np.asarray(store._vectors[rng.integers(0, n, queries)]) + 0.3 * rng.standard_normal((queries, dims)).astype(np.float32)
+            q /= np.linalg.norm(q, axis=1, keepdims=True)
+            brute = _latencies(store, q, k, ivf=False)
+
+            t = time.perf_counter()
+            store.train_ivf()
+            ivf_build = time.perf_counter() - t
+            ivf = _latencies(store, q, k, ivf=True)
+            recall = statistics.mean(
+                len({r for _, r in store._search_ivf(v, k)} & {r for _, r in store._search_brute(v[None, :], k)[0]}) / k
+                for v in q[:50]
+            )
+            print(
+                f"{n:>9} {build:>8.2f} {store.memory_bytes() / n:>9.0f} "
+                f"{statistics.median(brute):>10.2f} {_percentile(brute, 0.95):>10.2f} "
+                f"{ivf_build:>11.2f} {statistics.median(ivf):>8.2f} {_percentile(ivf, 0.95):>8.2f} "
+                f"{recall:>9.2f}"
+            )
+            store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--dims", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--nprobe", type=int, default=settings.vector_ivf_nprobe)
+    args = parser.parse_args()
+    settings.vector_ivf_nprobe = args.nprobe
+    run(args.sizes, args.dims, args.queries, args.k, args.seed)
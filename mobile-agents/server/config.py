@@ -12,8 +12,154 @@ class Settings(BaseSettings):
     supabase_url: str = os.getenv("SUPABASE_URL", "")
     supabase_service_key: str = os.getenv("SUPABASE_SERVICE_KEY", "")
     app_name: str = "MobileAgents"
+
+    # Upstream API base URLs, overridable to point at local stand-ins
+    # (see loadtest/). Empty openai_base_url uses the OpenAI default.
+    openai_base_url: str = ""
+    arxiv_api_url: str = "http://export.arxiv.org/api/query"
+    semantic_scholar_api_url: str = "https://api.semanticscholar.org/graph/v1"
+    wikipedia_url: str = "https://en.wikipedia.org"
+    slack_api_url: str = "https://slack.com/api"
     debug: bool = True
 
+    # Model routing: primary model per role, fallbacks tried in order on
+    # errors/timeouts. Policy "size" routes requests at or under
+    # small_request_tokens to small_models[role] first.
+    planner_model: str = "gpt-4.1"
+    synthesizer_model: str = "gpt-4.1"
+    vision_model: str = "gpt-4.1"
+    transcription_model: str = "whisper-1"
+    worker_model: str = "gpt-4.1"
+    model_fallbacks: dict[str, list[str]] = {}
+    model_timeout: float = 60.0
+    model_routing_policy: str = "static"
+    small_request_tokens: int = 400
+    small_models: dict[str, str] = {}
+
+    # LLM admission control: concurrent calls, optional RPM/TPM budgets
+    # (0 = rely on x-ratelimit headers only), queue depth and max wait (s)
+    llm_max_concurrency: int = 8
+    llm_rpm_limit: int = 0
+    llm_tpm_limit: int = 0
+    llm_max_queue: int = 100
+    llm_max_wait: float = 30.0
+
+    # Speculatively run read-only steps while the plan awaits confirmation;
+    # results are kept for speculation_ttl seconds
+    speculative_execution: bool = False
+    speculation_ttl: float = 120.0
+    speculation_max_tasks: int = 100
+
+    # Read-only tool result cache (0 disables) and its TTL in seconds
+    tool_cache_size: int = 512
+    tool_cache_ttl: float = 900.0
+    # Warm the tool cache with likely searches while the planner runs
+    prefetch_enabled: bool = False
+    prefetch_max_calls: int = 4
+
+    # Local full-text index of fetched papers/articles (path relative to
+    # the server dir); the planner prefers local_search when at least
+    # research_index_min_hits records match the request
+    research_index_enabled: bool = True
+    research_index_path: str = "research_index.db"
+    research_index_max_docs: int = 50000
+    research_index_min_hits: int = 3
+
+    # Semantic memory of fetched records (dir relative to the server dir).
+    # Embedder "hashing" (vector_dims wide) or "sentence-transformers"
+    # (vector_embedder_model); IVF kicks in at vector_ivf_min_vectors
+    vector_store_enabled: bool = True
+    vector_store_path: str = "vector_store"
+    vector_embedder: str = "hashing"
+    vector_embedder_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    vector_dims: int = 256
+    vector_ivf_min_vectors: int = 1_000_000
+    vector_ivf_nprobe: int = 16
+
+    # Map steps: max items expanded per step and children run concurrently
+    map_max_items: int = 10
+    map_concurrency: int = 4
+
+    # Scheduled monitors: at most monitor_max_concurrent runs in flight;
+    # the scheduler checks for due monitors every monitor_tick_seconds.
+    # A since-filtered arXiv search returns at most arxiv_since_max_results
+    # papers per run; the rest are picked up by the next run
+    monitors_enabled: bool = True
+    monitor_max_concurrent: int = 2
+    monitor_tick_seconds: float = 30.0
+    arxiv_since_max_results: int = 50
+
+    # Batch execution: instances in flight across all batches, max instances
+    # per batch, requests/second per upstream (action prefix) for batch tool
+    # calls, and the NDJSON results dir (relative to the server dir)
+    batch_concurrency: int = 8
+    batch_max_instances: int = 1000
+    batch_rate_limits: dict[str, float] = {"arxiv": 1.0, "semantic_scholar": 1.0, "wiki": 5.0}
+    batch_results_path: str = "batch_results"
+
+    # Synthesis cache: max entries (0 disables) and cosine threshold for
+    # near-duplicate reuse (0 disables similarity lookup)
+    synthesis_cache_size: int = 128
+    synthesis_cache_similarity: float = 0.0
+    # Token budget for step results sent to synthesis (0 disables compaction)
+    synthesis_token_budget: int = 6000
+    # Digest each step as it completes and reduce over digests at the end
+    incremental_synthesis: bool = False
+    digest_model: str = "gpt-4.1-mini"
+    # Adaptive synthesis: pass single short results through without an LLM
+    # call and use the fast model for small single-source inputs
+    adaptive_synthesis: bool = True
+    synthesis_passthrough_tokens: int = 150
+    synthesis_fast_max_tokens: int = 1500
+    synthesis_fast_model: str = "gpt-4.1-mini"
+
+    # Usage ledger prices in USD per 1M tokens (input, cached_input,
+    # output) or per minute of audio; models not listed cost 0
+    model_prices: dict[str, dict[str, float]] = {
+        "gpt-4.1": {"input": 2.0, "cached_input": 0.5, "output": 8.0},
+        "gpt-4.1-mini": {"input": 0.4, "cached_input": 0.1, "output": 1.6},
+        "whisper-1": {"minute": 0.006},
+    }
+
+    # Tracing exporter: "memory" (last tracing_memory_spans spans, served at
+    # /api/traces/{trace_id}), "file" (JSON lines), "otlp" or "none"
+    tracing_exporter: str = "memory"
+    tracing_service_name: str = "mobile-agents-server"
+    tracing_memory_spans: int = 10000
+    tracing_file_path: str = "traces.jsonl"
+    tracing_otlp_endpoint: str = ""
+
+    # Prometheus text metrics at GET /metrics (unauthenticated; restrict at
+    # the proxy if the server is exposed)
+    metrics_enabled: bool = True
+
+    # Event-loop monitor: lag sampled every loop_monitor_interval seconds;
+    # stalls over loop_block_threshold seconds are logged with the blocking
+    # stack and counted per route and call site
+    loop_monitor_enabled: bool = True
+    loop_monitor_interval: float = 0.05
+    loop_block_threshold: float = 0.1
+
+    # Sampling profiler (/api/admin/profile and the X-Profile request
+    # header): sample interval in seconds, longest timed profile, profiles
+    # sampling at once and finished profiles kept for retrieval
+    profiler_enabled: bool = True
+    profiler_interval: float = 0.01
+    profiler_max_seconds: float = 60.0
+    profiler_max_active: int = 4
+    profiler_max_results: int = 50
+    # Value a request's X-Profile header must carry to be profiled; empty
+    # disables the header (armed profiles still work)
+    profiler_secret: str = ""
+    # Supabase user ids allowed to use /api/admin endpoints
+    admin_user_ids: list[str] = []
+
+    # Latency model: samples kept per tool, agent and synthesis for rolling
+    # p50/p95, and the estimates used before there is any history
+    latency_window: int = 500
+    latency_default_step_ms: float = 2000.0
+    latency_default_synthesis_ms: float = 4000.0
+
     class Config:
         env_file = ".env"
         extra = "ignore"
@@ -1,5 +1,6 @@
 from crewai import Agent, LLM
 from .tools import AGENT_TOOLS
+from config import settings
 
 ORCHESTRATOR_BACKSTORY = (
     "You are a concise research librarian orchestrating an academic team. "
@@ -42,6 +43,12 @@ AGENT_BACKSTORIES = {
         "influential citation metrics, and help identify the most "
         "impactful work in any research area."
     ),
+    "library": (
+        "You are a research librarian who keeps a local index of every "
+        "paper and article the team has already fetched. You answer "
+        "repeat questions instantly from that index, without going back "
+        "to external services."
+    ),
 }
 
 
@@ -78,15 +85,39 @@ def create_orchestrator_agent(llm: LLM) -> Agent:
     )
 
 
+def _worker_llms(default_llm: LLM) -> dict[str, LLM]:
+    """
+    Resolve the LLM for each worker agent. Agents with a per-agent "model"
+    in the agent store (or a worker_model different from the default) get
+    their own LLM; LLMs are shared between agents using the same model.
+    """
+    from services.model_router import model_router
+
+    by_model = {default_llm.model: default_llm}
+    llms = {}
+    for agent_id in AGENT_BACKSTORIES:
+        model = model_router.model_for("worker", agent_id=agent_id)
+        if model not in by_model:
+            by_model[model] = LLM(
+                model=model,
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url or None,
+                timeout=settings.model_timeout,
+            )
+        llms[agent_id] = by_model[model]
+    return llms
+
+
 def create_agents(llm: LLM) -> dict[str, Agent]:
     """Returns all available CrewAI agents, keyed by agent_id."""
+    llms = _worker_llms(llm)
 
     agents = {
         "arxiv": Agent(
             role="ArXiv Research Analyst",
             goal="Search and summarize recent academic papers from arXiv",
             backstory=AGENT_BACKSTORIES["arxiv"],
-            llm=llm,
+            llm=llms["arxiv"],
             verbose=True,
             allow_delegation=False,
             tools=AGENT_TOOLS["arxiv"],
@@ -95,7 +126,7 @@ def create_agents(llm: LLM) -> dict[str, Agent]:
             role="Research Proposal Strategist",
             goal="Generate structured research proposals and methodology outlines",
             backstory=AGENT_BACKSTORIES["proposal"],
-            llm=llm,
+            llm=llms["proposal"],
             verbose=True,
             allow_delegation=False,
             tools=AGENT_TOOLS["proposal"],
@@ -104,7 +135,7 @@ def create_agents(llm: LLM) -> dict[str, Agent]:
             role="Background Research Specialist",
             goal="Look up and summarize background information from Wikipedia",
             backstory=AGENT_BACKSTORIES["wikipedia"],
-            llm=llm,
+            llm=llms["wikipedia"],
             verbose=True,
             allow_delegation=False,
             tools=AGENT_TOOLS["wikipedia"],
@@ -113,7 +144,7 @@ def create_agents(llm: LLM) -> dict[str, Agent]:
             role="Slack Messenger",
             goal="Send messages to Slack channels on behalf of the user",
             backstory=AGENT_BACKSTORIES["slack"],
-            llm=llm,
+            llm=llms["slack"],
             verbose=True,
             allow_delegation=False,
             tools=AGENT_TOOLS["slack"],
@@ -122,11 +153,20 @@ def create_agents(llm: LLM) -> dict[str, Agent]:
             role="Citation Analyst",
             goal="Search Semantic Scholar for papers and retrieve citation impact metrics",
             backstory=AGENT_BACKSTORIES["semantic_scholar"],
-            llm=llm,
+            llm=llms["semantic_scholar"],
             verbose=True,
             allow_delegation=False,
             tools=AGENT_TOOLS["semantic_scholar"],
         ),
+        "library": Agent(
+            role="Research Librarian",
+            goal="Answer from the local index of previously fetched papers and articles",
+            backstory=AGENT_BACKSTORIES["library"],
+            llm=llms["library"],
+            verbose=True,
+            allow_delegation=False,
+            tools=AGENT_TOOLS["library"],
+        ),
     }
 
     return agents
@@ -214,4 +254,17 @@ AGENT_METADATA = {
         "requiresApproval": False,
         "color": "#F59E0B",
     },
+    "library": {
+        "id": "library",
+        "name": "Library Agent",
+        "icon": "Database",
+        "description": "Search papers and articles already fetched, without network calls",
+        "role": "Research Librarian",
+        "goal": "Answer from the local index of previously fetched papers and articles",
+        "backstory": AGENT_BACKSTORIES["library"],
+        "capabilities": ["local_search", "related_papers"],
+        "enabled": True,
+        "requiresApproval": False,
+        "color": "#10B981",
+    },
 }
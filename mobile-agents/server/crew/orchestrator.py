@@ -1,10 +1,16 @@
+import asyncio
+
 from crewai import Crew, Task, Process, LLM
 from pydantic import BaseModel
 import uuid
 
 from .agents import create_agents, create_orchestrator_agent
 from .tasks import build_crew_task
+from config import settings
 from services.agent_store import get_agents
+from services.latency_model import latency_model
+from services.prefetch import candidate_queries
+from services.research_index import research_index
 
 
 class PlanStep(BaseModel):
@@ -15,6 +21,10 @@ class PlanStep(BaseModel):
     params: dict
     requires_approval: bool
     depends_on: list[str]
+    # "map" steps run `action` once per item produced by the `map_over` step
+    type: str = "tool"
+    map_over: str | None = None
+    reducer: str = "concat"
 
 
 class TaskPlan(BaseModel):
@@ -84,6 +94,22 @@ class MobileAgentsOrchestrator:
         )
         valid_agent_ids = ", ".join(a["id"] for a in enabled_agents)
 
+        # Point the planner at the local index when it already covers the topic
+        coverage_rule = ""
+        if settings.research_index_enabled and any(a["id"] == "library" for a in enabled_agents):
+            # SQLite lookups; keep them off the event loop
+            queries = candidate_queries(user_message)
+            hits = await asyncio.to_thread(
+                lambda: max((research_index.coverage(q) for q in queries), default=0)
+            )
+            if hits >= settings.research_index_min_hits:
+                coverage_rule = (
+                    f"\n- The local index already holds {hits} records matching this request. "
+                    "Prefer library local_search (keyword) or related_papers (semantic) steps over "
+                    "arxiv/semantic_scholar/wikipedia searches unless the user asks for the "
+                    "latest or new results."
+                )
+
         planning_task = Task(
             description=f"""Analyze the following user request and create a structured execution plan.
 
@@ -105,7 +131,8 @@ Rules:
 - Use step IDs like "step_1", "step_2", etc.
 - agent_id must be one of: {valid_agent_ids}
 - Use exact param names from the tool signatures. For slack_send_message use params: {{"channel": "<channel-or-username>", "text": "<message>"}}
-- For semantic_scholar_cite use params: {{"paper_id": "<id-or-doi>"}}
+- For semantic_scholar_cite use params: {{"paper_id": "<id-or-doi>"}}{coverage_rule}
+- To process each result of a search step individually (e.g. summarize every paper from arxiv_search, every article from wiki_search, or cite every paper from semantic_scholar_search), use a map step: type="map", map_over="<search step id>", add that id to depends_on, action="arxiv_summarize" / "wiki_summarize" / "semantic_scholar_cite", params={{}}. All other steps use type="tool".
 - If image analysis is provided, use that content to inform search queries and proposal topics.
 - If audio was transcribed, treat the transcript as the primary user intent.
 - If conversation history is provided, use it to resolve ambiguous references (e.g. "do it", "yes", "go ahead" likely refer to the most recent plan or topic discussed).""",
@@ -121,7 +148,8 @@ Rules:
             verbose=True,
         )
 
-        result = crew.kickoff()
+        # Run off the event loop: planning blocks on the LLM for seconds
+        result = await asyncio.to_thread(crew.kickoff)
         plan = result.json_dict
 
         task_id = str(uuid.uuid4())[:8]
@@ -132,10 +160,11 @@ Rules:
         if audio_transcript:
             plan["audio_transcript"] = audio_transcript
 
-        graph = self._build_graph(plan, user_message, input_modality)
+        graph = build_graph(plan, user_message, input_modality)
         graph["taskId"] = task_id
 
-        return {"plan": plan, "graph": graph}
+        # CrewAI's token counts, read by the usage ledger
+        return {"plan": plan, "graph": graph, "usage": result.token_usage}
 
     def assemble_crew(self, plan: dict) -> Crew:
         """Assemble a hierarchical CrewAI Crew with the orchestrator as manager."""
@@ -155,148 +184,154 @@ Rules:
 
         return crew
 
-    def _build_graph(
-        self, plan: dict, user_message: str, input_modality: str = "text"
-    ) -> dict:
-        """Build the execution graph state from the plan."""
-        # Build lookup from agent store
-        all_agents = {a["id"]: a for a in get_agents()}
 
-        nodes = []
-        edges = []
-        nodes.append(
-            {
-                "id": "input",
+def build_graph(plan: dict, user_message: str, input_modality: str = "text") -> dict:
+    """Build the execution graph state from the plan."""
+    # Build lookup from agent store
+    all_agents = {a["id"]: a for a in get_agents()}
+
+    nodes = []
+    edges = []
+    nodes.append(
+        {
+            "id": "input",
+            "type": "input",
+            "data": {
+                "label": user_message[:60]
+                + ("..." if len(user_message) > 60 else ""),
                 "type": "input",
-                "data": {
-                    "label": user_message[:60]
-                    + ("..." if len(user_message) > 60 else ""),
-                    "type": "input",
-                    "status": "completed",
-                    "inputModality": input_modality,
-                },
-                "position": {"x": 0, "y": 0},
-            }
-        )
+                "status": "completed",
+                "inputModality": input_modality,
+            },
+            "position": {"x": 0, "y": 0},
+        }
+    )
+
+    nodes.append(
+        {
+            "id": "orchestrator",
+            "type": "orchestrator",
+            "data": {
+                "label": f"Plan: {len(plan['steps'])} tasks",
+                "type": "orchestrator",
+                "status": "completed",
+            },
+            "position": {"x": 0, "y": 0},
+        }
+    )
+    edges.append(
+        {
+            "id": "e-input-orch",
+            "source": "input",
+            "target": "orchestrator",
+            "data": {"status": "completed"},
+        }
+    )
+
+    output_sources = []
+
+    for step in plan["steps"]:
+        step_id = step["id"]
+        agent_id = step["agent_id"]
+        agent_data = all_agents.get(agent_id, {})
 
         nodes.append(
             {
-                "id": "orchestrator",
-                "type": "orchestrator",
+                "id": step_id,
+                "type": "agent",
                 "data": {
-                    "label": f"Plan: {len(plan['steps'])} tasks",
-                    "type": "orchestrator",
-                    "status": "completed",
+                    "label": step["description"][:40],
+                    "type": "agent",
+                    "status": "pending",
+                    "agentId": agent_id,
+                    "agentColor": agent_data.get("color", "#6B7280"),
+                    "agentIcon": agent_data.get("icon", "Bot"),
+                    "stepType": step.get("type", "tool"),
                 },
                 "position": {"x": 0, "y": 0},
             }
         )
-        edges.append(
-            {
-                "id": "e-input-orch",
-                "source": "input",
-                "target": "orchestrator",
-                "data": {"status": "completed"},
-            }
-        )
-
-        output_sources = []
-
-        for step in plan["steps"]:
-            step_id = step["id"]
-            agent_id = step["agent_id"]
-            agent_data = all_agents.get(agent_id, {})
-
-            nodes.append(
-                {
-                    "id": step_id,
-                    "type": "agent",
-                    "data": {
-                        "label": step["description"][:40],
-                        "type": "agent",
-                        "status": "pending",
-                        "agentId": agent_id,
-                        "agentColor": agent_data.get("color", "#6B7280"),
-                        "agentIcon": agent_data.get("icon", "Bot"),
-                    },
-                    "position": {"x": 0, "y": 0},
-                }
-            )
 
-            if step.get("depends_on"):
-                for dep_id in step["depends_on"]:
-                    source = (
-                        f"checkpoint_{dep_id}"
-                        if any(
-                            s["id"] == dep_id and s.get("requires_approval")
-                            for s in plan["steps"]
-                        )
-                        else dep_id
-                    )
-                    edges.append(
-                        {
-                            "id": f"e-{dep_id}-{step_id}",
-                            "source": source,
-                            "target": step_id,
-                            "data": {"status": "pending"},
-                        }
+        if step.get("depends_on"):
+            for dep_id in step["depends_on"]:
+                source = (
+                    f"checkpoint_{dep_id}"
+                    if any(
+                        s["id"] == dep_id and s.get("requires_approval")
+                        for s in plan["steps"]
                     )
-            else:
+                    else dep_id
+                )
                 edges.append(
                     {
-                        "id": f"e-orch-{step_id}",
-                        "source": "orchestrator",
+                        "id": f"e-{dep_id}-{step_id}",
+                        "source": source,
                         "target": step_id,
                         "data": {"status": "pending"},
                     }
                 )
+        else:
+            edges.append(
+                {
+                    "id": f"e-orch-{step_id}",
+                    "source": "orchestrator",
+                    "target": step_id,
+                    "data": {"status": "pending"},
+                }
+            )
 
-            if step.get("requires_approval"):
-                cp_id = f"checkpoint_{step_id}"
-                nodes.append(
-                    {
-                        "id": cp_id,
+        if step.get("requires_approval"):
+            cp_id = f"checkpoint_{step_id}"
+            nodes.append(
+                {
+                    "id": cp_id,
+                    "type": "checkpoint",
+                    "data": {
+                        "label": f"Review: {step['action']}",
                         "type": "checkpoint",
-                        "data": {
-                            "label": f"Review: {step['action']}",
-                            "type": "checkpoint",
-                            "status": "pending",
-                        },
-                        "position": {"x": 0, "y": 0},
-                    }
-                )
-                edges.append(
-                    {
-                        "id": f"e-{step_id}-{cp_id}",
-                        "source": step_id,
-                        "target": cp_id,
-                        "data": {"status": "pending"},
-                    }
-                )
-                output_sources.append(cp_id)
-            else:
-                output_sources.append(step_id)
-
-        nodes.append(
-            {
-                "id": "output",
-                "type": "output",
-                "data": {
-                    "label": "Result",
-                    "type": "output",
-                    "status": "pending",
-                },
-                "position": {"x": 0, "y": 0},
-            }
-        )
-        for src in output_sources:
+                        "status": "pending",
+                    },
+                    "position": {"x": 0, "y": 0},
+                }
+            )
             edges.append(
                 {
-                    "id": f"e-{src}-output",
-                    "source": src,
-                    "target": "output",
+                    "id": f"e-{step_id}-{cp_id}",
+                    "source": step_id,
+                    "target": cp_id,
                     "data": {"status": "pending"},
                 }
             )
+            output_sources.append(cp_id)
+        else:
+            output_sources.append(step_id)
+
+    nodes.append(
+        {
+            "id": "output",
+            "type": "output",
+            "data": {
+                "label": "Result",
+                "type": "output",
+                "status": "pending",
+            },
+            "position": {"x": 0, "y": 0},
+        }
+    )
+    for src in output_sources:
+        edges.append(
+            {
+                "id": f"e-{src}-output",
+                "source": src,
+                "target": "output",
+                "data": {"status": "pending"},
+            }
+        )
 
-        return {"taskId": "", "nodes": nodes, "edges": edges, "status": "planning"}
+    return {
+        "taskId": "",
+        "nodes": nodes,
+        "edges": edges,
+        "status": "planning",
+        "estimate": latency_model.estimate(plan["steps"]),
+    }
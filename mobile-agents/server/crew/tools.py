@@ -5,138 +5,184 @@ import xml.etree.ElementTree as ET
 import json
 import os
 
+from config import settings
+from models.results import Article, Paper, ToolResult
+from services.research_index import research_index
+from services.vector_store import to_tool_result, vector_store
+
 
 # ---------------------------------------------------------------------------
-# Raw implementations (called directly by execution tracker)
+# Structured implementations (called directly by execution tracker)
 # ---------------------------------------------------------------------------
 
-def _arxiv_search(query: str, max_results: int = 5) -> str:
-    encoded = urllib.parse.quote(query)
-    url = (
-        f"http://export.arxiv.org/api/query?search_query=all:{encoded}"
-        f"&start=0&max_results={max_results}"
-        f"&sortBy=submittedDate&sortOrder=descending"
+_ATOM = {"atom": "http://www.w3.org/2005/Atom"}
+
+
+def _arxiv_paper(entry) -> Paper:
+    link = entry.find("atom:id", _ATOM).text
+    return Paper(
+        title=entry.find("atom:title", _ATOM).text.strip().replace("\n", " "),
+        authors=[a.find("atom:name", _ATOM).text for a in entry.findall("atom:author", _ATOM)],
+        abstract=entry.find("atom:summary", _ATOM).text.strip().replace("\n", " "),
+        url=link,
+        arxiv_id=link.rsplit("/abs/", 1)[-1],
+        categories=[c.get("term") for c in entry.findall("atom:category", _ATOM)],
+        published=entry.findtext("atom:published", None, _ATOM),
     )
+
+
+def _s2_paper(data: dict) -> Paper:
+    external = data.get("externalIds") or {}
+    return Paper(
+        title=data.get("title") or "Untitled",
+        authors=[a.get("name", "") for a in (data.get("authors") or [])],
+        year=data.get("year"),
+        abstract=data.get("abstract") or "",
+        url=data.get("url") or "",
+        s2_id=data.get("paperId"),
+        arxiv_id=external.get("ArXiv"),
+        doi=external.get("DOI"),
+        citation_count=data.get("citationCount") or 0,
+        influential_citation_count=data.get("influentialCitationCount") or 0,
+        reference_count=data.get("referenceCount"),
+    )
+
+
+def _arxiv_search_result(query: str, max_results: int = 5, since: str = "") -> ToolResult:
+    """
+    Newest papers first. With since (ISO timestamp), papers submitted after
+    it: fetched oldest first, a page of max_results at a time, up to
+    arxiv_since_max_results, so a caller advancing since to the newest paper
+    it saw resumes where this left off instead of skipping a backlog.
+    """
+    search = f"all:{urllib.parse.quote(query)}"
+    if since:
+        # submittedDate ranges are inclusive to the minute; filtered exactly below
+        stamp = "".join(c for c in since if c.isdigit())[:12]
+        search += f"+AND+submittedDate:[{stamp}+TO+999912312359]"
+    order = "ascending" if since else "descending"
+    limit = max(settings.arxiv_since_max_results, max_results) if since else max_results
+    papers: list[Paper] = []
     try:
-        with urllib.request.urlopen(url, timeout=15) as resp:
-            data = resp.read().decode()
-        root = ET.fromstring(data)
-        ns = {"atom": "http://www.w3.org/2005/Atom"}
-        entries = root.findall("atom:entry", ns)
-        if not entries:
-            return f"No arXiv papers found for '{query}'."
-        results = []
-        for entry in entries:
-            title = entry.find("atom:title", ns).text.strip().replace("\n", " ")
-            summary = entry.find("atom:summary", ns).text.strip().replace("\n", " ")[:300]
-            authors = [a.find("atom:name", ns).text for a in entry.findall("atom:author", ns)]
-            link = entry.find("atom:id", ns).text
-            results.append(
-                f"**{title}**\n"
-                f"Authors: {', '.join(authors[:3])}{'...' if len(authors) > 3 else ''}\n"
-                f"URL: {link}\n"
-                f"Abstract: {summary}..."
+        while True:
+            url = (
+                f"{settings.arxiv_api_url}?search_query={search}"
+                f"&start={len(papers)}&max_results={min(max_results, limit - len(papers))}"
+                f"&sortBy=submittedDate&sortOrder={order}"
             )
-        return f"Found {len(results)} recent papers for '{query}':\n\n" + "\n\n---\n\n".join(results)
+            with urllib.request.urlopen(url, timeout=15) as resp:
+                data = resp.read().decode()
+            root = ET.fromstring(data)
+            page = [_arxiv_paper(e) for e in root.findall("atom:entry", _ATOM)]
+            papers += page
+            if not since or len(page) < max_results or len(papers) >= limit:
+                break
+        if since:
+            papers = [p for p in reversed(papers) if (p.published or "") > since]
+        return ToolResult(action="arxiv_search", kind="papers", query=query, papers=papers)
     except Exception as e:
-        return f"arXiv search failed: {e}"
+        return ToolResult.error("arxiv_search", f"arXiv search failed: {e}")
 
 
-def _arxiv_summarize(paper_url: str) -> str:
+def _arxiv_summarize_result(paper_url: str) -> ToolResult:
     paper_id = paper_url.split("/")[-1]
-    url = f"http://export.arxiv.org/api/query?id_list={paper_id}"
+    url = f"{settings.arxiv_api_url}?id_list={paper_id}"
     try:
         with urllib.request.urlopen(url, timeout=15) as resp:
             data = resp.read().decode()
         root = ET.fromstring(data)
-        ns = {"atom": "http://www.w3.org/2005/Atom"}
-        entry = root.find("atom:entry", ns)
+        entry = root.find("atom:entry", _ATOM)
         if entry is None:
-            return f"Paper {paper_id} not found."
-        title = entry.find("atom:title", ns).text.strip().replace("\n", " ")
-        summary = entry.find("atom:summary", ns).text.strip().replace("\n", " ")
-        authors = [a.find("atom:name", ns).text for a in entry.findall("atom:author", ns)]
-        categories = [c.get("term") for c in entry.findall("atom:category", ns)]
-        return (
-            f"**{title}**\n"
-            f"Authors: {', '.join(authors)}\n"
-            f"Categories: {', '.join(categories)}\n\n"
-            f"Abstract:\n{summary}"
+            return ToolResult.error("arxiv_summarize", f"Paper {paper_id} not found.")
+        return ToolResult(
+            action="arxiv_summarize", kind="papers", query=paper_url, papers=[_arxiv_paper(entry)]
         )
     except Exception as e:
-        return f"Failed to fetch paper: {e}"
-
-
-def _generate_proposal(topic: str, context: str = "") -> str:
-    return (
-        f"## Research Proposal: {topic}\n\n"
-        f"### 1. Introduction & Motivation\n"
-        f"- Research gap identified in the area of {topic}\n"
-        f"- Context: {context[:300] if context else 'To be filled from literature review'}\n\n"
-        f"### 2. Research Questions\n"
-        f"- RQ1: What are the current limitations in {topic}?\n"
-        f"- RQ2: How can novel approaches improve the state of the art?\n\n"
-        f"### 3. Proposed Methodology\n"
-        f"- Literature survey and gap analysis\n"
-        f"- Experimental design and evaluation\n\n"
-        f"### 4. Expected Contributions\n"
-        f"- Novel framework / algorithm / analysis for {topic}\n"
-        f"- Empirical evaluation and reproducible benchmarks\n\n"
-        f"### 5. Timeline\n"
-        f"- Phase 1 (Months 1-3): Literature review\n"
-        f"- Phase 2 (Months 4-8): Implementation\n"
-        f"- Phase 3 (Months 9-12): Evaluation & writing"
+        return ToolResult.error("arxiv_summarize", f"Failed to fetch paper: {e}")
+
+
+def _generate_proposal_result(topic: str, context: str = "") -> ToolResult:
+    return ToolResult(
+        action="generate_proposal",
+        query=topic,
+        text=(
+            f"## Research Proposal: {topic}\n\n"
+            f"### 1. Introduction & Motivation\n"
+            f"- Research gap identified in the area of {topic}\n"
+            f"- Context: {context[:300] if context else 'To be filled from literature review'}\n\n"
+            f"### 2. Research Questions\n"
+            f"- RQ1: What are the current limitations in {topic}?\n"
+            f"- RQ2: How can novel approaches improve the state of the art?\n\n"
+            f"### 3. Proposed Methodology\n"
+            f"- Literature survey and gap analysis\n"
+            f"- Experimental design and evaluation\n\n"
+            f"### 4. Expected Contributions\n"
+            f"- Novel framework / algorithm / analysis for {topic}\n"
+            f"- Empirical evaluation and reproducible benchmarks\n\n"
+            f"### 5. Timeline\n"
+            f"- Phase 1 (Months 1-3): Literature review\n"
+            f"- Phase 2 (Months 4-8): Implementation\n"
+            f"- Phase 3 (Months 9-12): Evaluation & writing"
+        ),
     )
 
 
-def _outline_methodology(approach: str, domain: str = "") -> str:
-    return (
-        f"## Methodology: {approach}\n"
-        f"**Domain:** {domain or 'General'}\n\n"
-        f"### 1. Data Collection\n"
-        f"- Sources, datasets, and sampling strategy\n\n"
-        f"### 2. Approach Details\n"
-        f"- {approach}: step-by-step procedure\n"
-        f"- Baselines for comparison\n\n"
-        f"### 3. Evaluation Metrics\n"
-        f"- Quantitative: accuracy, F1, BLEU, etc.\n"
-        f"- Qualitative: human evaluation, case studies\n\n"
-        f"### 4. Reproducibility\n"
-        f"- Code and data availability plan"
+def _outline_methodology_result(approach: str, domain: str = "") -> ToolResult:
+    return ToolResult(
+        action="outline_methodology",
+        query=approach,
+        text=(
+            f"## Methodology: {approach}\n"
+            f"**Domain:** {domain or 'General'}\n\n"
+            f"### 1. Data Collection\n"
+            f"- Sources, datasets, and sampling strategy\n\n"
+            f"### 2. Approach Details\n"
+            f"- {approach}: step-by-step procedure\n"
+            f"- Baselines for comparison\n\n"
+            f"### 3. Evaluation Metrics\n"
+            f"- Quantitative: accuracy, F1, BLEU, etc.\n"
+            f"- Qualitative: human evaluation, case studies\n\n"
+            f"### 4. Reproducibility\n"
+            f"- Code and data availability plan"
+        ),
     )
 
 
-def _wiki_search(query: str) -> str:
+def _wiki_search_result(query: str) -> ToolResult:
     encoded = urllib.parse.quote(query)
     url = (
-        f"https://en.wikipedia.org/w/api.php?action=query&list=search"
+        f"{settings.wikipedia_url}/w/api.php?action=query&list=search"
         f"&srsearch={encoded}&srlimit=5&format=json"
     )
     try:
         req = urllib.request.Request(url, headers={"User-Agent": "MobileAgents/1.0"})
         with urllib.request.urlopen(req, timeout=10) as resp:
             data = json.loads(resp.read().decode())
-        results = data.get("query", {}).get("search", [])
-        if not results:
-            return f"No Wikipedia articles found for '{query}'."
-        lines = []
-        for r in results:
-            snippet = (
-                r["snippet"]
-                .replace('<span class="searchmatch">', "")
-                .replace("</span>", "")
+        articles = [
+            Article(
+                title=r["title"],
+                page_id=r["pageid"],
+                text=(
+                    r["snippet"]
+                    .replace('<span class="searchmatch">', "")
+                    .replace("</span>", "")
+                ),
             )
-            lines.append(f"**{r['title']}** (pageid: {r['pageid']})\n{snippet}")
-        return f"Found {len(lines)} Wikipedia articles for '{query}':\n\n" + "\n\n".join(lines)
+            for r in data.get("query", {}).get("search", [])
+        ]
+        return ToolResult(action="wiki_search", kind="articles", query=query, articles=articles)
     except Exception as e:
-        return f"Wikipedia search failed: {e}"
+        return ToolResult.error("wiki_search", f"Wikipedia search failed: {e}")
 
 
-def _slack_send_message(channel: str, text: str) -> str:
+def _slack_send_message_result(channel: str, text: str) -> ToolResult:
+    action = "slack_send_message"
     token = os.environ.get("SLACK_BOT_TOKEN", "")
     if not token:
-        return "Slack bot token not configured. Set the SLACK_BOT_TOKEN environment variable."
-    url = "https://slack.com/api/chat.postMessage"
+        return ToolResult.error(
+            action, "Slack bot token not configured. Set the SLACK_BOT_TOKEN environment variable."
+        )
+    url = f"{settings.slack_api_url}/chat.postMessage"
     payload = json.dumps({"channel": channel, "text": text}).encode()
     req = urllib.request.Request(
         url,
@@ -150,85 +196,251 @@ def _slack_send_message(channel: str, text: str) -> str:
         with urllib.request.urlopen(req, timeout=10) as resp:
             data = json.loads(resp.read().decode())
         if data.get("ok"):
-            return f"Message sent to {channel}: \"{text}\""
-        return f"Slack API error: {data.get('error', 'unknown error')}"
+            return ToolResult(action=action, text=f"Message sent to {channel}: \"{text}\"")
+        return ToolResult.error(action, f"Slack API error: {data.get('error', 'unknown error')}")
     except Exception as e:
-        return f"Slack send failed: {e}"
+        return ToolResult.error(action, f"Slack send failed: {e}")
 
 
-def _semantic_scholar_search(query: str, max_results: int = 5) -> str:
+def _semantic_scholar_search_result(query: str, max_results: int = 5) -> ToolResult:
     encoded = urllib.parse.quote(query)
     url = (
-        f"https://api.semanticscholar.org/graph/v1/paper/search?query={encoded}"
+        f"{settings.semantic_scholar_api_url}/paper/search?query={encoded}"
         f"&limit={max_results}"
-        f"&fields=title,year,citationCount,influentialCitationCount,authors,url,abstract"
+        f"&fields=title,year,citationCount,influentialCitationCount,authors,url,abstract,externalIds"
     )
     try:
         req = urllib.request.Request(url, headers={"User-Agent": "MobileAgents/1.0"})
         with urllib.request.urlopen(req, timeout=15) as resp:
             data = json.loads(resp.read().decode())
-        papers = data.get("data", [])
-        if not papers:
-            return f"No papers found on Semantic Scholar for '{query}'."
-        results = []
-        for p in papers:
-            authors = [a.get("name", "") for a in (p.get("authors") or [])[:3]]
-            author_str = ", ".join(authors)
-            if len(p.get("authors") or []) > 3:
-                author_str += "..."
-            abstract = (p.get("abstract") or "No abstract available.")[:300]
-            results.append(
-                f"**{p.get('title', 'Untitled')}** ({p.get('year', 'n/a')})\n"
-                f"Authors: {author_str}\n"
-                f"Citations: {p.get('citationCount', 0)} "
-                f"(influential: {p.get('influentialCitationCount', 0)})\n"
-                f"URL: {p.get('url', 'N/A')}\n"
-                f"Abstract: {abstract}..."
-            )
-        return f"Found {len(results)} papers for '{query}':\n\n" + "\n\n---\n\n".join(results)
+        papers = [_s2_paper(p) for p in data.get("data", [])]
+        return ToolResult(
+            action="semantic_scholar_search", kind="papers", query=query, papers=papers
+        )
     except Exception as e:
-        return f"Semantic Scholar search failed: {e}"
+        return ToolResult.error("semantic_scholar_search", f"Semantic Scholar search failed: {e}")
 
 
-def _semantic_scholar_cite(paper_id: str) -> str:
+def _semantic_scholar_cite_result(paper_id: str) -> ToolResult:
+    action = "semantic_scholar_cite"
     encoded = urllib.parse.quote(paper_id, safe=":")
     url = (
-        f"https://api.semanticscholar.org/graph/v1/paper/{encoded}"
-        f"?fields=title,year,citationCount,influentialCitationCount,referenceCount,authors,url"
+        f"{settings.semantic_scholar_api_url}/paper/{encoded}"
+        f"?fields=title,year,citationCount,influentialCitationCount,referenceCount,authors,url,externalIds"
     )
     try:
         req = urllib.request.Request(url, headers={"User-Agent": "MobileAgents/1.0"})
         with urllib.request.urlopen(req, timeout=15) as resp:
             data = json.loads(resp.read().decode())
-        authors = [a.get("name", "") for a in (data.get("authors") or [])]
-        return (
-            f"**{data.get('title', 'Untitled')}** ({data.get('year', 'n/a')})\n"
-            f"Authors: {', '.join(authors)}\n"
-            f"Citations: {data.get('citationCount', 0)} "
-            f"(influential: {data.get('influentialCitationCount', 0)})\n"
-            f"References: {data.get('referenceCount', 0)}\n"
-            f"URL: {data.get('url', 'N/A')}"
-        )
+        return ToolResult(action=action, kind="papers", query=paper_id, papers=[_s2_paper(data)])
     except urllib.error.HTTPError as e:
         if e.code == 404:
-            return f"Paper not found: {paper_id}"
-        return f"Semantic Scholar API error: {e}"
+            return ToolResult.error(action, f"Paper not found: {paper_id}")
+        return ToolResult.error(action, f"Semantic Scholar API error: {e}")
     except Exception as e:
-        return f"Semantic Scholar cite failed: {e}"
+        return ToolResult.error(action, f"Semantic Scholar cite failed: {e}")
 
 
-def _wiki_summarize(title: str) -> str:
+def _wiki_summarize_result(title: str) -> ToolResult:
     encoded = urllib.parse.quote(title)
-    url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{encoded}"
+    url = f"{settings.wikipedia_url}/api/rest_v1/page/summary/{encoded}"
     try:
         req = urllib.request.Request(url, headers={"User-Agent": "MobileAgents/1.0"})
         with urllib.request.urlopen(req, timeout=10) as resp:
             data = json.loads(resp.read().decode())
-        extract = data.get("extract", "No summary available.")
-        page_url = data.get("content_urls", {}).get("desktop", {}).get("page", "")
-        return f"**{data.get('title', title)}**\n{page_url}\n\n{extract}"
+        article = Article(
+            title=data.get("title", title),
+            page_id=data.get("pageid"),
+            url=data.get("content_urls", {}).get("desktop", {}).get("page", ""),
+            text=data.get("extract", "No summary available."),
+        )
+        return ToolResult(action="wiki_summarize", kind="articles", query=title, articles=[article])
+    except Exception as e:
+        return ToolResult.error("wiki_summarize", f"Wikipedia fetch failed: {e}")
+
+
+def _local_search_result(query: str, max_results: int = 5) -> ToolResult:
+    try:
+        return research_index.search(query, max_results)
+    except Exception as e:
+        return ToolResult.error("local_search", f"Local index search failed: {e}")
+
+
+def _related_papers_result(query: str, max_results: int = 5) -> ToolResult:
+    try:
+        return to_tool_result(query, vector_store.search([query], max_results)[0])
     except Exception as e:
-        return f"Wikipedia fetch failed: {e}"
+        return ToolResult.error("related_papers", f"Related papers lookup failed: {e}")
+
+
+# ---------------------------------------------------------------------------
+# Markdown rendering (for display, LLM prompts and CrewAI agents)
+# ---------------------------------------------------------------------------
+
+def _citation_line(p: Paper) -> str:
+    """Citation counts merged in from Semantic Scholar, when known."""
+    if p.citation_count is None:
+        return ""
+    return f"Citations: {p.citation_count} (influential: {p.influential_citation_count or 0})\n"
+
+
+def _author_list(authors: list[str], limit: int) -> str:
+    return ", ".join(authors[:limit]) + ("..." if len(authors) > limit else "")
+
+
+def _render_arxiv_search(r: ToolResult) -> str:
+    if not r.papers:
+        return f"No arXiv papers found for '{r.query}'."
+    blocks = [
+        f"**{p.title}**\n"
+        f"Authors: {_author_list(p.authors, 3)}\n"
+        f"URL: {p.url}\n"
+        + _citation_line(p)
+        + f"Abstract: {p.abstract[:300]}..."
+        for p in r.papers
+    ]
+    return f"Found {len(blocks)} recent papers for '{r.query}':\n\n" + "\n\n---\n\n".join(blocks)
+
+
+def _render_arxiv_summarize(r: ToolResult) -> str:
+    return "\n\n---\n\n".join(
+        f"**{p.title}**\n"
+        f"Authors: {', '.join(p.authors)}\n"
+        f"Categories: {', '.join(p.categories)}\n"
+        + _citation_line(p)
+        + "\n"
+        f"Abstract:\n{p.abstract}"
+        for p in r.papers
+    )
+
+
+def _render_wiki_search(r: ToolResult) -> str:
+    if not r.articles:
+        return f"No Wikipedia articles found for '{r.query}'."
+    lines = [f"**{a.title}** (pageid: {a.page_id})\n{a.text}" for a in r.articles]
+    return f"Found {len(lines)} Wikipedia articles for '{r.query}':\n\n" + "\n\n".join(lines)
+
+
+def _render_wiki_summarize(r: ToolResult) -> str:
+    return "\n\n---\n\n".join(f"**{a.title}**\n{a.url}\n\n{a.text}" for a in r.articles)
+
+
+def _render_semantic_scholar_search(r: ToolResult) -> str:
+    if not r.papers:
+        return f"No papers found on Semantic Scholar for '{r.query}'."
+    blocks = [
+        f"**{p.title}** ({p.year or 'n/a'})\n"
+        f"Authors: {_author_list(p.authors, 3)}\n"
+        f"Citations: {p.citation_count} "
+        f"(influential: {p.influential_citation_count})\n"
+        f"URL: {p.url or 'N/A'}\n"
+        f"Abstract: {(p.abstract or 'No abstract available.')[:300]}..."
+        for p in r.papers
+    ]
+    return f"Found {len(blocks)} papers for '{r.query}':\n\n" + "\n\n---\n\n".join(blocks)
+
+
+def _render_semantic_scholar_cite(r: ToolResult) -> str:
+    return "\n\n---\n\n".join(
+        f"**{p.title}** ({p.year or 'n/a'})\n"
+        f"Authors: {', '.join(p.authors)}\n"
+        f"Citations: {p.citation_count} "
+        f"(influential: {p.influential_citation_count})\n"
+        f"References: {p.reference_count or 0}\n"
+        f"URL: {p.url or 'N/A'}"
+        for p in r.papers
+    )
+
+
+def _render_local_search(r: ToolResult) -> str:
+    if not (r.papers or r.articles):
+        return f"No indexed records found for '{r.query}'. Try a network search."
+    source = "semantic memory" if r.action == "related_papers" else "local index"
+    blocks = [
+        f"**{p.title}**{f' ({p.year})' if p.year else ''}\n"
+        f"Authors: {_author_list(p.authors, 3)}\n"
+        + _citation_line(p)
+        + f"URL: {p.url or 'N/A'}\n"
+        f"Abstract: {p.abstract[:300]}..."
+        for p in r.papers
+    ] + [f"**{a.title}**\n{a.url}\n\n{a.text[:500]}" for a in r.articles]
+    return (
+        f"Found {len(blocks)} indexed records for '{r.query}' ({source}):\n\n"
+        + "\n\n---\n\n".join(blocks)
+    )
+
+
+_RENDERERS = {
+    "arxiv_search": _render_arxiv_search,
+    "arxiv_summarize": _render_arxiv_summarize,
+    "wiki_search": _render_wiki_search,
+    "wiki_summarize": _render_wiki_summarize,
+    "semantic_scholar_search": _render_semantic_scholar_search,
+    "semantic_scholar_cite": _render_semantic_scholar_cite,
+    "local_search": _render_local_search,
+    "related_papers": _render_local_search,
+}
+
+
+def render_result(result: ToolResult) -> str:
+    """Render a tool result as the markdown shown to users and LLMs."""
+    renderer = _RENDERERS.get(result.action)
+    if result.kind in ("text", "error") or renderer is None:
+        return result.text
+    if result.omitted and not (result.papers or result.articles):
+        return f"All {result.omitted} results for '{result.query}' were already covered by earlier steps."
+    text = renderer(result)
+    if result.omitted:
+        text += f"\n\n({result.omitted} more already covered by earlier steps.)"
+    return text
+
+
+# ---------------------------------------------------------------------------
+# Markdown implementations (string-returning, as used by CrewAI tools)
+# ---------------------------------------------------------------------------
+
+def _arxiv_search(query: str, max_results: int = 5) -> str:
+    return render_result(_arxiv_search_result(query, max_results))
+
+
+def _arxiv_summarize(paper_url: str) -> str:
+    return render_result(_arxiv_summarize_result(paper_url))
+
+
+def _generate_proposal(topic: str, context: str = "") -> str:
+    return render_result(_generate_proposal_result(topic, context))
+
+
+def _outline_methodology(approach: str, domain: str = "") -> str:
+    return render_result(_outline_methodology_result(approach, domain))
+
+
+def _wiki_search(query: str) -> str:
+    return render_result(_wiki_search_result(query))
+
+
+def _slack_send_message(channel: str, text: str) -> str:
+    return render_result(_slack_send_message_result(channel, text))
+
+
+def _semantic_scholar_search(query: str, max_results: int = 5) -> str:
+    return render_result(_semantic_scholar_search_result(query, max_results))
+
+
+def _semantic_scholar_cite(paper_id: str) -> str:
+    return render_result(_semantic_scholar_cite_result(paper_id))
+
+
+def _wiki_summarize(title: str) -> str:
+    return render_result(_wiki_summarize_result(title))
+
+
+def _local_search(query: str, max_results: int = 5) -> str:
+    return render_result(_local_search_result(query, max_results))
+
+
+def _related_papers(query: str, max_results: int = 5) -> str:
+    return render_result(_related_papers_result(query, max_results))
 
 
 # ---------------------------------------------------------------------------
@@ -289,6 +501,18 @@ def semantic_scholar_cite(paper_id: str) -> str:
     return _semantic_scholar_cite(paper_id)
 
 
+@tool("local_search")
+def local_search(query: str, max_results: int = 5) -> str:
+    """Search the local index of previously fetched papers and Wikipedia articles. Instant, no network access."""
+    return _local_search(query, max_results)
+
+
+@tool("related_papers")
+def related_papers(query: str, max_results: int = 5) -> str:
+    """Find previously fetched papers and articles semantically related to a query or abstract. Instant, no network access."""
+    return _related_papers(query, max_results)
+
+
 # ---------------------------------------------------------------------------
 # Exports
 # ---------------------------------------------------------------------------
@@ -300,17 +524,34 @@ AGENT_TOOLS = {
     "wikipedia": [wiki_search, wiki_summarize],
     "slack": [slack_send_message],
     "semantic_scholar": [semantic_scholar_search, semantic_scholar_cite],
+    "library": [local_search, related_papers],
 }
 
-# Raw callables for direct execution by the execution tracker
+# Structured callables for direct execution by the execution tracker
 TOOL_FUNCTIONS: dict[str, callable] = {
-    "arxiv_search": _arxiv_search,
-    "arxiv_summarize": _arxiv_summarize,
-    "generate_proposal": _generate_proposal,
-    "outline_methodology": _outline_methodology,
-    "wiki_search": _wiki_search,
-    "wiki_summarize": _wiki_summarize,
-    "slack_send_message": _slack_send_message,
-    "semantic_scholar_search": _semantic_scholar_search,
-    "semantic_scholar_cite": _semantic_scholar_cite,
+    "arxiv_search": _arxiv_search_result,
+    "arxiv_summarize": _arxiv_summarize_result,
+    "generate_proposal": _generate_proposal_result,
+    "outline_methodology": _outline_methodology_result,
+    "wiki_search": _wiki_search_result,
+    "wiki_summarize": _wiki_summarize_result,
+    "slack_send_message": _slack_send_message_result,
+    "semantic_scholar_search": _semantic_scholar_search_result,
+    "semantic_scholar_cite": _semantic_scholar_cite_result,
+    "local_search": _local_search_result,
+    "related_papers": _related_papers_result,
+}
+
+# Actions with no external side effects (safe to speculate, cache or retry)
+READ_ONLY_TOOLS = {
+    "arxiv_search",
+    "arxiv_summarize",
+    "generate_proposal",
+    "outline_methodology",
+    "wiki_search",
+    "wiki_summarize",
+    "semantic_scholar_search",
+    "semantic_scholar_cite",
+    "local_search",
+    "related_papers",
 }
@@ -0,0 +1,271 @@
+"""
+Record and replay upstream traffic for deterministic end-to-end runs.
+
+While a cassette is active, every urllib request (the tools in
+crew/tools.py) and every httpx request to the OpenAI API (planning via
+CrewAI, synthesis, vision, transcription) is intercepted:
+
+- record: the real request is made, and the request, response and wall
+  time are appended to the cassette;
+- replay: the matching recorded response is returned after sleeping the
+  recorded time multiplied by latency_scale (0 = no waiting).
+
+Requests match on method, URL and a hash of the body; when the body differs
+(e.g. multipart boundaries) the next unused exchange for the same method
+and URL is used. Cassettes are JSON files with a format version.
+"""
+
+import asyncio
+import base64
+import contextlib
+import hashlib
+import io
+import json
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+import httpx
+
+CASSETTE_VERSION = 1
+
+# Response headers that describe the stored (already decoded) body
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+class CassetteMiss(RuntimeError):
+    """Replay found no recorded exchange for a request."""
+
+
+def _encode(data: bytes) -> dict:
+    try:
+        return {"text": data.decode()}
+    except UnicodeDecodeError:
+        return {"b64": base64.b64encode(data).decode()}
+
+
+def _decode(body: dict) -> bytes:
+    return base64.b64decode(body["b64"]) if "b64" in body else body.get("text", "").encode()
+
+
+def _kind(url: str, body: bytes) -> str:
+    """Which pipeline stage an exchange belongs to."""
+    path = urllib.parse.urlsplit(url).path
+    if "/audio/" in path:
+        return "transcription"
+    if "/chat/completions" in path or "/responses" in path:
+        if b'"image_url"' in body:
+            return "vision"
+        if b"structured execution plan" in body:
+            return "planning"
+        return "synthesis"
+    return "tool"
+
+
+class _RecordedResponse(io.BytesIO):
+    """Minimal urlopen() response: a readable, closable context manager."""
+
+    def __init__(self, data: bytes, status: int, url: str):
+        super().__init__(data)
+        self.status = status
+        self.url = url
+
+    def getcode(self) -> int:
+        return self.status
+
+
+class Cassette:
+    def __init__(self, path: str | Path, mode: str = "replay", latency_scale: float = 1.0, llm_hosts: list[str] | None = None):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode!r}")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.llm_hosts = set(llm_hosts or ["api.openai.com"])
+        self.meta: dict = {}
+        self.sessions: list[dict] = []
+        self.interactions: list[dict] = []
+        self.session: int | None = None  # tags recorded exchanges
+        self._lock = threading.Lock()
+        self._used: set[int] = set()
+        self.misses = 0
+        if mode == "replay":
+            self.load()
+
+    # -- persistence -------------------------------------------------------
+
+    def load(self) -> None:
+        data = json.loads(self.path.read_text())
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version {data.get('version')} (expected {CASSETTE_VERSION})")
+        self.meta = data.get("meta", {})
+        self.sessions = data.get("sessions", [])
+        self.interactions = data.get("interactions", [])
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps({
+            "version": CASSETTE_VERSION,
+            "meta": self.meta,
+            "sessions": self.sessions,
+            "interactions": self.interactions,
+        }, indent=1))
+
+    # -- matching ----------------------------------------------------------
+
+    @staticmethod
+    def _hash(body: bytes) -> str:
+        return hashlib.sha256(body).hexdigest()[:16]
+
+    def _record(self, method: str, url: str, body: bytes, status: int, headers: dict, data: bytes | None, error: str | None, elapsed: float) -> None:
+        with self._lock:
+            self.interactions.append({
+                "kind": _kind(url, body),
+                "session": self.session,
+                "method": method,
+                "url": url,
+                "requestHash": self._hash(body),
+                "status": status,
+                "headers": headers,
+                "body": _encode(data) if data is not None else None,
+                "error": error,
+                "durationMs": round(elapsed * 1000, 2),
+            })
+
+    def _match(self, method: str, url: str, body: bytes) -> dict:
+        digest = self._hash(body)
+        with self._lock:
+            fallback = None
+            for i, it in enumerate(self.interactions):
+                if i in self._used or it["method"] != method or it["url"] != url:
+                    continue
+                if it["requestHash"] == digest:
+                    self._used.add(i)
+                    return it
+                if fallback is None:
+                    fallback = i
+            if fallback is not None:
+                self._used.add(fallback)
+                return self.interactions[fallback]
+            self.misses += 1
+        raise CassetteMiss(f"No recorded response for {method} {url}")
+
+    def _delay(self, exchange: dict) -> float:
+        return exchange["durationMs"] / 1000 * self.latency_scale
+
+    # -- urllib ------------------------------------------------------------
+
+    def _urlopen(self, real):
+        def urlopen(req, data=None, timeout=None, **kwargs):
+            if isinstance(req, urllib.request.Request):
+                method, url, body = req.get_method(), req.full_url, req.data or b""
+            else:
+                method, url, body = ("POST" if data else "GET"), req, data or b""
+            if self.mode == "replay":
+                exchange = self._match(method, url, body)
+                time.sleep(self._delay(exchange))
+                if exchange["error"]:
+                    raise urllib.error.URLError(exchange["error"])
+                payload = _decode(exchange["body"])
+                if exchange["status"] >= 400:
+                    raise urllib.error.HTTPError(url, exchange["status"], "replayed", exchange["headers"], io.BytesIO(payload))
+                return _RecordedResponse(payload, exchange["status"], url)
+
+            start = time.perf_counter()
+            try:
+                with real(req, data, timeout, **kwargs) if timeout is not None else real(req, data, **kwargs) as resp:
+                    payload = resp.read()
+                    status = resp.status
+                    headers = {k.lower(): v for k, v in resp.headers.items() if k.lower() not in _DROP_HEADERS}
+            except urllib.error.HTTPError as e:
+                payload = e.read()
+                self._record(method, url, body, e.code, dict(e.headers or {}), payload, None, time.perf_counter() - start)
+                raise urllib.error.HTTPError(url, e.code, e.reason, e.headers, io.BytesIO(payload)) from None
+            except Exception as e:
+                self._record(method, url, body, 0, {}, None, str(e), time.perf_counter() - start)
+                raise
+            self._record(method, url, body, status, headers, payload, None, time.perf_counter() - start)
+            return _RecordedResponse(payload, status, url)
+
+        return urlopen
+
+    # -- httpx -------------------------------------------------------------
+
+    def _intercepts(self, request: httpx.Request) -> bool:
+        return request.url.host in self.llm_hosts
+
+    def _replayed(self, request: httpx.Request, exchange: dict) -> httpx.Response:
+        if exchange["error"]:
+            raise httpx.ConnectError(exchange["error"], request=request)
+        return httpx.Response(
+            exchange["status"], headers=exchange["headers"], content=_decode(exchange["body"]), request=request
+        )
+
+    def _sync_transport(self, real):
+        cassette = self
+
+        def handle_request(transport, request: httpx.Request) -> httpx.Response:
+            if not cassette._intercepts(request):
+                return real(transport, request)
+            body = request.read()
+            if cassette.mode == "replay":
+                exchange = cassette._match(request.method, str(request.url), body)
+                time.sleep(cassette._delay(exchange))
+                return cassette._replayed(request, exchange)
+            start = time.perf_counter()
+            try:
+                response = real(transport, request)
+                payload = response.read()
+            except Exception as e:
+                cassette._record(request.method, str(request.url), body, 0, {}, None, str(e), time.perf_counter() - start)
+                raise
+            headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROP_HEADERS}
+            cassette._record(request.method, str(request.url), body, response.status_code, headers, payload, None, time.perf_counter() - start)
+            return httpx.Response(response.status_code, headers=headers, content=payload, request=request)
+
+        return handle_request
+
+    def _async_transport(self, real):
+        cassette = self
+
+        async def handle_async_request(transport, request: httpx.Request) -> httpx.Response:
+            if not cassette._intercepts(request):
+                return await real(transport, request)
+            body = await request.aread()
+            if cassette.mode == "replay":
+                exchange = cassette._match(request.method, str(request.url), body)
+                await asyncio.sleep(cassette._delay(exchange))
+                return cassette._replayed(request, exchange)
+            start = time.perf_counter()
+            try:
+                response = await real(transport, request)
+                payload = await response.aread()
+            except Exception as e:
+                cassette._record(request.method, str(request.url), body, 0, {}, None, str(e), time.perf_counter() - start)
+                raise
+            headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROP_HEADERS}
+            cassette._record(request.method, str(request.url), body, response.status_code, headers, payload, None, time.perf_counter() - start)
+            return httpx.Response(response.status_code, headers=headers, content=payload, request=request)
+
+        return handle_async_request
+
+    @contextlib.contextmanager
+    def active(self):
+        """Intercept urllib and OpenAI httpx traffic for the duration of the block."""
+        real_urlopen = urllib.request.urlopen
+        real_sync = httpx.HTTPTransport.handle_request
+        real_async = httpx.AsyncHTTPTransport.handle_async_request
+        urllib.request.urlopen = self._urlopen(real_urlopen)
+        httpx.HTTPTransport.handle_request = self._sync_transport(real_sync)
+        httpx.AsyncHTTPTransport.handle_async_request = self._async_transport(real_async)
+        try:
+            yield self
+        finally:
+            urllib.request.urlopen = real_urlopen
+            httpx.HTTPTransport.handle_request = real_sync
+            httpx.AsyncHTTPTransport.handle_async_request = real_async
+            if self.mode == "record":
+                self.save()
@@ -0,0 +1,309 @@
+"""
+Local stand-ins for every upstream the server talks to.
+
+One FastAPI app serves fake arXiv, Semantic Scholar, Wikipedia, Slack,
+OpenAI (chat completions) and Supabase auth under path prefixes, with
+deterministic, query-derived payloads. Each service has a latency
+distribution and an error rate so load tests can model slow or flaky
+upstreams:
+
+    fixed:50            always 50 ms
+    uniform:20:80       20-80 ms
+    normal:100:20       mean 100 ms, sd 20 ms (clamped at 0)
+    lognormal:120:0.5   median 120 ms, sigma 0.5
+
+The OpenAI stand-in answers planner prompts with a canned plan (parallel
+arXiv, Semantic Scholar and Wikipedia searches on the request's topic), as
+bare JSON for structured-output requests or in CrewAI's "Final Answer:"
+format otherwise, and everything else with a canned summary.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from xml.sax.saxutils import escape
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+SERVICES = ("arxiv", "s2", "wiki", "slack", "openai", "supabase")
+
+# Status returned by each service when it injects an error
+_ERROR_STATUS = {"arxiv": 503, "s2": 429, "wiki": 503, "slack": 500, "openai": 500, "supabase": 503}
+
+
+class Latency:
+    def __init__(self, spec: str):
+        kind, *args = spec.split(":")
+        self.spec = spec
+        self.kind = kind
+        self.args = [float(a) for a in args]
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if expected.get(kind) != len(self.args):
+            raise ValueError(f"Bad latency spec: {spec!r}")
+
+    def sample(self, rng: random.Random) -> float:
+        """Seconds to wait."""
+        a = self.args
+        if self.kind == "fixed":
+            ms = a[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(a[0], a[1])
+        elif self.kind == "normal":
+            ms = rng.gauss(a[0], a[1])
+        else:
+            ms = a[0] * rng.lognormvariate(0.0, a[1])
+        return max(0.0, ms) / 1000
+
+
+@dataclass
+class Profile:
+    """Per-service latency and error rate."""
+
+    latency: dict[str, Latency] = field(default_factory=lambda: {
+        "arxiv": Latency("lognormal:400:0.5"),
+        "s2": Latency("lognormal:250:0.5"),
+        "wiki": Latency("lognormal:120:0.4"),
+        "slack": Latency("lognormal:150:0.3"),
+        "openai": Latency("lognormal:1200:0.4"),
+        "supabase": Latency("lognormal:40:0.3"),
+    })
+    errors: dict[str, float] = field(default_factory=dict)
+    seed: int = 0
+
+    def set(self, service: str, latency: str | None = None, error_rate: float | None = None) -> None:
+        if service not in SERVICES:
+            raise ValueError(f"Unknown service {service!r}; expected one of {', '.join(SERVICES)}")
+        if latency is not None:
+            self.latency[service] = Latency(latency)
+        if error_rate is not None:
+            self.errors[service] = error_rate
+
+
+def _seed(text: str) -> int:
+    return int(hashlib.sha1(text.encode()).hexdigest()[:8], 16)
+
+
+def _words(text: str) -> list[str]:
+    return re.findall(r"[a-z]+", text.lower()) or ["research"]
+
+
+def _arxiv_entry(query: str, i: int, arxiv_id: str = "") -> str:
+    n = _seed(f"{query}:{i}") % 100000
+    arxiv_id = arxiv_id or f"2601.{n:05d}v1"
+    words = _words(query)
+    return (
+        "<entry>"
+        f"<id>http://arxiv.org/abs/{arxiv_id}</id>"
+        f"<published>2026-01-{1 + n % 28:02d}T00:00:00Z</published>"
+        f"<title>{escape(' '.join(words).title())}: Study {i + 1}</title>"
+        f"<summary>{escape(' '.join(words * 20))}</summary>"
+        "<author><name>A. Author</name></author><author><name>B. Author</name></author>"
+        '<category term="cs.LG"/>'
+        "</entry>"
+    )
+
+
+def _arxiv_feed(entries: list[str]) -> str:
+    return '<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom">' + "".join(entries) + "</feed>"
+
+
+def _s2_paper(query: str, i: int) -> dict:
+    n = _seed(f"{query}:{i}")
+    return {
+        "paperId": f"{n:040x}"[:40],
+        # Shares arXiv ids (not titles) with the arXiv stand-in for odd seeds
+        "title": f"{' '.join(_words(query)).title()}: Analysis {i + 1}",
+        "year": 2020 + n % 7,
+        "abstract": " ".join(_words(query) * 20),
+        "url": f"https://www.semanticscholar.org/paper/{n:x}",
+        "citationCount": n % 500,
+        "influentialCitationCount": n % 50,
+        "referenceCount": n % 80,
+        "authors": [{"name": "A. Author"}, {"name": "B. Author"}],
+        "externalIds": {"ArXiv": f"2601.{n % 100000:05d}"} if n % 2 else {},
+    }
+
+
+_TOPIC_RE = re.compile(r"User request:\s*(.+)")
+_PLANNER_MARKER = "structured execution plan"
+
+
+def _canned_plan(prompt: str) -> dict:
+    m = _TOPIC_RE.search(prompt)
+    topic = (m.group(1).strip() if m else "machine learning")[:80]
+    return {
+        "summary": f"Research {topic}",
+        "steps": [
+            {
+                "id": f"step_{i}",
+                "agent_id": agent,
+                "action": action,
+                "description": f"{label} for {topic}",
+                "params": {"query": topic},
+                "requires_approval": False,
+                "depends_on": [],
+                "type": "tool",
+            }
+            for i, (agent, action, label) in enumerate(
+                [
+                    ("arxiv", "arxiv_search", "Search arXiv"),
+                    ("semantic_scholar", "semantic_scholar_search", "Search Semantic Scholar"),
+                    ("wikipedia", "wiki_search", "Search Wikipedia"),
+                ],
+                start=1,
+            )
+        ],
+    }
+
+
+def _completion(model: str, content: str, prompt_chars: int) -> dict:
+    return {
+        "id": f"chatcmpl-fake{int(time.time() * 1000)}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_chars // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": prompt_chars // 4 + len(content) // 4,
+        },
+    }
+
+
+def create_app(profile: Profile | None = None) -> FastAPI:
+    profile = profile or Profile()
+    rng = random.Random(profile.seed)
+    app = FastAPI(title="Fake upstreams")
+    app.state.profile = profile
+    app.state.calls = dict.fromkeys(SERVICES, 0)
+
+    async def delay(service: str) -> Response | None:
+        """Wait the sampled latency; returns an error response if one is injected."""
+        app.state.calls[service] += 1
+        await asyncio.sleep(profile.latency[service].sample(rng))
+        if rng.random() < profile.errors.get(service, 0.0):
+            return JSONResponse({"error": f"injected {service} error"}, status_code=_ERROR_STATUS[service])
+        return None
+
+    @app.get("/arxiv/api/query")
+    async def arxiv(search_query: str = "", id_list: str = "", max_results: int = 5):
+        if err := await delay("arxiv"):
+            return err
+        if id_list:
+            entries = [_arxiv_entry(id_list, 0, arxiv_id=id_list)]
+        else:
+            query = search_query.split("+AND+")[0].removeprefix("all:")
+            entries = [_arxiv_entry(query, i) for i in range(max_results)]
+        return Response(_arxiv_feed(entries), media_type="application/atom+xml")
+
+    @app.get("/s2/graph/v1/paper/search")
+    async def s2_search(query: str = "", limit: int = 5):
+        if err := await delay("s2"):
+            return err
+        return {"total": limit, "data": [_s2_paper(query, i) for i in range(limit)]}
+
+    @app.get("/s2/graph/v1/paper/{paper_id:path}")
+    async def s2_paper(paper_id: str):
+        if err := await delay("s2"):
+            return err
+        return _s2_paper(paper_id, 0)
+
+    @app.get("/wiki/w/api.php")
+    async def wiki_search(srsearch: str = "", srlimit: int = 5):
+        if err := await delay("wiki"):
+            return err
+        title = " ".join(_words(srsearch)).title()
+        return {"query": {"search": [
+            {"title": f"{title} ({i + 1})", "pageid": _seed(f"{srsearch}:{i}") % 10**7,
+             "snippet": f'<span class="searchmatch">{title}</span> is a topic. ' * 5}
+            for i in range(srlimit)
+        ]}}
+
+    @app.get("/wiki/api/rest_v1/page/summary/{title:path}")
+    async def wiki_summary(title: str):
+        if err := await delay("wiki"):
+            return err
+        return {
+            "title": title,
+            "pageid": _seed(title) % 10**7,
+            "extract": f"{title} is a topic. " * 40,
+            "content_urls": {"desktop": {"page": f"https://en.wikipedia.org/wiki/{title}"}},
+        }
+
+    @app.post("/slack/api/chat.postMessage")
+    async def slack_post(request: Request):
+        if err := await delay("slack"):
+            return err
+        body = await request.json()
+        return {"ok": True, "channel": body.get("channel"), "ts": f"{time.time():.6f}"}
+
+    @app.post("/openai/v1/chat/completions")
+    async def openai_chat(request: Request):
+        if err := await delay("openai"):
+            return err
+        body = await request.json()
+        prompt = "\n".join(
+            m["content"] if isinstance(m.get("content"), str) else json.dumps(m.get("content"))
+            for m in body.get("messages", [])
+        )
+        if _PLANNER_MARKER in prompt:
+            plan = json.dumps(_canned_plan(prompt))
+            # Structured-output requests get bare JSON; ReAct prompts a final answer
+            content = plan if body.get("response_format") else (
+                f"Thought: I now can give a great answer\nFinal Answer: {plan}"
+            )
+        else:
+            content = (
+                "## Summary\n\n"
+                + "- Recent work converges on a few shared methods and benchmarks.\n" * 6
+                + "\nSources are listed in the step results above."
+            )
+        return _completion(body.get("model", "gpt-fake"), content, len(prompt))
+
+    @app.get("/supabase/auth/v1/user")
+    async def supabase_user(request: Request):
+        if err := await delay("supabase"):
+            return err
+        return {
+            "id": "00000000-0000-0000-0000-000000000001",
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": "loadtest@example.com",
+            "app_metadata": {},
+            "user_metadata": {},
+            "created_at": "2026-01-01T00:00:00Z",
+        }
+
+    @app.get("/__stats")
+    async def stats():
+        return app.state.calls
+
+    return app
+
+
+def env_for(base_url: str) -> dict[str, str]:
+    """Server environment pointing every upstream at fakes served from base_url."""
+    return {
+        "OPENAI_API_KEY": "sk-fake",
+        "OPENAI_BASE_URL": f"{base_url}/openai/v1",
+        "SUPABASE_URL": f"{base_url}/supabase",
+        "SUPABASE_SERVICE_KEY": "fake-service-key",
+        "SLACK_BOT_TOKEN": "xoxb-fake",
+        "ARXIV_API_URL": f"{base_url}/arxiv/api/query",
+        "SEMANTIC_SCHOLAR_API_URL": f"{base_url}/s2/graph/v1",
+        "WIKIPEDIA_URL": f"{base_url}/wiki",
+        "SLACK_API_URL": f"{base_url}/slack/api",
+        "CREWAI_TRACING_ENABLED": "false",
+        "CREWAI_DISABLE_TELEMETRY": "true",
+        "OTEL_SDK_DISABLED": "true",
+    }
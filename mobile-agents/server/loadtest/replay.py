@@ -0,0 +1,276 @@
+"""
+Record user sessions to a cassette, replay them offline, and diff latency
+profiles between builds.
+
+Each session in the corpus (JSON lines: {"message", "image_base64"?,
+"audio_base64"?}) runs in-process through the same path as /api/chat and
+/api/execute: image analysis and transcription, MobileAgentsOrchestrator.plan
+and execute_plan_stream. Usage:
+
+    python -m loadtest.replay record --corpus sessions.jsonl --out cassettes/main.json
+    python -m loadtest.replay replay --cassette cassettes/main.json --out before.json
+    git checkout my-branch
+    python -m loadtest.replay replay --cassette cassettes/main.json --out after.json
+    python -m loadtest.replay diff before.json after.json
+
+Replay serves every upstream and LLM response from the cassette with its
+recorded latency (times --scale; 0 measures pure server overhead), so two
+builds see identical upstream behaviour and differences in the profile come
+from the code. The research index and vector memory are disabled in both
+modes so earlier sessions do not change later ones.
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+import urllib.parse
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import settings
+from loadtest.cassettes import Cassette
+
+# Settings that decide which requests are made; recorded and restored on replay
+SNAPSHOT_SETTINGS = (
+    "openai_base_url", "arxiv_api_url", "semantic_scholar_api_url", "wikipedia_url", "slack_api_url",
+    "planner_model", "synthesizer_model", "synthesis_fast_model", "digest_model", "vision_model",
+    "transcription_model", "worker_model",
+)
+
+# Stateful stores that would make a session depend on the ones before it
+_ISOLATION = {"research_index_enabled": False, "vector_store_enabled": False}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _llm_hosts() -> list[str]:
+    return [urllib.parse.urlsplit(settings.openai_base_url).hostname or "api.openai.com"]
+
+
+def _apply(values: dict) -> None:
+    for key, value in values.items():
+        if hasattr(settings, key):
+            setattr(settings, key, value)
+
+
+def _pct(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1)
+
+
+async def run_session(session: dict) -> dict:
+    """Run one session in-process and return its timings."""
+    from crewai import LLM
+
+    from crew.orchestrator import MobileAgentsOrchestrator
+    from services.audio_transcriber import transcribe_audio
+    from services.execution_tracker import execute_plan_stream
+    from services.image_analyzer import analyze_image
+    from services.llm_scheduler import openai_client
+    from services.model_router import model_router
+    from services.tokens import count_tokens
+
+    profile: dict = {"message": session.get("message", ""), "steps": {}}
+    start = time.perf_counter()
+    client = openai_client(settings.openai_api_key)
+    image_analysis = audio_transcript = None
+    modality = "text"
+    if session.get("image_base64"):
+        image_analysis = await analyze_image(client, session["image_base64"])
+        modality = "image"
+    if session.get("audio_base64"):
+        audio_transcript = await transcribe_audio(client, session["audio_base64"])
+        modality = "voice"
+    if modality != "text":
+        profile["analysisMs"] = round((time.perf_counter() - start) * 1000, 1)
+
+    message = session.get("message") or audio_transcript or ("Analyze this image" if image_analysis else "Hello")
+    plan_start = time.perf_counter()
+
+    async def _plan(model: str) -> dict:
+        llm = LLM(
+            model=model,
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url or None,
+            timeout=settings.model_timeout,
+        )
+        return await MobileAgentsOrchestrator(llm=llm).plan(
+            user_message=message,
+            image_analysis=image_analysis,
+            audio_transcript=audio_transcript,
+            input_modality=modality,
+        )
+
+    request_tokens = count_tokens(message + (image_analysis or ""))
+    result, _ = await model_router.acall("planner", _plan, size_tokens=request_tokens, est_tokens=request_tokens + 2000)
+    profile["planMs"] = round((time.perf_counter() - plan_start) * 1000, 1)
+    plan = result["plan"]
+    actions = {s["id"]: s["action"] for s in plan["steps"]}
+    profile["stepCount"] = len(plan["steps"])
+    if not plan["steps"]:
+        profile["status"] = "no_plan"
+        profile["totalMs"] = round((time.perf_counter() - start) * 1000, 1)
+        return profile
+
+    exec_start = time.perf_counter()
+    status = "incomplete"
+    async for chunk in execute_plan_stream(plan, result["graph"], api_key=settings.openai_api_key):
+        event = json.loads(chunk[6:])
+        profile.setdefault("firstEventMs", round((time.perf_counter() - exec_start) * 1000, 1))
+        if event["type"] == "node_status" and event.get("status") == "completed":
+            if event["nodeId"] == "output":
+                profile["synthesisMs"] = event.get("duration")
+            elif event["nodeId"] in actions:
+                profile["steps"][event["nodeId"]] = {"action": actions[event["nodeId"]], "ms": event.get("duration")}
+        elif event["type"] in ("execution_complete", "execution_failed"):
+            status = "completed" if event["type"] == "execution_complete" else "failed"
+    profile["executeMs"] = round((time.perf_counter() - exec_start) * 1000, 1)
+    profile["totalMs"] = round((time.perf_counter() - start) * 1000, 1)
+    profile["status"] = status
+    return profile
+
+
+async def _run_all(sessions: list[dict], cassette: Cassette) -> list[dict]:
+    profiles = []
+    for i, session in enumerate(sessions):
+        cassette.session = i
+        try:
+            profiles.append(await run_session(session))
+        except Exception as e:
+            profiles.append({"message": session.get("message", ""), "status": "error", "error": f"{type(e).__name__}: {e}"})
+        print(f"[{i + 1}/{len(sessions)}] {profiles[-1]['status']} {profiles[-1].get('totalMs', '')}", file=sys.stderr)
+    return profiles
+
+
+def summarize(profiles: list[dict]) -> dict:
+    """p50/p95 per phase and per tool action over completed sessions."""
+    ok = [p for p in profiles if p.get("status") == "completed"]
+    phases: dict[str, list[float]] = {}
+    for p in ok:
+        for key in ("analysisMs", "planMs", "firstEventMs", "executeMs", "synthesisMs", "totalMs"):
+            if p.get(key) is not None:
+                phases.setdefault(key, []).append(p[key])
+        for step in p["steps"].values():
+            if step["ms"] is not None:
+                phases.setdefault(f"step:{step['action']}", []).append(step["ms"])
+    return {
+        "sessions": len(profiles),
+        "completed": len(ok),
+        "phases": {k: {"p50": _pct(v, 0.5), "p95": _pct(v, 0.95), "n": len(v)} for k, v in sorted(phases.items())},
+    }
+
+
+def record(corpus: Path, out: Path) -> dict:
+    sessions = [json.loads(line) for line in corpus.read_text().splitlines() if line.strip()]
+    _apply(_ISOLATION)
+    cassette = Cassette(out, mode="record", llm_hosts=_llm_hosts())
+    cassette.sessions = sessions
+    cassette.meta = {
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "settings": {k: getattr(settings, k) for k in SNAPSHOT_SETTINGS},
+    }
+    with cassette.active():
+        profiles = asyncio.run(_run_all(sessions, cassette))
+    return {"cassette": str(out), "commit": cassette.meta["commit"], "profiles": profiles, **summarize(profiles)}
+
+
+def replay(path: Path, scale: float) -> dict:
+    cassette = Cassette(path, mode="replay", latency_scale=scale)
+    _apply({**cassette.meta.get("settings", {}), **_ISOLATION})
+    # Nothing leaves the process, but the clients refuse to start without a key
+    settings.openai_api_key = settings.openai_api_key or "sk-replay"
+    cassette.llm_hosts = set(_llm_hosts())
+    with cassette.active():
+        profiles = asyncio.run(_run_all(cassette.sessions, cassette))
+    return {
+        "cassette": str(path),
+        "recordedCommit": cassette.meta.get("commit", ""),
+        "commit": _git_commit(),
+        "latencyScale": scale,
+        "misses": cassette.misses,
+        "profiles": profiles,
+        **summarize(profiles),
+    }
+
+
+def diff(before: dict, after: dict) -> list[dict]:
+    rows = []
+    a, b = before["phases"], after["phases"]
+    for phase in sorted(set(a) | set(b)):
+        row = {"phase": phase}
+        for q in ("p50", "p95"):
+            old, new = a.get(phase, {}).get(q), b.get(phase, {}).get(q)
+            row[q] = [old, new]
+            row[f"{q}Change"] = round((new - old) / old * 100, 1) if old and new is not None else None
+        rows.append(row)
+    return rows
+
+
+def _print_diff(before: dict, after: dict, rows: list[dict]) -> None:
+    print(f"before {before.get('commit') or '?'} ({before['completed']}/{before['sessions']})  "
+          f"after {after.get('commit') or '?'} ({after['completed']}/{after['sessions']})")
+    print(f"{'ms':<34}{'p50 before':>12}{'after':>10}{'Δ%':>8}{'p95 before':>12}{'after':>10}{'Δ%':>8}")
+    for r in rows:
+        cells = []
+        for q in ("p50", "p95"):
+            old, new = r[q]
+            change = r[f"{q}Change"]
+            cells += [
+                f"{'-' if old is None else old:>12}",
+                f"{'-' if new is None else new:>10}",
+                f"{'' if change is None else f'{change:+.1f}':>8}",
+            ]
+        print(f"{r['phase']:<34}" + "".join(cells))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="run sessions against real upstreams and save a cassette")
+    rec.add_argument("--corpus", type=Path, required=True, help="JSON lines of sessions")
+    rec.add_argument("--out", type=Path, required=True, help="cassette file to write")
+    rec.add_argument("--profile", type=Path, help="also write the recording run's profile")
+    rep = sub.add_parser("replay", help="replay a cassette and write a latency profile")
+    rep.add_argument("--cassette", type=Path, required=True)
+    rep.add_argument("--scale", type=float, default=1.0, help="multiply recorded latencies (0 = no waiting)")
+    rep.add_argument("--out", type=Path, help="profile file to write")
+    dif = sub.add_parser("diff", help="compare two replay profiles")
+    dif.add_argument("before", type=Path)
+    dif.add_argument("after", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "diff":
+        before, after = json.loads(args.before.read_text()), json.loads(args.after.read_text())
+        _print_diff(before, after, diff(before, after))
+        return
+    if args.command == "record":
+        report = record(args.corpus, args.out)
+        out = args.profile
+    else:
+        report = replay(args.cassette, args.scale)
+        out = args.out
+        if report["misses"]:
+            print(f"warning: {report['misses']} request(s) had no recorded response", file=sys.stderr)
+    print(json.dumps({"sessions": report["sessions"], "completed": report["completed"], "phases": report["phases"]}, indent=2))
+    if out:
+        out.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
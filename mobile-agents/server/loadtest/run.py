@@ -0,0 +1,302 @@
+"""
+Load test the full chat -> execute pipeline against local stand-in upstreams.
+
+Starts the fake upstreams (loadtest/fake_upstreams.py) in-process, starts
+the server (loadtest/serve.py) in a subprocess with every upstream URL
+pointed at them, then drives sessions at a target rate: POST /api/chat for
+a plan, then POST /api/execute and read the SSE stream to the end.
+Arrivals are open-loop (Poisson), so a slow server builds a backlog
+rather than slowing the load down. Usage:
+
+    python -m loadtest.run --rps 2 --duration 60
+    python -m loadtest.run --rps 5 --latency openai=lognormal:800:0.4 --errors arxiv=0.05
+    python -m loadtest.run --target http://localhost:8000   # already-running server
+
+Reports throughput, p50/p95/p99 latency of chat, execute and whole
+sessions, time to first SSE event and first step result, error counts,
+and the server's event-loop lag.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from loadtest.fake_upstreams import Profile, create_app, env_for
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+_WORDS = [
+    "graph", "transformer", "diffusion", "protein", "folding", "retrieval", "causal",
+    "inference", "robotics", "policy", "quantum", "federated", "privacy", "sparse",
+    "attention", "alignment", "compression", "vision", "language", "reinforcement",
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _pct(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1)
+
+
+def _summary(values: list[float]) -> dict:
+    return {"p50": _pct(values, 0.5), "p95": _pct(values, 0.95), "p99": _pct(values, 0.99), "n": len(values)}
+
+
+def _topics(n: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    return [f"find recent papers on {' '.join(rng.sample(_WORDS, 2))}" for _ in range(n)]
+
+
+def start_fakes(profile: Profile) -> tuple[str, uvicorn.Server]:
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(create_app(profile), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", server
+
+
+def start_server(fakes_url: str, extra_env: dict, workdir: str) -> tuple[str, subprocess.Popen]:
+    port = _free_port()
+    env = {
+        **os.environ,
+        **env_for(fakes_url),
+        # Keep load-test records out of the real local index and memory
+        "RESEARCH_INDEX_PATH": os.path.join(workdir, "research_index.db"),
+        "VECTOR_STORE_PATH": os.path.join(workdir, "vector_store"),
+        **extra_env,
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "loadtest.serve:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=SERVER_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=open(os.path.join(workdir, "server.log"), "w"),
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            log = Path(workdir, "server.log").read_text()[-2000:]
+            raise RuntimeError(f"Server exited:\n{log}")
+        try:
+            if httpx.get(f"{url}/api/health", timeout=1).status_code == 200:
+                return url, proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    proc.terminate()
+    raise RuntimeError("Server did not become healthy within 60s")
+
+
+class Recorder:
+    def __init__(self):
+        self.chat_ms: list[float] = []
+        self.execute_ms: list[float] = []
+        self.session_ms: list[float] = []
+        self.first_event_ms: list[float] = []
+        self.first_result_ms: list[float] = []
+        self.errors: dict[str, int] = {}
+        self.completed = 0
+        self.started = 0
+
+    def error(self, kind: str) -> None:
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+
+async def session(client: httpx.AsyncClient, url: str, message: str, rec: Recorder) -> None:
+    rec.started += 1
+    headers = {"Authorization": "Bearer loadtest"}
+    start = time.perf_counter()
+    try:
+        resp = await client.post(f"{url}/api/chat", json={"message": message}, headers=headers)
+    except httpx.HTTPError as e:
+        rec.error(f"chat:{type(e).__name__}")
+        return
+    rec.chat_ms.append((time.perf_counter() - start) * 1000)
+    if resp.status_code != 200:
+        rec.error(f"chat:{resp.status_code}")
+        return
+    body = resp.json()
+    if not body.get("plan"):
+        rec.error("chat:no_plan")
+        return
+
+    exec_start = time.perf_counter()
+    first_event = first_result = None
+    outcome = None
+    try:
+        async with client.stream(
+            "POST", f"{url}/api/execute", json={"plan": body["plan"], "graph": body["graph"]}, headers=headers
+        ) as stream:
+            if stream.status_code != 200:
+                rec.error(f"execute:{stream.status_code}")
+                return
+            async for line in stream.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                now = time.perf_counter()
+                first_event = first_event or now
+                event = json.loads(line[6:])
+                if (
+                    first_result is None
+                    and event.get("type") == "node_status"
+                    and event.get("status") == "completed"
+                ):
+                    first_result = now
+                if event.get("type") in ("execution_complete", "execution_failed"):
+                    outcome = event["type"]
+    except httpx.HTTPError as e:
+        rec.error(f"execute:{type(e).__name__}")
+        return
+    end = time.perf_counter()
+    if outcome != "execution_complete":
+        rec.error(f"execute:{outcome or 'incomplete'}")
+        return
+    rec.execute_ms.append((end - exec_start) * 1000)
+    rec.session_ms.append((end - start) * 1000)
+    if first_event:
+        rec.first_event_ms.append((first_event - exec_start) * 1000)
+    if first_result:
+        rec.first_result_ms.append((first_result - exec_start) * 1000)
+    rec.completed += 1
+
+
+async def drive(url: str, rps: float, duration: float, topics: list[str], max_in_flight: int, seed: int) -> dict:
+    rec = Recorder()
+    rng = random.Random(seed)
+    limits = httpx.Limits(max_connections=max_in_flight * 2, max_keepalive_connections=max_in_flight)
+    async with httpx.AsyncClient(timeout=300, limits=limits) as client:
+        try:
+            await client.get(f"{url}/__loadtest/lag", params={"reset": True})
+        except httpx.HTTPError:
+            pass
+        tasks: set[asyncio.Task] = set()
+        start = time.perf_counter()
+        next_at = start
+        while next_at - start < duration:
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+            if len(tasks) >= max_in_flight:
+                rec.error("client:max_in_flight")
+            else:
+                task = asyncio.create_task(session(client, url, rng.choice(topics), rec))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            next_at += rng.expovariate(rps)
+        if tasks:
+            await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+        try:
+            lag = (await client.get(f"{url}/__loadtest/lag")).json()
+        except (httpx.HTTPError, ValueError):
+            lag = None
+
+    return {
+        "targetRps": rps,
+        "durationSec": round(elapsed, 1),
+        "sessions": rec.started,
+        "completed": rec.completed,
+        "throughputRps": round(rec.completed / elapsed, 3) if elapsed else 0.0,
+        "errors": rec.errors,
+        "latencyMs": {
+            "chat": _summary(rec.chat_ms),
+            "execute": _summary(rec.execute_ms),
+            "session": _summary(rec.session_ms),
+        },
+        "timeToFirstEventMs": _summary(rec.first_event_ms),
+        "timeToFirstResultMs": _summary(rec.first_result_ms),
+        "eventLoopLag": lag,
+    }
+
+
+def _print_report(report: dict) -> None:
+    print(f"\n{report['completed']}/{report['sessions']} sessions in {report['durationSec']}s "
+          f"(target {report['targetRps']} rps, achieved {report['throughputRps']} rps)")
+    print(f"{'ms':<22}{'p50':>10}{'p95':>10}{'p99':>10}{'n':>8}")
+    rows = [(f"latency {k}", v) for k, v in report["latencyMs"].items()]
+    rows += [("first event", report["timeToFirstEventMs"]), ("first result", report["timeToFirstResultMs"])]
+    for name, s in rows:
+        print(f"{name:<22}{s['p50']:>10}{s['p95']:>10}{s['p99']:>10}{s['n']:>8}")
+    if report["eventLoopLag"]:
+        lag = report["eventLoopLag"]
+        print(f"event-loop lag: p50 {lag['p50Ms']} ms, p99 {lag['p99Ms']} ms, max {lag['maxMs']} ms")
+    if report["errors"]:
+        print("errors:", ", ".join(f"{k}={v}" for k, v in sorted(report["errors"].items())))
+
+
+def _pairs(items: list[str], what: str) -> dict[str, str]:
+    out = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise SystemExit(f"--{what} expects KEY=VALUE, got {item!r}")
+        out[key] = value
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rps", type=float, default=1.0, help="target session arrival rate")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of arrivals")
+    parser.add_argument("--topics", type=int, default=50, help="distinct requests (fewer = more cache hits)")
+    parser.add_argument("--max-in-flight", type=int, default=200)
+    parser.add_argument("--latency", action="append", default=[], metavar="SERVICE=SPEC",
+                        help="e.g. openai=lognormal:800:0.4 (services: arxiv s2 wiki slack openai supabase)")
+    parser.add_argument("--errors", action="append", default=[], metavar="SERVICE=RATE")
+    parser.add_argument("--server-env", action="append", default=[], metavar="KEY=VALUE",
+                        help="extra server settings, e.g. TOOL_CACHE_SIZE=0")
+    parser.add_argument("--target", help="drive an already-running server instead of starting one")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    profile = Profile(seed=args.seed)
+    for service, spec in _pairs(args.latency, "latency").items():
+        profile.set(service, latency=spec)
+    for service, rate in _pairs(args.errors, "errors").items():
+        profile.set(service, error_rate=float(rate))
+
+    proc = None
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as workdir:
+        if args.target:
+            url = args.target.rstrip("/")
+        else:
+            fakes_url, _ = start_fakes(profile)
+            url, proc = start_server(fakes_url, _pairs(args.server_env, "server-env"), workdir)
+            print(f"fakes at {fakes_url}, server at {url} (log: {workdir}/server.log)")
+        try:
+            report = asyncio.run(drive(
+                url, args.rps, args.duration, _topics(args.topics, args.seed), args.max_in_flight, args.seed
+            ))
+        finally:
+            if proc:
+                proc.terminate()
+                proc.wait(timeout=10)
+    _print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Server entry point for load tests: the real app plus an event-loop lag probe.
+
+    uvicorn loadtest.serve:app
+
+A background task sleeps for a fixed interval and records how late it wakes
+up; GET /__loadtest/lag returns the percentiles (and resets with ?reset=1).
+"""
+
+import asyncio
+import time
+
+from main import app
+
+_INTERVAL = 0.01
+_samples: list[float] = []
+
+
+async def _probe() -> None:
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(_INTERVAL)
+        _samples.append((time.perf_counter() - start - _INTERVAL) * 1000)
+        if len(_samples) > 100_000:
+            del _samples[:50_000]
+
+
+@app.on_event("startup")
+async def _start_probe():
+    asyncio.get_running_loop().create_task(_probe())
+
+
+@app.get("/__loadtest/lag")
+async def loop_lag(reset: bool = False):
+    ordered = sorted(_samples)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2) if ordered else 0.0
+    stats = {"samples": len(ordered), "p50Ms": pick(0.5), "p99Ms": pick(0.99), "maxMs": round(ordered[-1], 2) if ordered else 0.0}
+    if reset:
+        _samples.clear()
+    return stats
@@ -1,8 +1,19 @@
-from fastapi import FastAPI
+import time
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from opentelemetry.trace import SpanKind
 
-from routers import chat, execute, approve, agents, conversations
-from services.agent_store import load_agents
+from routers import chat, execute, approve, agents, conversations, models, monitors, templates, batch, traces, profiler as profiler_router
+from services import metrics, tracing
+from services.loop_monitor import loop_monitor
+from services.profiler import profiler
+from services.agent_store import load_agents, load_templates
+from services.monitors import load_monitors, monitor_scheduler
+from services.llm_scheduler import SchedulerOverloaded
+from services.tokens import warm_encoder
 from config import settings
 
 app = FastAPI(title="MobileAgents API")
@@ -13,6 +24,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["traceparent", "X-Profile-Id"],
 )
 
 app.include_router(chat.router)
@@ -20,13 +32,95 @@ app.include_router(execute.router)
 app.include_router(approve.router)
 app.include_router(agents.router)
 app.include_router(conversations.router)
+app.include_router(models.router)
+app.include_router(monitors.router)
+app.include_router(templates.router)
+app.include_router(batch.router)
+app.include_router(traces.router)
+app.include_router(profiler_router.router)
+
+
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    """
+    One server span per request, continuing an incoming traceparent, and
+    the request metrics. Requests sent with X-Profile (carrying
+    PROFILER_SECRET), or claimed by an armed profile, are sampled until
+    their body ends (X-Profile-Id names it).
+    """
+    start = time.perf_counter()
+    profile = None
+    if settings.profiler_enabled:
+        profile = profiler.begin_request(request.url.path, request.headers.get("x-profile"))
+    try:
+        response = await _traced(request, call_next)
+    except BaseException:
+        if profile is not None:
+            profiler.detach(profile)
+        raise
+    if profile is not None:
+        response.headers["X-Profile-Id"] = profile.id
+        response.body_iterator = profiler.profiled(response.body_iterator, profile)
+    route = request.scope.get("route")
+    metrics.route_series(route.path if route is not None else "unmatched", request.method).observe(
+        response.status_code, time.perf_counter() - start
+    )
+    return response
+
+
+async def _traced(request: Request, call_next):
+    with tracing.span(
+        f"{request.method} {request.url.path}",
+        context=tracing.extract(request.headers),
+        kind=SpanKind.SERVER,
+        **{"http.method": request.method, "http.target": request.url.path},
+    ) as span:
+        response = await call_next(request)
+        route = request.scope.get("route")
+        if route is not None:
+            # Route template rather than the raw path, e.g. /api/traces/{trace_id}
+            span.update_name(f"{request.method} {route.path}")
+        span.set_attribute("http.status_code", response.status_code)
+        if header := tracing.traceparent(span):
+            response.headers["traceparent"] = header
+    return response
+
+
+@app.exception_handler(SchedulerOverloaded)
+async def llm_overloaded(request: Request, exc: SchedulerOverloaded):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "5"},
+    )
 
 
 @app.on_event("startup")
 async def startup():
     load_agents()
+    load_templates()
+    load_monitors()
+    warm_encoder()
+    if settings.monitors_enabled:
+        monitor_scheduler.start()
+    if settings.loop_monitor_enabled:
+        loop_monitor.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await monitor_scheduler.stop()
+    loop_monitor.stop()
 
 
 @app.get("/api/health")
 async def health():
     return {"status": "ok", "app": settings.app_name}
+
+
+if settings.metrics_enabled:
+
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        """Prometheus text exposition (unauthenticated, like /api/health)."""
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
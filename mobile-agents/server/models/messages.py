@@ -26,6 +26,8 @@ class ChatRequest(BaseModel):
     input_modality: str = "text"
     conversation_history: list[HistoryMessage] = []
     conversation_id: Optional[str] = None
+    # Overrides the server's speculative_execution default when set
+    speculate: Optional[bool] = None
 
 
 class ChatResponse(BaseModel):
@@ -33,3 +35,4 @@ class ChatResponse(BaseModel):
     plan: Optional[dict] = None
     graph: Optional[dict] = None
     image_base64: Optional[str] = None
+    usage: Optional[dict] = None  # model calls made for this request (see services/usage.py)
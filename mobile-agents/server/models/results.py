@@ -0,0 +1,123 @@
+import re
+
+from pydantic import BaseModel, Field
+from typing import Optional
+
+_TITLE_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _first_by(items: list, key) -> list:
+    """First occurrence of each key, in original order."""
+    seen: dict = {}
+    for item in items:
+        seen.setdefault(key(item), item)
+    return list(seen.values())
+
+
+class Paper(BaseModel):
+    title: str
+    authors: list[str] = Field(default_factory=list)
+    year: Optional[int] = None
+    abstract: str = ""
+    url: str = ""
+    arxiv_id: Optional[str] = None
+    s2_id: Optional[str] = None
+    doi: Optional[str] = None
+    categories: list[str] = Field(default_factory=list)
+    citation_count: Optional[int] = None
+    influential_citation_count: Optional[int] = None
+    reference_count: Optional[int] = None
+    published: Optional[str] = None  # arXiv submission time, ISO 8601 UTC
+
+    @property
+    def keys(self) -> list[str]:
+        """All identities of this paper, strongest first (arXiv id, DOI, S2 id, title)."""
+        keys = []
+        if self.arxiv_id:
+            keys.append("arxiv:" + re.sub(r"v\d+$", "", self.arxiv_id))
+        if self.doi:
+            keys.append(f"doi:{self.doi.lower()}")
+        if self.s2_id:
+            keys.append(f"s2:{self.s2_id}")
+        title = " ".join(_TITLE_WORD_RE.findall(self.title.lower()))
+        if title:
+            keys.append(f"title:{title}")
+        return keys
+
+    @property
+    def key(self) -> str:
+        """Identity used for deduplication: the strongest id available."""
+        return self.keys[0] if self.keys else f"title:{self.title}"
+
+    def merge_from(self, other: "Paper") -> bool:
+        """Fill gaps from another record of the same paper; True if anything was added."""
+        changed = False
+        for field in ("arxiv_id", "doi", "s2_id", "year", "reference_count", "published"):
+            if getattr(self, field) is None and getattr(other, field) is not None:
+                setattr(self, field, getattr(other, field))
+                changed = True
+        for field in ("citation_count", "influential_citation_count"):
+            theirs = getattr(other, field)
+            if theirs is not None and (getattr(self, field) or 0) < theirs:
+                setattr(self, field, theirs)
+                changed = True
+        if len(other.abstract) > len(self.abstract):
+            self.abstract = other.abstract
+            changed = True
+        if len(other.authors) > len(self.authors):
+            self.authors = list(other.authors)
+        if not self.url:
+            self.url = other.url
+        for c in other.categories:
+            if c not in self.categories:
+                self.categories.append(c)
+        return changed
+
+
+class Article(BaseModel):
+    title: str
+    page_id: Optional[int] = None
+    url: str = ""
+    text: str = ""  # search snippet or page extract
+
+
+class ToolResult(BaseModel):
+    """Typed result of a tool call; rendered to markdown only for display/LLM input."""
+
+    action: str
+    kind: str = "text"  # papers | articles | text | error
+    query: str = ""
+    papers: list[Paper] = Field(default_factory=list)
+    articles: list[Article] = Field(default_factory=list)
+    text: str = ""
+    omitted: int = 0  # records dropped as duplicates of earlier results
+
+    @property
+    def is_error(self) -> bool:
+        return self.kind == "error"
+
+    @classmethod
+    def error(cls, action: str, message: str) -> "ToolResult":
+        return cls(action=action, kind="error", text=message)
+
+    @classmethod
+    def merge(cls, action: str, results: list["ToolResult"], unique: bool = False) -> "ToolResult":
+        """Combine per-item results of one action, optionally dropping repeated records."""
+        ok = [r for r in results if not r.is_error]
+        if not ok:
+            return results[0] if results else cls(action=action)
+        papers = [p for r in ok for p in r.papers]
+        articles = [a for r in ok for a in r.articles]
+        texts = [r.text for r in ok if r.text]
+        if unique:
+            papers = _first_by(papers, lambda p: p.key)
+            articles = _first_by(articles, lambda a: a.title)
+            texts = list(dict.fromkeys(texts))
+        return cls(
+            action=action,
+            kind=ok[0].kind,
+            query=ok[0].query,
+            papers=papers,
+            articles=articles,
+            text="\n\n---\n\n".join(texts),
+        )
@@ -13,6 +13,9 @@ class TaskStep(BaseModel):
     result: Optional[str] = None
     requires_approval: bool = False
     depends_on: list[str] = Field(default_factory=list)
+    type: str = "tool"  # tool | map
+    map_over: Optional[str] = None
+    reducer: str = "concat"
 
 
 class TaskPlan(BaseModel):
@@ -28,6 +28,7 @@ class AgentCreate(BaseModel):
     color: str = "#A855F7"
     isOrchestrator: Optional[bool] = None
     constitution: Optional[str] = None
+    model: Optional[str] = None
 
 
 @router.get("/api/agents")
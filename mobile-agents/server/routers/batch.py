@@ -0,0 +1,52 @@
+import re
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel
+
+from services.agent_store import get_template
+from services.batch import batch_owner, check_read_only, prepare, results_file, run_batch
+from services.plan_templates import TemplateError, check_template
+from auth import get_current_user
+
+router = APIRouter()
+
+
+class BatchRequest(BaseModel):
+    template_id: Optional[str] = None
+    template: Optional[dict] = None  # inline template instead of a saved one
+    args: list[dict]
+
+
+@router.post("/api/batch")
+async def run_batch_endpoint(request: BatchRequest, user: dict = Depends(get_current_user)):
+    """Run a plan template once per parameter set, streaming NDJSON progress and results."""
+    if request.template is not None:
+        template = {"id": "inline", **request.template}
+    else:
+        template = get_template(request.template_id) if request.template_id else None
+    if template is None:
+        raise HTTPException(status_code=404, detail="Template not found")
+    try:
+        if request.template is not None:
+            check_template(template)
+        check_read_only(template)
+        instances = prepare(template, request.args)
+    except TemplateError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        run_batch(template, instances, user["sub"]),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/api/batch/{batch_id}")
+async def get_batch_results(batch_id: str, user: dict = Depends(get_current_user)):
+    """Download the NDJSON lines written by one of the user's batch runs."""
+    if not re.fullmatch(r"[0-9a-f]{12}", batch_id) or batch_owner(batch_id) != user["sub"]:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    path = results_file(batch_id)
+    return FileResponse(path, media_type="application/x-ndjson")
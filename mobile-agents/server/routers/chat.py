@@ -1,13 +1,17 @@
 from fastapi import APIRouter, Depends
 from crewai import LLM
-from openai import OpenAI
 
 from models.messages import ChatRequest, ChatResponse
 from crew.orchestrator import MobileAgentsOrchestrator
 from services.agent_store import get_agents
 from services.image_analyzer import analyze_image
 from services.audio_transcriber import transcribe_audio
-from services import db
+from services.model_router import model_router
+from services.llm_scheduler import openai_client
+from services.tokens import count_tokens
+from services.speculation import speculation_store
+from services.prefetch import Prefetcher
+from services import db, tracing, usage
 from auth import get_current_user
 from config import settings
 
@@ -20,9 +24,13 @@ async def chat(request: ChatRequest, user: dict = Depends(get_current_user)):
     Main chat endpoint. Accepts text, image, and/or audio input.
     Analyzes multimodal input and returns a task plan with execution graph.
     """
-    llm = LLM(model="gpt-4.1", api_key=settings.openai_api_key)
-    orchestrator = MobileAgentsOrchestrator(llm=llm)
-    client = OpenAI(api_key=settings.openai_api_key)
+    client = openai_client(settings.openai_api_key)
+    usage_records = usage.collect(conversationId=request.conversation_id, userId=user["sub"], source="chat")
+
+    # Warm the tool cache with likely searches while analysis and planning run
+    prefetcher = Prefetcher() if settings.prefetch_enabled else None
+    if prefetcher and request.message:
+        prefetcher.start(request.message)
 
     image_analysis = None
     audio_transcript = None
@@ -30,12 +38,14 @@ async def chat(request: ChatRequest, user: dict = Depends(get_current_user)):
 
     # Handle image input
     if request.image_base64:
-        image_analysis = await analyze_image(client, request.image_base64)
+        with tracing.span("image_analysis", **{"image.bytes": len(request.image_base64) * 3 // 4}):
+            image_analysis = await analyze_image(client, request.image_base64)
         input_modality = "image"
 
     # Handle audio input
     if request.audio_base64:
-        audio_transcript = await transcribe_audio(client, request.audio_base64)
+        with tracing.span("transcription", **{"audio.bytes": len(request.audio_base64) * 3 // 4}):
+            audio_transcript = await transcribe_audio(client, request.audio_base64)
         input_modality = "voice"
 
     # Determine the user message: prefer explicit text, fall back to audio transcript
@@ -45,19 +55,42 @@ async def chat(request: ChatRequest, user: dict = Depends(get_current_user)):
     if not user_message:
         user_message = "Analyze this image" if image_analysis else "Hello"
 
+    if prefetcher and (image_analysis or audio_transcript):
+        prefetcher.start(user_message, image_analysis)
+
     # Pass recent conversation history for multi-turn context
     history = [
         {"role": m.role, "content": m.content}
         for m in request.conversation_history
     ]
 
-    result = await orchestrator.plan(
-        user_message=user_message,
-        image_analysis=image_analysis,
-        audio_transcript=audio_transcript,
-        input_modality=input_modality,
-        conversation_history=history,
-    )
+    async def _plan(model: str) -> dict:
+        llm = LLM(
+            model=model,
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url or None,
+            timeout=settings.model_timeout,
+        )
+        orchestrator = MobileAgentsOrchestrator(llm=llm)
+        return await orchestrator.plan(
+            user_message=user_message,
+            image_analysis=image_analysis,
+            audio_transcript=audio_transcript,
+            input_modality=input_modality,
+            conversation_history=history,
+        )
+
+    # Route planning by request size, falling back to the next model on errors.
+    # CrewAI adds ~2k tokens of agent/task prompt and JSON output per plan.
+    request_tokens = count_tokens(user_message + (image_analysis or ""))
+    with tracing.span("planning", **{"planning.request_tokens": request_tokens}) as span:
+        result, model = await model_router.acall(
+            "planner",
+            _plan,
+            size_tokens=request_tokens,
+            est_tokens=request_tokens + 2000,
+        )
+        span.set_attributes({"planning.model": model, "planning.steps": len(result["plan"]["steps"])})
 
     summary = result["plan"]["summary"]
     step_count = len(result["plan"]["steps"])
@@ -67,6 +100,9 @@ async def chat(request: ChatRequest, user: dict = Depends(get_current_user)):
     all_agents = {a["id"]: a for a in get_agents()}
     agent_names = [all_agents[a]["name"] for a in agents_involved if a in all_agents]
 
+    usage_summary = {"records": usage_records, "total": usage.totals(usage_records)}
+    await usage.persist(usage_records)
+
     # Handle 0-step plans (non-research requests like "return this image", "hello")
     if step_count == 0:
         # Persist messages to DB if conversation_id provided
@@ -78,8 +114,14 @@ async def chat(request: ChatRequest, user: dict = Depends(get_current_user)):
             plan=None,
             graph=None,
             image_base64=request.image_base64,
+            usage=usage_summary,
         )
 
+    # Start read-only steps while the user reviews the plan
+    speculate = request.speculate if request.speculate is not None else settings.speculative_execution
+    if speculate:
+        speculation_store.start(result["plan"], user["sub"])
+
     modality_note = ""
     if input_modality == "voice" and audio_transcript:
         modality_note = f'\n\n*Transcribed from voice:* "{audio_transcript}"'
@@ -107,4 +149,5 @@ async def chat(request: ChatRequest, user: dict = Depends(get_current_user)):
         plan=result["plan"],
         graph=result["graph"],
         image_base64=request.image_base64,
+        usage=usage_summary,
     )
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends
+
+from services.model_router import model_router
+from services.llm_scheduler import llm_scheduler
+from services.latency_model import latency_model
+from auth import get_current_user
+
+router = APIRouter()
+
+
+@router.get("/api/models")
+async def list_models(user: dict = Depends(get_current_user)):
+    """
+    Return the model routing configuration, per-model latency/token ledger
+    and LLM scheduler state (queue depth, quota, wait time per call site),
+    plus rolling step and synthesis latency (p50/p95 per tool and agent).
+    """
+    return {
+        "routing": model_router.describe(),
+        "ledger": model_router.ledger.snapshot(),
+        "scheduler": llm_scheduler.snapshot(),
+        "latency": latency_model.snapshot(),
+    }
@@ -0,0 +1,86 @@
+from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel
+from typing import Optional
+
+from services.monitors import (
+    get_monitors,
+    get_monitor,
+    create_monitor as store_create_monitor,
+    update_monitor as store_update_monitor,
+    delete_monitor as store_delete_monitor,
+    monitor_scheduler,
+)
+from auth import get_current_user
+
+router = APIRouter()
+
+
+class MonitorCreate(BaseModel):
+    name: str = ""
+    plan: dict
+    schedule: str
+    enabled: bool = True
+
+
+class MonitorUpdate(BaseModel):
+    name: Optional[str] = None
+    plan: Optional[dict] = None
+    schedule: Optional[str] = None
+    enabled: Optional[bool] = None
+
+
+def _check_plan(plan: dict) -> None:
+    if not isinstance(plan.get("steps"), list) or not plan["steps"]:
+        raise HTTPException(status_code=400, detail="Plan must have at least one step")
+
+
+def _owned(monitor_id: str, user: dict) -> dict:
+    """The user's monitor; 404 for other users' monitors, as for missing ones."""
+    monitor = get_monitor(monitor_id)
+    if monitor is None or monitor.get("userId") != user["sub"]:
+        raise HTTPException(status_code=404, detail="Monitor not found")
+    return monitor
+
+
+@router.get("/api/monitors")
+async def list_monitors(user: dict = Depends(get_current_user)):
+    """Return the user's scheduled monitors."""
+    return [m for m in get_monitors() if m.get("userId") == user["sub"]]
+
+
+@router.post("/api/monitors")
+async def create_monitor(monitor: MonitorCreate, user: dict = Depends(get_current_user)):
+    _check_plan(monitor.plan)
+    try:
+        return store_create_monitor({**monitor.model_dump(), "userId": user["sub"]})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.put("/api/monitors/{monitor_id}")
+async def update_monitor(monitor_id: str, monitor: MonitorUpdate, user: dict = Depends(get_current_user)):
+    _owned(monitor_id, user)
+    if monitor.plan is not None:
+        _check_plan(monitor.plan)
+    try:
+        result = store_update_monitor(monitor_id, monitor.model_dump(exclude_none=True))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Monitor not found")
+    return result
+
+
+@router.delete("/api/monitors/{monitor_id}")
+async def delete_monitor(monitor_id: str, user: dict = Depends(get_current_user)):
+    _owned(monitor_id, user)
+    if not store_delete_monitor(monitor_id):
+        raise HTTPException(status_code=404, detail="Monitor not found")
+    return {"ok": True}
+
+
+@router.post("/api/monitors/{monitor_id}/run")
+async def run_monitor(monitor_id: str, user: dict = Depends(get_current_user)):
+    """Run a monitor now (behind the scheduler's concurrency cap) and return it."""
+    _owned(monitor_id, user)
+    return await monitor_scheduler.run_now(monitor_id)
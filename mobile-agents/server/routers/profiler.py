@@ -0,0 +1,63 @@
+import asyncio
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel, Field
+
+from services.profiler import Profile, ProfilerBusy, profiler
+from auth import get_admin_user
+from config import settings
+
+router = APIRouter()
+
+Format = Literal["collapsed", "speedscope"]
+
+
+class ProfileRequest(BaseModel):
+    seconds: Optional[float] = Field(default=None, gt=0)
+    requests: Optional[int] = Field(default=None, gt=0)  # profile the next N requests instead
+    routes: list[str] = ["/api/chat", "/api/execute"]
+    format: Format = "collapsed"
+
+
+def _output(profile: Profile, fmt: str):
+    if fmt == "speedscope":
+        return profile.to_speedscope()
+    return PlainTextResponse(profile.to_collapsed())
+
+
+@router.post("/api/admin/profile")
+async def start_profile(request: ProfileRequest, user: dict = Depends(get_admin_user)):
+    """
+    Sample all threads for `seconds` and return the profile, or arm a
+    profile over the next `requests` requests to `routes` and return its
+    id (fetch it from GET /api/admin/profile/{id} once done).
+    """
+    if (request.seconds is None) == (request.requests is None):
+        raise HTTPException(status_code=400, detail="Give exactly one of seconds or requests")
+    if request.requests is not None:
+        return profiler.arm(request.requests, tuple(request.routes)).describe()
+
+    seconds = min(request.seconds, settings.profiler_max_seconds)
+    profile = profiler.register(Profile("seconds"))
+    try:
+        profiler.attach(profile)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.detach(profile)
+    return _output(profile, request.format)
+
+
+@router.get("/api/admin/profile/{profile_id}")
+async def get_profile(profile_id: str, format: Format = "collapsed", user: dict = Depends(get_admin_user)):
+    """A finished profile (from X-Profile or an armed request profile), or its progress (202) while it runs."""
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if not profile.done:
+        return JSONResponse(status_code=202, content=profile.describe())
+    return _output(profile, format)
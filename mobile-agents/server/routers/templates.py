@@ -0,0 +1,109 @@
+from typing import Any, Optional
+
+from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel
+
+from services.agent_store import (
+    get_templates as store_get_templates,
+    get_template as store_get_template,
+    create_template as store_create_template,
+    update_template as store_update_template,
+    delete_template as store_delete_template,
+    DEFAULT_TEMPLATES,
+)
+from services.plan_templates import TemplateError, check_template, instantiate
+from services.speculation import speculation_store
+from auth import get_current_user
+from config import settings
+
+router = APIRouter()
+
+
+class TemplateSlot(BaseModel):
+    name: str
+    type: str = "string"  # string | integer | number | boolean | enum
+    description: str = ""
+    default: Optional[Any] = None  # no default: the slot is required
+    options: Optional[list] = None  # enum values
+
+
+class TemplateCreate(BaseModel):
+    id: str
+    name: str
+    description: str = ""
+    summary: str = ""
+    slots: list[TemplateSlot] = []
+    steps: list[dict]
+
+
+class InstantiateRequest(BaseModel):
+    args: dict = {}
+    speculate: Optional[bool] = None
+
+
+def _validated(template: TemplateCreate) -> dict:
+    data = template.model_dump(exclude_none=True)
+    try:
+        check_template(data)
+    except TemplateError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return data
+
+
+def _editable(template_id: str, user: dict) -> None:
+    """Only a template's creator may change it; built-ins are read-only."""
+    template = store_get_template(template_id)
+    if template is None:
+        raise HTTPException(status_code=404, detail="Template not found")
+    if any(t["id"] == template_id for t in DEFAULT_TEMPLATES):
+        raise HTTPException(status_code=403, detail="Built-in templates are read-only")
+    if template.get("userId") != user["sub"]:
+        raise HTTPException(status_code=403, detail="Only the template's creator can change it")
+
+
+@router.get("/api/templates")
+async def list_templates(user: dict = Depends(get_current_user)):
+    """Return all saved plan templates."""
+    return store_get_templates()
+
+
+@router.post("/api/templates")
+async def create_template(template: TemplateCreate, user: dict = Depends(get_current_user)):
+    if store_get_template(template.id) is not None:
+        raise HTTPException(status_code=409, detail="Template already exists")
+    return store_create_template({**_validated(template), "userId": user["sub"]})
+
+
+@router.put("/api/templates/{template_id}")
+async def update_template(template_id: str, template: TemplateCreate, user: dict = Depends(get_current_user)):
+    _editable(template_id, user)
+    result = store_update_template(template_id, _validated(template))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Template not found")
+    return result
+
+
+@router.delete("/api/templates/{template_id}")
+async def delete_template(template_id: str, user: dict = Depends(get_current_user)):
+    _editable(template_id, user)
+    if not store_delete_template(template_id):
+        raise HTTPException(status_code=404, detail="Template not found")
+    return {"ok": True}
+
+
+@router.post("/api/templates/{template_id}/instantiate")
+async def instantiate_template(
+    template_id: str, request: InstantiateRequest, user: dict = Depends(get_current_user)
+):
+    """Fill a template's slots into a plan and graph ready for /api/execute (no LLM call)."""
+    template = store_get_template(template_id)
+    if template is None:
+        raise HTTPException(status_code=404, detail="Template not found")
+    try:
+        result = instantiate(template, request.args)
+    except TemplateError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    speculate = request.speculate if request.speculate is not None else settings.speculative_execution
+    if speculate:
+        speculation_store.start(result["plan"], user["sub"])
+    return result
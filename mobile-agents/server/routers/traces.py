@@ -0,0 +1,27 @@
+import re
+
+from fastapi import APIRouter, HTTPException, Depends
+
+from services import tracing
+from auth import get_current_user
+
+router = APIRouter()
+
+_TRACE_ID_RE = re.compile(r"[0-9a-f]{32}")
+
+
+@router.get("/api/traces/{trace_id}")
+async def get_trace(trace_id: str, user: dict = Depends(get_current_user)):
+    """
+    Spans of one trace from the in-memory exporter, in start order. The
+    trace id comes from the traceparent response header or the traceId of
+    an execution's final SSE event.
+    """
+    if not _TRACE_ID_RE.fullmatch(trace_id):
+        raise HTTPException(status_code=400, detail="Invalid trace id")
+    if tracing.memory_exporter is None:
+        raise HTTPException(status_code=404, detail="In-memory tracing is not enabled")
+    spans = sorted(tracing.memory_exporter.get_finished_spans(trace_id), key=lambda s: s.start_time)
+    if not spans:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return {"traceId": trace_id, "spans": [tracing.to_dict(s) for s in spans]}
@@ -62,3 +62,30 @@ create table if not exists approvals (
 
 alter table approvals enable row level security;
 create policy "Allow all" on approvals for all using (true) with check (true);
+
+-- LLM usage: one row per model call (planning, vision, transcription, digests, synthesis)
+create table if not exists llm_usage (
+  id uuid primary key default gen_random_uuid(),
+  conversation_id uuid references conversations(id) on delete cascade,
+  execution_id uuid references executions(id) on delete cascade,
+  step_id text,
+  agent_id text,
+  user_id uuid references auth.users(id) on delete set null,
+  source text,  -- chat, execute, batch:<id> or monitor:<id>
+  role text not null,
+  model text not null,
+  ok boolean not null default true,
+  prompt_tokens integer not null default 0,
+  completion_tokens integer not null default 0,
+  cached_tokens integer not null default 0,
+  audio_seconds real not null default 0,
+  cost_usd numeric(12, 6) not null default 0,
+  latency_ms integer not null default 0,
+  created_at timestamptz not null default now()
+);
+
+create index if not exists llm_usage_execution_idx on llm_usage (execution_id);
+create index if not exists llm_usage_conversation_idx on llm_usage (conversation_id);
+
+alter table llm_usage enable row level security;
+create policy "Allow all" on llm_usage for all using (true) with check (true);
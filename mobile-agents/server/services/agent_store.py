@@ -1,6 +1,8 @@
 """
-JSON-file-backed agent CRUD store.
-Loads from agents_config.json, falls back to AGENT_METADATA defaults.
+JSON-file-backed agent and plan template CRUD store.
+Loads agents from agents_config.json, falling back to AGENT_METADATA
+defaults, and plan templates from plan_templates.json, falling back to
+DEFAULT_TEMPLATES.
 """
 
 import json
@@ -8,8 +10,84 @@ from pathlib import Path
 from crew.agents import AGENT_METADATA
 
 AGENTS_FILE = Path(__file__).parent.parent / "agents_config.json"
+TEMPLATES_FILE = Path(__file__).parent.parent / "plan_templates.json"
 
 _agents_registry: dict[str, dict] = {}
+_templates_registry: dict[str, dict] = {}
+
+# Built-in plan templates. "{slot}" placeholders in step descriptions and
+# params are filled from typed slots when a template is instantiated.
+DEFAULT_TEMPLATES: list[dict] = [
+    {
+        "id": "literature_digest",
+        "name": "Literature digest",
+        "description": "Search arXiv and Semantic Scholar, summarize each paper, post to Slack",
+        "summary": "Literature digest on {topic} posted to {channel}",
+        "slots": [
+            {"name": "topic", "type": "string", "description": "Research topic"},
+            {"name": "max_results", "type": "integer", "default": 5},
+            {"name": "channel", "type": "string", "default": "#lab"},
+        ],
+        "steps": [
+            {
+                "id": "step_1",
+                "agent_id": "arxiv",
+                "action": "arxiv_search",
+                "description": "Search arXiv for {topic}",
+                "params": {"query": "{topic}", "max_results": "{max_results}"},
+            },
+            {
+                "id": "step_2",
+                "agent_id": "semantic_scholar",
+                "action": "semantic_scholar_search",
+                "description": "Search Semantic Scholar for {topic}",
+                "params": {"query": "{topic}", "max_results": "{max_results}"},
+            },
+            {
+                "id": "step_3",
+                "agent_id": "arxiv",
+                "action": "arxiv_summarize",
+                "description": "Summarize each arXiv paper on {topic}",
+                "type": "map",
+                "map_over": "step_1",
+                "depends_on": ["step_1"],
+            },
+            {
+                "id": "step_4",
+                "agent_id": "slack",
+                "action": "slack_send_message",
+                "description": "Post the {topic} digest to {channel}",
+                "params": {"channel": "{channel}"},
+                "depends_on": ["step_2", "step_3"],
+            },
+        ],
+    },
+    {
+        "id": "topic_background",
+        "name": "Topic background",
+        "description": "Wikipedia background plus recent arXiv papers",
+        "summary": "Background and recent papers on {topic}",
+        "slots": [
+            {"name": "topic", "type": "string", "description": "Topic to research"},
+        ],
+        "steps": [
+            {
+                "id": "step_1",
+                "agent_id": "wikipedia",
+                "action": "wiki_search",
+                "description": "Find Wikipedia background on {topic}",
+                "params": {"query": "{topic}"},
+            },
+            {
+                "id": "step_2",
+                "agent_id": "arxiv",
+                "action": "arxiv_search",
+                "description": "Search arXiv for recent papers on {topic}",
+                "params": {"query": "{topic}"},
+            },
+        ],
+    },
+]
 
 
 def load_agents() -> None:
@@ -60,3 +138,51 @@ def delete_agent(agent_id: str) -> bool:
     del _agents_registry[agent_id]
     _save()
     return True
+
+
+def load_templates() -> None:
+    """Load plan templates from JSON file, falling back to DEFAULT_TEMPLATES."""
+    global _templates_registry
+    if TEMPLATES_FILE.exists():
+        try:
+            data = json.loads(TEMPLATES_FILE.read_text())
+            _templates_registry = {t["id"]: t for t in data}
+            return
+        except Exception:
+            pass
+    _templates_registry = {t["id"]: dict(t) for t in DEFAULT_TEMPLATES}
+    _save_templates()
+
+
+def _save_templates() -> None:
+    TEMPLATES_FILE.write_text(json.dumps(list(_templates_registry.values()), indent=2))
+
+
+def get_templates() -> list[dict]:
+    return list(_templates_registry.values())
+
+
+def get_template(template_id: str) -> dict | None:
+    return _templates_registry.get(template_id)
+
+
+def create_template(data: dict) -> dict:
+    _templates_registry[data["id"]] = data
+    _save_templates()
+    return data
+
+
+def update_template(template_id: str, data: dict) -> dict | None:
+    if template_id not in _templates_registry:
+        return None
+    _templates_registry[template_id] = {**_templates_registry[template_id], **data, "id": template_id}
+    _save_templates()
+    return _templates_registry[template_id]
+
+
+def delete_template(template_id: str) -> bool:
+    if template_id not in _templates_registry:
+        return False
+    del _templates_registry[template_id]
+    _save_templates()
+    return True
@@ -1,7 +1,11 @@
+import asyncio
 import base64
 import tempfile
 from openai import OpenAI
 
+from config import settings
+from services.model_router import model_router
+
 
 async def transcribe_audio(client: OpenAI, audio_base64: str) -> str:
     """Transcribe audio using OpenAI Whisper API."""
@@ -11,10 +15,16 @@ async def transcribe_audio(client: OpenAI, audio_base64: str) -> str:
         tmp.write(audio_bytes)
         tmp.flush()
 
-        with open(tmp.name, "rb") as audio_file:
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-            )
+        def _transcribe(model: str):
+            with open(tmp.name, "rb") as audio_file:
+                return client.audio.transcriptions.create(
+                    model=model,
+                    file=audio_file,
+                    timeout=settings.model_timeout,
+                )
+
+        transcript, _ = await asyncio.to_thread(
+            model_router.call, "transcription", _transcribe
+        )
 
     return transcript.text
@@ -0,0 +1,193 @@
+"""
+Batch execution of one plan template over many parameter sets.
+
+Every parameter set is instantiated up front (so a bad row fails the whole
+request before any tool runs), then the instances run through a worker
+pool shared by all batches (batch_concurrency instances in flight).
+Identical read-only tool calls across instances are served once by the
+shared tool cache, and batch tool calls are paced per upstream by
+batch_rate_limits. Progress and per-instance results stream as NDJSON
+lines, which are also written to batch_results/<batch id>.ndjson; its
+first line names the user who started the batch, the only one who may
+download it. Batched templates, saved or inline, may use only read-only
+tools, so a batch never posts or writes once per parameter set.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncGenerator
+
+from config import settings
+from crew.tools import READ_ONLY_TOOLS
+from services import usage
+from services.plan_templates import TemplateError, instantiate
+from services.rate_limit import UpstreamLimiter, upstream_limiter
+
+RESULTS_DIR = Path(__file__).parent.parent / settings.batch_results_path
+
+# Shared by all batches so concurrent batches respect one global budget
+_pool: asyncio.Semaphore | None = None
+batch_limiter = UpstreamLimiter(settings.batch_rate_limits)
+
+_CACHE_COUNTERS = ("hits", "coalesced", "misses")
+
+
+def _worker_pool() -> asyncio.Semaphore:
+    global _pool
+    if _pool is None:
+        _pool = asyncio.Semaphore(settings.batch_concurrency)
+    return _pool
+
+
+def results_file(batch_id: str) -> Path:
+    return RESULTS_DIR / f"{batch_id}.ndjson"
+
+
+def batch_owner(batch_id: str) -> str | None:
+    """User who started a batch, from the batch_started line of its results."""
+    try:
+        with open(results_file(batch_id)) as f:
+            return json.loads(f.readline()).get("userId")
+    except (OSError, ValueError):
+        return None
+
+
+def check_read_only(template: dict) -> None:
+    """Reject templates with steps that have side effects (e.g. Slack posts)."""
+    actions = sorted({
+        str(s.get("action")) for s in template.get("steps", []) if s.get("action") not in READ_ONLY_TOOLS
+    })
+    if actions:
+        raise TemplateError(f"Batched templates may only use read-only tools, not: {', '.join(actions)}")
+
+
+def prepare(template: dict, arg_sets: list[dict]) -> list[dict]:
+    """Instantiate every parameter set; raises TemplateError naming the bad rows."""
+    if not arg_sets:
+        raise TemplateError("No parameter sets given")
+    if len(arg_sets) > settings.batch_max_instances:
+        raise TemplateError(f"At most {settings.batch_max_instances} parameter sets per batch")
+    instances, errors = [], []
+    for i, args in enumerate(arg_sets):
+        try:
+            instances.append(instantiate(template, args))
+        except TemplateError as e:
+            errors.append(f"[{i}] {e}")
+    if errors:
+        raise TemplateError("; ".join(errors[:10]))
+    return instances
+
+
+async def _run_instance(index: int, instance: dict, out: asyncio.Queue, attribution: dict) -> None:
+    """Run one instance and put its progress and result lines on the queue."""
+    from services.execution_tracker import execute_plan_stream
+
+    plan, graph = instance["plan"], instance["graph"]
+    async with _worker_pool():
+        upstream_limiter.set(batch_limiter)
+        start = time.time()
+        await out.put({"type": "instance_started", "index": index, "args": plan["template"]["args"]})
+        steps, summary, error, tool_cache, records = [], None, None, {}, []
+        try:
+            async for chunk in execute_plan_stream(
+                plan, graph, api_key=settings.openai_api_key, usage_attribution=attribution
+            ):
+                event = json.loads(chunk[6:])
+                if event["type"] == "node_status" and event.get("status") == "completed":
+                    if event["nodeId"] == "output":
+                        tool_cache = event.get("toolCache") or {}
+                        continue
+                    steps.append({
+                        "stepId": event["nodeId"],
+                        "result": event.get("result", ""),
+                        "duration": event.get("duration"),
+                    })
+                    await out.put({"type": "step_completed", "index": index, "stepId": event["nodeId"]})
+                elif event["type"] == "execution_complete":
+                    summary = event.get("summary", "")
+                elif event["type"] == "execution_failed":
+                    error = event.get("error", "Execution failed")
+                elif event["type"] == "usage":
+                    records.extend(event["records"])
+        except Exception as e:
+            error = str(e)
+        finally:
+            await usage.persist(records)
+        await out.put({
+            "type": "instance_failed" if summary is None else "instance_completed",
+            "index": index,
+            "args": plan["template"]["args"],
+            "summary": summary,
+            "error": error if summary is None else None,
+            "steps": steps,
+            "durationMs": int((time.time() - start) * 1000),
+            "toolCache": tool_cache,
+        })
+
+
+async def run_batch(template: dict, instances: list[dict], user_id: str | None = None) -> AsyncGenerator[str, None]:
+    """
+    Run prepared instances, yielding NDJSON lines and writing them to the
+    results file. Model usage is attributed to user_id and the batch.
+    """
+    batch_id = uuid.uuid4().hex[:12]
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    out: asyncio.Queue = asyncio.Queue()
+    total, done, failed = len(instances), 0, 0
+    calls = dict.fromkeys(_CACHE_COUNTERS, 0)
+    waited_before = batch_limiter.waited
+    start = time.time()
+
+    def throughput() -> float:
+        elapsed = time.time() - start
+        return round(done / elapsed * 60, 2) if elapsed > 0 else 0.0
+
+    attribution = {"userId": user_id, "source": f"batch:{batch_id}"}
+    tasks = [asyncio.create_task(_run_instance(i, inst, out, attribution)) for i, inst in enumerate(instances)]
+    with open(results_file(batch_id), "w") as f:
+
+        def emit(line: dict) -> str:
+            text = json.dumps(line) + "\n"
+            f.write(text)
+            return text
+
+        try:
+            yield emit({
+                "type": "batch_started", "batchId": batch_id, "template": template["id"],
+                "instances": total, "userId": user_id,
+            })
+            f.flush()
+            while done + failed < total:
+                line = await out.get()
+                if line["type"] in ("instance_completed", "instance_failed"):
+                    if line["type"] == "instance_completed":
+                        done += 1
+                    else:
+                        failed += 1
+                    for k in _CACHE_COUNTERS:
+                        calls[k] += line["toolCache"].get(k, 0)
+                    line["progress"] = {"done": done, "failed": failed, "total": total, "topicsPerMinute": throughput()}
+                    f.flush()
+                yield emit(line)
+            lookups = sum(calls.values())
+            yield emit({
+                "type": "batch_complete",
+                "batchId": batch_id,
+                "instances": total,
+                "completed": done,
+                "failed": failed,
+                "elapsedSec": round(time.time() - start, 2),
+                "topicsPerMinute": throughput(),
+                "toolCalls": {
+                    **calls,
+                    # Share of tool calls answered without a new upstream request
+                    "dedupeRatio": round((calls["hits"] + calls["coalesced"]) / lookups, 3) if lookups else 0.0,
+                    "rateLimitWaitSec": round(batch_limiter.waited - waited_before, 2),
+                },
+            })
+        finally:
+            for t in tasks:
+                t.cancel()
@@ -1,11 +1,13 @@
 """Data access layer for Supabase tables."""
 
 from typing import Optional
+from services import tracing
 from services.supabase_client import get_supabase
 
 
 # ── Conversations ──
 
+@tracing.traced("db.create_conversation")
 def create_conversation(user_id: str, title: str, transparency_level: str = "full_transparency") -> dict:
     sb = get_supabase()
     row = sb.table("conversations").insert({
@@ -28,6 +30,7 @@ def get_conversation(conversation_id: str) -> Optional[dict]:
     return rows.data[0] if rows.data else None
 
 
+@tracing.traced("db.delete_conversation")
 def delete_conversation(conversation_id: str) -> bool:
     sb = get_supabase()
     sb.table("conversations").delete().eq("id", conversation_id).execute()
@@ -36,6 +39,7 @@ def delete_conversation(conversation_id: str) -> bool:
 
 # ── Messages ──
 
+@tracing.traced("db.insert_message")
 def insert_message(
     conversation_id: str,
     role: str,
@@ -70,6 +74,7 @@ def list_messages(conversation_id: str) -> list[dict]:
 
 # ── Executions ──
 
+@tracing.traced("db.create_execution")
 def create_execution(conversation_id: str, plan: dict, graph: dict) -> dict:
     sb = get_supabase()
     row = sb.table("executions").insert({
@@ -81,6 +86,7 @@ def create_execution(conversation_id: str, plan: dict, graph: dict) -> dict:
     return row.data[0]
 
 
+@tracing.traced("db.complete_execution")
 def complete_execution(execution_id: str, status: str, summary: Optional[str], step_results: Optional[list]) -> dict:
     sb = get_supabase()
     row = sb.table("executions").update({
@@ -92,8 +98,37 @@ def complete_execution(execution_id: str, status: str, summary: Optional[str], s
     return row.data[0] if row.data else {}
 
 
+@tracing.traced("db.insert_usage")
+def insert_usage(records: list[dict]) -> None:
+    """Persist usage ledger records (services/usage.py), one row per model call."""
+    if not records:
+        return
+    sb = get_supabase()
+    sb.table("llm_usage").insert([
+        {
+            "conversation_id": r["conversationId"],
+            "execution_id": r["executionId"],
+            "step_id": r["stepId"],
+            "agent_id": r["agentId"],
+            "user_id": r["userId"],
+            "source": r["source"],
+            "role": r["role"],
+            "model": r["model"],
+            "ok": r["ok"],
+            "prompt_tokens": r["promptTokens"],
+            "completion_tokens": r["completionTokens"],
+            "cached_tokens": r["cachedTokens"],
+            "audio_seconds": r["audioSeconds"],
+            "cost_usd": r["costUsd"],
+            "latency_ms": r["latencyMs"],
+        }
+        for r in records
+    ]).execute()
+
+
 # ── Approvals ──
 
+@tracing.traced("db.create_approval")
 def create_approval(execution_id: str, step_id: str) -> dict:
     sb = get_supabase()
     row = sb.table("approvals").insert({
@@ -103,6 +138,7 @@ def create_approval(execution_id: str, step_id: str) -> dict:
     return row.data[0]
 
 
+@tracing.traced("db.resolve_approval")
 def resolve_approval(step_id: str, approved: bool, comment: str = "") -> Optional[dict]:
     sb = get_supabase()
     row = sb.table("approvals").update({
@@ -1,44 +1,211 @@
 import asyncio
 import json
-import re
+import logging
 import time
 import inspect
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import AsyncGenerator
 
 from openai import OpenAI
 
-from crew.tools import TOOL_FUNCTIONS
-
-
-def _extract_arxiv_urls(text: str) -> list[str]:
-    """Extract arXiv paper URLs from text."""
-    return re.findall(r"http://arxiv\.org/abs/[\w.]+", text)
-
+from crew.tools import TOOL_FUNCTIONS, render_result
+from config import settings
+from models.results import ToolResult
+from services.result_compactor import compact_results
+from services.tokens import count_tokens
+from services.synthesis_cache import synthesis_cache
+from services.model_router import model_router
+from services.paper_index import PaperIndex
+from services.research_index import research_index
+from services.vector_store import vector_store
+from services.llm_scheduler import SchedulerOverloaded, openai_client
+from services.tool_cache import tool_cache, execution_stats
+from services.latency_model import latency_model
+from services import metrics, tracing, usage
+
+logger = logging.getLogger(__name__)
+
+# Write-behind of fetched records to the local stores: one thread, since the
+# stores serialize writes anyway, and none of the default executor's threads,
+# which the steps' own tool calls need
+_store_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="store-writer")
+
+def _arxiv_urls(results: list[ToolResult]) -> list[str]:
+    """arXiv abstract URLs of papers in previous results (from either paper source)."""
+    return [
+        f"http://arxiv.org/abs/{p.arxiv_id}"
+        for r in results
+        for p in r.papers
+        if p.arxiv_id
+    ]
+
+
+def _wiki_titles(results: list[ToolResult]) -> list[str]:
+    """Titles of Wikipedia articles in previous results."""
+    return [a.title for r in results for a in r.articles]
+
+
+def _s2_paper_ids(results: list[ToolResult]) -> list[str]:
+    """Identifiers accepted by the Semantic Scholar paper endpoint."""
+    ids = []
+    for r in results:
+        for p in r.papers:
+            if p.s2_id:
+                ids.append(p.s2_id)
+            elif p.arxiv_id:
+                ids.append(f"ARXIV:{p.arxiv_id}")
+            elif p.doi:
+                ids.append(p.doi)
+    return ids
+
+
+# Map step action -> extractor producing its items from the upstream results
+MAP_ITEM_EXTRACTORS = {
+    "arxiv_summarize": _arxiv_urls,
+    "wiki_summarize": _wiki_titles,
+    "semantic_scholar_cite": _s2_paper_ids,
+}
+
+# Map step reducers merging per-item results (in item order)
+REDUCERS = {
+    "concat": lambda action, results: ToolResult.merge(action, results),
+    "unique": lambda action, results: ToolResult.merge(action, results, unique=True),
+}
+
+
+def _map_items(
+    step: dict, completed_steps: dict[str, ToolResult], paper_index: PaperIndex | None = None
+) -> list[str]:
+    """Items a map step fans out over, taken from its map_over (or dependency) results."""
+    action = step.get("action", "")
+    extractor = MAP_ITEM_EXTRACTORS.get(action)
+    if not extractor:
+        return []
+    sources = [step["map_over"]] if step.get("map_over") else step.get("depends_on", [])
+    results = [completed_steps[s] for s in sources if s in completed_steps]
+    items = list(dict.fromkeys(extractor(results)))
+    if paper_index:
+        items = [i for i in items if not paper_index.already_fetched(action, i)]
+    return items[: settings.map_max_items]
+
+
+async def _run_map_step(
+    step: dict, items: list[str], source_node: str, graph: dict, out: dict
+) -> AsyncGenerator[str, None]:
+    """
+    Expand a map step into one child node per item, run the children
+    concurrently (bounded by map_concurrency) and stream their status.
+    The reduced result is stored in out["result"].
+    """
+    step_id = step["id"]
+    action = step.get("action", "")
+    func = TOOL_FUNCTIONS.get(action)
+    param = next(iter(inspect.signature(func).parameters)) if func else "query"
+
+    new_nodes, new_edges = [], []
+    for i, item in enumerate(items):
+        child_id = f"{step_id}__{i}"
+        new_nodes.append({
+            "id": child_id,
+            "type": "agent",
+            "data": {
+                "label": item.rsplit("/", 1)[-1][:40],
+                "type": "agent",
+                "status": "pending",
+                "agentId": step.get("agent_id", ""),
+                "parentId": step_id,
+            },
+            "position": {"x": 0, "y": 0},
+        })
+        new_edges.append({
+            "id": f"e-{source_node}-{child_id}",
+            "source": source_node,
+            "target": child_id,
+            "data": {"status": "pending"},
+        })
+        new_edges.append({
+            "id": f"e-{child_id}-{step_id}",
+            "source": child_id,
+            "target": step_id,
+            "data": {"status": "pending"},
+        })
+    # Inherit agent styling from the parent node
+    parent = next((n for n in graph["nodes"] if n["id"] == step_id), None)
+    if parent:
+        for n in new_nodes:
+            n["data"]["agentColor"] = parent["data"].get("agentColor")
+            n["data"]["agentIcon"] = parent["data"].get("agentIcon")
+    graph["nodes"].extend(new_nodes)
+    graph["edges"].extend(new_edges)
+    yield f"data: {json.dumps({'type': 'graph_patch', 'nodes': new_nodes, 'edges': new_edges})}\n\n"
+
+    sem = asyncio.Semaphore(settings.map_concurrency)
+    queue: asyncio.Queue = asyncio.Queue()
+    results: list[ToolResult | None] = [None] * len(items)
+
+    async def run_child(i: int, item: str) -> None:
+        child_id = f"{step_id}__{i}"
+        try:
+            async with sem:
+                await queue.put(f"data: {json.dumps({'type': 'edge_status', 'edgeId': f'e-{source_node}-{child_id}', 'status': 'active'})}\n\n")
+                await queue.put(f"data: {json.dumps({'type': 'node_status', 'nodeId': child_id, 'status': 'running'})}\n\n")
+                start = time.time()
+                results[i] = await asyncio.to_thread(
+                    _call_tool,
+                    action,
+                    {param: item},
+                    {},
+                    f"{step.get('description', '')}: {item}",
+                    step.get("agent_id", ""),
+                )
+                duration = int((time.time() - start) * 1000)
+                await queue.put(f"data: {json.dumps({'type': 'node_status', 'nodeId': child_id, 'status': 'completed', 'result': render_result(results[i]), 'duration': duration})}\n\n")
+                await queue.put(f"data: {json.dumps({'type': 'edge_status', 'edgeId': f'e-{source_node}-{child_id}', 'status': 'completed'})}\n\n")
+                await queue.put(f"data: {json.dumps({'type': 'edge_status', 'edgeId': f'e-{child_id}-{step_id}', 'status': 'completed'})}\n\n")
+        except Exception as e:
+            await queue.put(f"data: {json.dumps({'type': 'node_status', 'nodeId': child_id, 'status': 'failed', 'result': str(e)})}\n\n")
+        finally:
+            await queue.put(None)
+
+    tasks = [asyncio.create_task(run_child(i, item)) for i, item in enumerate(items)]
+    finished = 0
+    try:
+        while finished < len(tasks):
+            event = await queue.get()
+            if event is None:
+                finished += 1
+                continue
+            yield event
+    finally:
+        for t in tasks:
+            t.cancel()
 
-def _extract_wiki_titles(text: str) -> list[str]:
-    """Extract Wikipedia article titles from search result text."""
-    return re.findall(r"\*\*(.+?)\*\*", text)
+    reducer = REDUCERS.get(step.get("reducer", "concat"), REDUCERS["concat"])
+    out["result"] = reducer(action, [r for r in results if r is not None])
 
 
 def _call_tool(
     action: str,
     params: dict,
-    prev_results: dict[str, str],
+    prev_results: dict[str, ToolResult],
     description: str,
     agent_id: str = "",
-) -> str:
+    paper_index: PaperIndex | None = None,
+) -> ToolResult:
     """
     Call a tool function by action name with the given params.
     When a step depends on previous steps but has incomplete params,
-    extracts structured data (URLs, titles) from previous results.
+    fills them from the fields (URLs, titles) of previous results.
     """
-    prev_text = "\n\n".join(prev_results.values()) if prev_results else ""
+    prev = list(prev_results.values()) if prev_results else []
+    prev_text = "\n\n".join(render_result(r) for r in prev)
 
+    tool_name = action
     func = TOOL_FUNCTIONS.get(action)
     if not func:
         for name, fn in TOOL_FUNCTIONS.items():
             if action.replace(" ", "_").lower() in name:
-                func = fn
+                tool_name, func = name, fn
                 break
 
     if not func:
@@ -48,11 +215,13 @@ def _call_tool(
             "wikipedia": "wiki_search",
             "slack": "slack_send_message",
             "semantic_scholar": "semantic_scholar_search",
+            "library": "local_search",
         }
         fallback_name = defaults.get(agent_id)
         func = TOOL_FUNCTIONS.get(fallback_name) if fallback_name else None
+        tool_name = fallback_name
         if not func:
-            return f"Unknown action: {action}. Description: {description}"
+            return ToolResult.error(action, f"Unknown action: {action}. Description: {description}")
 
     sig = inspect.signature(func)
     param_names = list(sig.parameters.keys())
@@ -87,22 +256,25 @@ def _call_tool(
     # Handle dependent steps with incomplete params
     if not kwargs and prev_results:
         if action == "arxiv_summarize":
-            urls = _extract_arxiv_urls(prev_text)
+            urls = [
+                u for u in dict.fromkeys(_arxiv_urls(prev))
+                if not (paper_index and paper_index.already_fetched(action, u))
+            ]
             if urls:
-                parts = []
-                for url in urls:
-                    parts.append(TOOL_FUNCTIONS["arxiv_summarize"](url))
-                return "\n\n---\n\n".join(parts)
-            return prev_text
+                return ToolResult.merge(action, [
+                    tool_cache.call(action, TOOL_FUNCTIONS[action], {"paper_url": url})
+                    for url in urls
+                ])
+            return ToolResult(action=action, text=prev_text)
 
         if action == "wiki_summarize":
-            titles = _extract_wiki_titles(prev_text)[:3]
+            titles = list(dict.fromkeys(_wiki_titles(prev)))[:3]
             if titles:
-                parts = []
-                for title in titles:
-                    parts.append(TOOL_FUNCTIONS["wiki_summarize"](title))
-                return "\n\n---\n\n".join(parts)
-            return prev_text
+                return ToolResult.merge(action, [
+                    tool_cache.call(action, TOOL_FUNCTIONS[action], {"title": title})
+                    for title in titles
+                ])
+            return ToolResult(action=action, text=prev_text)
 
         if action in ("generate_proposal", "outline_methodology"):
             first_param = param_names[0] if param_names else None
@@ -120,9 +292,51 @@ def _call_tool(
         kwargs["context"] = prev_text[:1000]
 
     try:
-        return func(**kwargs)
+        return tool_cache.call(tool_name, func, kwargs)
     except Exception as e:
-        return f"Tool execution failed ({action}): {e}"
+        return ToolResult.error(action, f"Tool execution failed ({action}): {e}")
+
+
+def _write_behind(write, result: ToolResult) -> None:
+    """Run write(result) on the store writer thread, logging a failure."""
+
+    def done(future: Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(
+                "%s failed for %s result", write.__qualname__, result.action, exc_info=future.exception()
+            )
+
+    _store_writer.submit(write, result).add_done_callback(done)
+
+
+def _cache_lookups(stats: dict) -> tuple[int, int]:
+    """(hits + coalesced, misses) so far in an execution's tool cache stats."""
+    return stats.get("hits", 0) + stats.get("coalesced", 0), stats.get("misses", 0)
+
+
+# Actions whose result is a confirmation that needs no rewriting
+PASSTHROUGH_ACTIONS = {"slack_send_message"}
+
+
+def _choose_synthesis(step_results: list[dict]) -> tuple[str, str | None]:
+    """
+    Pick a synthesis mode for the completed steps: "passthrough" (no LLM call;
+    never for a failed step, whose error text is no answer), "fast" (small
+    model for short single-source input) or "full".
+    Returns (mode, model_role).
+    """
+    if not settings.adaptive_synthesis:
+        return "full", "synthesizer"
+    tokens = sum(count_tokens(s["result"]) for s in step_results)
+    if len(step_results) == 1 and not step_results[0].get("error") and (
+        step_results[0].get("action") in PASSTHROUGH_ACTIONS
+        or tokens <= settings.synthesis_passthrough_tokens
+    ):
+        return "passthrough", None
+    sources = {s.get("agent_id") for s in step_results}
+    if len(sources) <= 1 and tokens <= settings.synthesis_fast_max_tokens:
+        return "fast", "synthesizer_fast"
+    return "full", "synthesizer"
 
 
 def _synthesize(
@@ -130,63 +344,213 @@ def _synthesize(
     user_message: str,
     plan_summary: str,
     step_results: list[dict],
-) -> str:
+    role: str = "synthesizer",
+) -> tuple[str, str]:
     """
     Call the LLM as the orchestrator to synthesize all agent results
     into a single coherent response for the user.
+    Returns (summary, model_used).
     """
     results_block = "\n\n".join(
         f"### Agent step: {s['description']}\n{s['result']}"
         for s in step_results
     )
 
-    response = client.chat.completions.create(
-        model="gpt-4.1",
-        messages=[
-            {
-                "role": "system",
-                "content": (
-                    "You are a research orchestrator synthesizing agent results for "
-                    "a MOBILE interface. Responses are read on small screens.\n\n"
-                    "Guidelines:\n"
-                    "- Be concise: aim for 150-300 words max\n"
-                    "- Lead with the key finding or answer in 1-2 sentences\n"
-                    "- Use short bullet points, not long paragraphs\n"
-                    "- Use markdown: **bold** for emphasis, short headings, compact lists\n"
-                    "- Keep relevant URLs but don't list more than 3-5\n"
-                    "- Do NOT mention the agents or internal execution process\n"
-                    "- Use uncertainty-aware language: 'based on available results' "
-                    "rather than absolute claims\n"
-                    "- End with a one-line disclaimer: '*Results may not be exhaustive "
-                    "— verify for critical decisions.*'"
-                ),
-            },
-            {
-                "role": "user",
-                "content": (
-                    f"**User request:** {user_message}\n\n"
-                    f"**Plan summary:** {plan_summary}\n\n"
-                    f"**Agent results:**\n\n{results_block}"
-                ),
-            },
-        ],
-        max_tokens=800,
+    messages = [
+        {
+            "role": "system",
+            "content": (
+                "You are a research orchestrator synthesizing agent results for "
+                "a MOBILE interface. Responses are read on small screens.\n\n"
+                "Guidelines:\n"
+                "- Be concise: aim for 150-300 words max\n"
+                "- Lead with the key finding or answer in 1-2 sentences\n"
+                "- Use short bullet points, not long paragraphs\n"
+                "- Use markdown: **bold** for emphasis, short headings, compact lists\n"
+                "- Keep relevant URLs but don't list more than 3-5\n"
+                "- Do NOT mention the agents or internal execution process\n"
+                "- Use uncertainty-aware language: 'based on available results' "
+                "rather than absolute claims\n"
+                "- End with a one-line disclaimer: '*Results may not be exhaustive "
+                "— verify for critical decisions.*'"
+            ),
+        },
+        {
+            "role": "user",
+            "content": (
+                f"**User request:** {user_message}\n\n"
+                f"**Plan summary:** {plan_summary}\n\n"
+                f"**Agent results:**\n\n{results_block}"
+            ),
+        },
+    ]
+
+    response, model = model_router.call(
+        role,
+        lambda model: client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=800,
+            timeout=settings.model_timeout,
+        ),
+        size_tokens=count_tokens(results_block),
+        est_tokens=count_tokens(messages[0]["content"] + messages[1]["content"]) + 800,
     )
+    return response.choices[0].message.content, model
+
+
+def _digest_step(client: OpenAI, user_message: str, step: dict) -> str:
+    """
+    Condense a single step result into a short digest. Used by incremental
+    synthesis so that the final call reduces over digests instead of raw results.
+    """
+    messages = [
+        {
+            "role": "system",
+            "content": (
+                "Condense one agent result for a later synthesis step. "
+                "Return at most 5 short bullet points with the facts most "
+                "relevant to the user's request. Keep paper/article titles "
+                "and up to 3 URLs verbatim. No preamble."
+            ),
+        },
+        {
+            "role": "user",
+            "content": (
+                f"**User request:** {user_message}\n\n"
+                f"**Agent step:** {step['description']}\n\n"
+                f"**Result:**\n{step['result']}"
+            ),
+        },
+    ]
+
+    with tracing.span("digest", **{"step.id": step["id"]}):
+        response, _ = model_router.call(
+            "digest",
+            lambda model: client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=250,
+                timeout=settings.model_timeout,
+            ),
+            est_tokens=count_tokens(messages[0]["content"] + messages[1]["content"]) + 250,
+        )
     return response.choices[0].message.content
 
 
+_COMPLETE = 'data: {"type": "execution_complete"'
+_FAILED = 'data: {"type": "execution_failed"'
+
+
 async def execute_plan_stream(
-    plan: dict, graph: dict, api_key: str
+    plan: dict,
+    graph: dict,
+    api_key: str,
+    speculation=None,
+    results_out: dict | None = None,
+    usage_attribution: dict | None = None,
+) -> AsyncGenerator[str, None]:
+    """_execute_plan_stream, counted in the executions metrics by outcome
+    (complete, failed, or aborted when the stream is closed or raises)."""
+    metrics.executions_in_flight.inc()
+    start = time.perf_counter()
+    outcome = "aborted"
+    try:
+        async for chunk in _execute_plan_stream(plan, graph, api_key, speculation, results_out, usage_attribution):
+            if chunk.startswith(_COMPLETE):
+                outcome = "complete"
+            elif chunk.startswith(_FAILED):
+                outcome = "failed"
+            yield chunk
+    finally:
+        metrics.executions_in_flight.dec()
+        metrics.execution_latency.observe(time.perf_counter() - start)
+        metrics.executions.labels(outcome).inc()
+
+
+def _eta_event(steps: list[dict], completed: dict, started: float) -> str:
+    estimate = latency_model.estimate(steps, completed)
+    return f"data: {json.dumps({'type': 'eta', 'remainingMs': estimate['totalMs'], 'criticalPath': estimate['criticalPath'], 'criticalPathMs': estimate['criticalPathMs'], 'completedSteps': len(completed), 'totalSteps': len(steps), 'elapsedMs': int((time.time() - started) * 1000)})}\n\n"
+
+
+async def _execute_plan_stream(
+    plan: dict,
+    graph: dict,
+    api_key: str,
+    speculation=None,
+    results_out: dict | None = None,
+    usage_attribution: dict | None = None,
 ) -> AsyncGenerator[str, None]:
     """
     Execute a plan step by step, calling real tools and yielding SSE events.
     After all agent steps complete, the orchestrator synthesizes a final response.
+    When a Speculation is given, unchanged read-only steps attach to its
+    background results instead of calling the tool again.
+
+    Steps with a "since" param are watched (scheduled monitor runs): when a
+    watched step finds nothing new, steps that depend only on empty results
+    are skipped, and synthesis is skipped if no watched step found anything.
+    Step results are copied into results_out when given.
+
+    The run is traced as an "execute" span (a child of the request's span)
+    with a span per step, approval wait and synthesis; graph_init carries
+    its traceparent and the final event its traceId.
+
+    Model calls (digests, synthesis) are recorded in the usage ledger with
+    usage_attribution (conversationId, executionId, userId, source) plus their step
+    and agent; new records are streamed as "usage" events after each step
+    and after synthesis, with running totals. Digests made unnecessary by a
+    cached or passthrough synthesis still finish their calls; their usage
+    follows execution_complete in a last "usage" event. The attribution's
+    userId also scopes the synthesis cache to that user's runs.
+
+    Step and synthesis durations feed the latency model. Ready steps run
+    longest remaining chain first, and "eta" events (after graph_init and
+    after each step) carry the estimated time left and critical path.
     """
-    yield f"data: {json.dumps({'type': 'graph_init', 'graph': graph})}\n\n"
+    # Spans here are never made current across a yield, only around awaits
+    exec_span = tracing.start_span("execute", **{"plan.id": plan.get("id"), "plan.steps": len(plan["steps"])})
+    trace_id = tracing.trace_id(exec_span)
+    yield f"data: {json.dumps({'type': 'graph_init', 'graph': graph, 'traceparent': tracing.traceparent(exec_span)})}\n\n"
 
-    completed_steps: dict[str, str] = {}
+    completed_steps: dict[str, ToolResult] = {}
     step_results: list[dict] = []
 
+    user_message = plan.get("user_message", plan.get("summary", ""))
+    # Include multimodal context so synthesis knows about images/audio
+    image_analysis = plan.get("image_analysis")
+    audio_transcript = plan.get("audio_transcript")
+    if image_analysis:
+        user_message += f"\n\n[User also provided an image. Image analysis: {image_analysis}]"
+    if audio_transcript and audio_transcript != user_message:
+        user_message += f"\n\n[Transcribed from voice: {audio_transcript}]"
+    plan_summary = plan.get("summary", "")
+    client = openai_client(api_key)
+
+    # Incremental mode: digest each step while the remaining steps run
+    digest_tasks: dict[str, asyncio.Task] = {}
+    last_step_done = time.time()
+
+    cache_stats: dict = {}
+    execution_stats.set(cache_stats)
+    usage_records = usage.collect(**(usage_attribution or {}))
+    usage_seen = 0
+
+    # Cross-source paper dedupe; shown_results hold what each step displays
+    paper_index = PaperIndex()
+    shown_results: dict[str, ToolResult] = {}
+
+    speculated_ids: set[str] = set()
+    speculation_saved_ms = 0
+
+    watched = {s["id"] for s in plan["steps"] if s.get("params", {}).get("since")}
+    unchanged: set[str] = set()
+    step_time_ms = 0
+
+    exec_start = time.time()
+    priority = latency_model.estimate(plan["steps"])["priority"]
+    yield _eta_event(plan["steps"], completed_steps, exec_start)
+
     while len(completed_steps) < len(plan["steps"]):
         ready = [
             s
@@ -197,6 +561,7 @@ async def execute_plan_stream(
 
         if not ready:
             break
+        ready.sort(key=lambda s: priority.get(s["id"], 0), reverse=True)
 
         for step in ready:
             step_id = step["id"]
@@ -204,10 +569,28 @@ async def execute_plan_stream(
             incoming_edges = [
                 e for e in graph["edges"] if e["target"] == step_id
             ]
+            deps = step.get("depends_on", [])
+            if deps and all(d in unchanged for d in deps):
+                # Nothing new upstream: skip rather than re-derive old output
+                completed_steps[step_id] = ToolResult(action=step.get("action", ""))
+                unchanged.add(step_id)
+                skipped_ids = [step_id] + (
+                    [f"checkpoint_{step_id}"] if step.get("requires_approval") else []
+                )
+                for node_id in skipped_ids:
+                    yield f"data: {json.dumps({'type': 'node_status', 'nodeId': node_id, 'status': 'skipped', 'result': 'No new results since the last run.'})}\n\n"
+                for e in incoming_edges:
+                    yield f"data: {json.dumps({'type': 'edge_status', 'edgeId': e['id'], 'status': 'completed'})}\n\n"
+                continue
             for e in incoming_edges:
                 yield f"data: {json.dumps({'type': 'edge_status', 'edgeId': e['id'], 'status': 'active'})}\n\n"
 
             yield f"data: {json.dumps({'type': 'node_status', 'nodeId': step_id, 'status': 'running'})}\n\n"
+            step_span = tracing.start_span(
+                f"step {step.get('action', '')}",
+                exec_span,
+                **{"step.id": step_id, "step.agent": step.get("agent_id"), "step.type": step.get("type", "tool")},
+            )
 
             prev_results = {
                 dep_id: completed_steps[dep_id]
@@ -216,17 +599,69 @@ async def execute_plan_stream(
             }
 
             start = time.time()
-            result = await asyncio.to_thread(
-                _call_tool,
-                step.get("action", ""),
-                step.get("params", {}),
-                prev_results,
-                step.get("description", ""),
-                step.get("agent_id", ""),
+            cached_before, misses_before = _cache_lookups(cache_stats)
+            result = None
+            spec = speculation.matches(step) if speculation else None
+            # Only reuse a speculative result if its inputs were speculative too
+            if (
+                spec
+                and not spec.task.cancelled()
+                and all(d in speculated_ids for d in step.get("depends_on", []))
+            ):
+                attached_at = time.monotonic()
+                try:
+                    result = await spec.task
+                    speculated_ids.add(step_id)
+                    speculation_saved_ms += spec.saved_ms(attached_at)
+                except Exception:
+                    result = None
+            items = (
+                _map_items(step, completed_steps, paper_index)
+                if result is None and step.get("type") == "map"
+                else []
             )
+            if items:
+                map_source = step.get("map_over") or step["depends_on"][0]
+                if any(
+                    s["id"] == map_source and s.get("requires_approval")
+                    for s in plan["steps"]
+                ):
+                    map_source = f"checkpoint_{map_source}"
+                map_out: dict = {}
+                async for event in _run_map_step(step, items, map_source, graph, map_out):
+                    yield event
+                result = map_out["result"]
+            if result is None:
+                with tracing.use(step_span), usage.scope(stepId=step_id, agentId=step.get("agent_id")):
+                    result = await asyncio.to_thread(
+                        _call_tool,
+                        step.get("action", ""),
+                        step.get("params", {}),
+                        prev_results,
+                        step.get("description", ""),
+                        step.get("agent_id", ""),
+                        paper_index,
+                    )
             duration = int((time.time() - start) * 1000)
-
-            yield f"data: {json.dumps({'type': 'node_status', 'nodeId': step_id, 'status': 'completed', 'result': result, 'duration': duration})}\n\n"
+            step_span.set_attribute("step.speculated", step_id in speculated_ids)
+            if result.is_error:
+                tracing.fail(step_span, result.text[:200])
+            step_span.end()
+            step_time_ms += duration
+            # Cache and prefetch hits say nothing about the tool's latency
+            cached_after, misses_after = _cache_lookups(cache_stats)
+            if step_id not in speculated_ids and not (cached_after > cached_before and misses_after == misses_before):
+                latency_model.observe_step(step, duration)
+            result, shown_results[step_id] = paper_index.absorb(result)
+            # Remember fetched records off the critical path
+            if settings.research_index_enabled:
+                _write_behind(research_index.ingest, result)
+            if settings.vector_store_enabled:
+                _write_behind(vector_store.add, result)
+            # Render once; the same text feeds SSE, synthesis and persistence
+            result_text = render_result(shown_results[step_id])
+
+            yield f"data: {json.dumps({'type': 'node_status', 'nodeId': step_id, 'status': 'completed', 'result': result_text, 'duration': duration, 'speculated': step_id in speculated_ids})}\n\n"
 
             for e in incoming_edges:
                 yield f"data: {json.dumps({'type': 'edge_status', 'edgeId': e['id'], 'status': 'completed'})}\n\n"
@@ -235,7 +670,13 @@ async def execute_plan_stream(
                 cp_id = f"checkpoint_{step_id}"
                 yield f"data: {json.dumps({'type': 'node_status', 'nodeId': cp_id, 'status': 'awaiting_approval'})}\n\n"
                 yield f"data: {json.dumps({'type': 'checkpoint_reached', 'nodeId': cp_id, 'stepId': step_id})}\n\n"
-                await asyncio.sleep(2)
+                wait_span = tracing.start_span("approval_wait", exec_span, **{"step.id": step_id})
+                metrics.approvals_pending.inc()
+                try:
+                    await asyncio.sleep(2)
+                finally:
+                    metrics.approvals_pending.dec()
+                wait_span.end()
                 yield f"data: {json.dumps({'type': 'node_status', 'nodeId': cp_id, 'status': 'approved'})}\n\n"
                 cp_edges = [
                     e for e in graph["edges"] if e["source"] == cp_id
@@ -244,13 +685,45 @@ async def execute_plan_stream(
                     yield f"data: {json.dumps({'type': 'edge_status', 'edgeId': e['id'], 'status': 'completed'})}\n\n"
 
             completed_steps[step_id] = result
-            step_results.append({
+            yield _eta_event(plan["steps"], completed_steps, exec_start)
+            if step_id in watched and not result.is_error and not (result.papers or result.articles):
+                unchanged.add(step_id)
+                continue
+            step_result = {
                 "id": step_id,
                 "description": step.get("description", ""),
-                "result": result,
-            })
+                "result": result_text,
+                "action": step.get("action", ""),
+                "agent_id": step.get("agent_id", ""),
+                "error": result.is_error,
+            }
+            step_results.append(step_result)
+            if settings.incremental_synthesis and len(plan["steps"]) > 1:
+                # The task copies the current context, parenting its span to the
+                # run and attributing its usage to the step
+                with tracing.use(exec_span), usage.scope(stepId=step_id, agentId=step_result["agent_id"]):
+                    digest_tasks[step_id] = asyncio.create_task(
+                        asyncio.to_thread(_digest_step, client, user_message, step_result)
+                    )
+            last_step_done = time.time()
+            new_usage, usage_seen = usage.drain(usage_records, usage_seen)
+            if new_usage:
+                yield f"data: {json.dumps({'type': 'usage', 'records': new_usage, 'total': usage.totals(usage_records)})}\n\n"
             await asyncio.sleep(0.2)
 
+    if results_out is not None:
+        results_out.update(completed_steps)
+
+    if watched and watched <= unchanged:
+        # Monitor run with nothing new: no synthesis, no summary
+        for e in [e for e in graph["edges"] if e["target"] == "output"]:
+            yield f"data: {json.dumps({'type': 'edge_status', 'edgeId': e['id'], 'status': 'completed'})}\n\n"
+        yield f"data: {json.dumps({'type': 'node_status', 'nodeId': 'output', 'status': 'skipped', 'result': 'No new results since the last run.'})}\n\n"
+        exec_span.set_attribute("execute.unchanged", True)
+        exec_span.end()
+        yield f"data: {json.dumps({'type': 'execution_complete', 'graph': graph, 'summary': '', 'unchanged': True, 'traceId': trace_id})}\n\n"
+        return
+
     # ── Orchestrator synthesis ──
     # Activate edges to output and show orchestrator is synthesizing
     output_edges = [e for e in graph["edges"] if e["target"] == "output"]
@@ -259,26 +732,100 @@ async def execute_plan_stream(
 
     yield f"data: {json.dumps({'type': 'node_status', 'nodeId': 'output', 'status': 'running'})}\n\n"
 
-    # Call the LLM to synthesize all agent results
-    user_message = plan.get("user_message", plan.get("summary", ""))
-    # Include multimodal context so synthesis knows about images/audio
-    image_analysis = plan.get("image_analysis")
-    audio_transcript = plan.get("audio_transcript")
-    if image_analysis:
-        user_message += f"\n\n[User also provided an image. Image analysis: {image_analysis}]"
-    if audio_transcript and audio_transcript != user_message:
-        user_message += f"\n\n[Transcribed from voice: {audio_transcript}]"
-    plan_summary = plan.get("summary", "")
-    client = OpenAI(api_key=api_key)
+    if paper_index.stats["merged"]:
+        # Earlier listings picked up fields (e.g. citation counts) from later ones
+        for s in step_results:
+            s["result"] = render_result(shown_results[s["id"]])
 
+    # Call the LLM to synthesize all agent results
     start = time.time()
-    summary = await asyncio.to_thread(
-        _synthesize, client, user_message, plan_summary, step_results
-    )
+    synth_span = tracing.start_span("synthesis", exec_span, **{"synthesis.steps": len(step_results)})
+    compaction = None
+    cache_hit = None
+    mode, role = _choose_synthesis(step_results)
+    model = None
+    # Summaries are only shared within a user's own runs
+    user_id = (usage_attribution or {}).get("userId")
+    cached = synthesis_cache.get(user_message, plan_summary, step_results, user_id)
+    if cached:
+        summary, cache_hit = cached
+        mode = "cache"
+    elif mode == "passthrough":
+        summary = step_results[0]["result"]
+    discarded: list[asyncio.Task] = []
+    if cache_hit or mode == "passthrough":
+        # Cancelling would not stop the calls already running in threads
+        discarded = list(digest_tasks.values())
+    else:
+        synthesis_input = step_results
+        if digest_tasks:
+            # Reduce over per-step digests, falling back to the raw result
+            # for any step whose digest failed
+            digests = await asyncio.gather(*digest_tasks.values(), return_exceptions=True)
+            by_step = dict(zip(digest_tasks.keys(), digests))
+            synthesis_input = [
+                {**s, "result": by_step[s["id"]]}
+                if isinstance(by_step.get(s["id"]), str)
+                else s
+                for s in step_results
+            ]
+        # Deduplicate and trim step results to the synthesis token budget
+        compacted, compaction = await asyncio.to_thread(
+            compact_results,
+            synthesis_input, f"{user_message}\n{plan_summary}", settings.synthesis_token_budget
+        )
+        try:
+            with tracing.use(synth_span):
+                summary, model = await asyncio.to_thread(
+                    _synthesize, client, user_message, plan_summary, compacted, role
+                )
+        except Exception as e:
+            # Overloaded, or every model in the synthesizer's chain failed
+            error = str(e) if isinstance(e, SchedulerOverloaded) else f"Synthesis failed: {e}"
+            for s in (synth_span, exec_span):
+                tracing.fail(s, error)
+                s.end()
+            yield f"data: {json.dumps({'type': 'node_status', 'nodeId': 'output', 'status': 'failed', 'result': error})}\n\n"
+            new_usage, usage_seen = usage.drain(usage_records, usage_seen)
+            if new_usage:
+                yield f"data: {json.dumps({'type': 'usage', 'records': new_usage, 'total': usage.totals(usage_records)})}\n\n"
+            yield f"data: {json.dumps({'type': 'execution_failed', 'nodeId': 'output', 'error': error, 'traceId': trace_id})}\n\n"
+            return
+        # A failed step may succeed next time; don't pin a summary of its error
+        if not any(s.get("error") for s in step_results):
+            synthesis_cache.put(user_message, plan_summary, step_results, summary, user_id)
     duration = int((time.time() - start) * 1000)
+    if model is not None:
+        # Only LLM syntheses; cached and passthrough ones take no time
+        latency_model.observe("synthesis", "", duration)
+    synth_span.set_attributes({"synthesis.mode": mode, "synthesis.model": model or "", "synthesis.cache_hit": bool(cache_hit)})
+    synth_span.end()
+    # Time from the last step finishing to the final summary being ready
+    synthesis_gap = int((time.time() - last_step_done) * 1000)
 
     for e in output_edges:
         yield f"data: {json.dumps({'type': 'edge_status', 'edgeId': e['id'], 'status': 'completed'})}\n\n"
 
-    yield f"data: {json.dumps({'type': 'node_status', 'nodeId': 'output', 'status': 'completed', 'result': 'Synthesis complete', 'duration': duration})}\n\n"
-    yield f"data: {json.dumps({'type': 'execution_complete', 'graph': graph, 'summary': summary})}\n\n"
+    speculation_stats = None
+    if speculation:
+        # Share of step time that was already spent before /api/execute arrived
+        total = step_time_ms + speculation_saved_ms
+        speculation_stats = {
+            "steps": len(speculated_ids),
+            "savedMs": speculation_saved_ms,
+            "savedShare": round(speculation_saved_ms / total, 3) if total else 0.0,
+        }
+
+    new_usage, usage_seen = usage.drain(usage_records, usage_seen)
+    if new_usage:
+        yield f"data: {json.dumps({'type': 'usage', 'records': new_usage, 'total': usage.totals(usage_records)})}\n\n"
+
+    output_result = f"Synthesis complete (cached: {cache_hit})" if cache_hit else "Synthesis complete"
+    yield f"data: {json.dumps({'type': 'node_status', 'nodeId': 'output', 'status': 'completed', 'result': output_result, 'duration': duration, 'cacheHit': cache_hit, 'compaction': compaction, 'synthesisGap': synthesis_gap, 'incremental': bool(digest_tasks), 'synthesis': {'mode': mode, 'model': model}, 'speculation': speculation_stats, 'toolCache': cache_stats, 'paperIndex': paper_index.stats})}\n\n"
+    exec_span.end()
+    yield f"data: {json.dumps({'type': 'execution_complete', 'graph': graph, 'summary': summary, 'traceId': trace_id})}\n\n"
+    if discarded:
+        await asyncio.gather(*discarded, return_exceptions=True)
+        new_usage, usage_seen = usage.drain(usage_records, usage_seen)
+        if new_usage:
+            yield f"data: {json.dumps({'type': 'usage', 'records': new_usage, 'total': usage.totals(usage_records)})}\n\n"
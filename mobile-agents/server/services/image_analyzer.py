@@ -1,32 +1,46 @@
+import asyncio
+
 from openai import OpenAI
 
+from config import settings
+from services.model_router import model_router
+
 
 async def analyze_image(client: OpenAI, image_base64: str) -> str:
-    """Analyze an image using GPT-4o vision and return a description."""
-    response = client.chat.completions.create(
-        model="gpt-4.1",
-        messages=[
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "text",
-                        "text": (
-                            "Analyze this image in the context of a research assistant. "
-                            "Describe what you see and what research tasks might be "
-                            "relevant (e.g., paper search, literature review, proposal "
-                            "generation). Be concise."
-                        ),
+    """Analyze an image using the configured vision model and return a description."""
+    messages = [
+        {
+            "role": "user",
+            "content": [
+                {
+                    "type": "text",
+                    "text": (
+                        "Analyze this image in the context of a research assistant. "
+                        "Describe what you see and what research tasks might be "
+                        "relevant (e.g., paper search, literature review, proposal "
+                        "generation). Be concise."
+                    ),
+                },
+                {
+                    "type": "image_url",
+                    "image_url": {
+                        "url": f"data:image/jpeg;base64,{image_base64}"
                     },
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{image_base64}"
-                        },
-                    },
-                ],
-            }
-        ],
-        max_tokens=300,
+                },
+            ],
+        }
+    ]
+
+    # Image inputs are billed at up to ~1.1k tokens at default detail
+    response, _ = await asyncio.to_thread(
+        model_router.call,
+        "vision",
+        lambda model: client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=300,
+            timeout=settings.model_timeout,
+        ),
+        est_tokens=1500,
     )
     return response.choices[0].message.content
@@ -0,0 +1,183 @@
+"""
+Rolling latency statistics and plan-time estimates.
+
+Every executed step records its duration per tool action ("tool" or "map")
+and per agent, and every synthesis its duration, in a QuantileSketch. A
+step's estimate is the p50 of its action, falling back to its agent and
+then to latency_default_step_ms. estimate() turns a plan's steps into:
+
+- the critical path: the chain of depends_on edges with the largest summed
+  estimate, a lower bound on the run with unlimited concurrency;
+- totalMs: what the executor actually takes running one step at a time,
+  plus its fixed approval wait and pause between steps, plus synthesis;
+- priorities: each step's longest path to the end of the plan, used to
+  start the longest chains first (execution and speculation).
+"""
+
+import math
+import threading
+from collections import Counter
+from collections.abc import Collection
+
+from config import settings
+
+# Fixed waits in execute_plan_stream: checkpoint approval and per-step pause
+APPROVAL_WAIT_MS = 2000
+STEP_PAUSE_MS = 200
+
+
+class QuantileSketch:
+    """
+    Log-bucketed histogram with relative error alpha over roughly the last
+    `window` to 2 * `window` samples (two generations, the older dropped as
+    a new one fills), so a slow upstream ages out once it recovers.
+    """
+
+    def __init__(self, window: int = 500, alpha: float = 0.02):
+        self.window = window
+        self._gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self._gamma)
+        self._current: Counter[int] = Counter()
+        self._previous: Counter[int] = Counter()
+        self._n = 0
+        self._prev_n = 0
+
+    @property
+    def count(self) -> int:
+        return self._n + self._prev_n
+
+    def add(self, value_ms: float) -> None:
+        self._current[math.ceil(math.log(max(value_ms, 1.0)) / self._log_gamma)] += 1
+        self._n += 1
+        if self._n >= self.window:
+            self._previous, self._prev_n = self._current, self._n
+            self._current, self._n = Counter(), 0
+
+    def quantile(self, q: float) -> float | None:
+        total = self.count
+        if not total:
+            return None
+        merged = self._previous + self._current
+        rank = q * (total - 1)
+        seen = 0
+        for index in sorted(merged):
+            seen += merged[index]
+            if seen > rank:
+                break
+        # Midpoint (in relative terms) of the bucket (gamma^(i-1), gamma^i]
+        return 2 * self._gamma ** index / (self._gamma + 1)
+
+
+class LatencyModel:
+    def __init__(self, window: int = 500):
+        self.window = window
+        self._lock = threading.Lock()
+        self._sketches: dict[tuple[str, str], QuantileSketch] = {}
+
+    def observe(self, kind: str, name: str, ms: float) -> None:
+        with self._lock:
+            sketch = self._sketches.get((kind, name))
+            if sketch is None:
+                sketch = self._sketches[(kind, name)] = QuantileSketch(self.window)
+            sketch.add(ms)
+
+    def observe_step(self, step: dict, ms: float) -> None:
+        self.observe("map" if step.get("type") == "map" else "tool", step.get("action", ""), ms)
+        if step.get("agent_id"):
+            self.observe("agent", step["agent_id"], ms)
+
+    def quantile(self, kind: str, name: str, q: float) -> float | None:
+        with self._lock:
+            sketch = self._sketches.get((kind, name))
+            return sketch.quantile(q) if sketch is not None else None
+
+    def step_ms(self, step: dict) -> float:
+        """Expected time of a step's tool call(s)."""
+        kind = "map" if step.get("type") == "map" else "tool"
+        for key in ((kind, step.get("action", "")), ("agent", step.get("agent_id", ""))):
+            p50 = self.quantile(*key, 0.5)
+            if p50 is not None:
+                return p50
+        return settings.latency_default_step_ms
+
+    def synthesis_ms(self) -> float:
+        p50 = self.quantile("synthesis", "", 0.5)
+        return p50 if p50 is not None else settings.latency_default_synthesis_ms
+
+    def estimate(self, steps: list[dict], done: Collection[str] = ()) -> dict:
+        """Estimate of the steps not in done (whose finished dependencies cost nothing)."""
+        remaining = [s for s in steps if s["id"] not in done]
+        ids = {s["id"] for s in remaining}
+        by_key: dict[tuple, float] = {}
+        cost = {}
+        for s in remaining:
+            key = (s.get("type"), s.get("action"), s.get("agent_id"))
+            if key not in by_key:
+                by_key[key] = self.step_ms(s)
+            cost[s["id"]] = by_key[key] + (APPROVAL_WAIT_MS if s.get("requires_approval") else 0)
+        deps = {s["id"]: [d for d in s.get("depends_on", []) if d in ids] for s in remaining}
+        dependents: dict[str, list[str]] = {i: [] for i in ids}
+        for step_id, ds in deps.items():
+            for d in ds:
+                dependents[d].append(step_id)
+
+        order = _topological(ids, deps)
+        finish: dict[str, float] = {}
+        via: dict[str, str | None] = {}
+        for step_id in order:
+            before = max(deps[step_id], key=lambda d: finish[d], default=None)
+            via[step_id] = before
+            finish[step_id] = cost[step_id] + (finish[before] if before else 0.0)
+        priority: dict[str, float] = {}
+        for step_id in reversed(order):
+            priority[step_id] = cost[step_id] + max((priority[d] for d in dependents[step_id]), default=0.0)
+
+        path: list[str] = []
+        node = max(finish, key=finish.get, default=None)
+        while node is not None:
+            path.append(node)
+            node = via[node]
+        synthesis = self.synthesis_ms()
+        return {
+            "stepMs": {i: round(ms) for i, ms in cost.items()},
+            "criticalPath": path[::-1],
+            "criticalPathMs": round(finish[path[0]] + synthesis) if path else round(synthesis),
+            "totalMs": round(sum(cost.values()) + STEP_PAUSE_MS * len(remaining) + synthesis),
+            "synthesisMs": round(synthesis),
+            "priority": {i: round(ms) for i, ms in priority.items()},
+        }
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            items = list(self._sketches.items())
+        out: dict[str, dict] = {}
+        for (kind, name), sketch in items:
+            p50, p95 = sketch.quantile(0.5), sketch.quantile(0.95)
+            out.setdefault(kind, {})[name] = {
+                "count": sketch.count,
+                "p50Ms": round(p50) if p50 is not None else None,
+                "p95Ms": round(p95) if p95 is not None else None,
+            }
+        return out
+
+
+def _topological(ids: set[str], deps: dict[str, list[str]]) -> list[str]:
+    """Steps in dependency order; steps in a cycle (an invalid plan) are left out."""
+    indegree = {i: len(deps[i]) for i in ids}
+    dependents: dict[str, list[str]] = {i: [] for i in ids}
+    for step_id, ds in deps.items():
+        for d in ds:
+            dependents[d].append(step_id)
+    queue = [i for i in ids if indegree[i] == 0]
+    order = []
+    while queue:
+        step_id = queue.pop()
+        order.append(step_id)
+        for nxt in dependents[step_id]:
+            indegree[nxt] -= 1
+            if indegree[nxt] == 0:
+                queue.append(nxt)
+    return order
+
+
+latency_model = LatencyModel(window=settings.latency_window)
@@ -0,0 +1,289 @@
+"""
+Process-wide admission control for LLM calls.
+
+Every model call acquires a slot before it is sent. Waiters are served in
+priority order (interactive planning ahead of background synthesis), and a
+slot is only granted while concurrency, the configured RPM/TPM window and
+the remaining-quota headers reported by OpenAI all allow it. A full queue or
+an exceeded wait raises SchedulerOverloaded so callers can shed load.
+
+Threads wait in acquire() on a condition variable; coroutines wait in
+aacquire() on a future resolved on their own loop, so queued async callers
+hold no executor thread. Both share one queue.
+"""
+
+import asyncio
+import heapq
+import itertools
+import re
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+
+import openai
+
+from config import settings
+
+# Lower runs first
+ROLE_PRIORITY = {
+    "planner": 0,
+    "vision": 0,
+    "transcription": 0,
+    "synthesizer": 1,
+    "synthesizer_fast": 1,
+    "digest": 2,
+    "worker": 2,
+}
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class SchedulerOverloaded(Exception):
+    """Raised when an LLM call cannot be admitted (queue full or wait exceeded)."""
+
+
+def _parse_reset(value: str) -> float:
+    """Parse OpenAI reset durations such as "1s", "6m0s" or "20ms" to seconds."""
+    return sum(float(n) * _DURATION_UNITS[u] for n, u in _DURATION_RE.findall(value))
+
+
+def _set_done(wake: asyncio.Future) -> None:
+    if not wake.done():
+        wake.set_result(None)
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        rpm_limit: int = 0,
+        tpm_limit: int = 0,
+        max_queue: int = 100,
+        max_wait: float = 30.0,
+    ):
+        self.max_concurrency = max_concurrency
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+
+        self._cond = threading.Condition()
+        self._waiters: list[tuple[int, int]] = []
+        # Futures that wake async waiters, resolved on their own loop
+        self._async_waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = set()
+        self._seq = itertools.count()
+        self._inflight = 0
+        # (admitted_at, est_tokens) for the trailing 60s window
+        self._window: deque[tuple[float, int]] = deque()
+        # Quota reported by the API, valid until the matching reset time
+        self._remaining_requests: int | None = None
+        self._remaining_tokens: int | None = None
+        self._requests_reset_at = 0.0
+        self._tokens_reset_at = 0.0
+        self._stats: dict[str, dict] = {}
+
+    # ── Admission ──
+
+    def _site_stats(self, call_site: str) -> dict:
+        return self._stats.setdefault(call_site, {
+            "calls": 0,
+            "rejected": 0,
+            "waitMsTotal": 0.0,
+            "waitMsMax": 0.0,
+        })
+
+    def _admissible(self, est_tokens: int, now: float) -> bool:
+        if self._inflight >= self.max_concurrency:
+            return False
+        while self._window and now - self._window[0][0] >= 60:
+            self._window.popleft()
+        if self.rpm_limit and len(self._window) >= self.rpm_limit:
+            return False
+        if self.tpm_limit:
+            used = sum(t for _, t in self._window)
+            # Always let a single oversized request through an empty window
+            if used and used + est_tokens > self.tpm_limit:
+                return False
+        if self._remaining_requests is not None and now < self._requests_reset_at:
+            if self._remaining_requests <= 0:
+                return False
+        if self._remaining_tokens is not None and now < self._tokens_reset_at:
+            if self._remaining_tokens < est_tokens:
+                return False
+        return True
+
+    def _enqueue(self, call_site: str, priority: int | None) -> tuple[tuple[int, int], dict]:
+        """Queue a waiter (caller holds the lock). Returns its ticket and call-site stats."""
+        if priority is None:
+            priority = ROLE_PRIORITY.get(call_site, 1)
+        stats = self._site_stats(call_site)
+        if len(self._waiters) >= self.max_queue:
+            stats["rejected"] += 1
+            raise SchedulerOverloaded(f"LLM queue full ({self.max_queue} waiting)")
+        ticket = (priority, next(self._seq))
+        heapq.heappush(self._waiters, ticket)
+        return ticket, stats
+
+    def _admit(self, ticket, est_tokens: int, start: float, stats: dict, now: float) -> float | None:
+        """Admit ticket if it is first in line and allowed; returns its wait in seconds."""
+        if self._waiters[0] != ticket or not self._admissible(est_tokens, now):
+            return None
+        heapq.heappop(self._waiters)
+        self._inflight += 1
+        self._window.append((now, est_tokens))
+        if self._remaining_requests is not None:
+            self._remaining_requests -= 1
+        if self._remaining_tokens is not None:
+            self._remaining_tokens -= est_tokens
+        wait_ms = (now - start) * 1000
+        stats["calls"] += 1
+        stats["waitMsTotal"] += wait_ms
+        stats["waitMsMax"] = max(stats["waitMsMax"], wait_ms)
+        # The next waiter may also be admissible
+        self._notify()
+        return wait_ms / 1000
+
+    def _leave(self, ticket) -> None:
+        if ticket in self._waiters:
+            self._waiters.remove(ticket)
+            heapq.heapify(self._waiters)
+            self._notify()
+
+    def _notify(self) -> None:
+        """Wake blocked threads and async waiters to re-check admission (caller holds the lock)."""
+        self._cond.notify_all()
+        for loop, wake in self._async_waiters:
+            loop.call_soon_threadsafe(_set_done, wake)
+
+    def acquire(self, call_site: str, est_tokens: int = 0, priority: int | None = None) -> float:
+        """Block until the call may be sent. Returns the queue wait in seconds."""
+        start = time.monotonic()
+        deadline = start + self.max_wait
+        with self._cond:
+            ticket, stats = self._enqueue(call_site, priority)
+            while True:
+                now = time.monotonic()
+                waited = self._admit(ticket, est_tokens, start, stats, now)
+                if waited is not None:
+                    return waited
+                if now >= deadline:
+                    self._leave(ticket)
+                    stats["rejected"] += 1
+                    raise SchedulerOverloaded(
+                        f"LLM call for {call_site} not admitted within {self.max_wait:.0f}s"
+                    )
+                # Poll so rate windows and quota resets are noticed without a release
+                self._cond.wait(timeout=min(deadline - now, 0.25))
+
+    async def aacquire(self, call_site: str, est_tokens: int = 0, priority: int | None = None) -> float:
+        """acquire() for coroutines: waits on the event loop rather than in a thread."""
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+        deadline = start + self.max_wait
+        with self._cond:
+            ticket, stats = self._enqueue(call_site, priority)
+        try:
+            while True:
+                wake = loop.create_future()
+                with self._cond:
+                    now = time.monotonic()
+                    waited = self._admit(ticket, est_tokens, start, stats, now)
+                    if waited is not None:
+                        return waited
+                    if now >= deadline:
+                        self._leave(ticket)
+                        stats["rejected"] += 1
+                        raise SchedulerOverloaded(
+                            f"LLM call for {call_site} not admitted within {self.max_wait:.0f}s"
+                        )
+                    self._async_waiters.add((loop, wake))
+                try:
+                    await asyncio.wait((wake,), timeout=min(deadline - now, 0.25))
+                finally:
+                    with self._cond:
+                        self._async_waiters.discard((loop, wake))
+        except asyncio.CancelledError:
+            with self._cond:
+                self._leave(ticket)
+            raise
+
+    def release(self) -> None:
+        with self._cond:
+            self._inflight -= 1
+            self._notify()
+
+    @contextmanager
+    def slot(self, call_site: str, est_tokens: int = 0, priority: int | None = None):
+        self.acquire(call_site, est_tokens, priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def aslot(self, call_site: str, est_tokens: int = 0, priority: int | None = None):
+        await self.aacquire(call_site, est_tokens, priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    # ── Quota tracking ──
+
+    def update_from_headers(self, headers) -> None:
+        """Refresh remaining RPM/TPM quota from x-ratelimit-* response headers."""
+        now = time.monotonic()
+        with self._cond:
+            if "x-ratelimit-remaining-requests" in headers:
+                self._remaining_requests = int(headers["x-ratelimit-remaining-requests"])
+                self._requests_reset_at = now + _parse_reset(
+                    headers.get("x-ratelimit-reset-requests", "")
+                )
+            if "x-ratelimit-remaining-tokens" in headers:
+                self._remaining_tokens = int(headers["x-ratelimit-remaining-tokens"])
+                self._tokens_reset_at = now + _parse_reset(
+                    headers.get("x-ratelimit-reset-tokens", "")
+                )
+            self._notify()
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "inflight": self._inflight,
+                "queued": len(self._waiters),
+                "remainingRequests": self._remaining_requests,
+                "remainingTokens": self._remaining_tokens,
+                "callSites": {
+                    site: {
+                        **s,
+                        "avgWaitMs": round(s["waitMsTotal"] / s["calls"], 1) if s["calls"] else 0.0,
+                    }
+                    for site, s in self._stats.items()
+                },
+            }
+
+
+llm_scheduler = LLMScheduler(
+    max_concurrency=settings.llm_max_concurrency,
+    rpm_limit=settings.llm_rpm_limit,
+    tpm_limit=settings.llm_tpm_limit,
+    max_queue=settings.llm_max_queue,
+    max_wait=settings.llm_max_wait,
+)
+
+
+def _on_response(response) -> None:
+    llm_scheduler.update_from_headers(response.headers)
+
+
+@lru_cache()
+def openai_client(api_key: str) -> openai.OpenAI:
+    """Shared OpenAI client whose responses feed rate-limit headers to the scheduler."""
+    return openai.OpenAI(
+        api_key=api_key,
+        base_url=settings.openai_base_url or None,
+        http_client=openai.DefaultHttpxClient(event_hooks={"response": [_on_response]}),
+    )
@@ -0,0 +1,184 @@
+"""
+Event-loop lag sampling and blocking-call detection.
+
+A heartbeat task sleeps loop_monitor_interval seconds at a time and records
+how late it wakes (mobileagents_event_loop_lag_seconds). A watchdog thread
+watches the heartbeat; when it is overdue by more than loop_block_threshold
+it captures the loop thread's stack while the blocking code is still
+running. When the loop wakes, the stall is logged with that stack and
+counted per route and call site (the innermost frame in server code, e.g.
+"services/db.py:52 insert_message").
+
+strict() turns stalls into test failures unless their call site is in an
+allowlist (KNOWN_BLOCKING by default), so new blocking calls in async code
+fail the suite while the known ones are being moved off the loop.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from config import settings
+from services import metrics
+
+logger = logging.getLogger(__name__)
+
+# Bound at import so the heartbeat keeps its pace if asyncio.sleep is patched
+_sleep = asyncio.sleep
+
+_SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+# Blocking calls already on the loop, as "path" or "path function"
+KNOWN_BLOCKING = (
+    "auth.py get_current_user",
+    "services/db.py create_conversation",
+    "services/db.py list_conversations",
+    "services/db.py list_messages",
+    "services/db.py delete_conversation",
+    "services/db.py insert_message",
+    "services/db.py create_execution",
+    "services/db.py complete_execution",
+    "services/db.py resolve_approval",
+    "services/db.py get_approval",
+)
+
+
+class BlockingCallError(AssertionError):
+    """Raised by strict() when the loop was blocked outside the allowlist."""
+
+
+@dataclass
+class Stall:
+    duration_ms: float
+    route: str = "unknown"
+    call_site: str = "unknown"
+    stack: list[str] = field(default_factory=list)
+
+
+def _call_site(stack: traceback.StackSummary) -> str:
+    for fs in reversed(stack):
+        if fs.filename.startswith(_SERVER_DIR) and "site-packages" not in fs.filename:
+            path = os.path.relpath(fs.filename, _SERVER_DIR).replace(os.sep, "/")
+            return f"{path}:{fs.lineno} {fs.name}"
+    return "unknown"
+
+
+def _route(frame) -> str:
+    # ASGI frames take the request scope as an argument; Starlette's router
+    # stores the matched route in it
+    while frame is not None:
+        code = frame.f_code
+        if "scope" in code.co_varnames[: code.co_argcount]:
+            scope = frame.f_locals.get("scope")
+            route = scope.get("route") if isinstance(scope, dict) else None
+            if route is not None and hasattr(route, "path"):
+                return route.path
+        frame = frame.f_back
+    return "background"
+
+
+def _allowed(stall: Stall, allow) -> bool:
+    path, _, rest = stall.call_site.partition(":")
+    func = rest.partition(" ")[2]
+    return any(entry in (path, f"{path} {func}") for entry in allow)
+
+
+class LoopMonitor:
+    def __init__(self, interval: float = 0.05, threshold: float = 0.1, max_stalls: int = 100):
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls: deque[Stall] = deque(maxlen=max_stalls)
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._thread_id: int | None = None
+        self._beat: float | None = None
+        # (beat, stall) captured by the watchdog for the heartbeat it found overdue
+        self._pending: tuple[float, Stall] | None = None
+        self._collectors: list[list[Stall]] = []
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start monitoring the running loop (restarting if bound to another one)."""
+        self.stop()
+        self._stop = threading.Event()
+        self._thread_id = threading.get_ident()
+        self._beat = None
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, args=(self._stop,), name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            beat = self._beat = time.perf_counter()
+            await _sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - beat - self.interval)
+            metrics.loop_lag.observe(lag)
+            if lag >= self.threshold:
+                pending, self._pending = self._pending, None
+                stall = pending[1] if pending is not None and pending[0] == beat else Stall(0.0)
+                stall.duration_ms = lag * 1000
+                self._report(stall)
+
+    def _watch(self, stop: threading.Event) -> None:
+        while not stop.wait(self.interval / 2):
+            beat = self._beat
+            if beat is None or (self._pending is not None and self._pending[0] == beat):
+                continue
+            if time.perf_counter() - beat - self.interval > self.threshold:
+                frame = sys._current_frames().get(self._thread_id)
+                if frame is None:
+                    continue
+                stack = traceback.extract_stack(frame)
+                self._pending = (beat, Stall(0.0, _route(frame), _call_site(stack), stack.format()))
+                del frame
+
+    def _report(self, stall: Stall) -> None:
+        self.stalls.append(stall)
+        for collected in self._collectors:
+            collected.append(stall)
+        metrics.loop_blocks.labels(stall.route, stall.call_site).inc()
+        metrics.loop_blocked_seconds.labels(stall.route, stall.call_site).inc(stall.duration_ms / 1000)
+        logger.warning(
+            "Event loop blocked for %.0f ms (route %s, call site %s)\n%s",
+            stall.duration_ms, stall.route, stall.call_site, "".join(stall.stack[-12:]),
+        )
+
+    @contextmanager
+    def strict(self, allow=KNOWN_BLOCKING):
+        """Raise BlockingCallError on exit if the loop blocked at a call site not in allow."""
+        collected: list[Stall] = []
+        self._collectors.append(collected)
+        try:
+            yield collected
+        finally:
+            self._collectors.remove(collected)
+        new = [s for s in collected if not _allowed(s, allow)]
+        if new:
+            raise BlockingCallError(
+                "Event loop blocked by:\n" + "\n".join(
+                    f"  {s.call_site} ({s.duration_ms:.0f} ms, route {s.route})" for s in new
+                )
+            )
+
+
+loop_monitor = LoopMonitor(
+    interval=settings.loop_monitor_interval,
+    threshold=settings.loop_block_threshold,
+)
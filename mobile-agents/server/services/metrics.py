@@ -0,0 +1,315 @@
+"""
+In-process metrics in the Prometheus text format, served at /metrics.
+
+Counters, gauges and histograms are sharded per thread: each thread adds to
+its own list of values without taking a lock, and a scrape sums the shards.
+A series (one label combination) is bound once and reused, so recording is
+an index into the calling thread's list rather than a label lookup; request
+series are bound per route and method on first use. Values that already
+live elsewhere (cache stats, the LLM scheduler, the to_thread pool) are read
+by callbacks at scrape time.
+"""
+
+import asyncio
+import bisect
+import os
+import threading
+from typing import AsyncIterator, Callable
+
+_local = threading.local()
+_shards: list[list[float]] = []
+_size = 0
+_lock = threading.Lock()  # registration only, never taken when recording
+_metrics: list["_Metric"] = []
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _allocate(n: int) -> int:
+    global _size
+    start = _size
+    _size += n
+    return start
+
+
+def _values() -> list[float]:
+    """This thread's shard, grown to cover series bound since it was created."""
+    try:
+        values = _local.values
+    except AttributeError:
+        values = _local.values = []
+        with _lock:
+            _shards.append(values)
+    if len(values) < _size:
+        values.extend([0] * (_size - len(values)))
+    return values
+
+
+def _total(slot: int) -> float:
+    return sum(shard[slot] for shard in _shards if len(shard) > slot)
+
+
+class _Series:
+    __slots__ = ("slot",)
+
+    def __init__(self, slot: int):
+        self.slot = slot
+
+    def inc(self, amount: float = 1) -> None:
+        _values()[self.slot] += amount
+
+    def dec(self, amount: float = 1) -> None:
+        _values()[self.slot] -= amount
+
+    def value(self) -> float:
+        return _total(self.slot)
+
+
+class _HistogramSeries:
+    """Per-bucket counts (not cumulative) followed by the sum of observations."""
+
+    __slots__ = ("slot", "bounds")
+
+    def __init__(self, slot: int, bounds: tuple[float, ...]):
+        self.slot = slot
+        self.bounds = bounds
+
+    def observe(self, value: float) -> None:
+        values = _values()
+        values[self.slot + bisect.bisect_left(self.bounds, value)] += 1
+        values[self.slot + len(self.bounds) + 1] += value
+
+    def counts(self) -> tuple[list[float], float]:
+        n = len(self.bounds) + 1
+        return [_total(self.slot + i) for i in range(n)], _total(self.slot + n)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), fn: Callable | None = None):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        # Scrape-time source: a number, or {label values tuple: number}
+        self.fn = fn
+        self._series: dict[tuple, object] = {}
+        with _lock:
+            _metrics.append(self)
+        if not labels and fn is None:
+            self.labels()
+
+    def _new(self):
+        return _Series(_allocate(1))
+
+    def labels(self, *values):
+        """The series for these label values, bound on first use; keep it for hot paths."""
+        series = self._series.get(values)
+        if series is None:
+            with _lock:
+                series = self._series.get(values)
+                if series is None:
+                    series = self._series[values] = self._new()
+        return series
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1) -> None:
+        self.labels().dec(amount)
+
+    def _samples(self) -> list[tuple[tuple, float]]:
+        if self.fn is not None:
+            data = self.fn()
+            return list(data.items()) if isinstance(data, dict) else [((), data)]
+        return [(values, series.value()) for values, series in list(self._series.items())]
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, value in self._samples():
+            lines.append(f"{self.name}{_labels(self.label_names, values)} {_number(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labels)
+
+    def _new(self):
+        return _HistogramSeries(_allocate(len(self.buckets) + 2), self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, series in list(self._series.items()):
+            counts, total = series.counts()
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, values, le)} {_number(cumulative)}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, values)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, values)} {_number(cumulative)}")
+        return lines
+
+
+async def counted(gauge: Gauge, stream: AsyncIterator):
+    """
+    Yield from stream while it is counted in gauge (e.g. open SSE streams).
+    Closing this iterator (a client disconnect) also closes stream, so its
+    cleanup runs now rather than whenever it is garbage collected.
+    """
+    gauge.inc()
+    try:
+        async for chunk in stream:
+            yield chunk
+    finally:
+        gauge.dec()
+        if hasattr(stream, "aclose"):
+            await stream.aclose()
+
+
+def render() -> str:
+    lines: list[str] = []
+    for metric in list(_metrics):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ── Requests ──
+
+http_requests = Counter(
+    "mobileagents_http_requests_total", "HTTP requests by route template, method and status class.",
+    ("route", "method", "status"),
+)
+http_latency = Histogram(
+    "mobileagents_http_request_duration_seconds",
+    "Time until the response starts (for SSE streams, until the stream opens).",
+    ("route", "method"),
+)
+
+
+class _RouteSeries:
+    __slots__ = ("by_status", "latency")
+
+    def __init__(self, route: str, method: str):
+        self.by_status = [http_requests.labels(route, method, f"{i}xx") for i in range(1, 6)]
+        self.latency = http_latency.labels(route, method)
+
+    def observe(self, status: int, seconds: float) -> None:
+        self.by_status[min(max(status // 100, 1), 5) - 1].inc()
+        self.latency.observe(seconds)
+
+
+_routes: dict[str, dict[str, _RouteSeries]] = {}
+
+
+def route_series(route: str, method: str) -> _RouteSeries:
+    by_method = _routes.get(route)
+    series = by_method.get(method) if by_method is not None else None
+    if series is None:
+        with _lock:
+            series = _routes.setdefault(route, {}).get(method)
+        if series is None:
+            series = _RouteSeries(route, method)
+            with _lock:
+                series = _routes[route].setdefault(method, series)
+    return series
+
+
+sse_streams = Gauge("mobileagents_sse_streams_active", "Open /api/execute SSE streams.")
+executions_in_flight = Gauge("mobileagents_executions_in_flight", "Plans executing (interactive, batch and monitor runs).")
+executions = Counter("mobileagents_executions_total", "Finished plan executions by outcome.", ("outcome",))
+for _outcome in ("complete", "failed", "aborted"):
+    executions.labels(_outcome)
+execution_latency = Histogram("mobileagents_execution_duration_seconds", "Plan execution time, start to final event.")
+approvals_pending = Gauge("mobileagents_approvals_pending", "Checkpoints waiting for approval.")
+
+# ── Tools (upstream calls; cache hits are counted under tool_cache) ──
+
+tool_calls = Counter("mobileagents_tool_calls_total", "Upstream tool calls by tool and outcome.", ("tool", "outcome"))
+tool_latency = Histogram("mobileagents_tool_call_duration_seconds", "Upstream tool call time.", ("tool",))
+
+# ── LLM calls per call site (model router role) ──
+
+llm_calls = Counter("mobileagents_llm_calls_total", "LLM calls by call site, model and outcome.", ("call_site", "model", "outcome"))
+llm_latency = Histogram("mobileagents_llm_call_duration_seconds", "LLM call time by call site.", ("call_site",))
+llm_tokens = Counter(
+    "mobileagents_llm_tokens_total", "LLM tokens by call site and kind (prompt, completion, cached prompt).",
+    ("call_site", "kind"),
+)
+llm_agent_tokens = Counter(
+    "mobileagents_llm_agent_tokens_total", "LLM prompt + completion tokens by call site and plan agent.",
+    ("call_site", "agent"),
+)
+llm_cost = Counter("mobileagents_llm_cost_usd_total", "Estimated LLM spend by call site and plan agent.", ("call_site", "agent"))
+
+# ── Event loop (services/loop_monitor.py) ──
+
+loop_lag = Histogram(
+    "mobileagents_event_loop_lag_seconds", "How late the loop monitor's heartbeat woke up.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+loop_blocks = Counter(
+    "mobileagents_event_loop_blocks_total", "Loop stalls over the threshold by route and call site.",
+    ("route", "call_site"),
+)
+loop_blocked_seconds = Counter(
+    "mobileagents_event_loop_blocked_seconds_total", "Time the loop was stalled, by route and call site.",
+    ("route", "call_site"),
+)
+
+
+# ── asyncio.to_thread pool ──
+
+
+def _pool_stats() -> dict[str, int]:
+    try:
+        executor = asyncio.get_running_loop()._default_executor
+    except (RuntimeError, AttributeError):
+        executor = None
+    if executor is None:
+        # Created on the first to_thread call, with ThreadPoolExecutor's default size
+        return {"max": min(32, (os.cpu_count() or 1) + 4), "threads": 0, "busy": 0, "queued": 0}
+    threads = len(executor._threads)
+    idle = executor._idle_semaphore._value
+    return {
+        "max": executor._max_workers,
+        "threads": threads,
+        "busy": max(0, threads - idle),
+        "queued": executor._work_queue.qsize(),
+    }
+
+
+Gauge(
+    "mobileagents_to_thread_workers", "Default executor (asyncio.to_thread) workers: max, started, busy; and queued work items.",
+    ("state",), fn=lambda: {(k,): v for k, v in _pool_stats().items()},
+)
@@ -0,0 +1,217 @@
+"""
+Model routing for every LLM role in the server.
+
+Each role (planner, synthesizer, vision, transcription, worker, ...) resolves
+to an ordered chain of models: an optional small model for short requests,
+the configured primary model (or a per-agent override for workers), then any
+fallbacks. Calls walk the chain on errors or timeouts, are admitted through
+the process-wide LLM scheduler, and record latency and token usage per model
+in a ledger.
+"""
+
+import threading
+import time
+from typing import Any, Awaitable, Callable
+
+from config import settings
+from services import metrics, usage
+from services.llm_scheduler import llm_scheduler
+
+ROLES = (
+    "planner",
+    "synthesizer",
+    "synthesizer_fast",
+    "digest",
+    "vision",
+    "transcription",
+    "worker",
+)
+
+
+def _primary_model(role: str) -> str:
+    return {
+        "planner": settings.planner_model,
+        "synthesizer": settings.synthesizer_model,
+        "synthesizer_fast": settings.synthesis_fast_model,
+        "digest": settings.digest_model,
+        "vision": settings.vision_model,
+        "transcription": settings.transcription_model,
+        "worker": settings.worker_model,
+    }[role]
+
+
+class ModelLedger:
+    """Thread-safe per-model call, error, latency and token counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict] = {}
+
+    def record(
+        self,
+        model: str,
+        role: str,
+        latency_ms: float,
+        ok: bool,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+    ) -> None:
+        with self._lock:
+            s = self._stats.setdefault(model, {
+                "calls": 0,
+                "errors": 0,
+                "latencyMs": 0.0,
+                "maxLatencyMs": 0.0,
+                "promptTokens": 0,
+                "completionTokens": 0,
+                "roles": {},
+            })
+            s["calls"] += 1
+            s["errors"] += 0 if ok else 1
+            s["latencyMs"] += latency_ms
+            s["maxLatencyMs"] = max(s["maxLatencyMs"], latency_ms)
+            s["promptTokens"] += prompt_tokens
+            s["completionTokens"] += completion_tokens
+            s["roles"][role] = s["roles"].get(role, 0) + 1
+        metrics.llm_calls.labels(role, model, "ok" if ok else "error").inc()
+        metrics.llm_latency.labels(role).observe(latency_ms / 1000)
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            out = {}
+            for model, s in self._stats.items():
+                out[model] = {
+                    **s,
+                    "roles": dict(s["roles"]),
+                    "avgLatencyMs": round(s["latencyMs"] / s["calls"], 1) if s["calls"] else 0.0,
+                }
+            return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+def _scheduler_slots() -> dict:
+    snap = llm_scheduler.snapshot()
+    return {("inflight",): snap["inflight"], ("queued",): snap["queued"]}
+
+
+metrics.Gauge(
+    "mobileagents_llm_scheduler_calls", "LLM calls holding an admission slot (inflight) or waiting for one (queued).",
+    ("state",), fn=_scheduler_slots,
+)
+
+
+class ModelRouter:
+    """Resolves model chains per role and runs calls with fallback."""
+
+    def __init__(self):
+        self.ledger = ModelLedger()
+
+    def agent_model(self, agent_id: str) -> str | None:
+        """Per-agent model override from the agent store, if any."""
+        from services.agent_store import get_agent
+
+        return (get_agent(agent_id) or {}).get("model") or None
+
+    def chain(
+        self, role: str, size_tokens: int | None = None, agent_id: str | None = None
+    ) -> list[str]:
+        """Ordered, de-duplicated list of models to try for a call."""
+        if role not in ROLES:
+            raise ValueError(f"Unknown model role: {role}")
+        models: list[str] = []
+        if (
+            settings.model_routing_policy == "size"
+            and size_tokens is not None
+            and size_tokens <= settings.small_request_tokens
+            and settings.small_models.get(role)
+        ):
+            models.append(settings.small_models[role])
+        models.append((agent_id and self.agent_model(agent_id)) or _primary_model(role))
+        models.extend(settings.model_fallbacks.get(role, []))
+        return list(dict.fromkeys(models))
+
+    def model_for(
+        self, role: str, size_tokens: int | None = None, agent_id: str | None = None
+    ) -> str:
+        return self.chain(role, size_tokens, agent_id)[0]
+
+    def call(
+        self,
+        role: str,
+        fn: Callable[[str], Any],
+        size_tokens: int | None = None,
+        agent_id: str | None = None,
+        est_tokens: int | None = None,
+    ) -> tuple[Any, str]:
+        """
+        Call fn(model) for each model in the role's chain until one succeeds.
+        est_tokens (prompt + completion) is used for rate-limit admission and
+        defaults to size_tokens. Returns (result, model_used). Re-raises the
+        last error if all fail; SchedulerOverloaded is never retried.
+        """
+        last_error: Exception | None = None
+        est = est_tokens if est_tokens is not None else (size_tokens or 0)
+        for model in self.chain(role, size_tokens, agent_id):
+            with llm_scheduler.slot(role, est):
+                start = time.perf_counter()
+                try:
+                    result = fn(model)
+                except Exception as e:
+                    self._record_failure(model, role, start)
+                    last_error = e
+                    continue
+            self._record_success(model, role, start, result)
+            return result, model
+        raise last_error
+
+    async def acall(
+        self,
+        role: str,
+        fn: Callable[[str], Awaitable[Any]],
+        size_tokens: int | None = None,
+        agent_id: str | None = None,
+        est_tokens: int | None = None,
+    ) -> tuple[Any, str]:
+        """Async variant of call() for coroutine-returning callables."""
+        last_error: Exception | None = None
+        est = est_tokens if est_tokens is not None else (size_tokens or 0)
+        for model in self.chain(role, size_tokens, agent_id):
+            async with llm_scheduler.aslot(role, est):
+                start = time.perf_counter()
+                try:
+                    result = await fn(model)
+                except Exception as e:
+                    self._record_failure(model, role, start)
+                    last_error = e
+                    continue
+            self._record_success(model, role, start, result)
+            return result, model
+        raise last_error
+
+    def _record_success(self, model: str, role: str, start: float, result: Any) -> None:
+        latency_ms = (time.perf_counter() - start) * 1000
+        rec = usage.record(role, model, latency_ms, result)
+        self.ledger.record(
+            model, role, latency_ms, ok=True,
+            prompt_tokens=rec["promptTokens"], completion_tokens=rec["completionTokens"],
+        )
+
+    def _record_failure(self, model: str, role: str, start: float) -> None:
+        latency_ms = (time.perf_counter() - start) * 1000
+        usage.record(role, model, latency_ms, ok=False)
+        self.ledger.record(model, role, latency_ms, ok=False)
+
+    def describe(self) -> dict:
+        """Current routing configuration, for the models endpoint."""
+        return {
+            "policy": settings.model_routing_policy,
+            "smallRequestTokens": settings.small_request_tokens,
+            "roles": {role: self.chain(role) for role in ROLES},
+            "smallModels": dict(settings.small_models),
+        }
+
+
+model_router = ModelRouter()
@@ -0,0 +1,306 @@
+"""
+Scheduled monitoring runs over saved plans.
+
+A monitor pairs a saved plan with a cron-style schedule and keeps a
+high-water mark per arXiv topic: the newest submittedDate seen so far.
+Each run passes the mark to the plan's arxiv_search steps as "since", so
+only newer papers are fetched and summarized; the execution tracker skips
+downstream steps and synthesis when nothing is new. Monitors persist to
+monitors.json, and the in-process scheduler runs due monitors with at
+most monitor_max_concurrent in flight.
+"""
+
+import asyncio
+import copy
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from config import settings
+from services import usage
+
+MONITORS_FILE = Path(__file__).parent.parent / "monitors.json"
+
+_monitors: dict[str, dict] = {}
+
+_CRON_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+# (min, max) of minute, hour, day of month, month, day of week (0/7 = Sunday)
+_CRON_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def _parse_field(spec: str, lo: int, hi: int) -> set[int]:
+    """Values of one cron field: *, n, a-b, with optional /step, comma-separated."""
+    values: set[int] = set()
+    for part in spec.split(","):
+        rng, _, step = part.partition("/")
+        if rng == "*":
+            start, end = lo, hi
+        elif "-" in rng:
+            start, end = (int(v) for v in rng.split("-", 1))
+        else:
+            start = int(rng)
+            end = hi if step else start
+        every = int(step) if step else 1
+        if start < lo or end > hi or start > end or every < 1:
+            raise ValueError(f"Invalid cron field: {part!r}")
+        values.update(range(start, end + 1, every))
+    return values
+
+
+class CronSchedule:
+    """Five-field cron expression (minute hour day-of-month month day-of-week), in UTC."""
+
+    def __init__(self, expr: str):
+        fields = _CRON_ALIASES.get(expr.strip(), expr).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expr!r}")
+        self.expr = expr
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _parse_field(f, lo, hi) for f, (lo, hi) in zip(fields, _CRON_RANGES)
+        )
+        self.weekdays = {d % 7 for d in weekdays}
+        # As in cron: when both day fields are restricted, either may match
+        self._either_day = fields[2] != "*" and fields[4] != "*"
+
+    def _day_matches(self, t: datetime) -> bool:
+        dom = t.day in self.days
+        dow = t.isoweekday() % 7 in self.weekdays
+        return (dom or dow) if self._either_day else (dom and dow)
+
+    def next_after(self, after: datetime) -> datetime:
+        """First matching minute strictly after the given time."""
+        t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Long enough for Feb 29 schedules
+        limit = t + timedelta(days=366 * 8)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = (t + timedelta(days=1)).replace(hour=0, minute=0)
+            elif t.hour not in self.hours:
+                t = (t + timedelta(hours=1)).replace(minute=0)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"Cron expression never fires: {self.expr!r}")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _topic(step: dict) -> str | None:
+    """High-water key of a monitored step: the normalized arXiv query."""
+    query = step.get("params", {}).get("query")
+    if step.get("action") != "arxiv_search" or not query:
+        return None
+    return " ".join(str(query).lower().split())
+
+
+# ---------------------------------------------------------------------------
+# JSON-file-backed CRUD
+# ---------------------------------------------------------------------------
+
+
+def load_monitors() -> None:
+    global _monitors
+    if MONITORS_FILE.exists():
+        try:
+            _monitors = {m["id"]: m for m in json.loads(MONITORS_FILE.read_text())}
+            return
+        except Exception:
+            pass
+    _monitors = {}
+
+
+def _save() -> None:
+    MONITORS_FILE.write_text(json.dumps(list(_monitors.values()), indent=2))
+
+
+def get_monitors() -> list[dict]:
+    return list(_monitors.values())
+
+
+def get_monitor(monitor_id: str) -> dict | None:
+    return _monitors.get(monitor_id)
+
+
+def create_monitor(data: dict) -> dict:
+    """Create a monitor; raises ValueError for an invalid schedule."""
+    schedule = CronSchedule(data["schedule"])
+    monitor = {
+        "id": data.get("id") or uuid.uuid4().hex[:12],
+        "name": data.get("name", ""),
+        "userId": data.get("userId"),  # usage of its runs is attributed to the creator
+        "plan": data["plan"],
+        "schedule": data["schedule"],
+        "enabled": data.get("enabled", True),
+        "highWater": {},
+        "nextRunAt": schedule.next_after(_now()).isoformat(),
+        "lastRunAt": None,
+        "lastStatus": None,
+        "lastSummary": None,
+        "newPapers": 0,
+    }
+    _monitors[monitor["id"]] = monitor
+    _save()
+    return monitor
+
+
+def update_monitor(monitor_id: str, data: dict) -> dict | None:
+    """Update name/plan/schedule/enabled; raises ValueError for an invalid schedule."""
+    monitor = _monitors.get(monitor_id)
+    if monitor is None:
+        return None
+    if "schedule" in data:
+        monitor["nextRunAt"] = CronSchedule(data["schedule"]).next_after(_now()).isoformat()
+    for key in ("name", "plan", "schedule", "enabled"):
+        if key in data:
+            monitor[key] = data[key]
+    _save()
+    return monitor
+
+
+def delete_monitor(monitor_id: str) -> bool:
+    if _monitors.pop(monitor_id, None) is None:
+        return False
+    _save()
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Runs
+# ---------------------------------------------------------------------------
+
+
+async def run_monitor(monitor_id: str) -> dict | None:
+    """
+    Execute a monitor's plan once, fetching only papers newer than each
+    topic's high-water mark. The marks advance only after a successful run,
+    so a failed run retries the same papers next time.
+    """
+    from services.execution_tracker import execute_plan_stream
+
+    monitor = _monitors.get(monitor_id)
+    if monitor is None:
+        return None
+    plan = copy.deepcopy(monitor["plan"])
+    marks = monitor.get("highWater", {})
+    for step in plan.get("steps", []):
+        topic = _topic(step)
+        if topic in marks:
+            step.setdefault("params", {})["since"] = marks[topic]
+
+    results: dict = {}
+    status, summary, records = "failed", None, []
+    attribution = {"userId": monitor.get("userId"), "source": f"monitor:{monitor_id}"}
+    try:
+        async for chunk in execute_plan_stream(
+            plan, {"nodes": [], "edges": []}, api_key=settings.openai_api_key,
+            results_out=results, usage_attribution=attribution,
+        ):
+            event = json.loads(chunk[6:])
+            if event["type"] == "execution_complete":
+                status = "unchanged" if event.get("unchanged") else "completed"
+                summary = event.get("summary") or None
+            elif event["type"] == "usage":
+                records.extend(event["records"])
+    except Exception as e:
+        summary = f"Monitor run failed: {e}"
+    finally:
+        await usage.persist(records)
+
+    new_papers = 0
+    if status != "failed":
+        marks = dict(marks)
+        for step in plan.get("steps", []):
+            topic, result = _topic(step), results.get(step["id"])
+            if topic is None or result is None or result.is_error:
+                continue
+            new_papers += len(result.papers)
+            # A since search returns the oldest new papers first when there
+            # are more than it fetches, so the newest one it saw is the mark
+            dates = [p.published for p in result.papers if p.published]
+            if topic in marks:
+                dates.append(marks[topic])
+            if dates:
+                marks[topic] = max(dates)
+        monitor["highWater"] = marks
+
+    monitor.update({
+        "lastRunAt": _now().isoformat(),
+        "lastStatus": status,
+        "newPapers": new_papers,
+    })
+    if summary:
+        monitor["lastSummary"] = summary
+    _save()
+    return monitor
+
+
+class MonitorScheduler:
+    """Starts due monitors from a background loop, capping concurrent runs."""
+
+    def __init__(self, max_concurrent: int = 2):
+        self.max_concurrent = max_concurrent
+        self._running: dict[str, asyncio.Task] = {}
+        self._sem: asyncio.Semaphore | None = None
+        self._loop_task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._loop_task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        tasks = [t for t in (self._loop_task, *self._running.values()) if t]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+
+    async def _loop(self) -> None:
+        while True:
+            self.tick()
+            await asyncio.sleep(settings.monitor_tick_seconds)
+
+    def tick(self, now: datetime | None = None) -> list[str]:
+        """Start every enabled monitor whose next run is due; returns their ids."""
+        now = now or _now()
+        started = []
+        for monitor in list(_monitors.values()):
+            if not monitor.get("enabled") or monitor["id"] in self._running:
+                continue
+            if datetime.fromisoformat(monitor["nextRunAt"]) > now:
+                continue
+            monitor["nextRunAt"] = CronSchedule(monitor["schedule"]).next_after(now).isoformat()
+            self.run_now(monitor["id"])
+            started.append(monitor["id"])
+        if started:
+            _save()
+        return started
+
+    def run_now(self, monitor_id: str) -> asyncio.Task:
+        """Queue a run (joining one already in flight) behind the concurrency cap."""
+        if monitor_id in self._running:
+            return self._running[monitor_id]
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_concurrent)
+        task = asyncio.create_task(self._run(monitor_id))
+        self._running[monitor_id] = task
+        return task
+
+    async def _run(self, monitor_id: str) -> dict | None:
+        try:
+            async with self._sem:
+                return await run_monitor(monitor_id)
+        finally:
+            self._running.pop(monitor_id, None)
+
+
+monitor_scheduler = MonitorScheduler(settings.monitor_max_concurrent)
@@ -0,0 +1,101 @@
+"""
+Per-execution index of papers seen across tool results.
+
+Papers from arXiv and Semantic Scholar are resolved to one entity by arXiv
+id (version stripped), DOI, Semantic Scholar id or normalized title, and
+the records are merged so an arXiv paper picks up citation counts from a
+Semantic Scholar hit (and vice versa). Later search steps only show papers
+that earlier searches have not, and fetch-style actions skip papers already
+fetched by the same action.
+"""
+
+import re
+
+from crew.tools import render_result
+from models.results import Paper, ToolResult
+from services.tokens import count_tokens
+
+# Actions that fetch details for one paper at a time
+_FETCH_ACTIONS = {"arxiv_summarize", "semantic_scholar_cite"}
+
+_ARXIV_ITEM_RE = re.compile(r"(?:arxiv\.org/abs/|^ARXIV:)(.+)$", re.I)
+
+
+def _item_key(item: str) -> str:
+    """Index key of a fetch item (arXiv URL, ARXIV:<id>, DOI or S2 id)."""
+    m = _ARXIV_ITEM_RE.search(item)
+    if m:
+        return "arxiv:" + re.sub(r"v\d+$", "", m.group(1))
+    if item.startswith("10."):
+        return f"doi:{item.lower()}"
+    return f"s2:{item}"
+
+
+class PaperIndex:
+    def __init__(self):
+        self._entities: list[Paper] = []
+        self._by_key: dict[str, int] = {}
+        self._shown: set[int] = set()
+        self._fetched: dict[str, set[int]] = {}
+        self.stats = {
+            "papers": 0,
+            "merged": 0,
+            "duplicatesRemoved": 0,
+            "fetchesSkipped": 0,
+            "tokensSaved": 0,
+        }
+
+    def _resolve(self, paper: Paper) -> int:
+        """Entity id for a paper, creating or merging the entity as needed."""
+        keys = paper.keys
+        idx = next((self._by_key[k] for k in keys if k in self._by_key), None)
+        if idx is None:
+            # Copy: results may be shared through the tool cache
+            self._entities.append(paper.model_copy(deep=True))
+            idx = len(self._entities) - 1
+            self.stats["papers"] += 1
+        elif self._entities[idx].merge_from(paper):
+            self.stats["merged"] += 1
+        for k in self._entities[idx].keys + keys:
+            self._by_key.setdefault(k, idx)
+        return idx
+
+    def absorb(self, result: ToolResult) -> tuple[ToolResult, ToolResult]:
+        """
+        Register a step's papers. Returns (full, deduped): full lists every
+        paper of the step as merged entities (for downstream steps); deduped
+        drops papers already shown by earlier steps (for display/synthesis).
+        """
+        if result.kind != "papers" or not result.papers:
+            return result, result
+        ids = list(dict.fromkeys(self._resolve(p) for p in result.papers))
+        # Listings are deduped against earlier listings; fetches (which add
+        # detail to listed papers) only against earlier fetches of the same kind
+        seen = (
+            self._fetched.setdefault(result.action, set())
+            if result.action in _FETCH_ACTIONS
+            else self._shown
+        )
+        fresh = [i for i in ids if i not in seen]
+        seen.update(ids)
+
+        full = result.model_copy(update={"papers": [self._entities[i] for i in ids]})
+        omitted = len(result.papers) - len(fresh)
+        if not omitted:
+            return full, full
+        deduped = result.model_copy(
+            update={"papers": [self._entities[i] for i in fresh], "omitted": result.omitted + omitted}
+        )
+        self.stats["duplicatesRemoved"] += omitted
+        self.stats["tokensSaved"] += max(
+            0, count_tokens(render_result(full)) - count_tokens(render_result(deduped))
+        )
+        return full, deduped
+
+    def already_fetched(self, action: str, item: str) -> bool:
+        """True if a fetch action already retrieved this item in this execution."""
+        idx = self._by_key.get(_item_key(item))
+        if idx is not None and idx in self._fetched.get(action, ()):
+            self.stats["fetchesSkipped"] += 1
+            return True
+        return False
@@ -0,0 +1,182 @@
+"""
+Instantiate saved plan templates without calling the planner LLM.
+
+A template is a plan whose step descriptions and params may contain
+"{slot}" placeholders, plus typed slots (string, integer, number, boolean,
+enum). Instantiation coerces the arguments to their slot types,
+substitutes them, validates the resulting plan (known agents and actions,
+tool params, dependency order, map steps) and builds its execution graph.
+"""
+
+import inspect
+import re
+import uuid
+
+from pydantic import ValidationError
+
+from crew.orchestrator import TaskPlan, build_graph
+from crew.tools import TOOL_FUNCTIONS
+from services.agent_store import get_agent
+from services.execution_tracker import MAP_ITEM_EXTRACTORS, REDUCERS
+
+SLOT_TYPES = ("string", "integer", "number", "boolean", "enum")
+
+_PLACEHOLDER_RE = re.compile(r"\{(\w+)\}")
+_TRUE = {"true", "1", "yes", "on"}
+_FALSE = {"false", "0", "no", "off"}
+
+
+class TemplateError(ValueError):
+    """Invalid template, template arguments or instantiated plan."""
+
+
+def _coerce(slot: dict, value):
+    name, kind = slot["name"], slot.get("type", "string")
+    try:
+        if kind == "string":
+            return str(value)
+        if kind == "integer" and not isinstance(value, (bool, float)):
+            return int(value)
+        if kind == "number" and not isinstance(value, bool):
+            return float(value)
+        if kind == "boolean":
+            if isinstance(value, bool):
+                return value
+            if str(value).lower() in _TRUE | _FALSE:
+                return str(value).lower() in _TRUE
+        if kind == "enum" and value in slot.get("options", []):
+            return value
+    except (TypeError, ValueError):
+        pass
+    expected = f"one of {slot.get('options', [])}" if kind == "enum" else kind
+    raise TemplateError(f"Slot '{name}' expects {expected}, got {value!r}")
+
+
+def bind_args(template: dict, args: dict) -> dict:
+    """Slot values from the arguments and slot defaults, coerced to slot types."""
+    slots = {s["name"]: s for s in template.get("slots", [])}
+    unknown = sorted(set(args) - set(slots))
+    if unknown:
+        raise TemplateError(f"Unknown template arguments: {', '.join(unknown)}")
+    values = {}
+    for name, slot in slots.items():
+        if name in args:
+            values[name] = _coerce(slot, args[name])
+        elif slot.get("default") is not None:
+            values[name] = _coerce(slot, slot["default"])
+        else:
+            raise TemplateError(f"Missing template argument: {name}")
+    return values
+
+
+def _fill(value, values: dict):
+    """Substitute placeholders; a value that is exactly "{slot}" keeps the slot's type."""
+    if isinstance(value, str):
+        m = _PLACEHOLDER_RE.fullmatch(value)
+        if m and m.group(1) in values:
+            return values[m.group(1)]
+        return _PLACEHOLDER_RE.sub(
+            lambda m: str(values[m.group(1)]) if m.group(1) in values else m.group(0), value
+        )
+    if isinstance(value, dict):
+        return {k: _fill(v, values) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_fill(v, values) for v in value]
+    return value
+
+
+def validate_plan(plan: dict) -> None:
+    """Raise TemplateError listing every problem that would break execution."""
+    errors = []
+    seen: set[str] = set()
+    for step in plan["steps"]:
+        sid, action = step["id"], step["action"]
+        if sid in seen:
+            errors.append(f"{sid}: duplicate step id")
+        agent = get_agent(step["agent_id"])
+        if agent is None or not agent.get("enabled", True):
+            errors.append(f"{sid}: agent '{step['agent_id']}' is not available")
+        func = TOOL_FUNCTIONS.get(action)
+        if func is None:
+            errors.append(f"{sid}: unknown action '{action}'")
+        else:
+            accepted = inspect.signature(func).parameters
+            for param in step["params"]:
+                if param not in accepted:
+                    errors.append(f"{sid}: {action} has no param '{param}'")
+        # Dependencies must be earlier steps, which also rules out cycles
+        for dep in step["depends_on"]:
+            if dep not in seen:
+                errors.append(f"{sid}: depends on unknown or later step '{dep}'")
+        if step["type"] == "map":
+            if action not in MAP_ITEM_EXTRACTORS:
+                errors.append(f"{sid}: '{action}' cannot be mapped")
+            if not step["depends_on"] or (step["map_over"] and step["map_over"] not in step["depends_on"]):
+                errors.append(f"{sid}: map steps must depend on their map_over step")
+            if step["reducer"] not in REDUCERS:
+                errors.append(f"{sid}: unknown reducer '{step['reducer']}'")
+        elif step["type"] != "tool":
+            errors.append(f"{sid}: unknown step type '{step['type']}'")
+        seen.add(sid)
+    if not plan["steps"]:
+        errors.append("plan has no steps")
+    if errors:
+        raise TemplateError("; ".join(errors))
+
+
+def _build_plan(template: dict, values: dict) -> dict:
+    steps = []
+    for step in template.get("steps", []):
+        agent = get_agent(step.get("agent_id", "")) or {}
+        steps.append({
+            **step,
+            "description": _fill(step.get("description", ""), values),
+            "params": _fill(step.get("params", {}), values),
+            # Same rule the planner follows for approval-gated agents
+            "requires_approval": bool(step.get("requires_approval") or agent.get("requiresApproval")),
+            "depends_on": list(step.get("depends_on", [])),
+        })
+    summary = _fill(template.get("summary") or template.get("name", ""), values)
+    try:
+        plan = TaskPlan.model_validate({"summary": summary, "steps": steps}).model_dump()
+    except ValidationError as e:
+        raise TemplateError(f"Invalid template steps: {e.errors()[0]['msg']}") from e
+    validate_plan(plan)
+    return plan
+
+
+def check_template(template: dict) -> None:
+    """Validate a template's slots and steps by instantiating it with sample values."""
+    names = [s.get("name", "") for s in template.get("slots", [])]
+    if len(set(names)) != len(names) or not all(n.isidentifier() for n in names):
+        raise TemplateError("Slot names must be unique identifiers")
+    samples = {"string": "x", "integer": 1, "number": 1.0, "boolean": True}
+    values = {}
+    for slot in template.get("slots", []):
+        kind = slot.get("type", "string")
+        if kind not in SLOT_TYPES:
+            raise TemplateError(f"Slot '{slot['name']}' has unknown type '{kind}'")
+        if kind == "enum" and not slot.get("options"):
+            raise TemplateError(f"Enum slot '{slot['name']}' needs options")
+        if slot.get("default") is not None:
+            values[slot["name"]] = _coerce(slot, slot["default"])
+        else:
+            values[slot["name"]] = slot["options"][0] if kind == "enum" else samples[kind]
+    text = str(template.get("summary", "")) + str(template.get("steps", []))
+    missing = sorted({m for m in _PLACEHOLDER_RE.findall(text)} - set(names))
+    if missing:
+        raise TemplateError(f"Placeholders without slots: {', '.join(missing)}")
+    _build_plan(template, values)
+
+
+def instantiate(template: dict, args: dict) -> dict:
+    """Plan and graph for a template, in the same shape as the planner's output."""
+    values = bind_args(template, args)
+    plan = _build_plan(template, values)
+    task_id = str(uuid.uuid4())[:8]
+    plan["id"] = task_id
+    plan["user_message"] = plan["summary"]
+    plan["template"] = {"id": template["id"], "args": values}
+    graph = build_graph(plan, plan["summary"])
+    graph["taskId"] = task_id
+    return {"plan": plan, "graph": graph}
@@ -0,0 +1,121 @@
+"""
+Query-level prefetch that overlaps tool calls with LLM planning.
+
+Candidate search queries are derived locally from the user's message (and
+image analysis, once available) and issued against the read-only search
+tools through the shared tool cache while the planner runs. When the plan's
+steps use the same queries they are served from the cache or joined in
+flight. Hit rate is tracked by the tool cache ("prefetchHitRate").
+"""
+
+import asyncio
+import re
+
+from config import settings
+from crew.tools import TOOL_FUNCTIONS
+from services.agent_store import get_agent
+from services.tool_cache import tool_cache
+
+# Words that frame a request rather than describe its topic
+_FRAMING_WORDS = {
+    "a", "about", "all", "an", "and", "any", "arxiv", "articles", "article",
+    "background", "can", "citation", "citations", "could", "do", "explain",
+    "find", "for", "get", "give", "i", "in", "is", "latest", "literature",
+    "look", "lookup", "me", "new", "of", "on", "paper", "papers", "please",
+    "recent", "research", "review", "scholar", "search", "semantic", "show",
+    "some", "summarise", "summarize", "summary", "tell", "the", "up", "want",
+    "what", "wiki", "wikipedia", "with", "you", "are", "regarding", "to",
+    "work", "works", "it", "them", "this", "that", "developments",
+}
+# Clause boundaries: punctuation, "then", and "and" before a follow-up action
+_CLAUSE_RE = re.compile(
+    r"\s*(?:,|;|\.|\band then\b|\bthen\b"
+    r"|\band (?=post|send|share|write|draft|summari[sz]e|generate)\b)\s*",
+    re.I,
+)
+_TOKEN_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9\-+.']*")
+_DELIVERY_RE = re.compile(r"[#@]|\b(?:post|send|share|message|slack|email)\b", re.I)
+
+# Search tool -> agent that must be enabled for the planner to use it
+_SEARCH_TOOLS = {
+    "arxiv_search": "arxiv",
+    "semantic_scholar_search": "semantic_scholar",
+    "wiki_search": "wikipedia",
+}
+
+
+def _strip_framing(tokens: list[str]) -> list[str]:
+    start, end = 0, len(tokens)
+    while start < end and tokens[start].lower() in _FRAMING_WORDS:
+        start += 1
+    while end > start and tokens[end - 1].lower() in _FRAMING_WORDS:
+        end -= 1
+    return tokens[start:end]
+
+
+def candidate_queries(message: str, image_analysis: str | None = None, limit: int = 2) -> list[str]:
+    """Derive likely search queries: the topic phrase of each clause, then image keywords."""
+    queries: list[str] = []
+    for clause in _CLAUSE_RE.split(message or ""):
+        # Skip clauses about delivery (channels, users) rather than topics
+        if _DELIVERY_RE.search(clause):
+            continue
+        tokens = _strip_framing(_TOKEN_RE.findall(clause))
+        if tokens:
+            queries.append(" ".join(tokens))
+    if image_analysis:
+        counts: dict[str, int] = {}
+        for tok in _TOKEN_RE.findall(image_analysis.lower()):
+            if tok not in _FRAMING_WORDS and len(tok) > 3:
+                counts[tok] = counts.get(tok, 0) + 1
+        keywords = sorted(counts, key=lambda t: -counts[t])[:4]
+        if keywords:
+            queries.append(" ".join(keywords))
+    return list(dict.fromkeys(q for q in queries if q))[:limit]
+
+
+def candidate_tools(message: str) -> list[str]:
+    """Search tools the planner is likely to pick for this message."""
+    text = (message or "").lower()
+    tools = []
+    if any(w in text for w in ("paper", "arxiv", "literature", "research", "publication")):
+        tools += ["arxiv_search", "semantic_scholar_search"]
+    if any(w in text for w in ("citation", "cited", "impact", "scholar")):
+        tools.append("semantic_scholar_search")
+    if any(w in text for w in ("wiki", "background", "what is", "overview", "explain")):
+        tools.append("wiki_search")
+    if not tools:
+        tools = ["arxiv_search", "wiki_search"]
+    return [
+        t for t in dict.fromkeys(tools)
+        if (get_agent(_SEARCH_TOOLS[t]) or {}).get("enabled", True)
+    ]
+
+
+class Prefetcher:
+    """Per-request prefetch with a fixed call budget."""
+
+    def __init__(self, max_calls: int | None = None):
+        self.budget = settings.prefetch_max_calls if max_calls is None else max_calls
+        self.issued: set[tuple[str, str]] = set()
+        self.tasks: list[asyncio.Task] = []
+
+    def start(self, message: str, image_analysis: str | None = None) -> None:
+        """Issue prefetch calls in the background; never raises."""
+        tools = candidate_tools(message)
+        for query in candidate_queries(message, image_analysis):
+            for tool in tools:
+                if len(self.issued) >= self.budget:
+                    return
+                if (tool, query.lower()) in self.issued:
+                    continue
+                self.issued.add((tool, query.lower()))
+                self.tasks.append(asyncio.create_task(self._fetch(tool, query)))
+
+    async def _fetch(self, tool: str, query: str) -> None:
+        try:
+            await asyncio.to_thread(
+                tool_cache.call, tool, TOOL_FUNCTIONS[tool], {"query": query}, "prefetch"
+            )
+        except Exception:
+            pass
@@ -0,0 +1,259 @@
+"""
+On-demand sampling profiler.
+
+While at least one Profile is active, a sampler thread reads every
+thread's stack (sys._current_frames) each profiler_interval seconds and
+adds it to the active profiles. Stacks are rooted at the thread they ran
+on: "event_loop" for the loop thread, "to_thread" for the default executor
+workers (asyncio_N), otherwise the thread name. Idle threads (the loop
+waiting in select, workers waiting for work) are not counted, so the
+output shows where CPU and blocking time went in CrewAI, pydantic,
+OpenAI client code and ours.
+
+A Profile covers a fixed number of seconds, the next K matching requests,
+or one request sent with an X-Profile header carrying profiler_secret. It renders as collapsed
+stacks (flamegraph.pl, speedscope import) or speedscope JSON. Samples are
+process-wide: a request profile includes whatever else ran while it was
+in flight.
+"""
+
+import hmac
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+
+from config import settings
+
+_SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+_WORKER_NAME = re.compile(r"asyncio_\d+")
+# Innermost frames of a thread with nothing to do
+_IDLE = {("selectors.py", "select"), ("thread.py", "_worker"), ("threading.py", "wait"), ("queue.py", "get")}
+
+
+class ProfilerBusy(Exception):
+    """Raised when profiler_max_active profiles are already running."""
+
+
+class Profile:
+    def __init__(self, kind: str, requests: int = 0, routes: tuple[str, ...] = ()):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind  # "seconds" | "requests" | "request"
+        self.remaining = requests
+        self.routes = routes
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+        self.samples = 0
+        self.started = time.time()  # for "requests" profiles, when armed
+        self.duration = 0.0
+        self.done = False
+        self._inflight = 0
+
+    def to_collapsed(self) -> str:
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def to_speedscope(self) -> dict:
+        frames: list[dict] = []
+        index: dict[str, int] = {}
+
+        def frame_id(label: str) -> int:
+            if label not in index:
+                index[label] = len(frames)
+                name, _, where = label.partition(" (")
+                file, _, line = where.rstrip(")").rpartition(":")
+                frames.append({"name": name, "file": file, "line": int(line)} if line.isdigit() else {"name": label})
+            return index[label]
+
+        by_thread: dict[str, list[tuple[list[int], int]]] = {}
+        for stack, count in self.stacks.items():
+            by_thread.setdefault(stack[0], []).append(([frame_id(f) for f in stack[1:]], count))
+        interval = settings.profiler_interval
+        profiles = []
+        for thread, samples in sorted(by_thread.items()):
+            total = sum(count for _, count in samples) * interval
+            profiles.append({
+                "type": "sampled",
+                "name": thread,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(total, 6),
+                "samples": [stack for stack, _ in samples],
+                "weights": [round(count * interval, 6) for _, count in samples],
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"mobile-agents {self.kind} profile {self.id}",
+            "exporter": "mobile-agents",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def describe(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "done": self.done,
+            "samples": self.samples,
+            "durationSec": round(self.duration or time.time() - self.started, 3),
+            "remainingRequests": self.remaining,
+        }
+
+
+def _label(code, cache: dict) -> str:
+    label = cache.get(code)
+    if label is None:
+        path = code.co_filename
+        if path.startswith(_SERVER_DIR) and "site-packages" not in path:
+            path = os.path.relpath(path, _SERVER_DIR)
+        else:
+            # Keep the package-relative part of library paths
+            path = path.rpartition("site-packages" + os.sep)[2] or os.path.basename(path)
+        label = cache[code] = f"{code.co_name} ({path}:{code.co_firstlineno})"
+    return label
+
+
+class Profiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active: list[Profile] = []
+        self._results: OrderedDict[str, Profile] = OrderedDict()
+        self._thread: threading.Thread | None = None
+        self._labels: dict = {}
+        self._armed = 0  # profiles with requests left to claim; skips the lock when 0
+        self.loop_thread_id: int | None = None
+
+    def register(self, profile: Profile) -> Profile:
+        """Keep profile retrievable by id (up to profiler_max_results finished ones)."""
+        with self._lock:
+            self._results[profile.id] = profile
+            # Armed and running profiles are never evicted
+            excess = len(self._results) - settings.profiler_max_results
+            for old in [p for p in self._results.values() if p.done][:max(excess, 0)]:
+                del self._results[old.id]
+        return profile
+
+    def get(self, profile_id: str) -> Profile | None:
+        return self._results.get(profile_id)
+
+    def arm(self, requests: int, routes: tuple[str, ...]) -> Profile:
+        """One Profile covering the next `requests` requests to any of routes."""
+        profile = self.register(Profile("requests", requests=requests, routes=routes))
+        with self._lock:
+            self._armed += 1
+        return profile
+
+    def claim(self, path: str) -> Profile | None:
+        """The armed profile that should cover a request to path, if any."""
+        if not self._armed:
+            return None
+        with self._lock:
+            for profile in self._results.values():
+                if profile.kind == "requests" and profile.remaining > 0 and path in profile.routes:
+                    profile.remaining -= 1
+                    self._armed -= profile.remaining == 0
+                    return profile
+        return None
+
+    def begin_request(self, path: str, header: str | None) -> Profile | None:
+        """Start sampling for a request sent with X-Profile or claimed by an armed profile."""
+        secret = settings.profiler_secret
+        if header and secret and hmac.compare_digest(header.encode(), secret.encode()):
+            profile = Profile("request")
+            try:
+                self.attach(profile)
+            except ProfilerBusy:
+                return None
+            return self.register(profile)
+        profile = self.claim(path)
+        if profile is None:
+            return None
+        try:
+            self.attach(profile)
+        except ProfilerBusy:
+            # Give the request back so the profile still gets its count
+            with self._lock:
+                profile.remaining += 1
+                self._armed += profile.remaining == 1
+            return None
+        return profile
+
+    async def profiled(self, body, profile: Profile):
+        """Response body iterator that detaches profile once the body (e.g. an SSE stream) ends."""
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            self.detach(profile)
+
+    def attach(self, profile: Profile) -> None:
+        """Sample into profile until the matching detach(); call from the event loop."""
+        with self._lock:
+            self.loop_thread_id = threading.get_ident()
+            if profile._inflight == 0:
+                if len(self._active) >= settings.profiler_max_active:
+                    raise ProfilerBusy(f"{len(self._active)} profiles already running")
+                self._active.append(profile)
+            profile._inflight += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+
+    def detach(self, profile: Profile) -> None:
+        """Stop sampling into profile; it is done once no requests remain."""
+        with self._lock:
+            profile._inflight -= 1
+            if profile._inflight == 0:
+                self._active.remove(profile)
+                if profile.remaining == 0:
+                    profile.duration = time.time() - profile.started
+                    profile.done = True
+
+    # -- sampling ------------------------------------------------------------
+
+    def _thread_names(self) -> dict[int, str]:
+        names = {}
+        for t in threading.enumerate():
+            if t.ident == self.loop_thread_id:
+                names[t.ident] = "event_loop"
+            elif _WORKER_NAME.fullmatch(t.name):
+                names[t.ident] = "to_thread"
+            else:
+                names[t.ident] = t.name
+        return names
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        names: dict[int, str] = {}
+        while True:
+            with self._lock:
+                active = list(self._active)
+                if not active:
+                    self._thread = None
+                    return
+            frames = sys._current_frames()
+            if len(names) != len(frames) or not names.keys() >= frames.keys():
+                names = self._thread_names()
+            for ident, frame in frames.items():
+                if ident == me:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in _IDLE:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_label(frame.f_code, self._labels))
+                    frame = frame.f_back
+                stack.append(names.get(ident, "thread"))
+                key = tuple(reversed(stack))
+                for profile in active:
+                    profile.stacks[key] += 1
+            for profile in active:
+                profile.samples += 1
+            del frames
+            time.sleep(settings.profiler_interval)
+
+
+profiler = Profiler()
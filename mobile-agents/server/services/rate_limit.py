@@ -0,0 +1,46 @@
+"""
+Per-upstream request pacing for tool calls.
+
+An UpstreamLimiter spaces calls to each upstream (keyed by action prefix,
+e.g. "arxiv" for arxiv_search and arxiv_summarize) to at most the
+configured requests per second. Slots are reserved under a lock, so
+concurrent callers queue in arrival order. The tool cache applies the
+limiter in the current context (set by batch runs) to real upstream calls
+only; cache hits and coalesced calls are free.
+"""
+
+import contextvars
+import threading
+import time
+
+
+class UpstreamLimiter:
+    def __init__(self, rates: dict[str, float]):
+        self.rates = {k: v for k, v in rates.items() if v > 0}
+        self._lock = threading.Lock()
+        self._next: dict[str, float] = {}
+        self.waited = 0.0
+
+    def upstream(self, action: str) -> str | None:
+        return next((name for name in self.rates if action.startswith(name)), None)
+
+    def wait(self, action: str) -> float:
+        """Block until the action's upstream may be called; returns seconds waited."""
+        name = self.upstream(action)
+        if name is None:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next.get(name, 0.0))
+            self._next[name] = start + 1.0 / self.rates[name]
+            delay = start - now
+            self.waited += delay
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+# Limiter applied to tool calls made in this context (None: unlimited)
+upstream_limiter: contextvars.ContextVar[UpstreamLimiter | None] = contextvars.ContextVar(
+    "upstream_limiter", default=None
+)
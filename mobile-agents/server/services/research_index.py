@@ -0,0 +1,218 @@
+"""
+Persistent local full-text index over fetched research records.
+
+Papers and Wikipedia articles from tool results are upserted into a SQLite
+table (merging with any earlier record of the same paper) and mirrored into
+an FTS5 index through triggers, so repeat topics can be answered by the
+local_search tool without a network call. Compaction prunes the least
+recently updated records beyond research_index_max_docs and optimizes the
+FTS segments. The database is opened lazily on first use.
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from config import settings
+from models.results import Article, Paper, ToolResult
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT UNIQUE NOT NULL,
+    kind TEXT NOT NULL,
+    title TEXT NOT NULL,
+    authors TEXT NOT NULL DEFAULT '',
+    body TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS docs_updated_at ON docs(updated_at);
+-- Every known identity (arXiv id, DOI, S2 id, title) of a stored document
+CREATE TABLE IF NOT EXISTS doc_keys (
+    key TEXT PRIMARY KEY,
+    doc_id TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+    title, authors, body, content='docs', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS docs_ai AFTER INSERT ON docs BEGIN
+    INSERT INTO docs_fts(rowid, title, authors, body)
+    VALUES (new.rowid, new.title, new.authors, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS docs_ad AFTER DELETE ON docs BEGIN
+    INSERT INTO docs_fts(docs_fts, rowid, title, authors, body)
+    VALUES ('delete', old.rowid, old.title, old.authors, old.body);
+END;
+CREATE TRIGGER IF NOT EXISTS docs_au AFTER UPDATE ON docs BEGIN
+    INSERT INTO docs_fts(docs_fts, rowid, title, authors, body)
+    VALUES ('delete', old.rowid, old.title, old.authors, old.body);
+    INSERT INTO docs_fts(rowid, title, authors, body)
+    VALUES (new.rowid, new.title, new.authors, new.body);
+END;
+"""
+
+_TERM_RE = re.compile(r"[A-Za-z0-9]+")
+# Compact after this many upserts
+_COMPACT_EVERY = 500
+
+
+def _fts_query(text: str, match_all: bool) -> str:
+    terms = [t.lower() for t in _TERM_RE.findall(text) if len(t) > 1]
+    return (" AND " if match_all else " OR ").join(f'"{t}"' for t in terms)
+
+
+class ResearchIndex:
+    def __init__(self, path: str | Path, max_docs: int = 50000):
+        self.path = str(path)
+        self.max_docs = max_docs
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._writes = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def ingest(self, result: ToolResult) -> int:
+        """Upsert the papers and articles of a tool result; returns records written."""
+        if result.is_error or result.action in ("local_search", "related_papers"):
+            return 0
+        records = [("paper", p.keys, p) for p in result.papers] + [
+            ("article", [f"wiki:{a.title.lower()}"], a) for a in result.articles
+        ]
+        if not records:
+            return 0
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            with db:
+                for kind, keys, record in records:
+                    if not keys:
+                        continue
+                    marks = ",".join("?" * len(keys))
+                    row = db.execute(
+                        f"SELECT d.id, d.data FROM doc_keys k JOIN docs d ON d.id = k.doc_id "
+                        f"WHERE k.key IN ({marks}) LIMIT 1",
+                        keys,
+                    ).fetchone()
+                    doc_id = row[0] if row else keys[0]
+                    if row:
+                        record = self._merge(kind, row[1], record)
+                        if kind == "paper":
+                            keys = list(dict.fromkeys(keys + record.keys))
+                    db.executemany(
+                        "INSERT OR IGNORE INTO doc_keys (key, doc_id) VALUES (?, ?)",
+                        [(k, doc_id) for k in keys],
+                    )
+                    db.execute(
+                        "INSERT INTO docs (id, kind, title, authors, body, data, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(id) DO UPDATE SET title = excluded.title, "
+                        "authors = excluded.authors, body = excluded.body, "
+                        "data = excluded.data, updated_at = excluded.updated_at",
+                        (
+                            doc_id,
+                            kind,
+                            record.title,
+                            ", ".join(getattr(record, "authors", [])),
+                            record.abstract if kind == "paper" else record.text,
+                            record.model_dump_json(),
+                            now,
+                        ),
+                    )
+            self._writes += len(records)
+            if self._writes >= _COMPACT_EVERY:
+                self._compact_locked()
+        return len(records)
+
+    @staticmethod
+    def _merge(kind: str, stored: str, record):
+        if kind == "paper":
+            merged = Paper.model_validate_json(stored)
+            merged.merge_from(record)
+            return merged
+        old = Article.model_validate_json(stored)
+        # Page extracts are longer than search snippets; keep the richer text
+        if len(old.text) > len(record.text):
+            return record.model_copy(update={"text": old.text, "url": record.url or old.url})
+        return record
+
+    def search(self, query: str, limit: int = 5) -> ToolResult:
+        """BM25-ranked records matching all query terms, or any term if too few match."""
+        rows = []
+        with self._lock:
+            db = self._db()
+            for match_all in (True, False):
+                q = _fts_query(query, match_all)
+                if not q:
+                    break
+                # Rank inside FTS first so only the top rows are joined/decoded
+                rows = db.execute(
+                    "SELECT d.kind, d.data FROM (SELECT rowid, bm25(docs_fts, 5.0, 1.0, 1.0) AS score "
+                    "FROM docs_fts WHERE docs_fts MATCH ? ORDER BY score LIMIT ?) hits "
+                    "JOIN docs d ON d.rowid = hits.rowid ORDER BY hits.score",
+                    (q, limit),
+                ).fetchall()
+                if len(rows) >= limit:
+                    break
+        papers = [Paper.model_validate_json(d) for k, d in rows if k == "paper"]
+        articles = [Article.model_validate_json(d) for k, d in rows if k == "article"]
+        return ToolResult(
+            action="local_search",
+            kind="papers" if papers else "articles",
+            query=query,
+            papers=papers,
+            articles=articles,
+        )
+
+    def coverage(self, query: str) -> int:
+        """Number of indexed records matching all terms of the query."""
+        q = _fts_query(query, match_all=True)
+        if not q:
+            return 0
+        with self._lock:
+            row = self._db().execute(
+                "SELECT count(*) FROM docs_fts WHERE docs_fts MATCH ?", (q,)
+            ).fetchone()
+        return row[0]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db().execute("SELECT count(*) FROM docs").fetchone()[0]
+
+    def compact(self) -> None:
+        """Prune records beyond max_docs (least recently updated first) and optimize FTS."""
+        with self._lock:
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        db = self._db()
+        with db:
+            db.execute(
+                "DELETE FROM docs WHERE rowid IN (SELECT rowid FROM docs "
+                "ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_docs,),
+            )
+            db.execute("DELETE FROM doc_keys WHERE doc_id NOT IN (SELECT id FROM docs)")
+            db.execute("INSERT INTO docs_fts(docs_fts) VALUES ('optimize')")
+        self._writes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+research_index = ResearchIndex(
+    Path(__file__).parent.parent / settings.research_index_path,
+    max_docs=settings.research_index_max_docs,
+)
@@ -0,0 +1,174 @@
+"""
+Token-budgeted compaction of step results before synthesis.
+
+Step results are split into per-item blocks (papers, articles), duplicate
+items across steps are merged, and when the total still exceeds the budget
+the least relevant sentences are dropped so that synthesis input stays
+within a predictable size. Every compacted block keeps its header lines, so
+when many items are present the least relevant whole blocks are dropped
+last to hold the budget.
+"""
+
+import re
+
+from services.tokens import count_tokens
+
+_BLOCK_SEP = "\n\n---\n\n"
+_TITLE_RE = re.compile(r"^\*\*(.+?)\*\*")
+_HEADER_PREFIXES = ("**", "Authors:", "URL:", "Citations:", "Categories:", "References:", "http")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_WORD_RE = re.compile(r"[a-z0-9]{3,}")
+_TITLE_WORD_RE = re.compile(r"[a-z0-9]+")
+_DROPPED = "(Trimmed to fit the synthesis budget.)"
+
+
+def _normalize_title(title: str) -> str:
+    return " ".join(_TITLE_WORD_RE.findall(title.lower()))
+
+
+def _split_blocks(result: str) -> list[str]:
+    """Split a tool result into item blocks (one per paper/article)."""
+    if _BLOCK_SEP in result:
+        return [b for b in result.split(_BLOCK_SEP) if b.strip()]
+    # Wikipedia search results are separated by blank lines, one **title** each
+    parts = result.split("\n\n")
+    if sum(1 for p in parts if _TITLE_RE.match(p)) > 1:
+        return [p for p in parts if p.strip()]
+    return [result]
+
+
+def _block_title(block: str) -> str | None:
+    # The first block of a search result carries a "Found N ..." preamble
+    for line in block.splitlines():
+        m = _TITLE_RE.match(line.strip())
+        if m:
+            return _normalize_title(m.group(1))
+    return None
+
+
+def _relevance(block: str, terms: set[str]) -> int:
+    return len(set(_WORD_RE.findall(block.lower())) & terms)
+
+
+def _drop_to_budget(step_blocks: list[list[str]], budget: int, terms: set[str]) -> None:
+    """Drop the least relevant blocks (later ones first on ties) until within budget."""
+    sep_tokens = count_tokens(_BLOCK_SEP)
+    block_tokens = [[count_tokens(b) + sep_tokens for b in blocks] for blocks in step_blocks]
+    total = sum(sum(t) for t in block_tokens)
+    if total <= budget:
+        return
+    ranked = sorted(
+        ((_relevance(b, terms), si, bi) for si, blocks in enumerate(step_blocks) for bi, b in enumerate(blocks)),
+        key=lambda t: (t[0], -t[1], -t[2]),
+    )
+    dropped: set[tuple[int, int]] = set()
+    marker_tokens = count_tokens(_DROPPED)
+    for _, si, bi in ranked:
+        if total <= budget:
+            break
+        dropped.add((si, bi))
+        total -= block_tokens[si][bi]
+        if all((si, j) in dropped for j in range(len(step_blocks[si]))):
+            total += marker_tokens
+    for si, blocks in enumerate(step_blocks):
+        blocks[:] = [b for bi, b in enumerate(blocks) if (si, bi) not in dropped]
+        if not blocks and block_tokens[si]:
+            blocks.append(_DROPPED)
+
+
+def _compact_block(block: str, budget: int, terms: set[str]) -> str:
+    """Keep header lines and the most query-relevant sentences within budget."""
+    header, body = [], []
+    for line in block.splitlines():
+        if line.startswith(_HEADER_PREFIXES) or line.startswith("Found "):
+            header.append(line)
+        elif line.strip():
+            body.append(line)
+
+    kept_header = "\n".join(header)
+    remaining = budget - count_tokens(kept_header)
+    sentences = [s for line in body for s in _SENTENCE_RE.split(line) if s.strip()]
+    if remaining <= 0 or not sentences:
+        return kept_header
+
+    scored = []
+    for i, sent in enumerate(sentences):
+        words = set(_WORD_RE.findall(sent.lower()))
+        overlap = len(words & terms)
+        # Lead sentences of an abstract carry the main claim
+        scored.append((overlap + (1.0 if i == 0 else 0.0), i, sent))
+    scored.sort(key=lambda t: (-t[0], t[1]))
+
+    chosen = []
+    for _, i, sent in scored:
+        cost = count_tokens(sent) + 1
+        if cost > remaining:
+            continue
+        chosen.append((i, sent))
+        remaining -= cost
+    chosen.sort()
+    text = " ".join(s for _, s in chosen)
+    return f"{kept_header}\n{text}" if kept_header else text
+
+
+def compact_results(
+    step_results: list[dict], query: str, token_budget: int
+) -> tuple[list[dict], dict]:
+    """
+    Deduplicate items across steps and fit results into token_budget.
+    Returns (compacted_step_results, stats). The budget is a hard limit:
+    if per-block trimming still leaves too much, the least relevant blocks
+    are dropped. A budget <= 0 disables compaction but still reports token
+    counts.
+    """
+    tokens_before = sum(count_tokens(s["result"]) for s in step_results)
+    if token_budget <= 0:
+        return step_results, {
+            "tokensBefore": tokens_before,
+            "tokensAfter": tokens_before,
+            "tokensSaved": 0,
+            "duplicatesRemoved": 0,
+        }
+
+    # ── Cross-step dedup: keep the richest copy of each titled item ──
+    seen: dict[str, tuple[int, int]] = {}
+    step_blocks: list[list[str]] = []
+    duplicates = 0
+    for si, s in enumerate(step_results):
+        blocks: list[str] = []
+        step_blocks.append(blocks)
+        for block in _split_blocks(s["result"]):
+            title = _block_title(block)
+            if title and title in seen:
+                duplicates += 1
+                pi, pb = seen[title]
+                if len(block) > len(step_blocks[pi][pb]):
+                    step_blocks[pi][pb] = block
+                continue
+            if title:
+                seen[title] = (si, len(blocks))
+            blocks.append(block)
+
+    # ── Relevance-based trimming when over budget ──
+    terms = set(_WORD_RE.findall(query.lower()))
+    block_tokens = [[count_tokens(b) for b in blocks] for blocks in step_blocks]
+    total = sum(sum(t) for t in block_tokens)
+    if total > token_budget:
+        step_blocks = [
+            [_compact_block(b, max(int(token_budget * t / total), 32), terms) for b, t in zip(blocks, tokens)]
+            for blocks, tokens in zip(step_blocks, block_tokens)
+        ]
+        # Headers and the per-block minimum can still overshoot with many items
+        _drop_to_budget(step_blocks, token_budget, terms)
+    compacted = [
+        {**s, "result": _BLOCK_SEP.join(blocks) if blocks else "(Covered by earlier results.)"}
+        for s, blocks in zip(step_results, step_blocks)
+    ]
+
+    tokens_after = sum(count_tokens(s["result"]) for s in compacted)
+    return compacted, {
+        "tokensBefore": tokens_before,
+        "tokensAfter": tokens_after,
+        "tokensSaved": max(tokens_before - tokens_after, 0),
+        "duplicatesRemoved": duplicates,
+    }
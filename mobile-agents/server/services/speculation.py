@@ -0,0 +1,142 @@
+"""
+Speculative execution of read-only plan steps.
+
+Right after planning, side-effect-free steps that need no approval are started
+in the background while the user reviews the plan. Results are held per user
+and task id for a short TTL; /api/execute attaches to them instead of calling
+the tools again, and cancels whatever is still running when it ends. Steps whose action is not known to be read-only (e.g. Slack) are never
+speculated, nor is anything that depends on them.
+"""
+
+import asyncio
+import json
+import time
+
+from config import settings
+from crew.tools import READ_ONLY_TOOLS
+from models.results import ToolResult
+from services.execution_tracker import _call_tool
+from services.latency_model import latency_model
+
+
+def _signature(step: dict) -> str:
+    return json.dumps(
+        [step.get("action", ""), step.get("params", {}), sorted(step.get("depends_on", []))],
+        sort_keys=True,
+        default=str,
+    )
+
+
+class SpeculativeStep:
+    def __init__(self, step: dict):
+        self.signature = _signature(step)
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.task: asyncio.Task | None = None
+
+    def saved_ms(self, attached_at: float) -> int:
+        """Tool time that had already elapsed when execution attached."""
+        if self.started_at is None:
+            return 0
+        end = self.finished_at if self.finished_at is not None else attached_at
+        return int((min(end, attached_at) - self.started_at) * 1000)
+
+
+class Speculation:
+    def __init__(self, task_id: str, user_id: str):
+        self.task_id = task_id
+        self.user_id = user_id
+        self.created_at = time.monotonic()
+        self.steps: dict[str, SpeculativeStep] = {}
+
+    def expired(self, now: float) -> bool:
+        return now - self.created_at > settings.speculation_ttl
+
+    def cancel(self) -> None:
+        for s in self.steps.values():
+            if s.task and not s.task.done():
+                s.task.cancel()
+
+    def matches(self, step: dict) -> SpeculativeStep | None:
+        """Return the speculative step if the plan step is unchanged since planning."""
+        spec = self.steps.get(step["id"])
+        if spec and spec.task and spec.signature == _signature(step):
+            return spec
+        return None
+
+
+def speculable_steps(plan: dict) -> list[dict]:
+    """Read-only, non-approval steps whose dependencies are all speculable."""
+    ok: set[str] = set()
+    steps = {s["id"]: s for s in plan.get("steps", [])}
+    changed = True
+    while changed:
+        changed = False
+        for sid, s in steps.items():
+            if sid in ok:
+                continue
+            if (
+                s.get("action") in READ_ONLY_TOOLS
+                and not s.get("requires_approval")
+                and all(d in ok for d in s.get("depends_on", []))
+            ):
+                ok.add(sid)
+                changed = True
+    return [s for s in plan.get("steps", []) if s["id"] in ok]
+
+
+class SpeculationStore:
+    def __init__(self):
+        self._by_task: dict[tuple[str, str], Speculation] = {}
+
+    def _purge(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, s in self._by_task.items() if s.expired(now)]:
+            self._by_task.pop(key).cancel()
+        while len(self._by_task) > settings.speculation_max_tasks:
+            oldest = next(iter(self._by_task))
+            self._by_task.pop(oldest).cancel()
+
+    def start(self, plan: dict, user_id: str) -> Speculation | None:
+        """Start speculating the plan's read-only steps in the background for user_id."""
+        self._purge()
+        steps = speculable_steps(plan)
+        if not steps:
+            return None
+        spec = Speculation(plan["id"], user_id)
+        for step in steps:
+            spec.steps[step["id"]] = SpeculativeStep(step)
+        # Tasks first run in creation order, so the longest chains claim
+        # to_thread workers first when the pool is saturated
+        priority = latency_model.estimate(steps)["priority"]
+        for step in sorted(steps, key=lambda s: priority.get(s["id"], 0), reverse=True):
+            spec.steps[step["id"]].task = asyncio.create_task(self._run(spec, step))
+        self._by_task[(user_id, plan["id"])] = spec
+        return spec
+
+    async def _run(self, spec: Speculation, step: dict) -> ToolResult:
+        deps = step.get("depends_on", [])
+        prev_results = {}
+        for dep in deps:
+            prev_results[dep] = await spec.steps[dep].task
+        entry = spec.steps[step["id"]]
+        entry.started_at = time.monotonic()
+        result = await asyncio.to_thread(
+            _call_tool,
+            step.get("action", ""),
+            step.get("params", {}),
+            prev_results,
+            step.get("description", ""),
+            step.get("agent_id", ""),
+        )
+        entry.finished_at = time.monotonic()
+        latency_model.observe_step(step, (entry.finished_at - entry.started_at) * 1000)
+        return result
+
+    def take(self, task_id: str, user_id: str) -> Speculation | None:
+        """Detach user_id's speculation for a task so their execution can consume it."""
+        self._purge()
+        return self._by_task.pop((user_id, task_id), None)
+
+
+speculation_store = SpeculationStore()
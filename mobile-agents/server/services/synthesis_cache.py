@@ -0,0 +1,150 @@
+"""
+In-process cache for orchestrator synthesis output.
+
+Entries are keyed on a content hash of the user message, plan summary and
+ordered step results, and belong to the user whose run produced them: a
+summary can carry results from that user's uploaded image or audio, so it is
+only ever served to them. When a similarity threshold is configured, a
+locally computed hashed bag-of-words vector lets near-identical inputs from
+the same user reuse a summary without another LLM call. Eviction is least-recently-used and
+bounded by entry count.
+"""
+
+import hashlib
+import json
+import math
+import re
+import zlib
+from collections import OrderedDict
+
+from config import settings
+from services import metrics
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_VECTOR_DIMS = 1024
+
+
+def _content_key(user_id: str | None, user_message: str, plan_summary: str, step_results: list[dict]) -> str:
+    payload = json.dumps(
+        [user_id, user_message, plan_summary, [[s["description"], s["result"]] for s in step_results]],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _embed(text: str) -> dict[int, float]:
+    """Hash tokens into a fixed number of buckets and L2-normalize (sparse)."""
+    vec: dict[int, float] = {}
+    for tok in _TOKEN_RE.findall(text.lower()):
+        idx = zlib.crc32(tok.encode()) % _VECTOR_DIMS
+        vec[idx] = vec.get(idx, 0.0) + 1.0
+    norm = math.sqrt(sum(v * v for v in vec.values()))
+    if norm:
+        for k in vec:
+            vec[k] /= norm
+    return vec
+
+
+def _cosine(a: dict[int, float], b: dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+class SynthesisCache:
+    """LRU cache of synthesized summaries with optional similarity fallback."""
+
+    def __init__(self, max_entries: int = 128, similarity_threshold: float = 0.0):
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        # key -> (summary, similarity vector, user id)
+        self._entries: OrderedDict[str, tuple[str, dict[int, float] | None, str | None]] = OrderedDict()
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _text(user_message: str, plan_summary: str, step_results: list[dict]) -> str:
+        return "\n".join(
+            [user_message, plan_summary]
+            + [f"{s['description']}\n{s['result']}" for s in step_results]
+        )
+
+    def get(
+        self, user_message: str, plan_summary: str, step_results: list[dict], user_id: str | None = None
+    ) -> tuple[str, str] | None:
+        """
+        Return (summary, hit_kind) where hit_kind is "exact" or "similar",
+        or None on a miss. Only user_id's own entries are considered.
+        """
+        if self.max_entries <= 0:
+            return None
+        key = _content_key(user_id, user_message, plan_summary, step_results)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], "exact"
+
+        if self.similarity_threshold > 0:
+            query = _embed(self._text(user_message, plan_summary, step_results))
+            best_key, best_score = None, 0.0
+            for k, (_, vec, owner) in self._entries.items():
+                if vec is None or owner != user_id:
+                    continue
+                score = _cosine(query, vec)
+                if score > best_score:
+                    best_key, best_score = k, score
+            if best_key is not None and best_score >= self.similarity_threshold:
+                self._entries.move_to_end(best_key)
+                self.similar_hits += 1
+                return self._entries[best_key][0], "similar"
+
+        self.misses += 1
+        return None
+
+    def put(
+        self,
+        user_message: str,
+        plan_summary: str,
+        step_results: list[dict],
+        summary: str,
+        user_id: str | None = None,
+    ) -> None:
+        if self.max_entries <= 0:
+            return
+        key = _content_key(user_id, user_message, plan_summary, step_results)
+        vec = (
+            _embed(self._text(user_message, plan_summary, step_results))
+            if self.similarity_threshold > 0
+            else None
+        )
+        self._entries[key] = (summary, vec, user_id)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+synthesis_cache = SynthesisCache(
+    max_entries=settings.synthesis_cache_size,
+    similarity_threshold=settings.synthesis_cache_similarity,
+)
+
+
+def _cache_hit_ratio() -> float:
+    lookups = synthesis_cache.hits + synthesis_cache.similar_hits + synthesis_cache.misses
+    return (synthesis_cache.hits + synthesis_cache.similar_hits) / lookups if lookups else 0.0
+
+
+metrics.Counter(
+    "mobileagents_synthesis_cache_lookups_total", "Synthesis cache lookups by result.", ("result",),
+    fn=lambda: {
+        ("hits",): synthesis_cache.hits,
+        ("similar_hits",): synthesis_cache.similar_hits,
+        ("misses",): synthesis_cache.misses,
+    },
+)
+metrics.Gauge("mobileagents_synthesis_cache_hit_ratio", "Synthesis cache hits (exact and similar) over lookups.", fn=_cache_hit_ratio)
@@ -0,0 +1,34 @@
+"""Token counting shared by routing, compaction and scheduling."""
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - tiktoken ships with crewai
+    tiktoken = None
+
+_encoder = None
+_encoder_loaded = False
+
+
+def _get_encoder():
+    global _encoder, _encoder_loaded
+    if not _encoder_loaded:
+        _encoder_loaded = True
+        if tiktoken is not None:
+            try:
+                _encoder = tiktoken.get_encoding("o200k_base")
+            except Exception:
+                _encoder = None
+    return _encoder
+
+
+def warm_encoder() -> None:
+    """Load the tiktoken encoding up front so the first request doesn't pay for it."""
+    _get_encoder()
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken when available, else estimate ~4 chars/token."""
+    enc = _get_encoder()
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
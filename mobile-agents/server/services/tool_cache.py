@@ -0,0 +1,226 @@
+"""
+Shared cache for read-only tool results.
+
+Calls are keyed on the action and its bound arguments (defaults applied,
+whitespace collapsed, and search queries whose case the upstream ignores
+lowercased). Identical calls already in flight are coalesced so that a
+prefetch or speculative call and the real execution only hit the upstream
+API once. Error results are never cached, and neither are local index
+lookups, which change on every ingest. Calls that do reach the upstream are
+paced by the context's UpstreamLimiter, if any.
+"""
+
+import contextvars
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable
+
+from config import settings
+from crew.tools import READ_ONLY_TOOLS, TOOL_FUNCTIONS
+from services import metrics, tracing
+from services.rate_limit import upstream_limiter
+
+_ERROR_MARKERS = (" failed:", "Failed to fetch", "API error", "not found", "Not found")
+
+# Per-execution counters; asyncio.to_thread copies the context into workers
+execution_stats: contextvars.ContextVar[dict | None] = contextvars.ContextVar(
+    "tool_cache_execution_stats", default=None
+)
+
+
+# Arguments whose case the upstream ignores, per tool
+_CASE_INSENSITIVE = {
+    "arxiv_search": {"query"},
+    "wiki_search": {"query"},
+    "semantic_scholar_search": {"query"},
+}
+
+# Served from the local research index, which changes on every ingest
+_UNCACHED = {"local_search", "related_papers"}
+
+
+def _normalize(action: str, name: str, value):
+    if isinstance(value, str):
+        value = " ".join(value.split())
+        if name in _CASE_INSENSITIVE.get(action, ()):
+            value = value.lower()
+    return value
+
+
+def _tool_series(action: str) -> tuple:
+    return (
+        metrics.tool_calls.labels(action, "ok"),
+        metrics.tool_calls.labels(action, "error"),
+        metrics.tool_latency.labels(action),
+    )
+
+
+# Bound up front so a tool call records without a label lookup
+_TOOL_SERIES = {action: _tool_series(action) for action in TOOL_FUNCTIONS}
+
+
+def _call_upstream(action: str, func: Callable, kwargs: dict):
+    ok, error, latency = _TOOL_SERIES.get(action) or _tool_series(action)
+    with tracing.span("tool.call", **{"tool.action": action}) as span:
+        limiter = upstream_limiter.get()
+        if limiter is not None:
+            limiter.wait(action)
+        start = time.perf_counter()
+        try:
+            result = func(**kwargs)
+        except Exception:
+            error.inc()
+            raise
+        finally:
+            latency.observe(time.perf_counter() - start)
+        if _is_error(result):
+            error.inc()
+            tracing.fail(span, str(getattr(result, "text", result))[:200])
+        else:
+            ok.inc()
+        return result
+
+
+def _is_error(result) -> bool:
+    if hasattr(result, "is_error"):
+        return result.is_error
+    first_line = str(result).split("\n", 1)[0]
+    return any(m in first_line for m in _ERROR_MARKERS)
+
+
+class _Entry:
+    __slots__ = ("result", "expires_at", "source", "used")
+
+    def __init__(self, result, expires_at: float, source: str):
+        self.result = result
+        self.expires_at = expires_at
+        self.source = source
+        self.used = False
+
+
+class ToolCache:
+    def __init__(self, max_entries: int = 512, ttl: float = 900.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        # key -> [future, owner source, joined by a non-prefetch caller]
+        self._inflight: dict[str, list] = {}
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "prefetched": 0,
+            "prefetchHits": 0,
+        }
+
+    @staticmethod
+    def key(action: str, func: Callable, kwargs: dict) -> str:
+        try:
+            bound = inspect.signature(func).bind(**kwargs)
+            bound.apply_defaults()
+            args = bound.arguments
+        except TypeError:
+            args = kwargs
+        return json.dumps(
+            [action, {k: _normalize(action, k, v) for k, v in sorted(args.items())}], default=str
+        )
+
+    def _count(self, name: str) -> None:
+        self.stats[name] += 1
+        per_exec = execution_stats.get()
+        if per_exec is not None:
+            per_exec[name] = per_exec.get(name, 0) + 1
+
+    def call(self, action: str, func: Callable, kwargs: dict, source: str = "execution"):
+        """Return a cached result or call func(**kwargs), coalescing concurrent calls."""
+        if self.max_entries <= 0 or action not in READ_ONLY_TOOLS or action in _UNCACHED:
+            return _call_upstream(action, func, kwargs)
+        key = self.key(action, func, kwargs)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self._count("hits")
+                if entry.source == "prefetch" and not entry.used and source != "prefetch":
+                    self._count("prefetchHits")
+                if source != "prefetch":
+                    entry.used = True
+                return entry.result
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                fut: Future = Future()
+                inflight = self._inflight[key] = [fut, source, False]
+                self._count("misses")
+                owner = True
+            else:
+                fut, owner_source, joined = inflight
+                self._count("coalesced")
+                if owner_source == "prefetch" and source != "prefetch" and not joined:
+                    self._count("prefetchHits")
+                if source != "prefetch":
+                    inflight[2] = True
+                owner = False
+
+        if not owner:
+            return fut.result()
+
+        try:
+            result = _call_upstream(action, func, kwargs)
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            fut.set_exception(e)
+            raise
+        with self._lock:
+            self._inflight.pop(key, None)
+            if not _is_error(result):
+                entry = _Entry(result, time.monotonic() + self.ttl, source)
+                entry.used = inflight[2]
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                if source == "prefetch":
+                    self._count("prefetched")
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        fut.set_result(result)
+        return result
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"] + self.stats["coalesced"]
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "hitRatio": round((self.stats["hits"] + self.stats["coalesced"]) / lookups, 3) if lookups else 0.0,
+                "prefetchHitRate": round(self.stats["prefetchHits"] / self.stats["prefetched"], 3) if self.stats["prefetched"] else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+tool_cache = ToolCache(
+    max_entries=settings.tool_cache_size,
+    ttl=settings.tool_cache_ttl,
+)
+
+
+def _cache_lookups() -> dict:
+    stats = tool_cache.stats
+    return {(kind,): stats[kind] for kind in ("hits", "misses", "coalesced", "prefetched", "prefetchHits")}
+
+
+def _cache_hit_ratio() -> float:
+    stats = tool_cache.stats
+    lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+    return (stats["hits"] + stats["coalesced"]) / lookups if lookups else 0.0
+
+
+metrics.Counter("mobileagents_tool_cache_lookups_total", "Tool cache lookups by result.", ("result",), fn=_cache_lookups)
+metrics.Gauge("mobileagents_tool_cache_hit_ratio", "Tool cache hits (including coalesced) over lookups.", fn=_cache_hit_ratio)
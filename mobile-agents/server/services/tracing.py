@@ -0,0 +1,250 @@
+"""
+OpenTelemetry tracing for requests, planning, tool calls, synthesis and DB writes.
+
+Spans go to one exporter chosen by tracing_exporter:
+
+- "memory": the last tracing_memory_spans finished spans, kept in process
+  (GET /api/traces/{trace_id} reads them; tests use memory_exporter);
+- "file": one JSON span per line appended to tracing_file_path;
+- "otlp": OTLP/HTTP to tracing_otlp_endpoint (needs the OTLP exporter
+  package, which CrewAI already installs);
+- "none": tracing off.
+
+Incoming W3C traceparent headers continue the caller's trace. urllib
+requests (every tool in crew/tools.py) get http.request spans with
+http.connect, http.tls and http.first_byte children. The provider is our
+own rather than the global one so CrewAI's telemetry is unaffected.
+"""
+
+import functools
+import http.client
+import json
+import threading
+import time
+import urllib.request
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Mapping, Sequence
+
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    SimpleSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.trace import NoOpTracer, Span, SpanKind, Status, StatusCode
+from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+
+from config import settings
+
+EXPORTERS = ("none", "memory", "file", "otlp")
+
+_propagator = TraceContextTextMapPropagator()
+
+
+class MemorySpanExporter(SpanExporter):
+    """Keeps the most recent finished spans in a bounded buffer."""
+
+    def __init__(self, max_spans: int = 10000):
+        self._spans: deque[ReadableSpan] = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        with self._lock:
+            self._spans.extend(spans)
+        return SpanExportResult.SUCCESS
+
+    def get_finished_spans(self, trace_id: str | None = None) -> list[ReadableSpan]:
+        with self._lock:
+            spans = list(self._spans)
+        if trace_id:
+            spans = [s for s in spans if format(s.context.trace_id, "032x") == trace_id]
+        return spans
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Appends each finished span as one line of OpenTelemetry JSON."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(json.dumps(json.loads(s.to_json())) + "\n" for s in spans)
+        with self._lock, open(self.path, "a") as f:
+            f.write(lines)
+        return SpanExportResult.SUCCESS
+
+
+_provider: TracerProvider | None = None
+_tracer: trace.Tracer = NoOpTracer()
+memory_exporter: MemorySpanExporter | None = None
+
+
+def configure(exporter: str | None = None) -> None:
+    """(Re)build the tracer from settings; exporter overrides tracing_exporter."""
+    global _provider, _tracer, memory_exporter
+    exporter = exporter or settings.tracing_exporter
+    if exporter not in EXPORTERS:
+        raise ValueError(f"Unknown tracing exporter {exporter!r}; expected one of {', '.join(EXPORTERS)}")
+    if _provider is not None:
+        _provider.shutdown()
+    _provider, memory_exporter = None, None
+    if exporter == "none":
+        _tracer = NoOpTracer()
+        return
+
+    _provider = TracerProvider(resource=Resource.create({"service.name": settings.tracing_service_name}))
+    if exporter == "memory":
+        memory_exporter = MemorySpanExporter(settings.tracing_memory_spans)
+        _provider.add_span_processor(SimpleSpanProcessor(memory_exporter))
+    elif exporter == "file":
+        _provider.add_span_processor(BatchSpanProcessor(JsonLinesSpanExporter(settings.tracing_file_path)))
+    else:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        _provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=settings.tracing_otlp_endpoint or None)))
+    _tracer = _provider.get_tracer("mobile-agents")
+    urllib.request.install_opener(urllib.request.build_opener(_TracedHTTPHandler, _TracedHTTPSHandler))
+
+
+def flush() -> None:
+    if _provider is not None:
+        _provider.force_flush()
+
+
+def _attrs(attributes: Mapping) -> dict:
+    return {k: v for k, v in attributes.items() if v is not None}
+
+
+@contextmanager
+def span(name: str, context=None, kind: SpanKind = SpanKind.INTERNAL, **attributes):
+    """Run the block in a new span that is current (so nested spans and threads started with to_thread inherit it)."""
+    with _tracer.start_as_current_span(name, context=context, kind=kind, attributes=_attrs(attributes)) as s:
+        yield s
+
+
+def start_span(name: str, parent: Span | None = None, **attributes) -> Span:
+    """A span that is not made current, for code that yields (SSE generators); end it explicitly."""
+    context = trace.set_span_in_context(parent) if parent is not None else None
+    return _tracer.start_span(name, context=context, attributes=_attrs(attributes))
+
+
+def use(s: Span):
+    """Make s current for the block without ending it; never hold this across a yield."""
+    return trace.use_span(s, end_on_exit=False)
+
+
+def fail(s: Span, error: str) -> None:
+    s.set_status(Status(StatusCode.ERROR, error))
+
+
+def traced(name: str) -> Callable:
+    """Decorator: run the function in a span."""
+
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return inner
+
+    return wrap
+
+
+def extract(headers: Mapping[str, str]):
+    """Context continuing the trace in a W3C traceparent header, if any."""
+    return _propagator.extract(headers)
+
+
+def traceparent(s: Span | None = None) -> str | None:
+    """W3C traceparent for s (default: the current span), or None when not recording."""
+    s = s or trace.get_current_span()
+    if not s.get_span_context().is_valid:
+        return None
+    carrier: dict[str, str] = {}
+    _propagator.inject(carrier, context=trace.set_span_in_context(s))
+    return carrier.get("traceparent")
+
+
+def trace_id(s: Span | None = None) -> str | None:
+    ctx = (s or trace.get_current_span()).get_span_context()
+    return format(ctx.trace_id, "032x") if ctx.is_valid else None
+
+
+def to_dict(s: ReadableSpan) -> dict:
+    return {
+        "name": s.name,
+        "traceId": format(s.context.trace_id, "032x"),
+        "spanId": format(s.context.span_id, "016x"),
+        "parentId": format(s.parent.span_id, "016x") if s.parent else None,
+        "start": s.start_time,
+        "durationMs": round((s.end_time - s.start_time) / 1e6, 3) if s.end_time else None,
+        "status": s.status.status_code.name,
+        "attributes": dict(s.attributes or {}),
+    }
+
+
+# -- urllib phases ---------------------------------------------------------
+
+
+def _record(name: str, start_ns: int, end_ns: int, **attributes) -> None:
+    """A child of the current span covering [start_ns, end_ns]."""
+    s = _tracer.start_span(name, start_time=start_ns, attributes=_attrs(attributes))
+    s.end(end_time=end_ns)
+
+
+class _PhaseTimer(http.client.HTTPConnection):
+    """Records TCP connect and time-to-first-byte spans."""
+
+    tcp_done = 0
+
+    def connect(self):
+        start = time.time_ns()
+        super().connect()
+        self.tcp_done = time.time_ns()
+        _record("http.connect", start, self.tcp_done, **{"net.peer.name": self.host, "net.peer.port": self.port})
+
+    def getresponse(self):
+        start = time.time_ns()
+        response = super().getresponse()
+        _record("http.first_byte", start, time.time_ns(), **{"http.status_code": response.status})
+        return response
+
+
+class _TracedHTTPSConnection(http.client.HTTPSConnection, _PhaseTimer):
+    # MRO puts _PhaseTimer between HTTPSConnection and HTTPConnection, so the
+    # TCP connect inside HTTPSConnection.connect is timed on its own
+    def connect(self):
+        super().connect()
+        _record("http.tls", self.tcp_done, time.time_ns())
+
+
+class _TracedHTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        with span("http.request", kind=SpanKind.CLIENT, **{"http.method": req.get_method(), "http.url": req.full_url}) as s:
+            response = self.do_open(_PhaseTimer, req)
+            s.set_attribute("http.status_code", response.status)
+            return response
+
+
+class _TracedHTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        kwargs = {"context": self._context}
+        if hasattr(self, "_check_hostname"):  # removed in Python 3.12
+            kwargs["check_hostname"] = self._check_hostname
+        with span("http.request", kind=SpanKind.CLIENT, **{"http.method": req.get_method(), "http.url": req.full_url}) as s:
+            response = self.do_open(_TracedHTTPSConnection, req, **kwargs)
+            s.set_attribute("http.status_code", response.status)
+            return response
+
+
+configure()
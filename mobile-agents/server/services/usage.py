@@ -0,0 +1,140 @@
+"""
+Usage ledger: tokens, cost and latency of every model call.
+
+The model router records each call here (services/model_router.py), so
+planning (CrewAI token_usage), vision, transcription, digests and synthesis
+are all covered. Records carry the attribution of the context the call ran
+in: collect() starts an execution or request (conversation, execution,
+user, and the source: chat, execute, batch or monitor) and gathers its records for the caller to stream as `usage` SSE
+events and persist with db.insert_usage; scope() adds the step and agent
+around a step's awaits. Both are contextvars, so asyncio.to_thread workers
+inherit them.
+
+Cost uses settings.model_prices (USD per 1M tokens, or per minute of
+audio). Token and cost totals are also counted on /metrics per call site
+and agent.
+"""
+
+import asyncio
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from config import settings
+from services import db, metrics
+
+logger = logging.getLogger(__name__)
+_attribution: ContextVar[dict] = ContextVar("usage_attribution", default={})
+_sink: ContextVar[list | None] = ContextVar("usage_sink", default=None)
+
+TOTAL_FIELDS = ("promptTokens", "completionTokens", "cachedTokens", "audioSeconds", "costUsd", "latencyMs")
+
+
+def collect(**attribution) -> list[dict]:
+    """
+    Attribute model calls in the current context to attribution
+    (conversationId, executionId, userId, source) and return the list their
+    records are appended to. Like tool_cache.execution_stats, this sets the
+    context for the rest of the caller's task.
+    """
+    records: list[dict] = []
+    _attribution.set({**_attribution.get(), **attribution})
+    _sink.set(records)
+    return records
+
+
+@contextmanager
+def scope(**attribution):
+    """Add attribution (stepId, agentId) to model calls in the block; never hold this across a yield."""
+    token = _attribution.set({**_attribution.get(), **attribution})
+    try:
+        yield
+    finally:
+        _attribution.reset(token)
+
+
+def tokens(result: Any) -> dict:
+    """Token counts from an OpenAI response, a CrewAI result or a dict with a "usage" entry."""
+    usage = result.get("usage") if isinstance(result, dict) else getattr(result, "usage", None)
+    if usage is None:
+        usage = getattr(result, "token_usage", None)
+    if usage is None:
+        return {"promptTokens": 0, "completionTokens": 0, "cachedTokens": 0, "audioSeconds": 0.0}
+    details = getattr(usage, "prompt_tokens_details", None) or getattr(usage, "input_tokens_details", None)
+    return {
+        "promptTokens": getattr(usage, "prompt_tokens", 0) or getattr(usage, "input_tokens", 0) or 0,
+        "completionTokens": getattr(usage, "completion_tokens", 0) or getattr(usage, "output_tokens", 0) or 0,
+        "cachedTokens": getattr(details, "cached_tokens", 0) or getattr(usage, "cached_prompt_tokens", 0) or 0,
+        # Whisper reports duration-based usage
+        "audioSeconds": float(getattr(usage, "seconds", 0) or 0),
+    }
+
+
+def cost(model: str, t: dict) -> float:
+    price = settings.model_prices.get(model)
+    if not price:
+        return 0.0
+    uncached = t["promptTokens"] - t["cachedTokens"]
+    return (
+        uncached * price.get("input", 0.0)
+        + t["cachedTokens"] * price.get("cached_input", price.get("input", 0.0))
+        + t["completionTokens"] * price.get("output", 0.0)
+    ) / 1_000_000 + t["audioSeconds"] / 60 * price.get("minute", 0.0)
+
+
+def record(role: str, model: str, latency_ms: float, result: Any = None, ok: bool = True) -> dict:
+    """Record one model call and return its usage record."""
+    t = tokens(result) if ok else tokens(None)
+    attribution = _attribution.get()
+    rec = {
+        "role": role,
+        "model": model,
+        "ok": ok,
+        "latencyMs": round(latency_ms),
+        **t,
+        "costUsd": round(cost(model, t), 6),
+        "conversationId": attribution.get("conversationId"),
+        "executionId": attribution.get("executionId"),
+        "stepId": attribution.get("stepId"),
+        "agentId": attribution.get("agentId"),
+        "userId": attribution.get("userId"),
+        "source": attribution.get("source"),
+    }
+    sink = _sink.get()
+    if sink is not None:
+        sink.append(rec)
+
+    agent = rec["agentId"] or "none"
+    for kind, key in (("prompt", "promptTokens"), ("completion", "completionTokens"), ("cached", "cachedTokens")):
+        if t[key]:
+            metrics.llm_tokens.labels(role, kind).inc(t[key])
+    if t["promptTokens"] or t["completionTokens"]:
+        metrics.llm_agent_tokens.labels(role, agent).inc(t["promptTokens"] + t["completionTokens"])
+    if rec["costUsd"]:
+        metrics.llm_cost.labels(role, agent).inc(rec["costUsd"])
+    return rec
+
+
+def totals(records: list[dict]) -> dict:
+    out = {field: 0 for field in TOTAL_FIELDS}
+    for rec in records:
+        for field in TOTAL_FIELDS:
+            out[field] += rec[field]
+    out["costUsd"] = round(out["costUsd"], 6)
+    out["calls"] = len(records)
+    return out
+
+
+async def persist(records: list[dict]) -> None:
+    """db.insert_usage off the event loop; a failed write is logged, never raised to the caller."""
+    try:
+        await asyncio.to_thread(db.insert_usage, records)
+    except Exception:
+        logger.exception("Could not persist %d usage records", len(records))
+
+
+def drain(records: list[dict], start: int) -> tuple[list[dict], int]:
+    """Records appended since start, and the new start."""
+    end = len(records)
+    return records[start:end], end
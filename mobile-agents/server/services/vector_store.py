@@ -0,0 +1,396 @@
+"""
+Semantic memory over fetched papers and articles.
+
+Records are embedded by a pluggable embedder and stored as rows of a
+memory-mapped float32 matrix (unit-normalized, so cosine similarity is a dot
+product) with their metadata appended to a JSON-lines log. Queries are
+batched and scored in fixed-size chunks of the matrix. Past
+vector_ivf_min_vectors rows an IVF coarse quantizer (k-means centroids over
+a sample) restricts each query to the rows of its nearest vector_ivf_nprobe
+lists. The quantizer is trained, and retrained once the store has doubled,
+in a background thread; searches use brute force or the previous centroids
+until it is ready. The store is opened lazily on first use.
+"""
+
+import json
+import logging
+import math
+import re
+import threading
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from config import settings
+from models.results import Article, Paper, ToolResult
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Rows scored per matrix multiply in brute-force search
+_CHUNK_ROWS = 65536
+
+
+# ---------------------------------------------------------------------------
+# Embedders
+# ---------------------------------------------------------------------------
+
+class HashingEmbedder:
+    """Signed feature hashing of unigrams and bigrams; dependency-free and deterministic."""
+
+    def __init__(self, dims: int = 256):
+        self.dims = dims
+        self.name = f"hashing-{dims}"
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dims), dtype=np.float32)
+        for i, text in enumerate(texts):
+            tokens = _TOKEN_RE.findall(text.lower())
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            if not features:
+                continue
+            hashes = np.fromiter((zlib.crc32(f.encode()) for f in features), dtype=np.uint32, count=len(features))
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(out[i], (hashes % self.dims).astype(np.intp), signs)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEmbedder:
+    """Small CPU model via sentence-transformers (optional dependency)."""
+
+    def __init__(self, model_name: str):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError(
+                "VECTOR_EMBEDDER=sentence-transformers requires the sentence-transformers package"
+            ) from e
+        self._model = SentenceTransformer(model_name, device="cpu")
+        self.dims = self._model.get_sentence_embedding_dimension()
+        self.name = f"st-{model_name}"
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = self._model.encode(texts, batch_size=32, normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+def create_embedder(kind: str | None = None):
+    kind = kind or settings.vector_embedder
+    if kind == "hashing":
+        return HashingEmbedder(settings.vector_dims)
+    if kind == "sentence-transformers":
+        return SentenceTransformerEmbedder(settings.vector_embedder_model)
+    raise ValueError(f"Unknown embedder: {kind}")
+
+
+def _record_text(record: Paper | Article) -> str:
+    body = record.abstract if isinstance(record, Paper) else record.text
+    # Title counted twice: it is the densest description of the record
+    return f"{record.title}\n{record.title}\n{body}"
+
+
+def _compact_record(record: Paper | Article) -> dict:
+    """Metadata kept per vector: enough to render a result without a fetch."""
+    if isinstance(record, Paper):
+        return record.model_copy(
+            update={"abstract": record.abstract[:600], "authors": record.authors[:5]}
+        ).model_dump(exclude_defaults=True)
+    return record.model_copy(update={"text": record.text[:600]}).model_dump(exclude_defaults=True)
+
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+
+class VectorStore:
+    def __init__(self, path: str | Path, embedder=None, ivf_min_vectors: int | None = None):
+        self.path = Path(path)
+        self._embedder = embedder
+        self.ivf_min_vectors = (
+            settings.vector_ivf_min_vectors if ivf_min_vectors is None else ivf_min_vectors
+        )
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._vectors: np.memmap | None = None
+        self.capacity = 0
+        self.count = 0
+        self._records: list[dict] = []
+        self._keys: dict[str, int] = {}
+        # IVF state
+        self._centroids: np.ndarray | None = None
+        self._assign: np.ndarray | None = None  # list id per row (first trained_count rows)
+        self._lists: list[np.ndarray] = []
+        self._pending: list[list[int]] = []  # rows assigned since the lists were built
+        self._trained_count = 0
+        self._training: threading.Thread | None = None
+
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            self._embedder = create_embedder()
+        return self._embedder
+
+    # -- persistence --------------------------------------------------------
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        header_file = self.path / "header.json"
+        header = json.loads(header_file.read_text()) if header_file.exists() else {}
+        if header.get("embedder") != self.embedder.name:
+            # New store, or vectors from a different embedder: start over
+            for f in ("vectors.f32", "records.jsonl", "ivf_centroids.npy", "ivf_assign.npy"):
+                (self.path / f).unlink(missing_ok=True)
+            header = {"embedder": self.embedder.name, "dims": self.embedder.dims}
+            header_file.write_text(json.dumps(header))
+
+        records_file = self.path / "records.jsonl"
+        if records_file.exists():
+            for line in records_file.read_text().splitlines():
+                entry = json.loads(line)
+                row = entry["row"]
+                while len(self._records) <= row:
+                    self._records.append({})
+                self._records[row] = entry
+                for k in entry["keys"]:
+                    self._keys[k] = row
+        self.count = len(self._records)
+        vectors_file = self.path / "vectors.f32"
+        if vectors_file.exists():
+            self.capacity = vectors_file.stat().st_size // (4 * self.embedder.dims)
+            self._vectors = np.memmap(
+                vectors_file, dtype=np.float32, mode="r+", shape=(self.capacity, self.embedder.dims)
+            )
+        self._loaded = True
+        self._load_ivf()
+
+    def _ensure_capacity(self, rows: int) -> None:
+        if rows <= self.capacity:
+            return
+        dims = self.embedder.dims
+        new_capacity = max(rows, self.capacity * 2, 1024)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        vectors_file = self.path / "vectors.f32"
+        with open(vectors_file, "ab") as f:
+            f.truncate(new_capacity * dims * 4)
+        self._vectors = np.memmap(
+            vectors_file, dtype=np.float32, mode="r+", shape=(new_capacity, dims)
+        )
+        self.capacity = new_capacity
+
+    # -- writes -------------------------------------------------------------
+
+    def add(self, result: ToolResult) -> int:
+        """Embed and store the papers and articles of a tool result; returns rows written."""
+        if result.is_error or result.action in ("local_search", "related_papers"):
+            return 0
+        records: list[tuple[list[str], Paper | Article]] = [
+            (p.keys, p) for p in result.papers if p.abstract or p.title
+        ] + [([f"wiki:{a.title.lower()}"], a) for a in result.articles]
+        records = [(keys, r) for keys, r in records if keys]
+        if not records:
+            return 0
+        vectors = self.embedder.embed([_record_text(r) for _, r in records])
+        with self._lock:
+            self._load()
+            log = []
+            for (keys, record), vector in zip(records, vectors):
+                row = next((self._keys[k] for k in keys if k in self._keys), None)
+                is_new = row is None
+                if not is_new:
+                    old = self._records[row]
+                    # Keep the richer record of the two
+                    if len(json.dumps(old["data"])) > len(json.dumps(_compact_record(record))):
+                        for k in keys:
+                            self._keys.setdefault(k, row)
+                        continue
+                else:
+                    row = self.count
+                    self._ensure_capacity(row + 1)
+                    self._records.append({})
+                    self.count += 1
+                self._vectors[row] = vector
+                entry = {
+                    "row": row,
+                    "keys": list(dict.fromkeys(keys + self._records[row].get("keys", []))),
+                    "kind": "paper" if isinstance(record, Paper) else "article",
+                    "data": _compact_record(record),
+                }
+                self._records[row] = entry
+                for k in entry["keys"]:
+                    self._keys[k] = row
+                log.append(json.dumps(entry))
+                if is_new:
+                    self._assign_new(row, vector)
+            if log:
+                self._vectors.flush()
+                with open(self.path / "records.jsonl", "a") as f:
+                    f.write("\n".join(log) + "\n")
+            return len(log)
+
+    # -- search -------------------------------------------------------------
+
+    def search(self, queries: list[str], k: int = 5) -> list[list[tuple[float, dict]]]:
+        """Top-k (score, record) per query by cosine similarity."""
+        q = self.embedder.embed(queries)
+        with self._lock:
+            self._load()
+            if self.count == 0:
+                return [[] for _ in queries]
+            if self.count >= self.ivf_min_vectors and self._centroids is None:
+                self._train_in_background()
+            if self._centroids is not None:
+                hits = [self._search_ivf(vec, k) for vec in q]
+            else:
+                hits = self._search_brute(q, k)
+            return [[(float(s), self._records[r]) for s, r in row] for row in hits]
+
+    def _search_brute(self, q: np.ndarray, k: int) -> list[list[tuple[float, int]]]:
+        n = self.count
+        best_scores = np.full((len(q), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(q), 0), dtype=np.int64)
+        for start in range(0, n, _CHUNK_ROWS):
+            block = np.asarray(self._vectors[start:min(n, start + _CHUNK_ROWS)])
+            scores = q @ block.T
+            take = min(k, scores.shape[1])
+            idx = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, idx, 1)], axis=1)
+            best_rows = np.concatenate([best_rows, idx + start], axis=1)
+        order = np.argsort(-best_scores, axis=1)[:, :k]
+        return [
+            list(zip(np.take_along_axis(best_scores, order, 1)[i], np.take_along_axis(best_rows, order, 1)[i]))
+            for i in range(len(q))
+        ]
+
+    def _search_ivf(self, vec: np.ndarray, k: int) -> list[tuple[float, int]]:
+        nprobe = min(settings.vector_ivf_nprobe, len(self._centroids))
+        probe = np.argpartition(-(self._centroids @ vec), nprobe - 1)[:nprobe]
+        rows = np.concatenate(
+            [self._lists[c] for c in probe] + [np.asarray(self._pending[c], dtype=np.int64) for c in probe]
+        )
+        if not len(rows):
+            return []
+        rows.sort()  # sequential reads from the memmap
+        scores = np.asarray(self._vectors[rows]) @ vec
+        take = min(k, len(rows))
+        idx = np.argpartition(-scores, take - 1)[:take]
+        idx = idx[np.argsort(-scores[idx])]
+        return list(zip(scores[idx], rows[idx]))
+
+    # -- IVF ----------------------------------------------------------------
+
+    def train_ivf(self, nlist: int | None = None, iterations: int = 8, seed: int = 0) -> None:
+        """
+        Train k-means centroids on a sample and assign every row to its nearest
+        list. The store lock is held only to snapshot the rows and to install
+        the result, so searches and writes carry on while k-means runs.
+        """
+        with self._lock:
+            self._load()
+            n, vectors = self.count, self._vectors
+        if n == 0:
+            return
+        nlist = nlist or max(1, int(math.sqrt(n)))
+        rng = np.random.default_rng(seed)
+        sample = np.asarray(vectors[np.sort(rng.choice(n, min(n, nlist * 32), replace=False))])
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Keep the previous centroid for empty lists
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+        assign = np.empty(n, dtype=np.int32)
+        for start in range(0, n, _CHUNK_ROWS):
+            block = np.asarray(vectors[start:min(n, start + _CHUNK_ROWS)])
+            assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        with self._lock:
+            if not self._loaded:
+                return  # closed meanwhile
+            self._centroids = centroids.astype(np.float32)
+            self._set_assignments(assign)
+            # Rows added while training go to the new lists' pending rows
+            for row in range(n, self.count):
+                self._assign_new(row, self._vectors[row])
+            np.save(self.path / "ivf_centroids.npy", self._centroids)
+            np.save(self.path / "ivf_assign.npy", assign)
+
+    def _train_in_background(self) -> None:
+        """Start train_ivf in a thread unless one is already running."""
+        if self._training is not None and self._training.is_alive():
+            return
+        self._training = threading.Thread(target=self._train_logged, name="vector-store-ivf", daemon=True)
+        self._training.start()
+
+    def _train_logged(self) -> None:
+        try:
+            self.train_ivf()
+        except Exception:
+            # Searches keep using brute force or the previous centroids
+            logger.exception("IVF training failed for %d vectors", self.count)
+
+    def _set_assignments(self, assign: np.ndarray) -> None:
+        self._assign = assign
+        self._trained_count = len(assign)
+        order = np.argsort(assign, kind="stable")
+        bounds = np.searchsorted(assign[order], np.arange(len(self._centroids) + 1))
+        self._lists = [order[bounds[i]:bounds[i + 1]].astype(np.int64) for i in range(len(self._centroids))]
+        self._pending = [[] for _ in self._centroids]
+
+    def _load_ivf(self) -> None:
+        centroids_file = self.path / "ivf_centroids.npy"
+        assign_file = self.path / "ivf_assign.npy"
+        if not (centroids_file.exists() and assign_file.exists()):
+            return
+        self._centroids = np.load(centroids_file)
+        assign = np.load(assign_file)
+        self._set_assignments(assign[: self.count])
+        for row in range(len(assign), self.count):
+            self._assign_new(row, self._vectors[row])
+
+    def _assign_new(self, row: int, vector: np.ndarray) -> None:
+        if self._centroids is None or row < self._trained_count:
+            return
+        self._pending[int(np.argmax(self._centroids @ vector))].append(row)
+        # Retrain once the store has doubled since the quantizer was built
+        if self.count >= 2 * self._trained_count:
+            self._train_in_background()
+
+    def memory_bytes(self) -> int:
+        """Bytes used by vectors and IVF structures (excluding record metadata)."""
+        with self._lock:
+            self._load()
+            total = self.count * self.embedder.dims * 4
+            if self._centroids is not None:
+                total += self._centroids.nbytes + self._trained_count * (4 + 8)
+            return total
+
+    def close(self) -> None:
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+            self._vectors = None
+            self._loaded = False
+            self._records, self._keys = [], {}
+            self._centroids = None
+
+
+def to_tool_result(query: str, hits: list[tuple[float, dict]]) -> ToolResult:
+    papers = [Paper(**r["data"]) for _, r in hits if r["kind"] == "paper"]
+    articles = [Article(**r["data"]) for _, r in hits if r["kind"] == "article"]
+    return ToolResult(
+        action="related_papers",
+        kind="papers" if papers else "articles",
+        query=query,
+        papers=papers,
+        articles=articles,
+    )
+
+
+vector_store = VectorStore(Path(__file__).parent.parent / settings.vector_store_path)
@@ -0,0 +1,94 @@
+"""Shared fixtures."""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models.results import ToolResult
+from services import execution_tracker
+from services.loop_monitor import loop_monitor
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "allow_blocking: don't fail the test on event-loop stalls")
+
+
+@pytest.fixture(autouse=True)
+def strict_loop(request, monkeypatch):
+    """
+    Watch every asyncio.run in a test with the loop monitor and fail the
+    test if the loop blocked outside KNOWN_BLOCKING.
+    """
+    if request.node.get_closest_marker("allow_blocking"):
+        yield
+        return
+    run = asyncio.run
+
+    def monitored(main, **kwargs):
+        async def watched():
+            loop_monitor.start()
+            try:
+                return await main
+            finally:
+                loop_monitor.stop()
+
+        return run(watched(), **kwargs)
+
+    monkeypatch.setattr(asyncio, "run", monitored)
+    with loop_monitor.strict():
+        yield
+
+
+class ExecutionStub:
+    """
+    execute_plan_stream with tool calls, model calls, the synthesis cache and
+    its pauses stubbed out. Set tool, synthesize, mode or client to change
+    what a run sees; calls and synthesized record what happened.
+    """
+
+    def __init__(self, monkeypatch):
+        self.calls: list[tuple[str, dict]] = []
+        self.synthesized = 0
+        self.tool = lambda action, *args: ToolResult(action=action, text=f"{action} result")
+        self.synthesize = lambda *args: ("summary", "test-model")
+        self.mode: tuple[str, str | None] = ("full", None)
+        self.client = None
+
+        monkeypatch.setattr(execution_tracker, "_call_tool", self._call_tool)
+        monkeypatch.setattr(execution_tracker, "_synthesize", self._synthesize)
+        monkeypatch.setattr(execution_tracker, "_choose_synthesis", lambda steps: self.mode)
+        monkeypatch.setattr(execution_tracker, "openai_client", lambda api_key: self.client)
+        monkeypatch.setattr(execution_tracker.synthesis_cache, "get", lambda *a: None)
+        monkeypatch.setattr(execution_tracker.synthesis_cache, "put", lambda *a: None)
+        sleep = asyncio.sleep
+        monkeypatch.setattr(asyncio, "sleep", lambda *_: sleep(0))
+
+    def _call_tool(self, action, params, prev_results, description="", agent_id="", paper_index=None):
+        self.calls.append((action, dict(params)))
+        return self.tool(action, params, prev_results, description, agent_id, paper_index)
+
+    def _synthesize(self, *args):
+        self.synthesized += 1
+        return self.synthesize(*args)
+
+    def run(self, plan: dict, graph: dict | None = None, **kwargs) -> list[dict]:
+        """Run plan to the end and return its decoded SSE events."""
+
+        async def collect():
+            stream = execution_tracker.execute_plan_stream(
+                plan, graph or {"nodes": [], "edges": []}, api_key="sk-test", **kwargs
+            )
+            return [json.loads(chunk[len("data: "):]) async for chunk in stream]
+
+        return asyncio.run(collect())
+
+
+@pytest.fixture
+def stub_execution(monkeypatch) -> ExecutionStub:
+    return ExecutionStub(monkeypatch)
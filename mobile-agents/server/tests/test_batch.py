@@ -0,0 +1,145 @@
+"""Tests for batch execution and upstream pacing."""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from crew.agents import AGENT_METADATA
+from crew.tools import TOOL_FUNCTIONS
+from models.results import Paper, ToolResult
+from services import agent_store, batch, execution_tracker
+from services.execution_tracker import _call_tool
+from services.plan_templates import TemplateError
+from services.rate_limit import UpstreamLimiter
+from services.tool_cache import ToolCache
+
+TEMPLATE = {
+    "id": "two_sources",
+    "name": "Two sources",
+    "summary": "Papers and background on {topic}",
+    "slots": [{"name": "topic", "type": "string"}, {"name": "field", "type": "string"}],
+    "steps": [
+        {"id": "step_1", "agent_id": "arxiv", "action": "arxiv_search",
+         "description": "Search arXiv for {topic}", "params": {"query": "{topic}"}},
+        {"id": "step_2", "agent_id": "wikipedia", "action": "wiki_search",
+         "description": "Background on {field}", "params": {"query": "{field}"}},
+    ],
+}
+
+
+class TestUpstreamLimiter:
+    def test_spacing_per_upstream(self):
+        limiter = UpstreamLimiter({"arxiv": 20.0, "wiki": 0})
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.wait("arxiv_search")
+        assert time.monotonic() - start >= 0.09
+        assert limiter.wait("wiki_search") == 0.0
+        assert limiter.upstream("semantic_scholar_search") is None
+
+
+class TestBatch:
+    @pytest.fixture(autouse=True)
+    def _isolate(self, tmp_path, monkeypatch, stub_execution):
+        from config import settings
+
+        monkeypatch.setattr(agent_store, "_agents_registry", {k: dict(v) for k, v in AGENT_METADATA.items()})
+        monkeypatch.setattr(batch, "RESULTS_DIR", tmp_path)
+        monkeypatch.setattr(batch, "_pool", None)
+        monkeypatch.setattr(batch, "batch_limiter", UpstreamLimiter({}))
+        monkeypatch.setattr(settings, "batch_concurrency", 2)
+        monkeypatch.setattr(settings, "research_index_enabled", False)
+        monkeypatch.setattr(settings, "vector_store_enabled", False)
+        monkeypatch.setattr(execution_tracker, "tool_cache", ToolCache())
+        stub_execution.tool = _call_tool
+        stub_execution.mode = ("passthrough", None)
+
+        self.upstream_calls = []
+
+        def arxiv_search(query: str, max_results: int = 5, since: str = "") -> ToolResult:
+            self.upstream_calls.append(("arxiv", query))
+            time.sleep(0.02)
+            return ToolResult(action="arxiv_search", kind="papers", query=query, papers=[Paper(title=query)])
+
+        def wiki_search(query: str) -> ToolResult:
+            self.upstream_calls.append(("wiki", query))
+            time.sleep(0.02)
+            return ToolResult(action="wiki_search", text=f"About {query}")
+
+        monkeypatch.setitem(TOOL_FUNCTIONS, "arxiv_search", arxiv_search)
+        monkeypatch.setitem(TOOL_FUNCTIONS, "wiki_search", wiki_search)
+
+    def _run(self, arg_sets):
+        async def collect():
+            instances = batch.prepare(TEMPLATE, arg_sets)
+            return [json.loads(line) async for line in batch.run_batch(TEMPLATE, instances, "u1")]
+
+        return asyncio.run(collect())
+
+    def test_runs_all_instances_and_dedupes_shared_calls(self, tmp_path):
+        topics = ["gnn", "diffusion", "rl", "gnn"]
+        lines = self._run([{"topic": t, "field": "machine learning"} for t in topics])
+
+        done = [l for l in lines if l["type"] == "instance_completed"]
+        assert sorted(l["index"] for l in done) == [0, 1, 2, 3]
+        assert all(l["summary"] and len(l["steps"]) == 2 for l in done)
+        # One wiki call for the shared field, one arXiv call per distinct topic
+        assert sorted(self.upstream_calls) == sorted(
+            [("arxiv", "gnn"), ("arxiv", "diffusion"), ("arxiv", "rl"), ("wiki", "machine learning")]
+        )
+        final = lines[-1]
+        assert final["type"] == "batch_complete" and final["completed"] == 4 and final["failed"] == 0
+        assert final["toolCalls"]["misses"] == 4
+        assert final["toolCalls"]["hits"] + final["toolCalls"]["coalesced"] == 4
+        assert final["topicsPerMinute"] > 0
+
+        written = (tmp_path / f"{lines[0]['batchId']}.ndjson").read_text().splitlines()
+        assert [json.loads(l) for l in written] == lines
+
+    def test_bad_rows_rejected_up_front(self):
+        with pytest.raises(TemplateError, match=r"\[1\] Missing template argument: field"):
+            batch.prepare(TEMPLATE, [{"topic": "a", "field": "b"}, {"topic": "c"}])
+        with pytest.raises(TemplateError, match="No parameter sets"):
+            batch.prepare(TEMPLATE, [])
+
+    def test_templates_with_side_effects_are_rejected(self, monkeypatch):
+        from fastapi import HTTPException
+
+        from routers.batch import BatchRequest, run_batch_endpoint
+        from services import agent_store
+
+        monkeypatch.setattr(agent_store, "_templates_registry", {t["id"]: t for t in agent_store.DEFAULT_TEMPLATES})
+
+        batch.check_read_only(TEMPLATE)
+        slack = {**TEMPLATE, "steps": TEMPLATE["steps"] + [
+            {"id": "step_3", "agent_id": "slack", "action": "slack_send_message", "params": {"text": "{topic}"}},
+        ]}
+        # Saved templates are checked too: the built-in digest posts to Slack
+        for request in (
+            BatchRequest(template=slack, args=[{"topic": "gnn", "field": "ml"}]),
+            BatchRequest(template_id="literature_digest", args=[{"topic": "gnn", "channel": "#lab"}] * 3),
+        ):
+            with pytest.raises(HTTPException) as e:
+                asyncio.run(run_batch_endpoint(request, {"sub": "u1"}))
+            assert e.value.status_code == 400 and "slack_send_message" in e.value.detail
+
+    def test_results_are_served_only_to_their_owner(self):
+        from fastapi import HTTPException
+
+        from routers.batch import get_batch_results
+
+        batch_id = self._run([{"topic": "gnn", "field": "ml"}])[0]["batchId"]
+        assert batch.batch_owner(batch_id) == "u1"
+        response = asyncio.run(get_batch_results(batch_id, {"sub": "u1"}))
+        assert response.path == batch.results_file(batch_id)
+        for bad_id in (batch_id, "../../secret"):
+            with pytest.raises(HTTPException) as e:
+                asyncio.run(get_batch_results(bad_id, {"sub": "u2"}))
+            assert e.value.status_code == 404
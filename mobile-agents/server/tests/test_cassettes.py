@@ -0,0 +1,100 @@
+"""Tests for record/replay cassettes and the latency profile diff."""
+
+import json
+import os
+import sys
+import time
+
+import httpx
+import pytest
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config import settings
+from crew import tools
+from loadtest.cassettes import Cassette, CassetteMiss
+from loadtest.fake_upstreams import Profile
+from loadtest.replay import diff
+from loadtest.run import start_fakes
+from services.llm_scheduler import openai_client
+
+
+@pytest.fixture(scope="module")
+def fakes():
+    profile = Profile()
+    for service in profile.latency:
+        profile.set(service, latency="fixed:0")
+    profile.set("arxiv", latency="fixed:80")
+    url, server = start_fakes(profile)
+    yield url
+    server.should_exit = True
+
+
+@pytest.fixture
+def upstreams(fakes, monkeypatch):
+    monkeypatch.setattr(settings, "arxiv_api_url", f"{fakes}/arxiv/api/query")
+    monkeypatch.setattr(settings, "wikipedia_url", f"{fakes}/wiki")
+    monkeypatch.setattr(settings, "openai_base_url", f"{fakes}/openai/v1")
+    return fakes
+
+
+def _calls(url: str) -> dict:
+    return httpx.get(f"{url}/__stats").json()
+
+
+def _session():
+    papers = tools._arxiv_search_result("graph transformers", max_results=2)
+    wiki = tools._wiki_search_result("graph transformers")
+    reply = openai_client("sk-fake").chat.completions.create(
+        model="gpt-4.1", messages=[{"role": "user", "content": "Summarize these papers"}]
+    )
+    return papers, wiki, reply.choices[0].message.content
+
+
+class TestCassettes:
+    def test_record_then_replay_offline(self, upstreams, tmp_path):
+        path = tmp_path / "cassette.json"
+        with Cassette(path, mode="record", llm_hosts=["127.0.0.1"]).active():
+            recorded = _session()
+        data = json.loads(path.read_text())
+        assert data["version"] == 1
+        assert [i["kind"] for i in data["interactions"]] == ["tool", "tool", "synthesis"]
+        assert data["interactions"][0]["durationMs"] >= 80
+
+        before = _calls(upstreams)
+        cassette = Cassette(path, mode="replay", latency_scale=0.0, llm_hosts=["127.0.0.1"])
+        with cassette.active():
+            start = time.perf_counter()
+            replayed = _session()
+            elapsed = time.perf_counter() - start
+        assert _calls(upstreams) == before
+        assert [p.title for p in replayed[0].papers] == [p.title for p in recorded[0].papers]
+        assert replayed[1].articles == recorded[1].articles
+        assert replayed[2] == recorded[2]
+        assert elapsed < 0.08 and cassette.misses == 0
+
+    def test_replay_keeps_recorded_latency_and_errors(self, upstreams, tmp_path):
+        path = tmp_path / "cassette.json"
+        with Cassette(path, mode="record").active():
+            tools._arxiv_search_result("slow query", max_results=1)
+        with Cassette(path, mode="replay", latency_scale=1.0).active():
+            start = time.perf_counter()
+            tools._arxiv_search_result("slow query", max_results=1)
+            assert time.perf_counter() - start >= 0.07
+            # Exchanges are used once; an unrecorded request is a miss
+            with pytest.raises(CassetteMiss):
+                tools.urllib.request.urlopen(f"{settings.arxiv_api_url}?search_query=other")
+
+    def test_rejects_unknown_version(self, tmp_path):
+        path = tmp_path / "cassette.json"
+        path.write_text(json.dumps({"version": 99, "interactions": []}))
+        with pytest.raises(ValueError):
+            Cassette(path)
+
+    def test_diff(self):
+        before = {"phases": {"planMs": {"p50": 100.0, "p95": 200.0}, "step:arxiv_search": {"p50": 50.0, "p95": 80.0}}}
+        after = {"phases": {"planMs": {"p50": 80.0, "p95": 260.0}}}
+        rows = {r["phase"]: r for r in diff(before, after)}
+        assert rows["planMs"]["p50Change"] == -20.0 and rows["planMs"]["p95Change"] == 30.0
+        assert rows["step:arxiv_search"]["p50"] == [50.0, None]
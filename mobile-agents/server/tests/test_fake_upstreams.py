@@ -0,0 +1,75 @@
+"""Tests for the load-test stand-in upstreams against the real tool parsers."""
+
+import os
+import sys
+
+import pytest
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config import settings
+from crew import tools
+from crew.orchestrator import TaskPlan
+from loadtest.fake_upstreams import Latency, Profile, _canned_plan
+from loadtest.run import start_fakes
+
+
+@pytest.fixture(scope="module")
+def fakes():
+    profile = Profile()
+    for service in profile.latency:
+        profile.set(service, latency="fixed:0")
+    url, server = start_fakes(profile)
+    yield url, profile
+    server.should_exit = True
+
+
+@pytest.fixture
+def upstreams(fakes, monkeypatch):
+    url, profile = fakes
+    monkeypatch.setattr(settings, "arxiv_api_url", f"{url}/arxiv/api/query")
+    monkeypatch.setattr(settings, "semantic_scholar_api_url", f"{url}/s2/graph/v1")
+    monkeypatch.setattr(settings, "wikipedia_url", f"{url}/wiki")
+    monkeypatch.setattr(settings, "slack_api_url", f"{url}/slack/api")
+    monkeypatch.setenv("SLACK_BOT_TOKEN", "xoxb-fake")
+    return profile
+
+
+class TestFakeUpstreams:
+    def test_tools_parse_fake_payloads(self, upstreams):
+        papers = tools._arxiv_search_result("graph transformers", max_results=3)
+        assert papers.kind == "papers" and len(papers.papers) == 3
+        assert all(p.arxiv_id and p.published for p in papers.papers)
+        one = tools._arxiv_summarize_result(papers.papers[0].url)
+        assert one.papers[0].arxiv_id == papers.papers[0].arxiv_id
+
+        s2 = tools._semantic_scholar_search_result("graph transformers", max_results=4)
+        assert len(s2.papers) == 4 and s2.papers[0].citation_count is not None
+        assert tools._semantic_scholar_cite_result(s2.papers[0].s2_id).kind == "papers"
+
+        wiki = tools._wiki_search_result("graph transformers")
+        assert wiki.kind == "articles" and len(wiki.articles) == 5
+        assert "topic" in tools._wiki_summarize_result(wiki.articles[0].title).articles[0].text
+
+        assert not tools._slack_send_message_result("#lab", "hi").is_error
+
+    def test_injected_errors(self, upstreams):
+        upstreams.set("arxiv", error_rate=1.0)
+        try:
+            assert tools._arxiv_search_result("x").is_error
+        finally:
+            upstreams.set("arxiv", error_rate=0.0)
+
+    def test_canned_plan_is_valid(self):
+        plan = _canned_plan("User request: find papers on diffusion\n\nRules: ...")
+        assert TaskPlan.model_validate(plan).steps[0].params == {"query": "find papers on diffusion"}
+
+    def test_latency_specs(self):
+        import random
+
+        rng = random.Random(0)
+        assert Latency("fixed:50").sample(rng) == 0.05
+        assert 0.02 <= Latency("uniform:20:80").sample(rng) <= 0.08
+        with pytest.raises(ValueError):
+            Latency("gamma:1:2")
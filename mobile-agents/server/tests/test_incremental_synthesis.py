@@ -0,0 +1,89 @@
+"""Tests for incremental synthesis: per-step digests reduced by the final call."""
+
+import os
+import sys
+import threading
+from types import SimpleNamespace
+from typing import Callable
+
+import pytest
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config import settings
+from models.results import ToolResult
+from services import execution_tracker
+from services.latency_model import LatencyModel
+
+PLAN = {"summary": "Research", "steps": [
+    {"id": "s1", "agent_id": "arxiv", "action": "arxiv_search", "description": "papers", "params": {"query": "q"}},
+    {"id": "s2", "agent_id": "wikipedia", "action": "wiki_search", "description": "background", "params": {"query": "q"}},
+]}
+
+
+class _DigestClient:
+    """Digests a step as "digest of <description>"; hooks run before each digest."""
+
+    def __init__(self):
+        self.hooks: dict[str, Callable[[], None]] = {}
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, model, messages, **kwargs):
+        description = messages[1]["content"].split("**Agent step:** ", 1)[1].split("\n", 1)[0]
+        if description in self.hooks:
+            self.hooks[description]()
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f"digest of {description}"))], usage=None
+        )
+
+
+class TestIncrementalSynthesis:
+    @pytest.fixture(autouse=True)
+    def _setup(self, monkeypatch, stub_execution):
+        monkeypatch.setattr(settings, "incremental_synthesis", True)
+        monkeypatch.setattr(settings, "research_index_enabled", False)
+        monkeypatch.setattr(settings, "vector_store_enabled", False)
+        # No history, so steps run in plan order
+        monkeypatch.setattr(execution_tracker, "latency_model", LatencyModel())
+        self.stub = stub_execution
+        self.client = stub_execution.client = _DigestClient()
+        self.synthesis_input = {}
+
+        def synthesize(client, user_message, plan_summary, step_results, role):
+            self.synthesis_input = {s["id"]: s["result"] for s in step_results}
+            return "summary", "test-model"
+
+        stub_execution.synthesize = synthesize
+
+    def test_digests_overlap_later_steps(self):
+        digest_started = threading.Event()
+        self.client.hooks["papers"] = digest_started.set
+        overlapped = []
+
+        def tool(action, *args):
+            if action == "wiki_search":
+                # The first step's digest runs while this step is still in flight
+                overlapped.append(digest_started.wait(2))
+            return ToolResult(action=action, text=f"{action} result")
+
+        self.stub.tool = tool
+        events = self.stub.run(PLAN)
+        assert overlapped == [True]
+        assert self.synthesis_input == {"s1": "digest of papers", "s2": "digest of background"}
+        output = next(e for e in events if e.get("nodeId") == "output" and e.get("status") == "completed")
+        assert output["incremental"] is True
+
+    def test_failed_digest_falls_back_to_raw_result(self):
+        def fail():
+            raise RuntimeError("digest model down")
+
+        self.client.hooks["background"] = fail
+        events = self.stub.run(PLAN)
+        assert events[-1]["type"] == "execution_complete"
+        assert self.synthesis_input["s1"] == "digest of papers"
+        assert "wiki_search result" in self.synthesis_input["s2"]
+
+    def test_single_step_plans_are_not_digested(self):
+        self.stub.run({**PLAN, "steps": PLAN["steps"][:1]})
+        assert "arxiv_search result" in self.synthesis_input["s1"]
@@ -0,0 +1,125 @@
+"""Tests for the rolling latency model, plan estimates and eta events."""
+
+import os
+import random
+import sys
+
+import pytest
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config import settings
+from crew.tools import TOOL_FUNCTIONS
+from models.results import ToolResult
+from services import execution_tracker
+from services.execution_tracker import _call_tool
+from services.latency_model import APPROVAL_WAIT_MS, STEP_PAUSE_MS, LatencyModel, QuantileSketch
+from services.tool_cache import ToolCache
+
+
+def _step(step_id, action="wiki_search", agent_id="wikipedia", depends_on=(), **extra):
+    return {"id": step_id, "agent_id": agent_id, "action": action, "depends_on": list(depends_on), **extra}
+
+
+class TestQuantileSketch:
+    def test_quantiles_within_relative_error(self):
+        rng = random.Random(7)
+        values = [rng.lognormvariate(6, 1) for _ in range(5000)]
+        sketch = QuantileSketch(window=10000)
+        for v in values:
+            sketch.add(v)
+        ordered = sorted(values)
+        for q in (0.5, 0.95):
+            exact = ordered[int(q * (len(ordered) - 1))]
+            assert sketch.quantile(q) == pytest.approx(exact, rel=0.03)
+
+    def test_old_samples_age_out(self):
+        sketch = QuantileSketch(window=100)
+        for _ in range(100):
+            sketch.add(5000)
+        for _ in range(250):
+            sketch.add(100)
+        assert sketch.count == 150
+        assert sketch.quantile(0.95) == pytest.approx(100, rel=0.02)
+        assert QuantileSketch().quantile(0.5) is None
+
+
+class TestEstimate:
+    def test_critical_path_total_and_priority(self):
+        model = LatencyModel()
+        for _ in range(10):
+            model.observe("tool", "arxiv_search", 3000)
+            model.observe("tool", "wiki_search", 500)
+            model.observe("synthesis", "", 1000)
+        steps = [
+            _step("s1", "arxiv_search", "arxiv"),
+            _step("s2", "wiki_search"),
+            _step("s3", "wiki_search", depends_on=["s1", "s2"], requires_approval=True),
+        ]
+        est = model.estimate(steps)
+        assert est["criticalPath"] == ["s1", "s3"]
+        p50 = est["stepMs"]
+        assert p50["s3"] == pytest.approx(500 + APPROVAL_WAIT_MS, rel=0.03)
+        assert est["criticalPathMs"] == pytest.approx(3000 + 500 + APPROVAL_WAIT_MS + 1000, rel=0.03)
+        assert est["totalMs"] == pytest.approx(sum(p50.values()) + 3 * STEP_PAUSE_MS + est["synthesisMs"], abs=2)
+        assert est["priority"]["s1"] > est["priority"]["s2"] > est["priority"]["s3"]
+
+        # Finished steps drop out, along with their edges
+        rest = model.estimate(steps, done={"s1"})
+        assert rest["criticalPath"] == ["s2", "s3"]
+        assert set(rest["stepMs"]) == {"s2", "s3"}
+
+    def test_falls_back_to_agent_then_default(self):
+        model = LatencyModel()
+        model.observe("agent", "arxiv", 800)
+        assert model.step_ms(_step("s1", "arxiv_fetch", "arxiv")) == pytest.approx(800, rel=0.02)
+        assert model.step_ms(_step("s1", "new_tool", "new_agent")) == settings.latency_default_step_ms
+        assert model.synthesis_ms() == settings.latency_default_synthesis_ms
+
+
+class TestExecution:
+    def test_longest_chain_first_and_eta_events(self, stub_execution, monkeypatch):
+        model = LatencyModel()
+        for _ in range(10):
+            model.observe("tool", "arxiv_search", 4000)
+            model.observe("tool", "wiki_search", 200)
+        monkeypatch.setattr(execution_tracker, "latency_model", model)
+        monkeypatch.setattr(settings, "incremental_synthesis", False)
+        # The wiki step comes first in the plan but heads the shorter chain
+        plan = {"summary": "Research", "steps": [
+            _step("s1", "wiki_search", params={"query": "graphs"}),
+            _step("s2", "arxiv_search", "arxiv", params={"query": "graphs"}),
+            _step("s3", "wiki_search", depends_on=["s2"], params={"query": "graphs"}),
+        ]}
+
+        events = stub_execution.run(plan)
+        assert [action for action, _ in stub_execution.calls] == ["arxiv_search", "wiki_search", "wiki_search"]
+        etas = [e for e in events if e["type"] == "eta"]
+        assert [e["completedSteps"] for e in etas] == [0, 1, 2, 3]
+        assert etas[0]["criticalPath"] == ["s2", "s3"]
+        remaining = [e["remainingMs"] for e in etas]
+        assert remaining == sorted(remaining, reverse=True)
+        # Durations were recorded for the next estimate
+        assert model.quantile("tool", "wiki_search", 0.5) is not None
+        assert model.quantile("synthesis", "", 0.5) is not None
+
+    def test_cache_hits_and_passthrough_are_not_observed(self, stub_execution, monkeypatch):
+        model = LatencyModel()
+        monkeypatch.setattr(execution_tracker, "latency_model", model)
+        monkeypatch.setattr(execution_tracker, "tool_cache", ToolCache())
+        monkeypatch.setattr(settings, "incremental_synthesis", False)
+        monkeypatch.setattr(settings, "research_index_enabled", False)
+        monkeypatch.setattr(settings, "vector_store_enabled", False)
+        monkeypatch.setitem(TOOL_FUNCTIONS, "wiki_search", lambda query: ToolResult(action="wiki_search", text=query))
+        stub_execution.tool = _call_tool
+        stub_execution.mode = ("passthrough", None)
+        plan = {"summary": "Research", "steps": [
+            _step("s1", params={"query": "graphs"}),
+            _step("s2", params={"query": "Graphs"}),
+        ]}
+
+        stub_execution.run(plan)
+        snapshot = model.snapshot()
+        assert snapshot["tool"]["wiki_search"]["count"] == 1
+        assert "synthesis" not in snapshot
@@ -0,0 +1,112 @@
+"""Tests for LLM admission control."""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.llm_scheduler import LLMScheduler, SchedulerOverloaded, _parse_reset
+
+
+class TestLLMScheduler:
+    def test_priority_order(self):
+        sched = LLMScheduler(max_concurrency=1)
+        sched.acquire("planner")  # occupy the only slot
+        order = []
+
+        def worker(site):
+            sched.acquire(site)
+            order.append(site)
+            sched.release()
+
+        background = threading.Thread(target=worker, args=("digest",))
+        background.start()
+        time.sleep(0.05)
+        interactive = threading.Thread(target=worker, args=("planner",))
+        interactive.start()
+        time.sleep(0.05)
+        sched.release()
+        background.join(2)
+        interactive.join(2)
+        assert order == ["planner", "digest"]
+
+    def test_rpm_window(self):
+        sched = LLMScheduler(rpm_limit=2, max_wait=0.3)
+        with sched.slot("synthesizer"):
+            pass
+        with sched.slot("synthesizer"):
+            pass
+        with pytest.raises(SchedulerOverloaded):
+            sched.acquire("synthesizer")
+        assert sched.snapshot()["callSites"]["synthesizer"]["rejected"] == 1
+
+    def test_queue_full(self):
+        sched = LLMScheduler(max_concurrency=1, max_queue=0)
+        with pytest.raises(SchedulerOverloaded):
+            sched.acquire("planner")
+
+    def test_header_quota_blocks_large_request(self):
+        sched = LLMScheduler(max_wait=0.3)
+        sched.update_from_headers({
+            "x-ratelimit-remaining-tokens": "100",
+            "x-ratelimit-reset-tokens": "10s",
+        })
+        with sched.slot("digest", est_tokens=50):
+            pass
+        with pytest.raises(SchedulerOverloaded):
+            sched.acquire("digest", est_tokens=500)
+
+    def test_async_waiters_hold_no_threads(self):
+        sched = LLMScheduler(max_concurrency=1)
+        order = []
+
+        async def call(site):
+            async with sched.aslot(site):
+                order.append(site)
+                await asyncio.sleep(0)
+
+        async def scenario():
+            sched.acquire("planner")  # occupy the only slot
+            tasks = [asyncio.create_task(call("digest")) for _ in range(20)]
+            await asyncio.sleep(0.05)
+            tasks.append(asyncio.create_task(call("planner")))
+            await asyncio.sleep(0.05)
+            assert sched.snapshot()["queued"] == 21
+            threads = threading.active_count()
+            # A thread releasing the slot wakes the loop's waiters
+            threading.Thread(target=sched.release).start()
+            await asyncio.gather(*tasks)
+            assert threading.active_count() <= threads
+            assert asyncio.get_running_loop()._default_executor is None
+
+        asyncio.run(scenario())
+        assert order[0] == "planner" and len(order) == 21
+        assert sched.snapshot()["inflight"] == 0
+
+    def test_cancelled_async_waiter_leaves_queue(self):
+        sched = LLMScheduler(max_concurrency=1, max_wait=5)
+
+        async def scenario():
+            await sched.aacquire("planner")
+            waiter = asyncio.create_task(sched.aacquire("digest"))
+            await asyncio.sleep(0.05)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            assert sched.snapshot()["queued"] == 0
+            sched.release()
+            # The slot is free for the next caller
+            assert await asyncio.wait_for(sched.aacquire("digest"), 1) < 1
+
+        asyncio.run(scenario())
+
+    def test_parse_reset(self):
+        assert _parse_reset("6m0s") == 360
+        assert _parse_reset("20ms") == pytest.approx(0.02)
+        assert _parse_reset("") == 0
@@ -0,0 +1,85 @@
+"""Tests for event-loop lag sampling and blocking-call detection."""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services import metrics
+from services.loop_monitor import BlockingCallError, LoopMonitor
+
+
+# These tests block the loop on purpose
+pytestmark = pytest.mark.allow_blocking
+
+
+def _block(seconds: float = 0.3) -> None:
+    time.sleep(seconds)
+
+
+async def _run(monitor: LoopMonitor, blocking) -> None:
+    monitor.start()
+    await asyncio.sleep(0.05)
+    blocking()
+    await asyncio.sleep(0.05)
+    monitor.stop()
+
+
+class TestStallDetection:
+    def test_captures_call_site_while_blocked(self):
+        monitor = LoopMonitor(interval=0.01, threshold=0.05)
+        asyncio.run(_run(monitor, _block))
+
+        assert len(monitor.stalls) == 1
+        stall = monitor.stalls[0]
+        assert stall.call_site.startswith("tests/test_loop_monitor.py:")
+        assert stall.call_site.endswith(" _block")
+        assert stall.route == "background"
+        assert stall.duration_ms >= 250
+        assert any("time.sleep" in line for line in stall.stack)
+        assert f'call_site="{stall.call_site}"' in metrics.render()
+
+    def test_short_callbacks_are_not_stalls(self):
+        monitor = LoopMonitor(interval=0.01, threshold=0.05)
+        asyncio.run(_run(monitor, lambda: _block(0.005)))
+        assert not monitor.stalls
+
+    def test_attributes_stall_to_route(self):
+        app = FastAPI()
+        monitor = LoopMonitor(interval=0.01, threshold=0.05)
+
+        @app.on_event("startup")
+        async def startup():
+            monitor.start()
+
+        @app.get("/slow/{n}")
+        async def slow(n: int):
+            _block()
+            return {"n": n}
+
+        with TestClient(app) as client:
+            client.get("/slow/1")
+            time.sleep(0.05)
+        monitor.stop()
+        assert [s.route for s in monitor.stalls] == ["/slow/{n}"]
+
+
+class TestStrictMode:
+    def test_new_blocking_call_fails(self):
+        monitor = LoopMonitor(interval=0.01, threshold=0.05)
+        with pytest.raises(BlockingCallError, match="_block"):
+            with monitor.strict():
+                asyncio.run(_run(monitor, _block))
+
+    def test_allowlisted_call_site_passes(self):
+        monitor = LoopMonitor(interval=0.01, threshold=0.05)
+        with monitor.strict(allow=("tests/test_loop_monitor.py _block",)) as stalls:
+            asyncio.run(_run(monitor, _block))
+        assert len(stalls) == 1
@@ -0,0 +1,72 @@
+"""Tests for map step item extraction and reduction."""
+
+import os
+import sys
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models.results import Article, Paper, ToolResult
+from services.execution_tracker import REDUCERS, _map_items
+
+
+SEARCH_RESULT = ToolResult(
+    action="arxiv_search",
+    kind="papers",
+    query="x",
+    papers=[
+        Paper(title="Paper A", url="http://arxiv.org/abs/2401.00001v1", arxiv_id="2401.00001v1"),
+        Paper(title="Paper B", url="http://arxiv.org/abs/2401.00002v1", arxiv_id="2401.00002v1"),
+        Paper(title="Paper A again", url="http://arxiv.org/abs/2401.00001v1", arxiv_id="2401.00001v1"),
+    ],
+)
+
+
+class TestMapSteps:
+    def test_items_from_map_over(self):
+        step = {"action": "arxiv_summarize", "map_over": "step_1", "depends_on": ["step_1"]}
+        items = _map_items(step, {"step_1": SEARCH_RESULT})
+        assert items == [
+            "http://arxiv.org/abs/2401.00001v1",
+            "http://arxiv.org/abs/2401.00002v1",
+        ]
+
+    def test_items_from_other_source(self):
+        s2 = ToolResult(
+            action="semantic_scholar_search",
+            kind="papers",
+            papers=[Paper(title="T", s2_id="abc"), Paper(title="U", arxiv_id="1706.03762")],
+        )
+        step = {"action": "semantic_scholar_cite", "depends_on": ["step_1"]}
+        assert _map_items(step, {"step_1": s2}) == ["abc", "ARXIV:1706.03762"]
+        step = {"action": "arxiv_summarize", "depends_on": ["step_1"]}
+        assert _map_items(step, {"step_1": s2}) == ["http://arxiv.org/abs/1706.03762"]
+
+    def test_items_capped(self, monkeypatch):
+        from config import settings
+
+        monkeypatch.setattr(settings, "map_max_items", 1)
+        step = {"action": "arxiv_summarize", "depends_on": ["step_1"]}
+        assert len(_map_items(step, {"step_1": SEARCH_RESULT})) == 1
+
+    def test_unmappable_action(self):
+        step = {"action": "slack_send_message", "map_over": "step_1"}
+        assert _map_items(step, {"step_1": SEARCH_RESULT}) == []
+
+    def test_reducers(self):
+        parts = [
+            ToolResult(action="wiki_summarize", kind="articles", articles=[Article(title=t)])
+            for t in ("a", "b", "a")
+        ]
+        merged = REDUCERS["concat"]("wiki_summarize", parts)
+        assert [a.title for a in merged.articles] == ["a", "b", "a"]
+        merged = REDUCERS["unique"]("wiki_summarize", parts)
+        assert [a.title for a in merged.articles] == ["a", "b"]
+
+    def test_reducer_skips_errors(self):
+        parts = [
+            ToolResult.error("arxiv_summarize", "Paper x not found."),
+            ToolResult(action="arxiv_summarize", kind="papers", papers=[Paper(title="ok")]),
+        ]
+        merged = REDUCERS["concat"]("arxiv_summarize", parts)
+        assert merged.kind == "papers" and len(merged.papers) == 1
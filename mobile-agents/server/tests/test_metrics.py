@@ -0,0 +1,145 @@
+"""Tests for the in-process metrics and the /metrics endpoint."""
+
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from crew.tools import TOOL_FUNCTIONS
+from models.results import ToolResult
+from services import execution_tracker, metrics
+from services.tool_cache import _call_upstream
+
+
+def _sample(text: str, series: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{series} not in exposition")
+
+
+class TestPrimitives:
+    def test_counter_shards_sum_across_threads(self):
+        counter = metrics.Counter("test_sharded_total", "Test.", ("kind",))
+        series = counter.labels("a")
+
+        def work():
+            for _ in range(10000):
+                series.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert series.value() == 80000
+        assert 'test_sharded_total{kind="a"} 80000' in metrics.render()
+
+    def test_histogram_buckets_are_cumulative(self):
+        hist = metrics.Histogram("test_latency_seconds", "Test.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            hist.observe(value)
+        text = metrics.render()
+        assert _sample(text, 'test_latency_seconds_bucket{le="0.1"}') == 2
+        assert _sample(text, 'test_latency_seconds_bucket{le="1.0"}') == 3
+        assert _sample(text, 'test_latency_seconds_bucket{le="+Inf"}') == 4
+        assert _sample(text, "test_latency_seconds_count") == 4
+        assert _sample(text, "test_latency_seconds_sum") == pytest.approx(3.65)
+
+    def test_label_values_are_escaped(self):
+        metrics.Counter("test_escaped_total", "Test.", ("v",)).labels('a"b\\c\n').inc()
+        assert 'test_escaped_total{v="a\\"b\\\\c\\n"} 1' in metrics.render()
+
+    def test_counted_closes_the_wrapped_stream(self):
+        closed = []
+
+        async def stream():
+            try:
+                yield "a"
+                yield "b"
+            finally:
+                closed.append(True)
+
+        async def run():
+            wrapped = metrics.counted(metrics.sse_streams, stream())
+            assert await wrapped.__anext__() == "a"
+            await wrapped.aclose()
+
+        asyncio.run(run())
+        assert closed == [True]
+
+
+class TestInstrumentation:
+    def test_tool_calls_by_outcome(self):
+        ok = 'mobileagents_tool_calls_total{tool="wiki_search",outcome="ok"}'
+        error = 'mobileagents_tool_calls_total{tool="wiki_search",outcome="error"}'
+        before = metrics.render()
+
+        def boom(**_):
+            raise RuntimeError("down")
+
+        _call_upstream("wiki_search", lambda **_: "found", {})
+        _call_upstream("wiki_search", lambda **_: ToolResult(action="wiki_search", kind="error", text="timed out"), {})
+        with pytest.raises(RuntimeError):
+            _call_upstream("wiki_search", boom, {})
+
+        after = metrics.render()
+        assert _sample(after, ok) - _sample(before, ok) == 1
+        assert _sample(after, error) - _sample(before, error) == 2
+        # Every tool is exported from the start, so rates exist before the first call
+        for action in TOOL_FUNCTIONS:
+            assert f'mobileagents_tool_call_duration_seconds_count{{tool="{action}"}}' in after
+
+    def test_execution_outcome_and_in_flight(self, stub_execution):
+        plan = {"summary": "Research", "steps": [
+            {"id": "s1", "agent_id": "wikipedia", "action": "wiki_search", "params": {"query": "graphs"}},
+        ]}
+        complete = 'mobileagents_executions_total{outcome="complete"}'
+        aborted = 'mobileagents_executions_total{outcome="aborted"}'
+        before = metrics.render()
+
+        async def run(stop_after=None):
+            seen = []
+            stream = execution_tracker.execute_plan_stream(plan, {"nodes": [], "edges": []}, api_key="sk-test")
+            async for chunk in stream:
+                seen.append(_sample(metrics.render(), "mobileagents_executions_in_flight"))
+                if stop_after and len(seen) == stop_after:
+                    await stream.aclose()
+                    break
+            return seen
+
+        in_flight = asyncio.run(run())
+        asyncio.run(run(stop_after=1))
+
+        after = metrics.render()
+        assert set(in_flight) == {1}
+        assert _sample(after, "mobileagents_executions_in_flight") == 0
+        assert _sample(after, complete) - _sample(before, complete) == 1
+        assert _sample(after, aborted) - _sample(before, aborted) == 1
+
+
+class TestEndpoint:
+    def test_exposition_includes_requests_and_pool(self):
+        from main import app
+
+        client = TestClient(app)
+        client.get("/api/health")
+        client.get("/api/no-such-route")
+        resp = client.get("/metrics")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = resp.text
+        assert _sample(text, 'mobileagents_http_requests_total{route="/api/health",method="GET",status="2xx"}') >= 1
+        assert _sample(text, 'mobileagents_http_requests_total{route="unmatched",method="GET",status="4xx"}') >= 1
+        assert 'mobileagents_http_request_duration_seconds_count{route="/api/health",method="GET"}' in text
+        assert _sample(text, 'mobileagents_to_thread_workers{state="max"}') > 0
+        for name in ("mobileagents_tool_cache_hit_ratio", "mobileagents_synthesis_cache_hit_ratio",
+                     "mobileagents_llm_scheduler_calls", "mobileagents_sse_streams_active",
+                     "mobileagents_approvals_pending"):
+            assert f"# TYPE {name} " in text
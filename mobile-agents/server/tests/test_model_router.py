@@ -0,0 +1,110 @@
+"""Tests for model chains, fallback and the size routing policy."""
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config import settings
+from services import model_router as router_module
+from services.execution_tracker import _synthesize
+from services.llm_scheduler import SchedulerOverloaded
+from services.model_router import ModelRouter
+
+
+@pytest.fixture
+def routing(monkeypatch):
+    monkeypatch.setattr(settings, "synthesizer_model", "big")
+    monkeypatch.setattr(settings, "model_fallbacks", {"synthesizer": ["backup", "big"]})
+    monkeypatch.setattr(settings, "small_models", {"synthesizer": "small"})
+    monkeypatch.setattr(settings, "small_request_tokens", 1000)
+    monkeypatch.setattr(settings, "model_routing_policy", "size")
+    return ModelRouter()
+
+
+def _failing(*bad):
+    tried = []
+
+    def fn(model):
+        tried.append(model)
+        if model in bad:
+            raise RuntimeError(f"{model} down")
+        return f"from {model}"
+
+    return fn, tried
+
+
+class TestChain:
+    def test_size_policy_prepends_small_model(self, routing):
+        assert routing.chain("synthesizer", size_tokens=500) == ["small", "big", "backup"]
+        assert routing.chain("synthesizer", size_tokens=5000) == ["big", "backup"]
+        assert routing.chain("synthesizer") == ["big", "backup"]
+
+    def test_fixed_policy_ignores_size(self, routing, monkeypatch):
+        monkeypatch.setattr(settings, "model_routing_policy", "fixed")
+        assert routing.model_for("synthesizer", size_tokens=10) == "big"
+
+    def test_unknown_role(self, routing):
+        with pytest.raises(ValueError):
+            routing.chain("poet")
+
+
+class TestCall:
+    def test_falls_back_in_order(self, routing):
+        fn, tried = _failing("small", "big")
+        assert routing.call("synthesizer", fn, size_tokens=10) == ("from backup", "backup")
+        assert tried == ["small", "big", "backup"]
+        ledger = routing.ledger.snapshot()
+        assert (ledger["big"]["errors"], ledger["backup"]["errors"]) == (1, 0)
+
+    def test_raises_last_error_when_every_model_fails(self, routing):
+        fn, tried = _failing("big", "backup")
+        with pytest.raises(RuntimeError, match="backup down"):
+            routing.call("synthesizer", fn)
+        assert tried == ["big", "backup"]
+
+    def test_async_falls_back(self, routing):
+        fn, tried = _failing("big")
+
+        async def afn(model):
+            return fn(model)
+
+        assert asyncio.run(routing.acall("synthesizer", afn)) == ("from backup", "backup")
+
+    def test_overload_is_not_retried(self, routing, monkeypatch):
+        def overloaded(role, est):
+            raise SchedulerOverloaded("busy")
+
+        monkeypatch.setattr(router_module.llm_scheduler, "slot", overloaded)
+        fn, tried = _failing()
+        with pytest.raises(SchedulerOverloaded):
+            routing.call("synthesizer", fn)
+        assert tried == []
+
+
+class TestSynthesisFailure:
+    def test_execution_fails_cleanly_when_the_chain_is_exhausted(self, routing, monkeypatch, stub_execution):
+        monkeypatch.setattr(router_module, "model_router", routing)
+        monkeypatch.setattr("services.execution_tracker.model_router", routing)
+        monkeypatch.setattr(settings, "incremental_synthesis", False)
+
+        def create(model, **kwargs):
+            raise RuntimeError(f"{model} down")
+
+        stub_execution.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        stub_execution.synthesize = _synthesize
+        stub_execution.mode = ("full", "synthesizer")
+        plan = {"summary": "Research", "steps": [
+            {"id": "s1", "agent_id": "wikipedia", "action": "wiki_search", "params": {"query": "q"}},
+        ]}
+
+        events = stub_execution.run(plan, usage_attribution={"executionId": "e1"})
+        assert events[-1]["type"] == "execution_failed"
+        assert events[-1]["error"] == "Synthesis failed: backup down"
+        failed = [r["model"] for e in events if e["type"] == "usage" for r in e["records"] if not r["ok"]]
+        assert failed == ["small", "big", "backup"]
@@ -0,0 +1,220 @@
+"""Tests for monitor schedules and incremental (since-filtered) runs."""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models.results import Paper, ToolResult
+from services import monitors
+from services.monitors import CronSchedule
+
+
+def _utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class TestCronSchedule:
+    def test_every_fifteen_minutes(self):
+        cron = CronSchedule("*/15 * * * *")
+        assert cron.next_after(_utc(2026, 1, 1, 10, 7)) == _utc(2026, 1, 1, 10, 15)
+        assert cron.next_after(_utc(2026, 1, 1, 10, 45)) == _utc(2026, 1, 1, 11, 0)
+
+    def test_weekday_mornings(self):
+        cron = CronSchedule("30 8 * * 1-5")
+        # Friday after 08:30 -> Monday
+        assert cron.next_after(_utc(2026, 1, 2, 9, 0)) == _utc(2026, 1, 5, 8, 30)
+
+    def test_day_fields_either_match(self):
+        # 1st of the month or any Sunday
+        cron = CronSchedule("0 0 1 * 0")
+        assert cron.next_after(_utc(2026, 1, 1, 12, 0)) == _utc(2026, 1, 4, 0, 0)
+
+    def test_aliases_and_month_rollover(self):
+        assert CronSchedule("@daily").next_after(_utc(2026, 12, 31, 23, 59)) == _utc(2027, 1, 1)
+        assert CronSchedule("0 0 29 2 *").next_after(_utc(2026, 3, 1)) == _utc(2028, 2, 29)
+
+    @pytest.mark.parametrize("expr", ["* * * *", "61 * * * *", "*/0 * * * *", "a * * * *"])
+    def test_invalid(self, expr):
+        with pytest.raises(ValueError):
+            CronSchedule(expr)
+
+
+def _paper(n: int, published: str) -> Paper:
+    return Paper(title=f"Paper {n}", arxiv_id=f"2601.0000{n}", published=published)
+
+
+class TestArxivSince:
+    def test_pages_oldest_first_so_no_paper_is_skipped(self, monkeypatch):
+        from urllib.parse import parse_qs, urlparse
+
+        from config import settings
+        from crew import tools
+
+        # 12 papers, one a day; the feed honours the date range, start,
+        # max_results and order
+        feed = [_paper(n, f"2026-01-{n + 1:02d}T00:00:00Z") for n in range(12)]
+        requests = []
+
+        class _Response:
+            def __init__(self, body):
+                self.body = body
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def read(self):
+                return self.body.encode()
+
+        def urlopen(url, timeout=None):
+            query = parse_qs(urlparse(url).query)
+            requests.append(query)
+            stamp = query["search_query"][0].split("submittedDate:[", 1)[1][:12]
+            papers = [p for p in feed if "".join(c for c in p.published if c.isdigit())[:12] >= stamp]
+            if query["sortOrder"] == ["descending"]:
+                papers = papers[::-1]
+            start, count = int(query["start"][0]), int(query["max_results"][0])
+            entries = "".join(
+                f"<entry><id>http://arxiv.org/abs/{p.arxiv_id}</id><title>{p.title}</title>"
+                f"<summary>-</summary><published>{p.published}</published></entry>"
+                for p in papers[start:start + count]
+            )
+            return _Response(f'<feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>')
+
+        monkeypatch.setattr(tools.urllib.request, "urlopen", urlopen)
+        monkeypatch.setattr(settings, "arxiv_since_max_results", 6)
+
+        first = tools._arxiv_search_result("graphs", max_results=4, since="2026-01-02T00:00:00Z")
+        assert [r["start"] for r in requests] == [["0"], ["4"]]
+        # Capped at 6 fetched (one at the mark); newest first
+        assert [p.published[:10] for p in first.papers] == [f"2026-01-{d:02d}" for d in (7, 6, 5, 4, 3)]
+
+        second = tools._arxiv_search_result("graphs", max_results=4, since=first.papers[0].published)
+        assert [p.published[:10] for p in second.papers] == [f"2026-01-{d:02d}" for d in (12, 11, 10, 9, 8)]
+
+
+class TestMonitorRuns:
+    @pytest.fixture(autouse=True)
+    def _isolate(self, tmp_path, monkeypatch, stub_execution):
+        from config import settings
+
+        monkeypatch.setattr(monitors, "MONITORS_FILE", tmp_path / "monitors.json")
+        monkeypatch.setattr(monitors, "_monitors", {})
+        monkeypatch.setattr(settings, "research_index_enabled", False)
+        monkeypatch.setattr(settings, "vector_store_enabled", False)
+
+        self.feed = [_paper(1, "2026-01-01T00:00:00Z"), _paper(2, "2026-01-02T00:00:00Z")]
+        self.stub = stub_execution
+
+        def call_tool(action, params, prev, *args):
+            if action == "arxiv_search":
+                since = params.get("since", "")
+                return ToolResult(
+                    action=action, kind="papers",
+                    papers=[p for p in self.feed if p.published > since],
+                )
+            return ToolResult(action=action, text=f"{len(prev['s1'].papers)} new")
+
+        stub_execution.tool = call_tool
+        stub_execution.synthesize = lambda *args: ("digest", "test-model")
+
+        self.monitor = monitors.create_monitor({
+            "schedule": "@daily",
+            "plan": {
+                "summary": "Track new papers",
+                "steps": [
+                    {"id": "s1", "action": "arxiv_search", "params": {"query": "Graph  Transformers"}},
+                    {"id": "s2", "action": "generate_proposal", "depends_on": ["s1"]},
+                ],
+            },
+        })
+
+    def _run(self) -> dict:
+        return asyncio.run(monitors.run_monitor(self.monitor["id"]))
+
+    def test_high_water_advances_and_skips_when_unchanged(self):
+        first = self._run()
+        assert first["lastStatus"] == "completed" and first["newPapers"] == 2
+        assert first["highWater"] == {"graph transformers": "2026-01-02T00:00:00Z"}
+        assert "since" not in self.stub.calls[0][1]
+
+        self.stub.calls.clear()
+        second = self._run()
+        assert second["lastStatus"] == "unchanged" and second["newPapers"] == 0
+        # Only the search ran, with the mark; the dependent step and synthesis were skipped
+        assert self.stub.calls == [
+            ("arxiv_search", {"query": "Graph  Transformers", "since": "2026-01-02T00:00:00Z"})
+        ]
+        assert self.stub.synthesized == 1
+        assert second["lastSummary"] == "digest"
+
+    def test_only_new_papers_are_processed(self):
+        self._run()
+        self.feed.append(_paper(3, "2026-01-03T00:00:00Z"))
+        self.stub.calls.clear()
+        run = self._run()
+        assert run["lastStatus"] == "completed" and run["newPapers"] == 1
+        assert run["highWater"]["graph transformers"] == "2026-01-03T00:00:00Z"
+        assert [a for a, _ in self.stub.calls] == ["arxiv_search", "generate_proposal"]
+        assert self.stub.synthesized == 2
+
+    def test_run_usage_is_attributed_and_persisted(self, monkeypatch):
+        from services import db, usage
+
+        persisted = []
+        monkeypatch.setattr(db, "insert_usage", persisted.extend)
+        self.monitor["userId"] = "u1"
+
+        def synthesize(*args):
+            usage.record("synthesizer", "gpt-4o", 10)
+            return "digest", "test-model"
+
+        self.stub.synthesize = synthesize
+        self._run()
+        assert [(r["role"], r["userId"], r["source"]) for r in persisted] == [
+            ("synthesizer", "u1", f"monitor:{self.monitor['id']}"),
+        ]
+
+    def test_only_the_owner_sees_and_changes_a_monitor(self):
+        from fastapi import HTTPException
+
+        from routers import monitors as api
+
+        self.monitor["userId"] = "u1"
+        owner, other = {"sub": "u1"}, {"sub": "u2"}
+        assert [m["id"] for m in asyncio.run(api.list_monitors(owner))] == [self.monitor["id"]]
+        assert asyncio.run(api.list_monitors(other)) == []
+        for call in (
+            api.update_monitor(self.monitor["id"], api.MonitorUpdate(enabled=False), other),
+            api.delete_monitor(self.monitor["id"], other),
+            api.run_monitor(self.monitor["id"], other),
+        ):
+            with pytest.raises(HTTPException) as e:
+                asyncio.run(call)
+            assert e.value.status_code == 404
+        assert self.monitor["enabled"] and self.stub.calls == []
+        updated = asyncio.run(api.update_monitor(self.monitor["id"], api.MonitorUpdate(enabled=False), owner))
+        assert updated["enabled"] is False
+
+    def test_scheduler_starts_due_monitors(self):
+        due = datetime.fromisoformat(self.monitor["nextRunAt"])
+
+        async def scenario():
+            scheduler = monitors.MonitorScheduler(max_concurrent=1)
+            assert scheduler.tick(due - timedelta(minutes=1)) == []
+            assert scheduler.tick(due) == [self.monitor["id"]]
+            # Already running: not started twice
+            assert scheduler.tick(due) == []
+            await asyncio.gather(*scheduler._running.values())
+
+        asyncio.run(scenario())
+        assert self.monitor["lastStatus"] == "completed"
+        assert datetime.fromisoformat(self.monitor["nextRunAt"]) == due + timedelta(days=1)
@@ -0,0 +1,81 @@
+"""Tests for cross-source paper deduplication."""
+
+import os
+import sys
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models.results import Paper, ToolResult
+from services.paper_index import PaperIndex
+
+
+def _arxiv(*papers):
+    return ToolResult(action="arxiv_search", kind="papers", query="q", papers=list(papers))
+
+
+def _s2(*papers):
+    return ToolResult(action="semantic_scholar_search", kind="papers", query="q", papers=list(papers))
+
+
+ATTENTION_ARXIV = Paper(
+    title="Attention Is All You Need",
+    url="http://arxiv.org/abs/1706.03762v7",
+    arxiv_id="1706.03762v7",
+    abstract="The dominant sequence transduction models...",
+)
+ATTENTION_S2 = Paper(
+    title="Attention is All you Need",
+    s2_id="204e3073",
+    arxiv_id="1706.03762",
+    citation_count=90000,
+    influential_citation_count=12000,
+    year=2017,
+)
+BERT_S2 = Paper(title="BERT: Pre-training of Deep Bidirectional Transformers", s2_id="df2b0e26", doi="10.18653/V1/N19-1423")
+
+
+class TestPaperIndex:
+    def test_merges_across_sources(self):
+        index = PaperIndex()
+        first, _ = index.absorb(_arxiv(ATTENTION_ARXIV))
+        full, shown = index.absorb(_s2(ATTENTION_S2, BERT_S2))
+        assert len(full.papers) == 2
+        assert [p.title for p in shown.papers] == [BERT_S2.title]
+        assert shown.omitted == 1
+        # The earlier arXiv record now carries Semantic Scholar citation data
+        assert first.papers[0].citation_count == 90000
+        assert first.papers[0].s2_id == "204e3073"
+        assert index.stats["duplicatesRemoved"] == 1
+        assert index.stats["merged"] == 1
+        assert index.stats["tokensSaved"] > 0
+
+    def test_title_match_without_ids(self):
+        index = PaperIndex()
+        index.absorb(_arxiv(Paper(title="Deep Residual Learning", arxiv_id="1512.03385")))
+        _, shown = index.absorb(_s2(Paper(title="Deep  residual learning.", s2_id="x")))
+        assert shown.papers == []
+
+    def test_does_not_mutate_inputs(self):
+        index = PaperIndex()
+        original = ATTENTION_ARXIV.model_copy()
+        index.absorb(_arxiv(ATTENTION_ARXIV))
+        index.absorb(_s2(ATTENTION_S2))
+        assert ATTENTION_ARXIV == original
+
+    def test_fetch_skipped_once_fetched(self):
+        index = PaperIndex()
+        index.absorb(_arxiv(ATTENTION_ARXIV))
+        url = "http://arxiv.org/abs/1706.03762v7"
+        assert not index.already_fetched("arxiv_summarize", url)
+        index.absorb(ToolResult(action="arxiv_summarize", kind="papers", papers=[ATTENTION_ARXIV]))
+        assert index.already_fetched("arxiv_summarize", url)
+        assert index.already_fetched("arxiv_summarize", "http://arxiv.org/abs/1706.03762")
+        assert not index.already_fetched("semantic_scholar_cite", "ARXIV:1706.03762")
+
+    def test_fetch_not_deduped_against_listing(self):
+        index = PaperIndex()
+        index.absorb(_arxiv(ATTENTION_ARXIV))
+        summary = ToolResult(action="arxiv_summarize", kind="papers", papers=[ATTENTION_ARXIV])
+        _, shown = index.absorb(summary)
+        assert len(shown.papers) == 1
@@ -0,0 +1,137 @@
+"""Tests for plan template instantiation and validation."""
+
+import asyncio
+import copy
+import os
+import sys
+
+import pytest
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from crew.agents import AGENT_METADATA
+from services import agent_store
+from services.agent_store import DEFAULT_TEMPLATES
+from services.plan_templates import TemplateError, check_template, instantiate
+
+
+@pytest.fixture(autouse=True)
+def agents(monkeypatch):
+    registry = {k: dict(v) for k, v in AGENT_METADATA.items()}
+    monkeypatch.setattr(agent_store, "_agents_registry", registry)
+    return registry
+
+
+def _template(template_id: str) -> dict:
+    return copy.deepcopy(next(t for t in DEFAULT_TEMPLATES if t["id"] == template_id))
+
+
+class TestInstantiate:
+    def test_defaults_are_valid(self):
+        for template in DEFAULT_TEMPLATES:
+            check_template(template)
+
+    def test_slots_filled_with_types(self):
+        result = instantiate(_template("literature_digest"), {"topic": "graph transformers", "max_results": "3"})
+        plan, graph = result["plan"], result["graph"]
+        search = plan["steps"][0]
+        assert search["params"] == {"query": "graph transformers", "max_results": 3}
+        assert search["description"] == "Search arXiv for graph transformers"
+        assert plan["steps"][3]["params"] == {"channel": "#lab"}
+        assert plan["summary"] == "Literature digest on graph transformers posted to #lab"
+        assert plan["template"] == {
+            "id": "literature_digest",
+            "args": {"topic": "graph transformers", "max_results": 3, "channel": "#lab"},
+        }
+        assert graph["taskId"] == plan["id"]
+        node_ids = {n["id"] for n in graph["nodes"]}
+        assert {"step_1", "step_4", "checkpoint_step_4", "output"} <= node_ids
+
+    def test_approval_follows_agent(self):
+        plan = instantiate(_template("literature_digest"), {"topic": "x"})["plan"]
+        assert [s["requires_approval"] for s in plan["steps"]] == [False, False, False, True]
+
+    @pytest.mark.parametrize(
+        "args, message",
+        [
+            ({}, "Missing template argument: topic"),
+            ({"topic": "x", "max_results": "many"}, "expects integer"),
+            ({"topic": "x", "colour": "red"}, "Unknown template arguments: colour"),
+        ],
+    )
+    def test_bad_arguments(self, args, message):
+        with pytest.raises(TemplateError, match=message):
+            instantiate(_template("literature_digest"), args)
+
+    def test_disabled_agent(self, agents):
+        agents["slack"]["enabled"] = False
+        with pytest.raises(TemplateError, match="agent 'slack' is not available"):
+            instantiate(_template("literature_digest"), {"topic": "x"})
+
+
+class TestCheckTemplate:
+    def test_invalid_steps(self):
+        template = _template("topic_background")
+        template["steps"][0]["action"] = "wiki_lookup"
+        template["steps"][1]["depends_on"] = ["step_3"]
+        template["steps"][1]["params"]["limit"] = 3
+        with pytest.raises(TemplateError) as e:
+            check_template(template)
+        assert "unknown action 'wiki_lookup'" in str(e.value)
+        assert "unknown or later step 'step_3'" in str(e.value)
+        assert "arxiv_search has no param 'limit'" in str(e.value)
+
+    def test_placeholder_without_slot(self):
+        template = _template("topic_background")
+        template["summary"] = "Background on {subject}"
+        with pytest.raises(TemplateError, match="Placeholders without slots: subject"):
+            check_template(template)
+
+    def test_enum_slot(self):
+        template = _template("topic_background")
+        template["slots"].append({"name": "depth", "type": "enum", "options": ["brief", "full"], "default": "brief"})
+        template["steps"][0]["description"] = "Find {depth} background on {topic}"
+        check_template(template)
+        plan = instantiate(template, {"topic": "x"})["plan"]
+        assert plan["steps"][0]["description"] == "Find brief background on x"
+        with pytest.raises(TemplateError, match="one of"):
+            instantiate(template, {"topic": "x", "depth": "deep"})
+
+
+class TestOwnership:
+    @pytest.fixture(autouse=True)
+    def _registry(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(agent_store, "TEMPLATES_FILE", tmp_path / "plan_templates.json")
+        monkeypatch.setattr(agent_store, "_templates_registry", {t["id"]: copy.deepcopy(t) for t in DEFAULT_TEMPLATES})
+
+    def _status(self, call) -> int:
+        from fastapi import HTTPException
+
+        with pytest.raises(HTTPException) as e:
+            asyncio.run(call)
+        return e.value.status_code
+
+    def test_only_the_creator_changes_a_template(self):
+        from routers import templates as api
+
+        owner, other = {"sub": "u1"}, {"sub": "u2"}
+        body = api.TemplateCreate(**{**_template("topic_background"), "id": "mine"})
+        created = asyncio.run(api.create_template(body, owner))
+        assert created["userId"] == "u1"
+        # Taking over an existing id, or someone else's template, is refused
+        assert self._status(api.create_template(body, other)) == 409
+        assert self._status(api.update_template("mine", body, other)) == 403
+        assert self._status(api.delete_template("mine", other)) == 403
+
+        renamed = api.TemplateCreate(**{**body.model_dump(), "name": "Renamed"})
+        assert asyncio.run(api.update_template("mine", renamed, owner))["userId"] == "u1"
+        assert asyncio.run(api.delete_template("mine", owner)) == {"ok": True}
+
+    def test_built_ins_are_read_only(self):
+        from routers import templates as api
+
+        body = api.TemplateCreate(**_template("literature_digest"))
+        assert self._status(api.update_template("literature_digest", body, {"sub": "u1"})) == 403
+        assert self._status(api.delete_template("literature_digest", {"sub": "u1"})) == 403
+        assert agent_store.get_template("literature_digest") is not None
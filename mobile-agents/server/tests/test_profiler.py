@@ -0,0 +1,116 @@
+"""Tests for the sampling profiler and its admin endpoints."""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from auth import get_current_user
+from config import settings
+from services.profiler import Profile, profiler
+
+
+def _spin(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from main import app
+
+    monkeypatch.setattr(settings, "admin_user_ids", ["admin"])
+    user = {"sub": "admin"}
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        yield TestClient(app), user
+    finally:
+        app.dependency_overrides.clear()
+
+
+class TestSampling:
+    def test_aggregates_loop_and_to_thread_stacks(self):
+        profile = profiler.register(Profile("seconds"))
+
+        async def run():
+            profiler.attach(profile)
+            try:
+                await asyncio.to_thread(_spin, 0.2)
+                _spin(0.1)
+            finally:
+                profiler.detach(profile)
+
+        asyncio.run(run())
+        assert profile.done and profile.samples > 0
+        roots = {stack[0] for stack in profile.stacks}
+        assert {"event_loop", "to_thread"} <= roots
+        spin = [s for s in profile.stacks if any(f.startswith("_spin (tests/test_profiler.py:") for f in s)]
+        assert {s[0] for s in spin} == {"event_loop", "to_thread"}
+
+        line = profile.to_collapsed().splitlines()[0]
+        stack, count = line.rsplit(" ", 1)
+        assert ";" in stack and int(count) > 0
+
+        doc = profile.to_speedscope()
+        frames = doc["shared"]["frames"]
+        assert {p["name"] for p in doc["profiles"]} == roots
+        for p in doc["profiles"]:
+            assert p["type"] == "sampled" and len(p["samples"]) == len(p["weights"])
+            assert all(0 <= i < len(frames) for sample in p["samples"] for i in sample)
+        assert any(f["name"] == "_spin" and f["file"] == "tests/test_profiler.py" for f in frames)
+
+
+class TestEndpoints:
+    def test_requires_admin(self, client):
+        http, user = client
+        user["sub"] = "someone-else"
+        assert http.post("/api/admin/profile", json={"seconds": 0.05}).status_code == 403
+
+    def test_timed_profile(self, client):
+        http, _ = client
+        resp = http.post("/api/admin/profile", json={"seconds": 0.1})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain")
+        resp = http.post("/api/admin/profile", json={"seconds": 0.1, "format": "speedscope"})
+        assert resp.json()["$schema"].startswith("https://www.speedscope.app/")
+        assert http.post("/api/admin/profile", json={}).status_code == 400
+
+    def test_x_profile_header(self, client, monkeypatch):
+        http, _ = client
+        # Without the secret configured, or with the wrong one, the header is ignored
+        assert "X-Profile-Id" not in http.get("/api/health", headers={"X-Profile": "1"}).headers
+        monkeypatch.setattr(settings, "profiler_secret", "s3cret")
+        assert "X-Profile-Id" not in http.get("/api/health", headers={"X-Profile": "1"}).headers
+        resp = http.get("/api/health", headers={"X-Profile": "s3cret"})
+        profile_id = resp.headers["X-Profile-Id"]
+        assert "X-Profile-Id" not in http.get("/api/health").headers
+        profile = http.get(f"/api/admin/profile/{profile_id}?format=speedscope")
+        assert profile.status_code == 200 and "profiles" in profile.json()
+
+    def test_next_requests(self, client):
+        http, _ = client
+        armed = http.post("/api/admin/profile", json={"requests": 2, "routes": ["/api/health"]}).json()
+        assert armed["remainingRequests"] == 2
+        assert http.get(f"/api/admin/profile/{armed['id']}").status_code == 202
+
+        ids = [http.get("/api/health").headers.get("X-Profile-Id") for _ in range(3)]
+        assert ids == [armed["id"], armed["id"], None]
+        assert http.get(f"/api/admin/profile/{armed['id']}").status_code == 200
+        assert http.get("/api/admin/profile/unknown").status_code == 404
+
+    def test_armed_profiles_are_not_evicted(self, client, monkeypatch):
+        http, _ = client
+        monkeypatch.setattr(settings, "profiler_max_results", 2)
+        armed = http.post("/api/admin/profile", json={"requests": 1, "routes": ["/api/health"]}).json()
+        for _ in range(3):
+            http.post("/api/admin/profile", json={"seconds": 0.01})
+        assert http.get(f"/api/admin/profile/{armed['id']}").status_code == 202
+        assert http.get("/api/health").headers.get("X-Profile-Id") == armed["id"]
+        assert http.get(f"/api/admin/profile/{armed['id']}").status_code == 200
@@ -0,0 +1,88 @@
+"""Tests for the local full-text research index."""
+
+import os
+import sys
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models.results import Article, Paper, ToolResult
+from services.research_index import ResearchIndex
+
+
+def _papers(action, *papers):
+    return ToolResult(action=action, kind="papers", query="q", papers=list(papers))
+
+
+class TestResearchIndex:
+    def test_search_and_merge(self, tmp_path):
+        index = ResearchIndex(tmp_path / "index.db")
+        index.ingest(_papers(
+            "arxiv_search",
+            Paper(title="Attention Is All You Need", arxiv_id="1706.03762v7",
+                  abstract="A network architecture based solely on attention."),
+        ))
+        index.ingest(_papers(
+            "semantic_scholar_search",
+            Paper(title="Attention is All you Need", s2_id="204e", arxiv_id="1706.03762",
+                  citation_count=90000),
+        ))
+        assert index.count() == 1
+        result = index.search("attention architecture")
+        assert result.action == "local_search"
+        assert result.papers[0].citation_count == 90000
+        assert "solely on attention" in result.papers[0].abstract
+        index.close()
+
+    def test_articles_keep_longer_text(self, tmp_path):
+        index = ResearchIndex(tmp_path / "index.db")
+        index.ingest(ToolResult(action="wiki_summarize", kind="articles", articles=[
+            Article(title="Transformer", url="https://en.wikipedia.org/wiki/Transformer", text="A long extract " * 20),
+        ]))
+        index.ingest(ToolResult(action="wiki_search", kind="articles", articles=[
+            Article(title="Transformer", page_id=1, text="snippet"),
+        ]))
+        article = index.search("transformer").articles[0]
+        assert article.text.startswith("A long extract")
+        assert article.url
+        index.close()
+
+    def test_errors_and_local_results_not_ingested(self, tmp_path):
+        index = ResearchIndex(tmp_path / "index.db")
+        assert index.ingest(ToolResult.error("arxiv_search", "arXiv search failed: x")) == 0
+        assert index.ingest(_papers("local_search", Paper(title="x"))) == 0
+        assert index.ingest(_papers("related_papers", Paper(title="x"))) == 0
+        assert index.count() == 0
+        index.close()
+
+    def test_coverage_and_compaction(self, tmp_path):
+        index = ResearchIndex(tmp_path / "index.db", max_docs=2)
+        for i in range(4):
+            index.ingest(_papers("arxiv_search", Paper(title=f"Diffusion models part {i}", arxiv_id=f"2401.0000{i}")))
+        assert index.coverage("diffusion models") == 4
+        index.compact()
+        assert index.count() == 2
+        assert index.coverage("diffusion models") == 2
+        # Keys of pruned documents are dropped with them
+        index.ingest(_papers("arxiv_search", Paper(title="Diffusion models part 0", arxiv_id="2401.00000")))
+        assert index.count() == 3
+        index.close()
+
+
+class TestExecution:
+    def test_ingest_failures_are_logged(self, stub_execution, monkeypatch, caplog):
+        from config import settings
+        from services import execution_tracker
+
+        def ingest(result):
+            raise RuntimeError("database is locked")
+
+        monkeypatch.setattr(settings, "research_index_enabled", True)
+        monkeypatch.setattr(settings, "vector_store_enabled", False)
+        monkeypatch.setattr(execution_tracker.research_index, "ingest", ingest)
+        stub_execution.run({"summary": "Research", "steps": [
+            {"id": "s1", "agent_id": "arxiv", "action": "arxiv_search", "params": {"query": "q"}},
+        ]})
+        execution_tracker._store_writer.submit(lambda: None).result(2)
+        assert "ingest failed for arxiv_search result" in caplog.text
+        assert "database is locked" in caplog.text
@@ -0,0 +1,68 @@
+"""Tests for token-budgeted compaction of step results."""
+
+import os
+import sys
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.result_compactor import compact_results
+from services.tokens import count_tokens
+
+
+def _paper(title: str, abstract: str) -> str:
+    return f"**{title}**\nAuthors: A. Author\nURL: http://arxiv.org/abs/1234.5678\nAbstract: {abstract}"
+
+
+FILLER = " ".join(f"Unrelated sentence number {i} about cooking recipes." for i in range(40))
+
+
+class TestCompactResults:
+    def test_under_budget_unchanged(self):
+        steps = [{"description": "s1", "result": _paper("Graph Networks", "Short abstract.")}]
+        compacted, stats = compact_results(steps, "graph networks", 10_000)
+        assert compacted[0]["result"] == steps[0]["result"]
+        assert stats["tokensSaved"] == 0
+        assert stats["duplicatesRemoved"] == 0
+
+    def test_dedup_keeps_richest_copy(self):
+        short = _paper("Graph Neural Networks", "Short.")
+        long = _paper("Graph neural networks", "A much longer abstract about message passing on graphs.")
+        steps = [
+            {"description": "search", "result": short + "\n\n---\n\n" + _paper("Other Paper", "Other.")},
+            {"description": "summarize", "result": long},
+        ]
+        compacted, stats = compact_results(steps, "graph", 10_000)
+        assert stats["duplicatesRemoved"] == 1
+        assert "message passing" in compacted[0]["result"]
+        assert "Other Paper" in compacted[0]["result"]
+        assert "Covered by earlier results" in compacted[1]["result"]
+
+    def test_trims_to_budget_keeping_relevant_sentences(self):
+        abstract = FILLER + " Transformers use attention to model long sequences."
+        steps = [{"description": "s1", "result": _paper("Attention Paper", abstract)}]
+        compacted, stats = compact_results(steps, "attention transformers", 80)
+        result = compacted[0]["result"]
+        assert "**Attention Paper**" in result
+        assert "Transformers use attention" in result
+        assert count_tokens(result) <= 100
+        assert stats["tokensSaved"] > 0
+
+    def test_disabled_budget(self):
+        steps = [{"description": "s1", "result": FILLER}]
+        compacted, stats = compact_results(steps, "x", 0)
+        assert compacted is steps
+        assert stats["tokensBefore"] == stats["tokensAfter"]
+
+    def test_many_items_stay_within_budget(self):
+        # Headers plus the per-block minimum alone would overshoot the budget
+        papers = [_paper(f"Cooking Paper {i}", FILLER) for i in range(30)]
+        papers[17] = _paper("Attention Paper", "Transformers use attention to model long sequences.")
+        steps = [
+            {"description": "s1", "result": "\n\n---\n\n".join(papers[:15])},
+            {"description": "s2", "result": "\n\n---\n\n".join(papers[15:])},
+        ]
+        compacted, stats = compact_results(steps, "attention transformers", 400)
+        assert stats["tokensAfter"] <= 400
+        assert "**Attention Paper**" in compacted[1]["result"]
+        assert "Cooking Paper 29" not in compacted[1]["result"]
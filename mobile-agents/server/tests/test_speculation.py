@@ -0,0 +1,112 @@
+"""Tests for speculative execution of read-only steps."""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+
+import pytest
+from starlette.requests import Request
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config import settings
+from models.results import ToolResult
+from services import execution_tracker, speculation
+from services.speculation import SpeculationStore, speculable_steps
+
+PLAN = {"id": "abcd1234", "summary": "Research", "steps": [
+    {"id": "s1", "agent_id": "wikipedia", "action": "wiki_search", "params": {"query": "graphs"}},
+    {"id": "s2", "agent_id": "slack", "action": "slack_send_message", "depends_on": ["s1"],
+     "params": {"recipient": "#lab", "message": "digest"}},
+    {"id": "s3", "agent_id": "proposal", "action": "generate_proposal", "depends_on": ["s2"]},
+]}
+
+
+@pytest.fixture
+def store():
+    return SpeculationStore()
+
+
+@pytest.fixture
+def spec_calls(monkeypatch):
+    calls = []
+
+    def call_tool(action, params, prev_results, description="", agent_id=""):
+        calls.append(action)
+        return ToolResult(action=action, text=f"speculative {action}")
+
+    monkeypatch.setattr(speculation, "_call_tool", call_tool)
+    return calls
+
+
+class TestSpeculableSteps:
+    def test_side_effects_and_their_dependents_are_never_speculated(self):
+        assert [s["id"] for s in speculable_steps(PLAN)] == ["s1"]
+        only_slack = {"id": "p2", "steps": [PLAN["steps"][1] | {"depends_on": []}]}
+        assert speculable_steps(only_slack) == []
+        assert SpeculationStore().start(only_slack, "u1") is None
+
+    def test_bound_to_the_planning_user(self, store, spec_calls):
+        async def scenario():
+            spec = store.start(PLAN, "u1")
+            assert store.take(PLAN["id"], "u2") is None
+            assert store.take(PLAN["id"], "u1") is spec
+            assert store.take(PLAN["id"], "u1") is None
+            spec.cancel()
+
+        asyncio.run(scenario())
+
+
+class TestExecution:
+    def test_reuses_speculative_result(self, store, spec_calls, stub_execution):
+        plan = {**PLAN, "steps": PLAN["steps"][:1]}
+
+        async def scenario():
+            spec = store.start(plan, "u1")
+            await spec.steps["s1"].task
+            stream = execution_tracker.execute_plan_stream(
+                plan, {"nodes": [], "edges": []}, api_key="sk-test", speculation=store.take(plan["id"], "u1")
+            )
+            return [json.loads(c[len("data: "):]) async for c in stream]
+
+        events = asyncio.run(scenario())
+        step = next(e for e in events if e.get("nodeId") == "s1" and e.get("status") == "completed")
+        assert step["speculated"] and "speculative wiki_search" in step["result"]
+        assert spec_calls == ["wiki_search"] and stub_execution.calls == []
+
+    def test_abort_cancels_pending_speculation(self, store, monkeypatch, stub_execution):
+        from routers import execute
+
+        monkeypatch.setattr(execute, "speculation_store", store)
+        release = threading.Event()
+
+        def slow_tool(action, *args, **kwargs):
+            release.wait(2)
+            return ToolResult(action=action, text="late")
+
+        monkeypatch.setattr(speculation, "_call_tool", slow_tool)
+        monkeypatch.setattr(settings, "openai_api_key", "sk-test")
+        plan = {**PLAN, "steps": [PLAN["steps"][0], {**PLAN["steps"][0], "id": "s2", "depends_on": ["s1"]}]}
+        body = json.dumps({"plan": plan, "graph": {"nodes": [], "edges": []}}).encode()
+
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def scenario():
+            spec = store.start(plan, "u1")
+            request = Request({"type": "http", "method": "POST", "headers": []}, receive)
+            response = await execute.execute_plan(request, {"sub": "u1"})
+            await response.body_iterator.__anext__()  # graph_init
+            # The client disconnects before the run reaches the speculated steps
+            await response.body_iterator.aclose()
+            await asyncio.sleep(0)
+            tasks = [s.task for s in spec.steps.values()]
+            release.set()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            return tasks
+
+        tasks = asyncio.run(scenario())
+        assert all(t.cancelled() for t in tasks)
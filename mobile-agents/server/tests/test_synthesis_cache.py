@@ -0,0 +1,60 @@
+"""Tests for the orchestrator synthesis cache."""
+
+import os
+import sys
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.synthesis_cache import SynthesisCache
+
+
+STEPS = [
+    {"description": "Search arXiv for diffusion models", "result": "**Paper A**\nAbstract: denoising diffusion"},
+    {"description": "Search Wikipedia for diffusion", "result": "**Diffusion model** (pageid: 1)\ngenerative models"},
+]
+
+
+class TestSynthesisCache:
+    def test_exact_hit(self):
+        cache = SynthesisCache(max_entries=4)
+        cache.put("diffusion models", "Research diffusion", STEPS, "summary")
+        assert cache.get("diffusion models", "Research diffusion", STEPS) == ("summary", "exact")
+
+    def test_order_matters(self):
+        cache = SynthesisCache(max_entries=4)
+        cache.put("diffusion models", "Research diffusion", STEPS, "summary")
+        assert cache.get("diffusion models", "Research diffusion", list(reversed(STEPS))) is None
+
+    def test_lru_eviction(self):
+        cache = SynthesisCache(max_entries=2)
+        cache.put("a", "", STEPS, "1")
+        cache.put("b", "", STEPS, "2")
+        cache.get("a", "", STEPS)
+        cache.put("c", "", STEPS, "3")
+        assert cache.get("b", "", STEPS) is None
+        assert cache.get("a", "", STEPS) == ("1", "exact")
+
+    def test_similarity_fallback(self):
+        cache = SynthesisCache(max_entries=4, similarity_threshold=0.9)
+        cache.put("diffusion models", "Research diffusion", STEPS, "summary")
+        hit = cache.get("diffusion models please", "Research diffusion", STEPS)
+        assert hit == ("summary", "similar")
+
+    def test_similarity_disabled_by_default(self):
+        cache = SynthesisCache(max_entries=4)
+        cache.put("diffusion models", "Research diffusion", STEPS, "summary")
+        assert cache.get("diffusion models please", "Research diffusion", STEPS) is None
+
+    def test_entries_are_only_served_to_their_user(self):
+        cache = SynthesisCache(max_entries=4, similarity_threshold=0.9)
+        cache.put("diffusion models", "Research diffusion", STEPS, "summary", "u1")
+        assert cache.get("diffusion models", "Research diffusion", STEPS, "u2") is None
+        assert cache.get("diffusion models please", "Research diffusion", STEPS, "u2") is None
+        assert cache.get("diffusion models", "Research diffusion", STEPS, "u1") == ("summary", "exact")
+        assert cache.get("diffusion models please", "Research diffusion", STEPS, "u1") == ("summary", "similar")
+
+    def test_disabled(self):
+        cache = SynthesisCache(max_entries=0)
+        cache.put("a", "", STEPS, "1")
+        assert cache.get("a", "", STEPS) is None
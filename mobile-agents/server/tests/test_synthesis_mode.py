@@ -0,0 +1,64 @@
+"""Tests for adaptive synthesis mode selection."""
+
+import os
+import sys
+
+import pytest
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config import settings
+from models.results import ToolResult
+from services import execution_tracker
+from services.execution_tracker import _choose_synthesis
+
+
+def _result(text, agent_id="arxiv", action="arxiv_search", error=False):
+    return {"description": "step", "result": text, "agent_id": agent_id, "action": action, "error": error}
+
+
+class TestChooseSynthesis:
+    @pytest.fixture(autouse=True)
+    def _adaptive(self, monkeypatch):
+        monkeypatch.setattr(settings, "adaptive_synthesis", True)
+        monkeypatch.setattr(settings, "synthesis_passthrough_tokens", 20)
+        monkeypatch.setattr(settings, "synthesis_fast_max_tokens", 200)
+
+    def test_passthrough(self):
+        assert _choose_synthesis([_result("short answer")]) == ("passthrough", None)
+        confirmation = _result("Message sent " * 50, "slack", "slack_send_message")
+        assert _choose_synthesis([confirmation]) == ("passthrough", None)
+
+    def test_failed_step_is_never_passed_through(self):
+        failed = _result("arXiv search failed: timeout", error=True)
+        assert _choose_synthesis([failed]) == ("fast", "synthesizer_fast")
+
+    def test_fast_for_short_single_source(self):
+        assert _choose_synthesis([_result("word " * 50), _result("more " * 50)]) == ("fast", "synthesizer_fast")
+
+    def test_full_for_several_sources_or_long_input(self):
+        assert _choose_synthesis([_result("word " * 50), _result("more " * 50, "wikipedia")]) == ("full", "synthesizer")
+        assert _choose_synthesis([_result("word " * 500)]) == ("full", "synthesizer")
+
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setattr(settings, "adaptive_synthesis", False)
+        assert _choose_synthesis([_result("short answer")]) == ("full", "synthesizer")
+
+
+class TestExecution:
+    def test_summaries_of_failed_steps_are_not_cached(self, stub_execution, monkeypatch):
+        monkeypatch.setattr(settings, "incremental_synthesis", False)
+        stored = []
+        monkeypatch.setattr(execution_tracker.synthesis_cache, "put", lambda *args: stored.append(args))
+        plan = {"summary": "Research", "steps": [
+            {"id": "s1", "agent_id": "arxiv", "action": "arxiv_search", "params": {"query": "q"}},
+        ]}
+
+        stub_execution.tool = lambda action, *args: ToolResult.error(action, "arXiv search failed: timeout")
+        stub_execution.run(plan)
+        assert stored == []
+
+        stub_execution.tool = lambda action, *args: ToolResult(action=action, text="papers")
+        stub_execution.run(plan)
+        assert len(stored) == 1
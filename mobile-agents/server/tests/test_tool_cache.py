@@ -0,0 +1,89 @@
+"""Tests for the shared read-only tool cache."""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models.results import ToolResult
+from services.tool_cache import ToolCache
+
+
+class _Upstream:
+    """A search tool that records its calls and can be held mid-call."""
+
+    def __init__(self, error: bool = False):
+        self.calls: list[str] = []
+        self.error = error
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, query: str, max_results: int = 5) -> ToolResult:
+        self.calls.append(query)
+        self.started.set()
+        self.release.wait(2)
+        if self.error:
+            return ToolResult.error("arxiv_search", "arXiv search failed: upstream down")
+        return ToolResult(action="arxiv_search", query=query)
+
+
+class TestKey:
+    def test_only_case_insensitive_arguments_are_lowercased(self):
+        upstream = _Upstream()
+        key = ToolCache.key
+        assert key("arxiv_search", upstream, {"query": "  Graph   Networks"}) == key(
+            "arxiv_search", upstream, {"query": "graph networks", "max_results": 5}
+        )
+
+        def cite(paper_id: str) -> str:
+            return paper_id
+
+        assert key("semantic_scholar_cite", cite, {"paper_id": "ABC"}) != key(
+            "semantic_scholar_cite", cite, {"paper_id": "abc"}
+        )
+
+
+class TestCall:
+    def test_concurrent_calls_are_coalesced(self):
+        cache, upstream = ToolCache(), _Upstream()
+        upstream.release.clear()
+        with ThreadPoolExecutor(2) as pool:
+            first = pool.submit(cache.call, "arxiv_search", upstream, {"query": "graphs"})
+            upstream.started.wait(2)
+            second = pool.submit(cache.call, "arxiv_search", upstream, {"query": "Graphs"})
+            deadline = time.monotonic() + 2
+            while cache.stats["coalesced"] == 0 and time.monotonic() < deadline:
+                time.sleep(0.001)
+            upstream.release.set()
+            assert first.result() is second.result()
+        assert upstream.calls == ["graphs"]
+        assert (cache.stats["misses"], cache.stats["coalesced"]) == (1, 1)
+
+    def test_prefetch_hits_count_once(self):
+        cache, upstream = ToolCache(), _Upstream()
+        cache.call("arxiv_search", upstream, {"query": "graphs"}, "prefetch")
+        cache.call("arxiv_search", upstream, {"query": "graphs"})
+        cache.call("arxiv_search", upstream, {"query": "graphs"})
+        assert upstream.calls == ["graphs"]
+        snap = cache.snapshot()
+        assert (snap["prefetched"], snap["prefetchHits"], snap["hits"]) == (1, 1, 2)
+        assert snap["prefetchHitRate"] == 1.0
+
+    def test_errors_are_not_cached(self):
+        cache, upstream = ToolCache(), _Upstream(error=True)
+        for _ in range(2):
+            assert cache.call("arxiv_search", upstream, {"query": "graphs"}).is_error
+        assert upstream.calls == ["graphs", "graphs"]
+        assert cache.snapshot()["entries"] == 0
+
+    def test_local_index_lookups_are_not_cached(self):
+        cache, upstream = ToolCache(), _Upstream()
+        for _ in range(2):
+            cache.call("local_search", upstream, {"query": "graphs"})
+        assert upstream.calls == ["graphs", "graphs"]
+        assert cache.stats["misses"] == 0
@@ -0,0 +1,128 @@
+"""Tests for tracing spans across execution, tool HTTP calls and requests."""
+
+import json
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from auth import get_current_user
+from config import settings
+from loadtest.fake_upstreams import Profile
+from loadtest.run import start_fakes
+from services import execution_tracker, tracing
+from services.execution_tracker import _call_tool
+
+
+@pytest.fixture(autouse=True)
+def memory_tracing():
+    tracing.configure("memory")
+    yield tracing.memory_exporter
+    tracing.configure()
+
+
+@pytest.fixture(scope="module")
+def fakes():
+    profile = Profile()
+    for service in profile.latency:
+        profile.set(service, latency="fixed:0")
+    url, server = start_fakes(profile)
+    yield url
+    server.should_exit = True
+
+
+def _by_name(spans) -> dict:
+    return {s.name: s for s in spans}
+
+
+class TestExecutionSpans:
+    def test_steps_tools_http_and_synthesis(self, fakes, memory_tracing, stub_execution, monkeypatch):
+        monkeypatch.setattr(settings, "arxiv_api_url", f"{fakes}/arxiv/api/query")
+        monkeypatch.setattr(settings, "wikipedia_url", f"{fakes}/wiki")
+        monkeypatch.setattr(settings, "research_index_enabled", False)
+        monkeypatch.setattr(settings, "vector_store_enabled", False)
+        monkeypatch.setattr(execution_tracker.tool_cache, "max_entries", 0)
+        stub_execution.tool = _call_tool
+
+        plan = {"summary": "Research", "steps": [
+            {"id": "s1", "agent_id": "arxiv", "action": "arxiv_search", "params": {"query": "graphs"}},
+            {"id": "s2", "agent_id": "wikipedia", "action": "wiki_search", "params": {"query": "graphs"},
+             "requires_approval": True},
+        ]}
+
+        events = stub_execution.run(plan)
+        spans = memory_tracing.get_finished_spans()
+        names = [s.name for s in spans]
+        for name in ("execute", "step arxiv_search", "step wiki_search", "tool.call", "http.request",
+                     "http.connect", "http.first_byte", "approval_wait", "synthesis"):
+            assert name in names
+
+        by_id = {s.context.span_id: s for s in spans}
+        execute = _by_name(spans)["execute"]
+        trace_id = format(execute.context.trace_id, "032x")
+        assert all(format(s.context.trace_id, "032x") == trace_id for s in spans)
+        # http.first_byte -> http.request -> tool.call -> step -> execute
+        chain, s = [], _by_name(spans)["http.first_byte"]
+        while s.parent:
+            s = by_id[s.parent.span_id]
+            chain.append(s.name)
+        assert chain[:2] == ["http.request", "tool.call"] and chain[-1] == "execute"
+        assert chain[2].startswith("step ")
+
+        assert trace_id in events[0]["traceparent"]
+        assert events[-1]["type"] == "execution_complete" and events[-1]["traceId"] == trace_id
+        assert _by_name(spans)["synthesis"].attributes["synthesis.model"] == "test-model"
+
+
+class TestRequestSpans:
+    def test_continues_incoming_trace_and_serves_it(self, memory_tracing):
+        from main import app
+
+        app.dependency_overrides[get_current_user] = lambda: {"sub": "u1"}
+        try:
+            client = TestClient(app)
+            incoming = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+            resp = client.get("/api/health", headers={"traceparent": incoming})
+            assert resp.status_code == 200
+            assert resp.headers["traceparent"].split("-")[1] == "0af7651916cd43dd8448eb211c80319c"
+
+            server = _by_name(memory_tracing.get_finished_spans())["GET /api/health"]
+            assert format(server.parent.span_id, "016x") == "b7ad6b7169203331"
+
+            trace = client.get("/api/traces/0af7651916cd43dd8448eb211c80319c").json()
+            assert [s["name"] for s in trace["spans"]] == ["GET /api/health"]
+            assert client.get("/api/traces/" + "0" * 32).status_code == 404
+        finally:
+            app.dependency_overrides.clear()
+
+
+class TestExporters:
+    def test_memory_buffer_is_bounded(self, monkeypatch):
+        monkeypatch.setattr(settings, "tracing_memory_spans", 3)
+        tracing.configure("memory")
+        for i in range(5):
+            with tracing.span(f"s{i}"):
+                pass
+        assert [s.name for s in tracing.memory_exporter.get_finished_spans()] == ["s2", "s3", "s4"]
+
+    def test_file_exporter_writes_json_lines(self, tmp_path, monkeypatch):
+        path = tmp_path / "traces.jsonl"
+        monkeypatch.setattr(settings, "tracing_file_path", str(path))
+        tracing.configure("file")
+        with tracing.span("outer", topic="graphs"):
+            with tracing.span("inner"):
+                pass
+        tracing.flush()
+        spans = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [s["name"] for s in spans] == ["inner", "outer"]
+        assert spans[1]["attributes"] == {"topic": "graphs"}
+
+    def test_none_disables(self):
+        tracing.configure("none")
+        with tracing.span("ignored") as s:
+            assert tracing.traceparent(s) is None
+        assert tracing.memory_exporter is None
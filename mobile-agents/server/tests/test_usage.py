@@ -0,0 +1,175 @@
+"""Tests for the LLM usage ledger."""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+from crewai.types.usage_metrics import UsageMetrics
+from openai.types import CompletionUsage
+from openai.types.completion_usage import PromptTokensDetails
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config import settings
+from models.results import ToolResult
+from services import metrics, usage
+from services.execution_tracker import _synthesize
+from services.model_router import model_router
+
+
+def _response(prompt=100, completion=20, cached=40):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="text"))],
+        usage=CompletionUsage(
+            prompt_tokens=prompt, completion_tokens=completion, total_tokens=prompt + completion,
+            prompt_tokens_details=PromptTokensDetails(cached_tokens=cached),
+        ),
+    )
+
+
+class _Completions:
+    def create(self, **kwargs):
+        return _response()
+
+
+_client = SimpleNamespace(chat=SimpleNamespace(completions=_Completions()))
+
+
+class TestTokens:
+    def test_openai_response(self):
+        assert usage.tokens(_response()) == {
+            "promptTokens": 100, "completionTokens": 20, "cachedTokens": 40, "audioSeconds": 0.0,
+        }
+
+    def test_crewai_plan_result(self):
+        result = {"plan": {}, "usage": UsageMetrics(prompt_tokens=900, completion_tokens=150, cached_prompt_tokens=300)}
+        t = usage.tokens(result)
+        assert (t["promptTokens"], t["completionTokens"], t["cachedTokens"]) == (900, 150, 300)
+
+    def test_transcription_duration(self):
+        t = usage.tokens(SimpleNamespace(text="hi", usage=SimpleNamespace(type="duration", seconds=30)))
+        assert t["audioSeconds"] == 30.0
+        assert usage.cost("whisper-1", t) == pytest.approx(0.003)
+
+    def test_cost_bills_cached_prompt_tokens_at_cached_rate(self, monkeypatch):
+        monkeypatch.setattr(settings, "model_prices", {"m": {"input": 2.0, "cached_input": 0.5, "output": 8.0}})
+        t = usage.tokens(_response(prompt=1_000_000, completion=100_000, cached=400_000))
+        assert usage.cost("m", t) == pytest.approx(0.6 * 2.0 + 0.4 * 0.5 + 0.1 * 8.0)
+        assert usage.cost("unpriced", t) == 0.0
+
+
+class TestRecording:
+    def test_router_calls_are_attributed(self):
+        async def run():
+            records = usage.collect(conversationId="c1", executionId="e1", userId="u1")
+            with usage.scope(stepId="s1", agentId="arxiv"):
+                await asyncio.to_thread(model_router.call, "digest", lambda model: _response())
+            with pytest.raises(RuntimeError):
+                model_router.call("synthesizer", lambda model: (_ for _ in ()).throw(RuntimeError("down")))
+            return records
+
+        records = asyncio.run(run())
+        digest = records[0]
+        assert (digest["role"], digest["stepId"], digest["agentId"], digest["executionId"]) == ("digest", "s1", "arxiv", "e1")
+        assert (digest["promptTokens"], digest["cachedTokens"], digest["ok"]) == (100, 40, True)
+        assert digest["costUsd"] > 0
+        failed = [r for r in records if r["role"] == "synthesizer"]
+        assert failed and not any(r["ok"] for r in failed) and failed[0]["stepId"] is None
+        assert usage.totals(records)["promptTokens"] == 100
+
+        text = metrics.render()
+        assert 'mobileagents_llm_tokens_total{call_site="digest",kind="cached"}' in text
+        assert 'mobileagents_llm_cost_usd_total{call_site="digest",agent="arxiv"}' in text
+
+
+class TestExecutionEvents:
+    def test_usage_events_per_step_and_synthesis(self, stub_execution, monkeypatch):
+        monkeypatch.setattr(settings, "incremental_synthesis", True)
+        stub_execution.client = _client
+        stub_execution.synthesize = _synthesize
+        stub_execution.mode = ("full", "synthesizer")
+        plan = {"summary": "Research", "steps": [
+            {"id": "s1", "agent_id": "arxiv", "action": "arxiv_search", "params": {"query": "q"}},
+            {"id": "s2", "agent_id": "wikipedia", "action": "wiki_search", "params": {"query": "q"}},
+        ]}
+
+        events = stub_execution.run(
+            plan, usage_attribution={"executionId": "e1", "conversationId": "c1", "userId": "u1"}
+        )
+        usage_events = [e for e in events if e["type"] == "usage"]
+        records = [r for e in usage_events for r in e["records"]]
+        assert sorted((r["role"], r["stepId"], r["agentId"]) for r in records) == [
+            ("digest", "s1", "arxiv"), ("digest", "s2", "wikipedia"), ("synthesizer", None, None),
+        ]
+        assert all(r["executionId"] == "e1" and r["userId"] == "u1" for r in records)
+        total = usage_events[-1]["total"]
+        assert (total["calls"], total["promptTokens"], total["completionTokens"]) == (3, 300, 60)
+        assert events[-1]["type"] == "execution_complete"
+
+    def test_discarded_digests_are_still_reported(self, stub_execution, monkeypatch):
+        monkeypatch.setattr(settings, "incremental_synthesis", True)
+        slow = SimpleNamespace(create=lambda **kwargs: time.sleep(0.05) or _response())
+        stub_execution.client = SimpleNamespace(chat=SimpleNamespace(completions=slow))
+        stub_execution.mode = ("passthrough", None)
+        plan = {"summary": "Research", "steps": [
+            {"id": "s1", "agent_id": "arxiv", "action": "arxiv_search", "params": {"query": "q"}},
+            {"id": "s2", "agent_id": "wikipedia", "action": "wiki_search", "params": {"query": "q"}},
+        ]}
+
+        events = stub_execution.run(plan, usage_attribution={"executionId": "e1"})
+        complete = next(i for i, e in enumerate(events) if e["type"] == "execution_complete")
+        records = [r for e in events if e["type"] == "usage" for r in e["records"]]
+        # Both digests were sent before passthrough made them unnecessary
+        assert sorted(r["stepId"] for r in records if r["role"] == "digest") == ["s1", "s2"]
+        assert events[-1]["type"] == "usage" and complete == len(events) - 2
+
+
+class TestPersistence:
+    def test_failed_write_is_logged_not_raised(self, monkeypatch, caplog):
+        def insert_usage(records):
+            raise RuntimeError("relation llm_usage does not exist")
+
+        monkeypatch.setattr(usage.db, "insert_usage", insert_usage)
+        asyncio.run(usage.persist([{"role": "planner"}]))
+        assert "Could not persist 1 usage records" in caplog.text
+
+    def test_execute_persists_usage_when_the_client_disconnects(self, stub_execution, monkeypatch):
+        from starlette.requests import Request
+
+        from routers import execute
+
+        persisted = []
+        monkeypatch.setattr(execute.db, "insert_usage", persisted.extend)
+        monkeypatch.setattr(settings, "incremental_synthesis", False)
+
+        def tool(action, *args):
+            usage.record("worker", "gpt-4o-mini", 5, _response())
+            return ToolResult(action=action, text="ok")
+
+        stub_execution.tool = tool
+        plan = {"id": "p1", "summary": "Research", "steps": [
+            {"id": "s1", "agent_id": "arxiv", "action": "arxiv_search", "params": {"query": "q"}},
+            {"id": "s2", "agent_id": "arxiv", "action": "arxiv_search", "params": {"query": "r"}},
+        ]}
+        body = json.dumps({"plan": plan, "graph": {"nodes": [], "edges": []}}).encode()
+
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def scenario():
+            request = Request({"type": "http", "method": "POST", "headers": []}, receive)
+            response = await execute.execute_plan(request, {"sub": "u1"})
+            async for chunk in response.body_iterator:
+                if '"type": "usage"' in chunk:
+                    break
+            await response.body_iterator.aclose()
+
+        asyncio.run(scenario())
+        assert [(r["role"], r["stepId"], r["userId"], r["source"]) for r in persisted] == [
+            ("worker", "s1", "u1", "execute"),
+        ]
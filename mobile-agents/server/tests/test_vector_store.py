@@ -0,0 +1,144 @@
+"""Tests for the NumPy vector store."""
+
+import os
+import sys
+import threading
+
+import numpy as np
+
+# Add server dir to path so imports work
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models.results import Article, Paper, ToolResult
+from services.vector_store import HashingEmbedder, VectorStore, to_tool_result
+
+TOPICS = [
+    ("Denoising diffusion probabilistic models", "diffusion models generate images by iterative denoising"),
+    ("Graph neural networks for molecules", "message passing neural networks predict molecular properties"),
+    ("Proximal policy optimization", "reinforcement learning policy gradient with clipped objective"),
+    ("Retrieval augmented generation", "language models retrieve documents to ground generation"),
+]
+
+
+def _papers(n_per_topic=1, offset=0):
+    papers = []
+    for t, (title, abstract) in enumerate(TOPICS):
+        for j in range(n_per_topic):
+            papers.append(Paper(
+                title=f"{title} {offset + j}", abstract=abstract, arxiv_id=f"2401.{offset + t * 1000 + j:05d}",
+            ))
+    return ToolResult(action="arxiv_search", kind="papers", papers=papers)
+
+
+class TestVectorStore:
+    def test_embedder_normalized_and_deterministic(self):
+        emb = HashingEmbedder(64)
+        a, b = emb.embed(["graph neural networks", "graph neural networks"])
+        assert np.allclose(a, b)
+        assert abs(np.linalg.norm(a) - 1.0) < 1e-5
+
+    def test_search_finds_topic(self, tmp_path):
+        store = VectorStore(tmp_path, embedder=HashingEmbedder(128))
+        assert store.add(_papers()) == 4
+        store.add(ToolResult(action="wiki_summarize", kind="articles", articles=[
+            Article(title="Diffusion model", text="a class of generative models based on denoising"),
+        ]))
+        hits = store.search(["diffusion denoising images", "policy gradient reinforcement"], k=2)
+        assert hits[0][0][1]["data"]["title"].startswith("Denoising diffusion")
+        assert hits[1][0][1]["data"]["title"].startswith("Proximal policy")
+        result = to_tool_result("q", hits[0])
+        assert result.action == "related_papers"
+        assert result.papers and result.articles
+
+    def test_upsert_by_key_and_persistence(self, tmp_path):
+        store = VectorStore(tmp_path, embedder=HashingEmbedder(128))
+        store.add(_papers())
+        store.add(ToolResult(action="semantic_scholar_search", kind="papers", papers=[
+            Paper(title="Proximal policy optimization 0", arxiv_id="2401.02000",
+                  abstract="reinforcement learning policy gradient with clipped objective, extended",
+                  citation_count=5),
+        ]))
+        assert store.count == 4
+        store.close()
+        reopened = VectorStore(tmp_path, embedder=HashingEmbedder(128))
+        top = reopened.search(["clipped objective"], k=1)[0][0][1]
+        assert top["data"]["citation_count"] == 5
+        assert reopened.count == 4
+
+    def test_ivf_matches_brute_force(self, tmp_path):
+        store = VectorStore(tmp_path, embedder=HashingEmbedder(128), ivf_min_vectors=10**9)
+        store.add(_papers(n_per_topic=50))
+        brute = store.search(["graph message passing molecules"], k=5)[0]
+        store.train_ivf(nlist=4)
+        ivf = store.search(["graph message passing molecules"], k=5)[0]
+        assert all("Graph neural" in r["data"]["title"] for _, r in ivf)
+        assert [round(s, 4) for s, _ in ivf] == [round(s, 4) for s, _ in brute]
+        # New rows are assigned to lists without retraining
+        store.add(_papers(n_per_topic=1, offset=500))
+        assert store._centroids is not None
+        store.close()
+        reopened = VectorStore(tmp_path, embedder=HashingEmbedder(128), ivf_min_vectors=10**9)
+        again = reopened.search(["graph message passing molecules"], k=5)[0]
+        assert reopened._centroids is not None
+        assert all("Graph neural" in r["data"]["title"] for _, r in again)
+
+    def test_ivf_trains_in_the_background(self, tmp_path):
+        store = VectorStore(tmp_path, embedder=HashingEmbedder(128), ivf_min_vectors=100)
+        store.add(_papers(n_per_topic=25))
+        release = threading.Event()
+        train = store.train_ivf
+
+        def slow_train(*args, **kwargs):
+            release.wait(2)
+            train(*args, **kwargs)
+
+        store.train_ivf = slow_train
+        # Served by brute force while the first quantizer trains
+        hits = store.search(["graph message passing molecules"], k=3)[0]
+        assert all("Graph neural" in r["data"]["title"] for _, r in hits)
+        assert store._centroids is None
+        release.set()
+        store._training.join(2)
+        assert store._trained_count == 100
+
+        # Doubling retrains in the background; the old centroids keep serving
+        release.clear()
+        store.add(_papers(n_per_topic=25, offset=500))
+        old = store._centroids
+        assert old is not None and store._training.is_alive()
+        hits = store.search(["graph message passing molecules"], k=3)[0]
+        assert all("Graph neural" in r["data"]["title"] for _, r in hits)
+        release.set()
+        store._training.join(2)
+        assert store._trained_count == 200 and store._centroids is not old
+
+    def test_training_failures_are_logged(self, tmp_path, caplog):
+        store = VectorStore(tmp_path, embedder=HashingEmbedder(128), ivf_min_vectors=4)
+        store.add(_papers())
+
+        def broken_train():
+            raise MemoryError("k-means sample")
+
+        store.train_ivf = broken_train
+        assert store.search(["graph molecules"], k=1)[0]
+        store._training.join(2)
+        assert "IVF training failed for 4 vectors" in caplog.text and store._centroids is None
+
+
+class TestExecution:
+    def test_add_failures_are_logged(self, stub_execution, monkeypatch, caplog):
+        from config import settings
+        from services import execution_tracker
+
+        def add(result):
+            raise OSError("No space left on device")
+
+        monkeypatch.setattr(settings, "research_index_enabled", False)
+        monkeypatch.setattr(settings, "vector_store_enabled", True)
+        monkeypatch.setattr(execution_tracker.vector_store, "add", add)
+        stub_execution.run({"summary": "Research", "steps": [
+            {"id": "s1", "agent_id": "arxiv", "action": "arxiv_search", "params": {"query": "q"}},
+        ]})
+        execution_tracker._store_writer.submit(lambda: None).result(2)
+        assert "add failed for arxiv_search result" in caplog.text
+        assert "No space left on device" in caplog.text